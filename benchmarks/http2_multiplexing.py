@@ -0,0 +1,199 @@
+"""
+Compare throughput of HTTP/1.1 and HTTP/2 clients against a local stand-in server.
+
+Stand-in server accepts both HTTP/1.1 and HTTP/2 (negotiated through TLS ALPN, same as
+the real JustWatch API) and responds to every GraphQL request with an empty
+`GetProviders` response after a fixed delay, simulating API latency. It also counts how
+many TCP connections were opened by the client.
+
+Requires `openssl` command for creating a temporary self-signed certificate and
+optional `http2` dependencies:
+
+```shell
+uv run --extra http2 python benchmarks/http2_multiplexing.py
+```
+"""
+
+import json
+import ssl
+from argparse import ArgumentParser
+from asyncio import (
+    IncompleteReadError,
+    Server,
+    StreamReader,
+    StreamWriter,
+    create_task,
+    gather,
+    run,
+    sleep,
+    start_server,
+)
+from os import environ
+from pathlib import Path
+from subprocess import run as run_command
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import DataReceived, StreamEnded
+from httpx import Limits
+
+from simplejustwatchapi import AsyncJustWatchClient
+
+_RESPONSE = json.dumps({"data": {"packages": []}}).encode()
+
+
+class StandInServer:
+    """Local TLS server answering GraphQL requests over HTTP/1.1 and HTTP/2."""
+
+    def __init__(self, certificate: Path, key: Path, latency: float) -> None:
+        """Init server with a given certificate and simulated response latency."""
+        self.connections = 0
+        self._latency = latency
+        self._ssl = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self._ssl.load_cert_chain(certificate, key)
+        self._ssl.set_alpn_protocols(["h2", "http/1.1"])
+        self._server: Server | None = None
+
+    async def start(self) -> str:
+        """Start server on a random port, return URL of its GraphQL endpoint."""
+        self._server = await start_server(self._handle, "127.0.0.1", 0, ssl=self._ssl)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"https://localhost:{port}/graphql"
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._server:
+            self._server.close()
+
+    async def _handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        self.connections += 1
+        protocol = writer.get_extra_info("ssl_object").selected_alpn_protocol()
+        try:
+            if protocol == "h2":
+                await self._handle_http2(reader, writer)
+            else:
+                await self._handle_http1(reader, writer)
+        except (ConnectionError, IncompleteReadError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_http1(self, reader: StreamReader, writer: StreamWriter) -> None:
+        while headers := await reader.readuntil(b"\r\n\r\n"):
+            length = next(
+                int(line.split(b":")[1])
+                for line in headers.lower().split(b"\r\n")
+                if line.startswith(b"content-length:")
+            )
+            await reader.readexactly(length)
+            await sleep(self._latency)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: %d\r\n\r\n%s" % (len(_RESPONSE), _RESPONSE)
+            )
+            await writer.drain()
+
+    async def _handle_http2(self, reader: StreamReader, writer: StreamWriter) -> None:
+        connection = H2Connection(H2Configuration(client_side=False))
+        connection.initiate_connection()
+        writer.write(connection.data_to_send())
+        responses = set()
+        while data := await reader.read(65535):
+            for event in connection.receive_data(data):
+                if isinstance(event, DataReceived):
+                    connection.acknowledge_received_data(
+                        event.flow_controlled_length, event.stream_id
+                    )
+                elif isinstance(event, StreamEnded):
+                    response = self._respond_http2(connection, writer, event.stream_id)
+                    task = create_task(response)
+                    responses.add(task)
+                    task.add_done_callback(responses.discard)
+            writer.write(connection.data_to_send())
+            await writer.drain()
+
+    async def _respond_http2(
+        self, connection: H2Connection, writer: StreamWriter, stream_id: int
+    ) -> None:
+        await sleep(self._latency)
+        headers = [
+            (":status", "200"),
+            ("content-type", "application/json"),
+            ("content-length", str(len(_RESPONSE))),
+        ]
+        connection.send_headers(stream_id, headers)
+        connection.send_data(stream_id, _RESPONSE, end_stream=True)
+        writer.write(connection.data_to_send())
+        await writer.drain()
+
+
+def create_certificate(directory: Path) -> tuple[Path, Path]:
+    """Create a self-signed certificate for `localhost` through `openssl` command."""
+    certificate = directory / "certificate.pem"
+    key = directory / "key.pem"
+    run_command(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-addext",
+            "subjectAltName=DNS:localhost",
+            "-keyout",
+            str(key),
+            "-out",
+            str(certificate),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return certificate, key
+
+
+async def benchmark(
+    http2: bool, certificate: Path, key: Path, requests: int, connections: int
+) -> None:
+    """Send all requests concurrently, print throughput and number of connections."""
+    server = StandInServer(certificate, key, latency=0.05)
+    url = await server.start()
+    limits = Limits(max_connections=connections, max_keepalive_connections=connections)
+    # Identical requests would be coalesced into one, measure each separately.
+    async with AsyncJustWatchClient(
+        limits=limits, http2=http2, url=url, coalesce=False
+    ) as client:
+        start = perf_counter()
+        await gather(*(client.providers() for _ in range(requests)))
+        elapsed = perf_counter() - start
+    await server.stop()
+    name = "HTTP/2  " if http2 else "HTTP/1.1"
+    print(
+        f"{name}: {requests / elapsed:8.1f} requests/s, "
+        f"{elapsed:6.2f}s total, {server.connections} connections"
+    )
+
+
+async def main(requests: int, connections: int) -> None:
+    """Run benchmark for both HTTP versions."""
+    with TemporaryDirectory() as directory:
+        certificate, key = create_certificate(Path(directory))
+        # httpx reads trusted certificates from this variable.
+        environ["SSL_CERT_FILE"] = str(certificate)
+        await benchmark(False, certificate, key, requests, connections)
+        await benchmark(True, certificate, key, requests, connections)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--connections", type=int, default=10)
+    arguments = parser.parse_args()
+    run(main(arguments.requests, arguments.connections))
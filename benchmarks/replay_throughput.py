@@ -0,0 +1,107 @@
+"""
+Measure offline throughput of the whole prepare → send → parse pipeline.
+
+Workload (search, details of the first result, popular titles and providers) is first
+recorded once from the real JustWatch API, then replayed any number of times without
+network access, with a fixed synthetic latency. Results are deterministic, so they can
+be compared between changes in the library.
+
+```shell
+uv run python benchmarks/replay_throughput.py record recording.jsonl
+uv run python benchmarks/replay_throughput.py replay recording.jsonl --latency 0.05
+```
+
+Replay runs the workload with both sync client (from a thread pool) and async client.
+"""
+
+from argparse import ArgumentParser
+from asyncio import gather, run
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+from httpx import Limits
+
+from simplejustwatchapi import (
+    AsyncJustWatchClient,
+    JustWatchClient,
+    RecordingTransport,
+    ReplayTransport,
+)
+
+_CALLS_PER_WORKLOAD = 4
+
+
+def workload(client: JustWatchClient) -> None:
+    """Run a single workload with a sync client."""
+    results = client.search("The Matrix", count=5)
+    client.details(results[0].entry_id)
+    client.popular(count=10)
+    client.providers()
+
+
+async def async_workload(client: AsyncJustWatchClient) -> None:
+    """Run a single workload with an async client."""
+    results = await client.search("The Matrix", count=5)
+    await client.details(results[0].entry_id)
+    await client.popular(count=10)
+    await client.providers()
+
+
+def record(recording: Path) -> None:
+    """Record the workload from the real JustWatch API."""
+    with JustWatchClient(transport=RecordingTransport(recording)) as client:
+        workload(client)
+    print(f"Recorded workload into {recording}")
+
+
+def replay_sync(recording: Path, latency: float, workloads: int, workers: int) -> None:
+    """Replay workloads with a sync client, from multiple threads."""
+    transport = ReplayTransport(recording, latency=latency)
+    with (
+        JustWatchClient(transport=transport, coalesce=False) as client,
+        ThreadPoolExecutor(max_workers=workers) as executor,
+    ):
+        start = perf_counter()
+        list(executor.map(lambda _: workload(client), range(workloads)))
+        elapsed = perf_counter() - start
+    report("sync ", workloads, elapsed)
+
+
+async def replay_async(recording: Path, latency: float, workloads: int) -> None:
+    """Replay workloads with an async client, all concurrently."""
+    transport = ReplayTransport(recording, latency=latency)
+    limits = Limits(max_connections=None)
+    async with AsyncJustWatchClient(
+        limits=limits, transport=transport, coalesce=False
+    ) as client:
+        start = perf_counter()
+        await gather(*(async_workload(client) for _ in range(workloads)))
+        elapsed = perf_counter() - start
+    report("async", workloads, elapsed)
+
+
+def report(name: str, workloads: int, elapsed: float) -> None:
+    """Print throughput of a single run."""
+    calls = workloads * _CALLS_PER_WORKLOAD
+    print(f"{name}: {calls / elapsed:9.1f} calls/s, {elapsed:6.2f}s for {calls} calls")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("recording", type=Path)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workloads", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=20)
+    arguments = parser.parse_args()
+    if arguments.mode == "record":
+        record(arguments.recording)
+    else:
+        replay_sync(
+            arguments.recording,
+            arguments.latency,
+            arguments.workloads,
+            arguments.workers,
+        )
+        run(replay_async(arguments.recording, arguments.latency, arguments.workloads))
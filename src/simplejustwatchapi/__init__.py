@@ -1,19 +1,42 @@
 """The main simplejustwatchapi package with "public" interface."""
 
+from simplejustwatchapi.batching import BatchPolicy
+from simplejustwatchapi.circuitbreaker import CircuitBreaker
+from simplejustwatchapi.client import AsyncJustWatchClient, JustWatchClient
+from simplejustwatchapi.concurrency import AdaptiveConcurrency
 from simplejustwatchapi.exceptions import (
     JustWatchApiError,
+    JustWatchCircuitOpenError,
+    JustWatchDeadlineError,
     JustWatchError,
     JustWatchHttpError,
 )
+from simplejustwatchapi.hedging import HedgePolicy
 from simplejustwatchapi.justwatch import (
     details,
+    details_for_locales,
+    details_many,
     episodes,
+    episodes_many,
+    iter_popular,
+    iter_search,
     offers_for_countries,
+    offers_matrix,
     popular,
+    popular_for_countries,
     providers,
+    providers_for_countries,
     search,
+    search_many,
     seasons,
+    seasons_many,
+    show_tree,
 )
+from simplejustwatchapi.persisted import PersistedQueries
+from simplejustwatchapi.ratelimit import RateLimiter
+from simplejustwatchapi.retry import RetryPolicy
+from simplejustwatchapi.splitting import SplitPolicy
+from simplejustwatchapi.transport import RecordingTransport, ReplayTransport
 from simplejustwatchapi.tuples import (
     Episode,
     Interactions,
@@ -21,25 +44,52 @@ from simplejustwatchapi.tuples import (
     Offer,
     OfferPackage,
     Scoring,
+    ShowTree,
     StreamingCharts,
 )
 
 __all__ = [
+    "AdaptiveConcurrency",
+    "AsyncJustWatchClient",
+    "BatchPolicy",
+    "CircuitBreaker",
     "Episode",
+    "HedgePolicy",
     "Interactions",
     "JustWatchApiError",
+    "JustWatchCircuitOpenError",
+    "JustWatchClient",
+    "JustWatchDeadlineError",
     "JustWatchError",
     "JustWatchHttpError",
     "MediaEntry",
     "Offer",
     "OfferPackage",
+    "PersistedQueries",
+    "RateLimiter",
+    "RecordingTransport",
+    "ReplayTransport",
+    "RetryPolicy",
     "Scoring",
+    "ShowTree",
+    "SplitPolicy",
     "StreamingCharts",
     "details",
+    "details_for_locales",
+    "details_many",
     "episodes",
+    "episodes_many",
+    "iter_popular",
+    "iter_search",
     "offers_for_countries",
+    "offers_matrix",
     "popular",
+    "popular_for_countries",
     "providers",
+    "providers_for_countries",
     "search",
+    "search_many",
     "seasons",
+    "seasons_many",
+    "show_tree",
 ]
@@ -0,0 +1,274 @@
+"""
+Micro-batching of single-node calls into shared requests ("DataLoader"-style).
+
+Code calling [`details`][simplejustwatchapi.client.JustWatchClient.details] for one
+node ID at a time (e.g., from separate request handlers) sends a separate request for
+each call. With [`BatchPolicy`][simplejustwatchapi.batching.BatchPolicy] passed to
+[`JustWatchClient`][simplejustwatchapi.client.JustWatchClient] or
+[`AsyncJustWatchClient`][simplejustwatchapi.client.AsyncJustWatchClient], calls to
+`details`, `seasons`, and `episodes` made within a short window are collected and sent
+as a single GraphQL query, with an aliased `node` field for each call:
+
+```python
+from simplejustwatchapi import BatchPolicy, JustWatchClient
+
+client = JustWatchClient(batching=BatchPolicy(window=0.005))
+```
+
+Calls are grouped by `country`, `language`, and `best_only` - only calls with the same
+values share a request. Calls for the same data within a window share a single `node`
+field. Each call gets the same result as it would get from a separate request, errors
+related to a single node fail only calls for that node. Large batches are split into
+chunks fitting into client's complexity budget, the same as for [`details_many`]
+[simplejustwatchapi.justwatch.details_many].
+
+The first call of a batch waits for `window` seconds (or until the batch has `max_size`
+elements) before the request is sent, so each call is slower by up to `window`.
+Batching pays off only when many calls are made at the same time - from multiple threads
+for the sync client, or from multiple tasks for the async client. For the async client
+`window` of `0` collects all calls made within a single iteration of the event loop,
+e.g., from [`asyncio.gather`][asyncio.gather].
+
+Request is sent by the thread which made the first call of a batch (or with context of
+such task), so only its [`deadline`][simplejustwatchapi.deadline.deadline] applies to
+the request itself. Other calls wait only until their own deadlines.
+"""
+
+from asyncio import (
+    CancelledError,
+    Future,
+    Task,
+    TimerHandle,
+    ensure_future,
+    get_running_loop,
+    shield,
+    wait_for,
+)
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future as ThreadFuture
+from threading import Event, Lock
+from typing import Any
+
+from simplejustwatchapi.exceptions import JustWatchError
+
+
+class BatchPolicy:
+    """
+    Policy of collecting single-node calls into shared requests.
+
+    Policy holds only configuration, so it can be shared between clients, each client
+    collects its own batches.
+
+    Args:
+        window (float): Time in seconds, for which calls are collected after the first
+            call of a batch.
+        max_size (int): Maximal number of elements in a single batch, batch is sent
+            right away once it's full.
+
+    Raises:
+        exceptions.JustWatchError: Configuration is invalid.
+
+    """
+
+    def __init__(self, window: float = 0.002, max_size: int = 100) -> None:
+        """Init BatchPolicy."""
+        if window < 0 or max_size < 1:
+            error_msg = f"Invalid batching config: {window=}, {max_size=}"
+            raise JustWatchError(error_msg)
+        self._window = window
+        self._max_size = max_size
+
+    @property
+    def window(self) -> float:
+        """Time in seconds, for which calls are collected after the first one."""
+        return self._window
+
+    @property
+    def max_size(self) -> int:
+        """Maximal number of elements in a single batch."""
+        return self._max_size
+
+
+class Batcher:
+    """
+    Batching of calls made concurrently from multiple threads.
+
+    The first thread calling [`load`][simplejustwatchapi.batching.Batcher.load] with a
+    given key starts a new batch, waits for other calls with the same key, and then
+    sends all of them with a single call of `send`. Each thread gets result for its own
+    element, or the exception.
+
+    Args:
+        policy (BatchPolicy): Configuration of batching.
+        send (Callable[[Hashable, list[Hashable]], dict[Hashable, Any]]): Function
+            sending a batch of elements for a key. It returns results for all elements,
+            result which is an exception is raised for calls of that element.
+
+    """
+
+    def __init__(
+        self,
+        policy: BatchPolicy,
+        send: Callable[[Hashable, list[Hashable]], dict[Hashable, Any]],
+    ) -> None:
+        """Init Batcher without any pending batches."""
+        self._policy = policy
+        self._send = send
+        self._lock = Lock()
+        self._pending: dict[Hashable, dict[Hashable, ThreadFuture[Any]]] = {}
+        self._full: dict[Hashable, Event] = {}
+
+    def load(self, key: Hashable, item: Hashable, max_wait: float | None = None) -> Any:
+        """
+        Add element to a batch for the key, wait for its result.
+
+        Args:
+            key (Hashable): Key of a batch, only elements with the same key are sent
+                together.
+            item (Hashable): Element to get result for.
+            max_wait (float | None): Maximal time in seconds to wait for a batch sent
+                by another thread, no limit for `None`.
+
+        Returns:
+            (Any): Result for the element.
+
+        Raises:
+            TimeoutError: Batch sent by another thread didn't finish within `max_wait`.
+
+        """
+        with self._lock:
+            futures = self._pending.get(key)
+            if leader := futures is None:
+                futures = self._pending[key] = {}
+                self._full[key] = Event()
+            full = self._full[key]
+            if (future := futures.get(item)) is None:
+                future = futures[item] = ThreadFuture()
+            if len(futures) >= self._policy.max_size:
+                self._detach(key)
+                full.set()
+        if not leader:
+            return future.result(max_wait)
+        full.wait(self._policy.window)
+        with self._lock:
+            if self._pending.get(key) is futures:
+                self._detach(key)
+        self._dispatch(key, futures)
+        return future.result()
+
+    def _detach(self, key: Hashable) -> None:
+        """Remove pending batch, so following calls start a new one."""
+        del self._pending[key]
+        del self._full[key]
+
+    def _dispatch(
+        self, key: Hashable, futures: dict[Hashable, ThreadFuture[Any]]
+    ) -> None:
+        """Send a batch, set results of all of its elements."""
+        try:
+            results = self._send(key, list(futures))
+        except BaseException as error:  # noqa: BLE001
+            for future in futures.values():
+                future.set_exception(error)
+            return
+        for item, future in futures.items():
+            if isinstance(result := results.get(item), BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class AsyncBatcher:
+    """
+    Batching of coroutine calls made concurrently from multiple tasks.
+
+    The first task calling [`load`][simplejustwatchapi.batching.AsyncBatcher.load]
+    with a given key starts a new batch, which is sent with a single call of `send`
+    after `window`, in a separate task. Each task gets result for its own element, or
+    the exception. Cancelling one of waiting tasks doesn't cancel the batch.
+
+    Args:
+        policy (BatchPolicy): Configuration of batching.
+        send (Callable[[Hashable, list[Hashable]], Awaitable[dict[Hashable, Any]]]):
+            Coroutine function sending a batch of elements for a key. It returns results
+            for all elements, result which is an exception is raised for calls of that
+            element.
+
+    """
+
+    def __init__(
+        self,
+        policy: BatchPolicy,
+        send: Callable[[Hashable, list[Hashable]], Awaitable[dict[Hashable, Any]]],
+    ) -> None:
+        """Init AsyncBatcher without any pending batches."""
+        self._policy = policy
+        self._send = send
+        self._pending: dict[Hashable, dict[Hashable, Future[Any]]] = {}
+        self._timers: dict[Hashable, TimerHandle] = {}
+        self._tasks: set[Task[None]] = set()
+
+    async def load(
+        self, key: Hashable, item: Hashable, max_wait: float | None = None
+    ) -> Any:
+        """
+        Add element to a batch for the key, wait for its result.
+
+        Args:
+            key (Hashable): Key of a batch, only elements with the same key are sent
+                together.
+            item (Hashable): Element to get result for.
+            max_wait (float | None): Maximal time in seconds to wait for the batch, no
+                limit for `None`.
+
+        Returns:
+            (Any): Result for the element.
+
+        Raises:
+            TimeoutError: Batch didn't finish within `max_wait`.
+
+        """
+        loop = get_running_loop()
+        if (futures := self._pending.get(key)) is None:
+            futures = self._pending[key] = {}
+            self._timers[key] = loop.call_later(self._policy.window, self._flush, key)
+        if (future := futures.get(item)) is None:
+            future = futures[item] = loop.create_future()
+        if len(futures) >= self._policy.max_size:
+            self._timers[key].cancel()
+            self._flush(key)
+        return await wait_for(shield(future), max_wait)
+
+    def _flush(self, key: Hashable) -> None:
+        """Remove pending batch, and send it in a separate task."""
+        futures = self._pending.pop(key)
+        del self._timers[key]
+        task = ensure_future(self._dispatch(key, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(
+        self, key: Hashable, futures: dict[Hashable, Future[Any]]
+    ) -> None:
+        """Send a batch, set results of all of its elements."""
+        try:
+            results = await self._send(key, list(futures))
+        except CancelledError:
+            for future in futures.values():
+                future.cancel()
+            raise
+        except BaseException as error:  # noqa: BLE001
+            for future in futures.values():
+                _set_exception(future, error)
+            return
+        for item, future in futures.items():
+            if isinstance(result := results.get(item), BaseException):
+                _set_exception(future, result)
+            else:
+                future.set_result(result)
+
+
+def _set_exception(future: Future[Any], error: BaseException) -> None:
+    """Set exception of a future, mark it as retrieved, there might be no waiters."""
+    future.set_exception(error)
+    future.exception()
@@ -0,0 +1,249 @@
+"""
+Circuit breaker failing fast while JustWatch API is unhealthy.
+
+Without it, during an outage each request waits for connection or read timeout, before
+failing. [`CircuitBreaker`][simplejustwatchapi.circuitbreaker.CircuitBreaker] counts
+consecutive failures, and after too many of them it "opens" - all following requests
+fail immediately with [`JustWatchCircuitOpenError`]
+[simplejustwatchapi.exceptions.JustWatchCircuitOpenError], without sending anything.
+It's meant to be passed to [`JustWatchClient`]
+[simplejustwatchapi.client.JustWatchClient] or [`AsyncJustWatchClient`]
+[simplejustwatchapi.client.AsyncJustWatchClient]:
+
+```python
+from simplejustwatchapi import CircuitBreaker, JustWatchClient
+
+breaker = CircuitBreaker(failure_threshold=5, recovery_time=30.0)
+client = JustWatchClient(circuit_breaker=breaker)
+```
+
+Circuit has three states:
+
+- [`CLOSED`][simplejustwatchapi.circuitbreaker.CLOSED] - requests are sent as usual,
+consecutive failures are counted.
+- [`OPEN`][simplejustwatchapi.circuitbreaker.OPEN] - requests fail immediately, until
+`recovery_time` passes.
+- [`HALF_OPEN`][simplejustwatchapi.circuitbreaker.HALF_OPEN] - a limited number of
+"probe" requests is sent to check if API recovered, others still fail immediately.
+If probes are successful, then circuit is closed, if any of them fails, it's opened
+again.
+
+Only network errors (including timeouts) and `5xx` responses are counted as failures.
+Other errors (e.g., `4xx` responses) are caused by requests themselves, not by health of
+the API.
+
+Breaker can also keep a cache of the most recent successful responses (with
+`cache_size`), then requests which would fail while circuit is open are instead served
+with their cached (possibly stale) responses.
+"""
+
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import Lock
+from time import monotonic
+from typing import Any
+
+from httpx import HTTPStatusError, TransportError
+
+from simplejustwatchapi.exceptions import JustWatchCircuitOpenError, JustWatchError
+from simplejustwatchapi.singleflight import request_key
+
+CLOSED = "closed"
+"""Circuit state - requests are sent as usual."""
+
+OPEN = "open"
+"""Circuit state - requests fail immediately."""
+
+HALF_OPEN = "half-open"
+"""Circuit state - only a limited number of probe requests is sent."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with closed, open, and half-open states.
+
+    Circuit opens after `failure_threshold` consecutive failed requests. After
+    `recovery_time` seconds it goes into half-open state, where up to `probes` requests
+    can be sent at the same time. Circuit closes after `probes` successful probes, any
+    failed probe opens it again for another `recovery_time` seconds.
+
+    Results of requests sent before the circuit opened, but finished while it's open,
+    don't affect its state.
+
+    Breaker is safe to use from multiple threads and from multiple `asyncio` tasks at
+    the same time (including sharing it between sync and async clients).
+
+    Args:
+        failure_threshold (int): Number of consecutive failures opening the circuit.
+        recovery_time (float): Number of seconds circuit stays open, before probe
+            requests are allowed.
+        probes (int): Number of successful probe requests needed to close the circuit,
+            and how many of them can be sent at the same time.
+        cache_size (int): Number of the most recent successful responses kept for
+            serving while circuit is open. No responses are cached for `0`.
+
+    Raises:
+        exceptions.JustWatchError: Configuration is invalid.
+
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_time: float = 30.0,
+        probes: int = 1,
+        cache_size: int = 0,
+    ) -> None:
+        """Init CircuitBreaker in closed state."""
+        if failure_threshold < 1 or recovery_time < 0 or probes < 1 or cache_size < 0:
+            error_msg = (
+                f"Invalid circuit breaker config: {failure_threshold=}, "
+                f"{recovery_time=}, {probes=}, {cache_size=}"
+            )
+            raise JustWatchError(error_msg)
+        self._failure_threshold = failure_threshold
+        self._recovery_time = recovery_time
+        self._probes = probes
+        self._cache_size = cache_size
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        Current state of the circuit.
+
+        One of [`CLOSED`][simplejustwatchapi.circuitbreaker.CLOSED], [`OPEN`]
+        [simplejustwatchapi.circuitbreaker.OPEN], or [`HALF_OPEN`]
+        [simplejustwatchapi.circuitbreaker.HALF_OPEN].
+        """
+        with self._lock:
+            self._update_state(monotonic())
+            return self._state
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Let a request through, or fail immediately if circuit is open.
+
+        Result of the request is used for updating the state of the circuit. Request
+        failed if it raised a network error, or `httpx.HTTPStatusError` with `5xx`
+        status code.
+
+        Raises:
+            exceptions.JustWatchCircuitOpenError: Circuit is open, or it's half-open
+                and all probe requests are already in flight.
+
+        """
+        probe = self._enter()
+        try:
+            yield
+        except TransportError:
+            self._exit(probe, failed=True)
+            raise
+        except HTTPStatusError as error:
+            self._exit(probe, failed=error.response.is_server_error)
+            raise
+        except BaseException:
+            self._exit(probe, failed=None)
+            raise
+        else:
+            self._exit(probe, failed=False)
+
+    def cached(
+        self, request_json: dict[str, Any], error: JustWatchCircuitOpenError
+    ) -> dict[str, Any]:
+        """
+        Return cached response for a request which failed due to open circuit.
+
+        Args:
+            request_json (dict[str, Any]): JSON with full request.
+            error (JustWatchCircuitOpenError): Error raised for the request.
+
+        Returns:
+            (dict[str, Any]): The most recent successful response for the same request.
+
+        Raises:
+            exceptions.JustWatchCircuitOpenError: Given error, if there's no cached
+                response for the request.
+
+        """
+        if not self._cache_size:
+            raise error
+        with self._lock:
+            if (response := self._cache.get(request_key(request_json))) is None:
+                raise error
+            return response
+
+    def store(self, request_json: dict[str, Any], response: dict[str, Any]) -> None:
+        """Cache a successful response, if cache is enabled."""
+        if not self._cache_size:
+            return
+        key = request_key(request_json)
+        with self._lock:
+            self._cache[key] = response
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def _enter(self) -> bool:
+        """Check if request can be sent, return whether it's a probe request."""
+        now = monotonic()
+        with self._lock:
+            self._update_state(now)
+            if self._state == CLOSED:
+                return False
+            if self._state == HALF_OPEN and self._probes_in_flight < self._probes:
+                self._probes_in_flight += 1
+                return True
+            retry_after = max(0.0, self._opened_at + self._recovery_time - now)
+        error_msg = f"Circuit breaker is {self._state}, request was not sent"
+        raise JustWatchCircuitOpenError(error_msg, retry_after)
+
+    def _exit(self, probe: bool, failed: bool | None) -> None:
+        """
+        Update the state of the circuit based on result of a request.
+
+        Args:
+            probe (bool): Whether it was a probe request.
+            failed (bool | None): Whether request failed, `None` if result of the
+                request shouldn't affect the circuit.
+
+        """
+        with self._lock:
+            if probe:
+                self._probes_in_flight -= 1
+                self._probe_result(failed)
+            elif self._state == CLOSED and failed is not None:
+                self._failures = self._failures + 1 if failed else 0
+                if self._failures >= self._failure_threshold:
+                    self._open()
+
+    def _probe_result(self, failed: bool | None) -> None:
+        """Close or open the circuit based on result of a probe request."""
+        if self._state != HALF_OPEN or failed is None:
+            return
+        if failed:
+            self._open()
+            return
+        self._probe_successes += 1
+        if self._probe_successes >= self._probes:
+            self._state = CLOSED
+            self._failures = 0
+
+    def _open(self) -> None:
+        """Open the circuit, starting the recovery time."""
+        self._state = OPEN
+        self._opened_at = monotonic()
+
+    def _update_state(self, now: float) -> None:
+        """Move open circuit to half-open state, if recovery time has passed."""
+        if self._state == OPEN and now >= self._opened_at + self._recovery_time:
+            self._state = HALF_OPEN
+            self._probe_successes = 0
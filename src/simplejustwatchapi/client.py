@@ -0,0 +1,2054 @@
+"""
+Clients keeping a persistent connection pool to JustWatch GraphQL API.
+
+Module-level functions from [`justwatch`][simplejustwatchapi.justwatch] module are
+thin wrappers around a shared [`JustWatchClient`]
+[simplejustwatchapi.client.JustWatchClient] instance. If you're sending a lot of
+requests, or want to configure connection pool yourself, you can create your own
+client and use its methods directly:
+
+```python
+from simplejustwatchapi import JustWatchClient
+
+with JustWatchClient() as client:
+    results = client.search("The Matrix")
+    entry = client.details(results[0].entry_id)
+```
+
+Each method matches the module-level function of the same name - it takes the same
+arguments, returns the same data, and raises the same exceptions.
+
+The underlying [`httpx.Client`][httpx.Client] reuses connections between requests, so
+TCP and TLS handshakes are done only once per connection, instead of once per request.
+
+For `asyncio` there's [`AsyncJustWatchClient`]
+[simplejustwatchapi.client.AsyncJustWatchClient] with the same methods, but as
+coroutines. It allows for sending many concurrent requests from a single event loop:
+
+```python
+from asyncio import gather
+
+from simplejustwatchapi import AsyncJustWatchClient
+
+async with AsyncJustWatchClient() as client:
+    entries = await gather(*(client.details(node_id) for node_id in node_ids))
+```
+
+Both clients can use HTTP/2 (with `http2=True`), which multiplexes concurrent requests
+over a single connection. It requires optional dependencies, installed with
+`simple-justwatch-python-api[http2]`.
+
+Both clients use the same functions from [`query`][simplejustwatchapi.query] module to
+prepare requests and parse responses, only the way requests are sent is different.
+"""
+
+from asyncio import ensure_future, gather
+from asyncio import sleep as async_sleep
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar, copy_context
+from functools import cache, partial
+from itertools import chain
+from threading import Lock
+from time import sleep
+from types import TracebackType
+from typing import Any, Self
+from weakref import WeakKeyDictionary
+
+from httpx import (
+    AsyncBaseTransport,
+    AsyncClient,
+    BaseTransport,
+    Client,
+    HTTPError,
+    HTTPStatusError,
+    Limits,
+    Response,
+    Timeout,
+    TimeoutException,
+)
+
+from simplejustwatchapi.batching import AsyncBatcher, Batcher, BatchPolicy
+from simplejustwatchapi.circuitbreaker import CircuitBreaker
+from simplejustwatchapi.concurrency import AdaptiveConcurrency, ConcurrencySlot
+from simplejustwatchapi.deadline import (
+    deadline,
+    deadline_passed,
+    remaining,
+    request_timeout,
+)
+from simplejustwatchapi.exceptions import (
+    JustWatchApiError,
+    JustWatchCircuitOpenError,
+    JustWatchDeadlineError,
+    JustWatchHttpError,
+)
+from simplejustwatchapi.graphql import (
+    DEFAULT_COMPLEXITY_BUDGET,
+    GRAPHQL_SHOW_TREE_QUERY,
+    estimate_complexity,
+    graphql_details_for_locales_query,
+    graphql_details_many_query,
+    graphql_episodes_many_query,
+    graphql_offers_matrix_query,
+    graphql_popular_for_countries_query,
+    graphql_providers_for_countries_query,
+    graphql_search_many_query,
+    graphql_seasons_many_query,
+    max_batch_size,
+)
+from simplejustwatchapi.hedging import HedgePolicy
+from simplejustwatchapi.paging import aiter_pages, iter_pages, page_ranges
+from simplejustwatchapi.persisted import (
+    PERSISTED_QUERY_NOT_FOUND,
+    PERSISTED_QUERY_NOT_SUPPORTED,
+    PersistedQueries,
+    get_params,
+    persisted_query_error,
+    persisted_request,
+)
+from simplejustwatchapi.query import (
+    parse_details_for_locales_response,
+    parse_details_many_response,
+    parse_details_response,
+    parse_episodes_many_response,
+    parse_episodes_response,
+    parse_nodes_batch_response,
+    parse_offers_for_countries_response,
+    parse_offers_matrix_response,
+    parse_popular_for_countries_response,
+    parse_popular_response,
+    parse_providers_for_countries_response,
+    parse_providers_response,
+    parse_search_many_response,
+    parse_search_response,
+    parse_seasons_many_response,
+    parse_seasons_response,
+    parse_show_tree_response,
+    prepare_details_for_locales_request,
+    prepare_details_many_request,
+    prepare_details_request,
+    prepare_episodes_many_request,
+    prepare_episodes_request,
+    prepare_nodes_batch_request,
+    prepare_offers_for_countries_request,
+    prepare_offers_matrix_request,
+    prepare_popular_for_countries_request,
+    prepare_popular_request,
+    prepare_providers_for_countries_request,
+    prepare_providers_request,
+    prepare_search_many_request,
+    prepare_search_request,
+    prepare_seasons_many_request,
+    prepare_seasons_request,
+    prepare_show_tree_request,
+)
+from simplejustwatchapi.ratelimit import RateLimiter
+from simplejustwatchapi.retry import RetryPolicy
+from simplejustwatchapi.singleflight import AsyncSingleFlight, SingleFlight, request_key
+from simplejustwatchapi.splitting import SplitPolicy
+from simplejustwatchapi.tuples import (
+    Episode,
+    MediaEntry,
+    Offer,
+    OfferPackage,
+    ShowTree,
+)
+
+GRAPHQL_API_URL = "https://apis.justwatch.com/graphql"
+"""URL of JustWatch GraphQL API used by default."""
+
+DEFAULT_LIMITS = Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0,
+)
+"""Default connection pool limits used by clients."""
+
+DEFAULT_TIMEOUT = Timeout(5.0)
+"""Default timeout for each request sent by clients."""
+
+_LAST_RETRIES: ContextVar[WeakKeyDictionary[Any, int] | None] = ContextVar(
+    "justwatch_last_retries", default=None
+)
+"""Number of retries of the last request of each client in current context."""
+
+
+class _BaseClient:
+    """Configuration and logic shared by both sync and async clients."""
+
+    def __init__(
+        self,
+        url: str,
+        rate_limiter: RateLimiter | None,
+        retry: RetryPolicy | None,
+        persisted_queries: PersistedQueries | None,
+        concurrency: AdaptiveConcurrency | None,
+        circuit_breaker: CircuitBreaker | None,
+        hedging: HedgePolicy | None,
+        complexity_budget: int,
+        splitting: SplitPolicy | None,
+    ) -> None:
+        """Init client configuration, not related to connection pool."""
+        self._url = url
+        self._rate_limiter = rate_limiter
+        self._retry = retry
+        self._persisted_queries = persisted_queries
+        self._concurrency = concurrency
+        self._circuit_breaker = circuit_breaker
+        self._hedging = hedging
+        self._complexity_budget = complexity_budget
+        self._splitting = splitting
+
+    @property
+    def last_retries(self) -> int:
+        """
+        Number of retries used by the last request sent in current thread or task.
+
+        Value is tracked separately for each thread (and each `asyncio` task), so
+        concurrent requests don't overwrite each other's values. It's set both for
+        successful requests and for requests which failed after all retries.
+        Calls coalesced with an identical in-flight request don't send requests of their
+        own, so they report `0`.
+        """
+        return (_LAST_RETRIES.get() or {}).get(self, 0)
+
+    def _set_last_retries(self, retries: int) -> None:
+        """Store number of retries of the last request in current context."""
+        # Mapping is copied, so it isn't shared with contexts copied from this one.
+        last_retries = WeakKeyDictionary(_LAST_RETRIES.get() or {})
+        last_retries[self] = retries
+        _LAST_RETRIES.set(last_retries)
+
+    def deadline(self, seconds: float) -> AbstractContextManager[None]:
+        """
+        Limit total time of all requests sent within the context.
+
+        Check [`deadline`][simplejustwatchapi.deadline] for details. Deadline applies
+        to all clients used in current thread or `asyncio` task, not only this one.
+
+        Args:
+            seconds (float): Time budget in seconds, counted from entering the context.
+
+        Returns:
+            (AbstractContextManager[None]): Context manager setting the deadline.
+
+        """
+        return deadline(seconds)
+
+    def _details_many_chunks(self, node_ids: list[str]) -> list[list[str]]:
+        """Deduplicate node IDs and split them into chunks, one for each request."""
+        if not (unique_ids := list(dict.fromkeys(node_ids))):
+            return []
+        size = max_batch_size(graphql_details_many_query, self._complexity_budget)
+        return self._split_chunks("details_many", unique_ids, size)
+
+    def _locale_chunks(
+        self, locales: list[tuple[str, str]]
+    ) -> list[Sequence[tuple[str, str]]]:
+        """Normalize and deduplicate locales, split them into chunks for requests."""
+        unique_locales = list(
+            dict.fromkeys((country.upper(), language) for country, language in locales)
+        )
+        if not unique_locales:
+            return []
+        size = max_batch_size(
+            graphql_details_for_locales_query, self._complexity_budget
+        )
+        return self._split_chunks("details_for_locales", unique_locales, size)
+
+    def _search_many_chunks(self, titles: list[str], count: int) -> list[list[str]]:
+        """Deduplicate titles and split them into chunks, one for each request."""
+        if not (unique_titles := list(dict.fromkeys(titles))):
+            return []
+        size = max_batch_size(
+            graphql_search_many_query,
+            self._complexity_budget,
+            variables={"first": count},
+        )
+        return self._split_chunks(
+            _split_key("search_many", count=count), unique_titles, size
+        )
+
+    def _episodes_many_chunks(self, season_ids: list[str]) -> list[list[str]]:
+        """Deduplicate season IDs and split them into chunks, one for each request."""
+        if not (unique_ids := list(dict.fromkeys(season_ids))):
+            return []
+        size = max_batch_size(graphql_episodes_many_query, self._complexity_budget)
+        return self._split_chunks("episodes_many", unique_ids, size)
+
+    def _seasons_many_chunks(self, show_ids: list[str]) -> list[list[str]]:
+        """Deduplicate show IDs and split them into chunks, one for each request."""
+        if not (unique_ids := list(dict.fromkeys(show_ids))):
+            return []
+        size = max_batch_size(graphql_seasons_many_query, self._complexity_budget)
+        return self._split_chunks("seasons_many", unique_ids, size)
+
+    def _batch_chunks(
+        self, items: list[tuple[str, str]]
+    ) -> list[list[tuple[str, str]]]:
+        """
+        Split elements of a batch into chunks, one for each request.
+
+        Each element takes a share of complexity budget, based on how many elements of
+        its kind fit into a single request, so a chunk can mix different kinds.
+        """
+        limit = len(items)
+        if self._splitting is not None:
+            limit = self._splitting.start_size("batch", limit)
+        budget = self._complexity_budget
+        chunks: list[list[tuple[str, str]]] = [[]]
+        used = 0
+        for kind, node_id in items:
+            cost = budget // max_batch_size(_BATCH_QUERIES[kind], budget)
+            if chunks[-1] and (used + cost > budget or len(chunks[-1]) >= limit):
+                chunks.append([])
+                used = 0
+            chunks[-1].append((kind, node_id))
+            used += cost
+        return chunks
+
+    def _fall_back_on(self, error: JustWatchApiError) -> bool:
+        """Check whether a rejected request can be replaced with smaller ones."""
+        splitting = self._splitting
+        return splitting is not None and splitting.is_complexity_error(error)
+
+    def _country_chunks(
+        self,
+        operation: str,
+        countries: set[str],
+        query_for_size: Callable[[int], str],
+        variables: dict[str, Any] | None = None,
+    ) -> list[list[str]]:
+        """Normalize country codes and split them into chunks, one for each request."""
+        size = max_batch_size(
+            query_for_size, self._complexity_budget, variables=variables
+        )
+        unique_countries = sorted({country.upper() for country in countries})
+        return self._split_chunks(operation, unique_countries, size)
+
+    def _offers_matrix_chunks(
+        self, operation: str, node_ids: list[str], countries: set[str]
+    ) -> list[Sequence[tuple[str, tuple[str, ...]]]]:
+        """
+        Split pairs of node IDs and country codes into chunks, one for each request.
+
+        Countries are split into the fewest groups of similar size, where a single node
+        ID with all countries of a group fits into complexity budget. Node IDs are then
+        split into chunks for each group. Each element of a chunk is a pair of node ID
+        and its group of countries, so all elements of a chunk share the same group.
+        """
+        unique_ids = list(dict.fromkeys(node_ids))
+        unique_countries = sorted({country.upper() for country in countries})
+        if not unique_ids or not unique_countries:
+            return []
+        group_size = max_batch_size(
+            _offers_matrix_countries_query_for_size, self._complexity_budget
+        )
+        group_count = -(-len(unique_countries) // group_size)
+        group_size = -(-len(unique_countries) // group_count)
+        groups = [
+            tuple(unique_countries[start : start + group_size])
+            for start in range(0, len(unique_countries), group_size)
+        ]
+        node_size = max_batch_size(
+            _offers_matrix_query_for_size(len(groups[0])), self._complexity_budget
+        )
+        return [
+            chunk
+            for group in groups
+            for chunk in self._split_chunks(
+                operation, [(node_id, group) for node_id in unique_ids], node_size
+            )
+        ]
+
+    def _split_chunks(
+        self, operation: str, items: Sequence[Any], size: int | None = None
+    ) -> list[Sequence[Any]]:
+        """
+        Split elements of a request into chunks, each one sent as a separate request.
+
+        Args:
+            operation (str): Name of the operation, used by splitting policy.
+            items (Sequence[Any]): All elements of the request, e.g., node IDs.
+            size (int | None): Maximal size of a chunk, no limit for `None`. It's
+                further limited by size remembered by splitting policy.
+
+        Returns:
+            (list[Sequence[Any]]): Chunks of elements, a single chunk with all of them
+                if they don't have to be split.
+
+        """
+        size = size or len(items)
+        if self._splitting is not None:
+            size = self._splitting.start_size(operation, size)
+        if not items or size >= len(items):
+            return [items]
+        return [items[start : start + size] for start in range(0, len(items), size)]
+
+    def _retry_delay(self, retry: int, error: HTTPError) -> float | None:
+        """
+        Return delay before a given retry, or `None` if request shouldn't be retried.
+
+        Args:
+            retry (int): Number of the retry, starting from 0 for the first retry.
+            error (HTTPError): Error from the failed request.
+
+        Returns:
+            (float | None): Delay in seconds before the retry, `None` if there should be
+                no retry, including retries which can't start before the deadline.
+
+        """
+        if (
+            self._retry is None
+            or retry + 1 >= self._retry.max_attempts
+            or not self._retry.is_retryable(error)
+        ):
+            return None
+        delay = self._retry.delay(retry, error)
+        if (left := remaining()) is not None and delay >= left:
+            return None
+        return delay
+
+    def _guard(self) -> AbstractContextManager[None]:
+        """Return circuit breaker guard for a single request, if breaker is used."""
+        return self._circuit_breaker.guard() if self._circuit_breaker else nullcontext()
+
+    def _cached_response(
+        self, request_json: dict[str, Any], error: JustWatchCircuitOpenError
+    ) -> dict[str, Any]:
+        """Return cached response for a request blocked by open circuit, or raise."""
+        if self._circuit_breaker is None:
+            raise error
+        return self._circuit_breaker.cached(request_json, error)
+
+    def _store_response(
+        self, request_json: dict[str, Any], response: dict[str, Any]
+    ) -> None:
+        """Store successful response in circuit breaker cache, if it's used."""
+        if self._circuit_breaker:
+            self._circuit_breaker.store(request_json, response)
+
+    def _persisted_request(self, request_json: dict[str, Any]) -> dict[str, Any]:
+        """Return hash-only request if persisted queries are used, or the full one."""
+        if self._persisted_queries is None or "query" not in request_json:
+            return request_json
+        return persisted_request(request_json, include_query=False)
+
+    def _full_request(
+        self, request_json: dict[str, Any], response: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """
+        Return request with full query, if hash-only request has to be sent again.
+
+        If server doesn't support persisted queries, then they are disabled for this
+        client, so following requests don't need two round-trips.
+        """
+        error = persisted_query_error(response)
+        if error == PERSISTED_QUERY_NOT_SUPPORTED:
+            self._persisted_queries = None
+            return request_json
+        if error == PERSISTED_QUERY_NOT_FOUND:
+            return persisted_request(request_json, include_query=True)
+        return None
+
+    def _get_params(self, request_json: dict[str, Any]) -> dict[str, str] | None:
+        """Return `GET` query parameters if request should be sent as `GET`."""
+        if (
+            self._persisted_queries is None
+            or not self._persisted_queries.use_get
+            or "query" in request_json
+        ):
+            return None
+        return get_params(request_json)
+
+
+class JustWatchClient(_BaseClient):
+    """
+    Client for JustWatch GraphQL API with a persistent connection pool.
+
+    Client is thread-safe, a single instance can (and should) be shared between
+    threads. It can be used as a context manager, which closes all connections on exit.
+    Alternatively you can call [`close`]
+    [simplejustwatchapi.client.JustWatchClient.close] directly.
+
+    Args:
+        limits (Limits): Connection pool limits - maximum number of connections, how
+            many of them can be kept alive, and for how long idle connections are kept.
+        timeout (float | Timeout): Timeout for each request, either as a number of
+            seconds, or a detailed [`httpx.Timeout`][httpx.Timeout] configuration.
+        http2 (bool): Use HTTP/2 if server supports it. Concurrent requests are then
+            multiplexed over a single connection, instead of each one needing its own.
+            Requires optional `http2` dependencies.
+        url (str): URL of JustWatch GraphQL API. Useful mostly for testing with a local
+            stand-in server.
+        rate_limiter (RateLimiter | None): Limiter for how many requests per second can
+            be sent. Can be shared between clients. No limit for `None`.
+        retry (RetryPolicy | None): Policy for retrying requests failed due to
+            transient HTTP errors. No retries for `None`.
+        coalesce (bool): Coalesce identical requests sent concurrently - only one of
+            them is sent, others wait for its response. Check [`singleflight`]
+            [simplejustwatchapi.singleflight] for details.
+        persisted_queries (PersistedQueries | None): Configuration of automatic
+            persisted queries, sending query hashes instead of full queries. Check
+            [`persisted`][simplejustwatchapi.persisted] for details. Full queries are
+            always sent for `None`.
+        transport (BaseTransport | None): Custom `httpx` transport used for sending
+            requests, e.g., one of transports from [`transport`]
+            [simplejustwatchapi.transport] module. If given, then `limits` and `http2`
+            are ignored, as they are used only for the default transport.
+        concurrency (AdaptiveConcurrency | None): Adaptive limit of concurrent requests,
+            adjusted based on responses. Can be shared between clients. No limit for
+            `None`, other than connection pool limits.
+        circuit_breaker (CircuitBreaker | None): Circuit breaker failing requests
+            immediately while API is unhealthy. Check [`circuitbreaker`]
+            [simplejustwatchapi.circuitbreaker] for details. Requests are always sent
+            for `None`.
+        hedging (HedgePolicy | None): Policy of sending duplicates of slow requests.
+            Check [`hedging`][simplejustwatchapi.hedging] for details. No duplicates
+            are sent for `None`.
+        complexity_budget (int): Maximal estimated complexity of a single batched
+            request, used for splitting batches into chunks. Check [`graphql`]
+            [simplejustwatchapi.graphql] for details.
+        splitting (SplitPolicy | None): Policy of splitting requests rejected for too
+            high complexity. Check [`splitting`][simplejustwatchapi.splitting] for
+            details. Such requests fail for `None`.
+        batching (BatchPolicy | None): Policy of collecting concurrent `details`,
+            `seasons`, and `episodes` calls into shared requests. Check [`batching`]
+            [simplejustwatchapi.batching] for details. Each call sends its own request
+            for `None`.
+        max_workers (int): Maximal number of threads sending chunks of a single
+            [`offers_matrix`][simplejustwatchapi.client.JustWatchClient.offers_matrix]
+            or [`seasons_many`][simplejustwatchapi.client.JustWatchClient.seasons_many]
+            call concurrently. Requests sent by them are still limited by `limits`,
+            `rate_limiter` and `concurrency`.
+
+    """
+
+    def __init__(
+        self,
+        limits: Limits = DEFAULT_LIMITS,
+        timeout: float | Timeout = DEFAULT_TIMEOUT,
+        http2: bool = False,
+        url: str = GRAPHQL_API_URL,
+        rate_limiter: RateLimiter | None = None,
+        retry: RetryPolicy | None = None,
+        coalesce: bool = True,
+        persisted_queries: PersistedQueries | None = None,
+        transport: BaseTransport | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        hedging: HedgePolicy | None = None,
+        complexity_budget: int = DEFAULT_COMPLEXITY_BUDGET,
+        splitting: SplitPolicy | None = None,
+        batching: BatchPolicy | None = None,
+        max_workers: int = 8,
+    ) -> None:
+        """Init JustWatchClient with its own connection pool."""
+        super().__init__(
+            url,
+            rate_limiter,
+            retry,
+            persisted_queries,
+            concurrency,
+            circuit_breaker,
+            hedging,
+            complexity_budget,
+            splitting,
+        )
+        self._http = Client(
+            limits=limits, timeout=timeout, http2=http2, transport=transport
+        )
+        self._single_flight = SingleFlight() if coalesce else None
+        self._batcher = Batcher(batching, self._send_batch) if batching else None
+        self._max_workers = max_workers
+        self._executors: dict[str, ThreadPoolExecutor] = {}
+        self._executors_lock = Lock()
+
+    def __enter__(self) -> Self:
+        """Return this client, connections are closed on context exit."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close all connections in the pool."""
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close all connections in the pool, client can't be used afterwards.
+
+        Thread pools of the client are shut down too, after their running requests end.
+        """
+        with self._executors_lock:
+            executors = list(self._executors.values())
+        for executor in executors:
+            executor.shutdown(cancel_futures=True)
+        self._http.close()
+
+    def search(
+        self,
+        title: str = "",
+        country: str = "US",
+        language: str = "en",
+        count: int = 4,
+        best_only: bool = True,
+        offset: int = 0,
+        providers: list[str] | str | None = None,
+    ) -> list[MediaEntry]:
+        """
+        Search JustWatch for the given title.
+
+        Check [`search`][simplejustwatchapi.justwatch.search] for details.
+        """
+
+        def send(part: range) -> list[MediaEntry]:
+            request = prepare_search_request(
+                title, country, language, len(part), best_only, part.start, providers
+            )
+            return parse_search_response(self._post(request))
+
+        parts = self._split_chunks("search", range(offset, offset + count))
+        return list(chain.from_iterable(self._send_split("search", parts, send)))
+
+    def iter_search(
+        self,
+        title: str = "",
+        country: str = "US",
+        language: str = "en",
+        page_size: int = 50,
+        best_only: bool = True,
+        offset: int = 0,
+        providers: list[str] | str | None = None,
+    ) -> Iterator[MediaEntry]:
+        """
+        Iterate over all search results for the given title, page by page.
+
+        Check [`iter_search`][simplejustwatchapi.justwatch.iter_search] for details.
+        Next page is requested in a background thread.
+        """
+
+        def fetch(page: range) -> list[MediaEntry]:
+            return self.search(
+                title, country, language, len(page), best_only, page.start, providers
+            )
+
+        return iter_pages(fetch, page_ranges(offset, page_size))
+
+    def search_many(
+        self,
+        titles: list[str],
+        country: str = "US",
+        language: str = "en",
+        count: int = 4,
+        best_only: bool = True,
+        providers: list[str] | str | None = None,
+    ) -> dict[str, list[MediaEntry]]:
+        """
+        Search JustWatch for multiple titles, with as few requests as possible.
+
+        Check [`search_many`][simplejustwatchapi.justwatch.search_many] for details.
+        Requests for each chunk of titles are sent one after another.
+        """
+
+        def send(chunk: list[str]) -> dict[str, list[MediaEntry]]:
+            request = prepare_search_many_request(
+                chunk, country, language, count, best_only, providers
+            )
+            return parse_search_many_response(self._post(request), chunk)
+
+        chunks = self._search_many_chunks(titles, count)
+        operation = _split_key("search_many", count=count)
+        return _merge_parts(self._send_split(operation, chunks, send))
+
+    def popular(
+        self,
+        country: str = "US",
+        language: str = "en",
+        count: int = 4,
+        best_only: bool = True,
+        offset: int = 0,
+        providers: list[str] | str | None = None,
+    ) -> list[MediaEntry]:
+        """
+        Look up all currently popular titles on JustWatch.
+
+        Check [`popular`][simplejustwatchapi.justwatch.popular] for details.
+        """
+
+        def send(part: range) -> list[MediaEntry]:
+            request = prepare_popular_request(
+                country, language, len(part), best_only, part.start, providers
+            )
+            return parse_popular_response(self._post(request))
+
+        parts = self._split_chunks("popular", range(offset, offset + count))
+        return list(chain.from_iterable(self._send_split("popular", parts, send)))
+
+    def iter_popular(
+        self,
+        country: str = "US",
+        language: str = "en",
+        page_size: int = 50,
+        best_only: bool = True,
+        offset: int = 0,
+        providers: list[str] | str | None = None,
+    ) -> Iterator[MediaEntry]:
+        """
+        Iterate over all currently popular titles on JustWatch, page by page.
+
+        Check [`iter_popular`][simplejustwatchapi.justwatch.iter_popular] for details.
+        Next page is requested in a background thread.
+        """
+
+        def fetch(page: range) -> list[MediaEntry]:
+            return self.popular(
+                country, language, len(page), best_only, page.start, providers
+            )
+
+        return iter_pages(fetch, page_ranges(offset, page_size))
+
+    def popular_for_countries(
+        self,
+        countries: set[str],
+        language: str = "en",
+        count: int = 4,
+        best_only: bool = True,
+        providers: list[str] | str | None = None,
+    ) -> dict[str, list[MediaEntry]]:
+        """
+        Look up popular titles for multiple countries, with as few requests as possible.
+
+        Check [`popular_for_countries`]
+        [simplejustwatchapi.justwatch.popular_for_countries] for details.
+        Requests for each chunk of countries are sent one after another.
+        """
+        if not countries:
+            return {}
+
+        def send(part: list[str]) -> dict[str, list[MediaEntry]]:
+            request = prepare_popular_for_countries_request(
+                set(part), language, count, best_only, providers
+            )
+            return parse_popular_for_countries_response(self._post(request), set(part))
+
+        operation = _split_key("popular_for_countries", count=count)
+        chunks = self._country_chunks(
+            operation,
+            countries,
+            _popular_for_countries_query_for_size,
+            variables={"first": count},
+        )
+        parts = self._send_split(operation, chunks, send)
+        return _by_given_countries(countries, _merge_parts(parts))
+
+    def details(
+        self,
+        node_id: str,
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> MediaEntry:
+        """
+        Get details of entry for a given ID.
+
+        Check [`details`][simplejustwatchapi.justwatch.details] for details.
+        """
+        if self._batcher is not None:
+            return self._load("details", node_id, country, language, best_only)
+        request = prepare_details_request(node_id, country, language, best_only)
+        response = self._post(request)
+        return parse_details_response(response)
+
+    def details_many(
+        self,
+        node_ids: list[str],
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> dict[str, MediaEntry]:
+        """
+        Get details of entries for multiple IDs, with as few requests as possible.
+
+        Check [`details_many`][simplejustwatchapi.justwatch.details_many] for details.
+        Requests for each chunk of node IDs are sent one after another.
+        """
+
+        def send(chunk: list[str]) -> dict[str, MediaEntry]:
+            request = prepare_details_many_request(chunk, country, language, best_only)
+            return parse_details_many_response(self._post(request), chunk)
+
+        chunks = self._details_many_chunks(node_ids)
+        parts = self._send_split("details_many", chunks, send)
+        return _merge_parts(parts)
+
+    def details_for_locales(
+        self,
+        node_id: str,
+        locales: list[tuple[str, str]],
+        best_only: bool = True,
+    ) -> dict[tuple[str, str], MediaEntry]:
+        """
+        Get details of entry for a given ID in multiple locales.
+
+        Check [`details_for_locales`][simplejustwatchapi.justwatch.details_for_locales]
+        for details. Requests for each chunk of locales are sent one after another.
+        """
+
+        def send(chunk: list[tuple[str, str]]) -> dict[tuple[str, str], MediaEntry]:
+            request = prepare_details_for_locales_request(node_id, chunk, best_only)
+            return parse_details_for_locales_response(self._post(request), chunk)
+
+        chunks = self._locale_chunks(locales)
+        parts = self._send_split("details_for_locales", chunks, send)
+        return _by_given_locales(locales, _merge_parts(parts))
+
+    def seasons(
+        self,
+        show_id: str,
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> list[MediaEntry]:
+        """
+        Get details of all seasons available for a given show ID.
+
+        Check [`seasons`][simplejustwatchapi.justwatch.seasons] for details.
+        """
+        if self._batcher is not None:
+            return self._load("seasons", show_id, country, language, best_only)
+        request = prepare_seasons_request(show_id, country, language, best_only)
+        response = self._post(request)
+        return parse_seasons_response(response)
+
+    def seasons_many(
+        self,
+        show_ids: list[str],
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> dict[str, list[MediaEntry]]:
+        """
+        Get seasons for multiple show IDs, with as few requests as possible.
+
+        Check [`seasons_many`][simplejustwatchapi.justwatch.seasons_many] for details.
+        Requests for chunks of show IDs are sent concurrently, by up to `max_workers`
+        threads.
+        """
+
+        def send(chunk: list[str]) -> dict[str, list[MediaEntry]]:
+            request = prepare_seasons_many_request(chunk, country, language, best_only)
+            return parse_seasons_many_response(self._post(request), chunk)
+
+        chunks = self._seasons_many_chunks(show_ids)
+        parts = self._send_split("seasons_many", chunks, send, concurrently=True)
+        return _merge_parts(parts)
+
+    def episodes(
+        self,
+        season_id: str,
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> list[Episode]:
+        """
+        Get details of all episodes available for a given season ID.
+
+        Check [`episodes`][simplejustwatchapi.justwatch.episodes] for details.
+        """
+        if self._batcher is not None:
+            return self._load("episodes", season_id, country, language, best_only)
+        request = prepare_episodes_request(season_id, country, language, best_only)
+        response = self._post(request)
+        return parse_episodes_response(response)
+
+    def episodes_many(
+        self,
+        season_ids: list[str],
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> dict[str, list[Episode]]:
+        """
+        Get episodes for multiple season IDs, with as few requests as possible.
+
+        Check [`episodes_many`][simplejustwatchapi.justwatch.episodes_many] for
+        details. Requests for each chunk of season IDs are sent one after another.
+        """
+
+        def send(chunk: list[str]) -> dict[str, list[Episode]]:
+            request = prepare_episodes_many_request(chunk, country, language, best_only)
+            return parse_episodes_many_response(self._post(request), chunk)
+
+        chunks = self._episodes_many_chunks(season_ids)
+        parts = self._send_split("episodes_many", chunks, send)
+        return _merge_parts(parts)
+
+    def show_tree(
+        self,
+        show_id: str,
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> ShowTree:
+        """
+        Get details of a show with all of its seasons and their episodes.
+
+        Check [`show_tree`][simplejustwatchapi.justwatch.show_tree] for details.
+        Requests for each group of seasons are sent one after another.
+        """
+        if _show_tree_complexity() <= self._complexity_budget:
+            request = prepare_show_tree_request(
+                show_id, country, language, best_only, with_episodes=True
+            )
+            try:
+                return parse_show_tree_response(self._post(request))
+            except JustWatchApiError as error:
+                if not self._fall_back_on(error):
+                    raise
+        request = prepare_show_tree_request(
+            show_id, country, language, best_only, with_episodes=False
+        )
+        tree = parse_show_tree_response(self._post(request))
+        season_ids = [season.entry_id for season in tree.seasons]
+        episodes = self.episodes_many(season_ids, country, language, best_only)
+        return tree._replace(episodes=episodes)
+
+    def offers_for_countries(
+        self,
+        node_id: str,
+        countries: set[str],
+        language: str = "en",
+        best_only: bool = True,
+    ) -> dict[str, list[Offer]]:
+        """
+        Get offers for entry of given node ID for all given countries.
+
+        Check [`offers_for_countries`]
+        [simplejustwatchapi.justwatch.offers_for_countries] for details.
+        """
+        if not countries:
+            return {}
+
+        def send(part: list[str]) -> dict[str, list[Offer]]:
+            request = prepare_offers_for_countries_request(
+                node_id, set(part), language, best_only
+            )
+            return parse_offers_for_countries_response(self._post(request), set(part))
+
+        chunks = self._split_chunks("offers_for_countries", sorted(countries))
+        parts = self._send_split("offers_for_countries", chunks, send)
+        return _merge_parts(parts)
+
+    def offers_matrix(
+        self,
+        node_ids: list[str],
+        countries: set[str],
+        language: str = "en",
+        best_only: bool = True,
+    ) -> dict[tuple[str, str], list[Offer]]:
+        """
+        Get offers for multiple node IDs in all given countries, with few requests.
+
+        Check [`offers_matrix`][simplejustwatchapi.justwatch.offers_matrix] for details.
+        Requests for chunks are sent concurrently, by up to `max_workers` threads.
+        """
+
+        def send(chunk: list[tuple[str, tuple[str, ...]]]) -> dict[Any, list[Offer]]:
+            ids, group = [node_id for node_id, _ in chunk], set(chunk[0][1])
+            request = prepare_offers_matrix_request(ids, group, language, best_only)
+            return parse_offers_matrix_response(self._post(request), ids, group)
+
+        country_count = len({country.upper() for country in countries})
+        operation = _split_key("offers_matrix", countries=country_count)
+        chunks = self._offers_matrix_chunks(operation, node_ids, countries)
+        parts = self._send_split(operation, chunks, send, concurrently=True)
+        return _matrix_by_given_countries(node_ids, countries, parts)
+
+    def providers(self, country: str = "US") -> list[OfferPackage]:
+        """
+        Look up all providers for the given country.
+
+        Check [`providers`][simplejustwatchapi.justwatch.providers] for details.
+        """
+        request = prepare_providers_request(country)
+        response = self._post(request)
+        return parse_providers_response(response)
+
+    def providers_for_countries(
+        self, countries: set[str]
+    ) -> dict[str, list[OfferPackage]]:
+        """
+        Look up all providers for multiple countries, with as few requests as possible.
+
+        Check [`providers_for_countries`]
+        [simplejustwatchapi.justwatch.providers_for_countries] for details.
+        Requests for each chunk of countries are sent one after another.
+        """
+        if not countries:
+            return {}
+
+        def send(part: list[str]) -> dict[str, list[OfferPackage]]:
+            request = prepare_providers_for_countries_request(set(part))
+            response = self._post(request)
+            return parse_providers_for_countries_response(response, set(part))
+
+        chunks = self._country_chunks(
+            "providers_for_countries",
+            countries,
+            _providers_for_countries_query_for_size,
+        )
+        parts = self._send_split("providers_for_countries", chunks, send)
+        return _by_given_countries(countries, _merge_parts(parts))
+
+    def _load(
+        self, kind: str, node_id: str, country: str, language: str, best_only: bool
+    ) -> Any:
+        """Get data for a single node ID from a request shared with concurrent calls."""
+        key = (country.upper(), language, best_only)
+        try:
+            return self._batcher.load(key, (kind, node_id), remaining())
+        except TimeoutError as error:
+            raise JustWatchDeadlineError from error
+
+    def _send_batch(
+        self, key: tuple[str, str, bool], items: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], Any]:
+        """Send all collected calls sharing the same locale and offers filter."""
+        country, language, best_only = key
+
+        def send(chunk: list[tuple[str, str]]) -> dict[tuple[str, str], Any]:
+            request = prepare_nodes_batch_request(chunk, country, language, best_only)
+            return parse_nodes_batch_response(self._post(request), chunk)
+
+        return _merge_parts(self._send_split("batch", self._batch_chunks(items), send))
+
+    def _send_split(
+        self,
+        operation: str,
+        chunks: list[Sequence[Any]],
+        send: Callable[[Any], Any],
+        concurrently: bool = False,
+    ) -> list[Any]:
+        """
+        Send each chunk of a request, splitting chunks rejected for complexity.
+
+        Chunks sent concurrently run in client's thread pool, each with a copy of
+        caller's context (including its deadline). If any chunk fails, chunks which
+        haven't started yet are cancelled.
+
+        Args:
+            operation (str): Name of the operation, used by splitting policy.
+            chunks (list[Sequence[Any]]): Chunks of elements of the request.
+            send (Callable[[Any], Any]): Function sending a request for a single chunk,
+                returning its parsed results.
+            concurrently (bool): Send chunks concurrently, instead of one after
+                another.
+
+        Returns:
+            (list[Any]): Results for all sent requests, in order of their elements.
+
+        """
+        if not concurrently or len(chunks) < 2:  # noqa: PLR2004
+            return [
+                result
+                for chunk in chunks
+                for result in self._bisect(operation, chunk, send)
+            ]
+        executor = self._get_executor("chunk", self._max_workers)
+        futures = [
+            executor.submit(copy_context().run, self._bisect, operation, chunk, send)
+            for chunk in chunks
+        ]
+        try:
+            return [result for future in futures for result in future.result()]
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _get_executor(self, name: str, max_workers: int) -> ThreadPoolExecutor:
+        """Return thread pool of a given name, create it on first use."""
+        with self._executors_lock:
+            if name not in self._executors:
+                self._executors[name] = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix=f"justwatch-{name}"
+                )
+            return self._executors[name]
+
+    def _bisect(
+        self, operation: str, chunk: Sequence[Any], send: Callable[[Any], Any]
+    ) -> list[Any]:
+        """Send a single chunk, if it's rejected for complexity, send both halves."""
+        try:
+            result = send(chunk)
+        except JustWatchApiError as error:
+            if self._splitting is None:
+                raise
+            half = self._splitting.split(operation, len(chunk), error)
+            return self._bisect(operation, chunk[:half], send) + self._bisect(
+                operation, chunk[half:], send
+            )
+        if self._splitting is not None:
+            self._splitting.succeeded(operation, len(chunk))
+        return [result]
+
+    def _post(self, request_json: dict[str, Any]) -> dict[str, Any]:
+        """
+        Send a GraphQL query, verify HTTP response, return API response JSON as `dict`.
+
+        Identical requests sent concurrently are coalesced, if enabled. Each request
+        is retried according to the client's retry policy. While circuit breaker is
+        open, cached response is returned, if there's one.
+
+        Args:
+            request_json(dict[str, Any]): JSON with full request - GraphQL query and
+                variables.
+
+        Returns:
+            (dict[str, Any]): JSON response from the API.
+
+        Raises:
+            exceptions.JustWatchHttpError: HTTP-related error occurred.
+            exceptions.JustWatchCircuitOpenError: Circuit breaker is open, and there's
+                no cached response.
+            exceptions.JustWatchDeadlineError: Deadline passed before response arrived.
+
+        """
+        self._set_last_retries(0)
+        try:
+            if self._single_flight is None:
+                response = self._post_query(request_json)
+            else:
+                response = self._single_flight.do(
+                    request_key(request_json),
+                    partial(self._post_query, request_json),
+                    remaining(),
+                )
+        except JustWatchCircuitOpenError as error:
+            return self._cached_response(request_json, error)
+        except TimeoutError as error:
+            raise JustWatchDeadlineError from error
+        self._store_response(request_json, response)
+        return response
+
+    def _post_query(self, request_json: dict[str, Any]) -> dict[str, Any]:
+        """Send a request, as persisted query if enabled, return API response JSON."""
+        persisted = self._persisted_request(request_json)
+        response = self._post_with_retries(persisted)
+        if persisted is not request_json and (
+            full := self._full_request(request_json, response)
+        ):
+            retries = self.last_retries
+            response = self._post_with_retries(full)
+            self._set_last_retries(retries + self.last_retries)
+        return response
+
+    def _post_with_retries(self, request_json: dict[str, Any]) -> dict[str, Any]:
+        """Send a request, retrying it if needed, return API response JSON."""
+        retry = 0
+        with _translate_http_errors():
+            while True:
+                try:
+                    with self._guard():
+                        response = self._send_hedged(request_json)
+                except HTTPError as error:
+                    if (delay := self._retry_delay(retry, error)) is None:
+                        self._set_last_retries(retry)
+                        raise
+                    sleep(delay)
+                    retry += 1
+                else:
+                    break
+        self._set_last_retries(retry)
+        return response.json()
+
+    def _send_hedged(self, request_json: dict[str, Any]) -> Response:
+        """Send a single request, hedged with a duplicate if hedging is used."""
+        if self._hedging is None:
+            return self._send(request_json)
+        executor = self._get_executor("hedge", self._hedging.max_workers)
+        return self._hedging.call(partial(self._send, request_json), executor)
+
+    def _send(self, request_json: dict[str, Any]) -> Response:
+        """
+        Send a single request, raise an error for non-`2xx` status codes.
+
+        Hash-only persisted queries are sent as `GET` requests, if configured. Request
+        waits for a rate limiter token and a free slot, if concurrency is limited.
+        Waiting, and timeout of the request itself, are limited to time left until the
+        deadline, if there's one.
+        """
+        with _deadline_timeouts():
+            if self._rate_limiter:
+                self._rate_limiter.acquire(remaining())
+            concurrency = (
+                self._concurrency.slot(remaining())
+                if self._concurrency
+                else nullcontext(ConcurrencySlot(0.0))
+            )
+            with concurrency as slot, _deadline_timeouts():
+                timeout = request_timeout(self._http.timeout)
+                if (params := self._get_params(request_json)) is not None:
+                    response = self._http.get(self._url, params=params, timeout=timeout)
+                else:
+                    response = self._http.post(
+                        self._url, json=request_json, timeout=timeout
+                    )
+                slot.status_code = response.status_code
+        response.raise_for_status()
+        return response
+
+
+class AsyncJustWatchClient(_BaseClient):
+    """
+    Asynchronous client for JustWatch GraphQL API with a persistent connection pool.
+
+    Async equivalent of [`JustWatchClient`][simplejustwatchapi.client.JustWatchClient],
+    all methods are coroutines. A single instance can be shared between all tasks in an
+    event loop. It can be used as an async context manager, which closes all connections
+    on exit. Alternatively you can call [`aclose`]
+    [simplejustwatchapi.client.AsyncJustWatchClient.aclose] directly.
+
+    Args:
+        limits (Limits): Connection pool limits - maximum number of connections, how
+            many of them can be kept alive, and for how long idle connections are kept.
+            Maximum number of connections also limits how many requests can be sent
+            concurrently, other requests will wait for a free connection.
+        timeout (float | Timeout): Timeout for each request, either as a number of
+            seconds, or a detailed [`httpx.Timeout`][httpx.Timeout] configuration.
+        http2 (bool): Use HTTP/2 if server supports it. Concurrent requests are then
+            multiplexed over a single connection, instead of each one needing its own.
+            Requires optional `http2` dependencies.
+        url (str): URL of JustWatch GraphQL API. Useful mostly for testing with a local
+            stand-in server.
+        rate_limiter (RateLimiter | None): Limiter for how many requests per second can
+            be sent. Can be shared between clients. No limit for `None`.
+        retry (RetryPolicy | None): Policy for retrying requests failed due to
+            transient HTTP errors. No retries for `None`.
+        coalesce (bool): Coalesce identical requests sent concurrently - only one of
+            them is sent, others wait for its response. Check [`singleflight`]
+            [simplejustwatchapi.singleflight] for details.
+        persisted_queries (PersistedQueries | None): Configuration of automatic
+            persisted queries, sending query hashes instead of full queries. Check
+            [`persisted`][simplejustwatchapi.persisted] for details. Full queries are
+            always sent for `None`.
+        transport (AsyncBaseTransport | None): Custom `httpx` transport used for
+            sending requests, e.g., one of transports from [`transport`]
+            [simplejustwatchapi.transport] module. If given, then `limits` and `http2`
+            are ignored, as they are used only for the default transport.
+        concurrency (AdaptiveConcurrency | None): Adaptive limit of concurrent requests,
+            adjusted based on responses. Can be shared between clients. No limit for
+            `None`, other than connection pool limits.
+        circuit_breaker (CircuitBreaker | None): Circuit breaker failing requests
+            immediately while API is unhealthy. Check [`circuitbreaker`]
+            [simplejustwatchapi.circuitbreaker] for details. Requests are always sent
+            for `None`.
+        hedging (HedgePolicy | None): Policy of sending duplicates of slow requests.
+            Check [`hedging`][simplejustwatchapi.hedging] for details. No duplicates
+            are sent for `None`.
+        complexity_budget (int): Maximal estimated complexity of a single batched
+            request, used for splitting batches into chunks. Check [`graphql`]
+            [simplejustwatchapi.graphql] for details.
+        splitting (SplitPolicy | None): Policy of splitting requests rejected for too
+            high complexity. Check [`splitting`][simplejustwatchapi.splitting] for
+            details. Such requests fail for `None`.
+        batching (BatchPolicy | None): Policy of collecting concurrent `details`,
+            `seasons`, and `episodes` calls into shared requests. Check [`batching`]
+            [simplejustwatchapi.batching] for details. Each call sends its own request
+            for `None`.
+
+    """
+
+    def __init__(
+        self,
+        limits: Limits = DEFAULT_LIMITS,
+        timeout: float | Timeout = DEFAULT_TIMEOUT,
+        http2: bool = False,
+        url: str = GRAPHQL_API_URL,
+        rate_limiter: RateLimiter | None = None,
+        retry: RetryPolicy | None = None,
+        coalesce: bool = True,
+        persisted_queries: PersistedQueries | None = None,
+        transport: AsyncBaseTransport | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        hedging: HedgePolicy | None = None,
+        complexity_budget: int = DEFAULT_COMPLEXITY_BUDGET,
+        splitting: SplitPolicy | None = None,
+        batching: BatchPolicy | None = None,
+    ) -> None:
+        """Init AsyncJustWatchClient with its own connection pool."""
+        super().__init__(
+            url,
+            rate_limiter,
+            retry,
+            persisted_queries,
+            concurrency,
+            circuit_breaker,
+            hedging,
+            complexity_budget,
+            splitting,
+        )
+        self._http = AsyncClient(
+            limits=limits, timeout=timeout, http2=http2, transport=transport
+        )
+        self._single_flight = AsyncSingleFlight() if coalesce else None
+        self._batcher = AsyncBatcher(batching, self._send_batch) if batching else None
+
+    async def __aenter__(self) -> Self:
+        """Return this client, connections are closed on context exit."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close all connections in the pool."""
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close all connections in the pool, client can't be used afterwards."""
+        await self._http.aclose()
+
+    async def search(
+        self,
+        title: str = "",
+        country: str = "US",
+        language: str = "en",
+        count: int = 4,
+        best_only: bool = True,
+        offset: int = 0,
+        providers: list[str] | str | None = None,
+    ) -> list[MediaEntry]:
+        """
+        Search JustWatch for the given title.
+
+        Check [`search`][simplejustwatchapi.justwatch.search] for details.
+        """
+
+        async def send(part: range) -> list[MediaEntry]:
+            request = prepare_search_request(
+                title, country, language, len(part), best_only, part.start, providers
+            )
+            return parse_search_response(await self._post(request))
+
+        parts = self._split_chunks("search", range(offset, offset + count))
+        return list(chain.from_iterable(await self._send_split("search", parts, send)))
+
+    def iter_search(
+        self,
+        title: str = "",
+        country: str = "US",
+        language: str = "en",
+        page_size: int = 50,
+        best_only: bool = True,
+        offset: int = 0,
+        providers: list[str] | str | None = None,
+    ) -> AsyncIterator[MediaEntry]:
+        """
+        Iterate over all search results for the given title, page by page.
+
+        Check [`iter_search`][simplejustwatchapi.justwatch.iter_search] for details.
+        Returns an async iterator, next page is requested in a background task.
+        """
+
+        async def fetch(page: range) -> list[MediaEntry]:
+            return await self.search(
+                title, country, language, len(page), best_only, page.start, providers
+            )
+
+        return aiter_pages(fetch, page_ranges(offset, page_size))
+
+    async def search_many(
+        self,
+        titles: list[str],
+        country: str = "US",
+        language: str = "en",
+        count: int = 4,
+        best_only: bool = True,
+        providers: list[str] | str | None = None,
+    ) -> dict[str, list[MediaEntry]]:
+        """
+        Search JustWatch for multiple titles, with as few requests as possible.
+
+        Check [`search_many`][simplejustwatchapi.justwatch.search_many] for details.
+        Requests for all chunks of titles are sent concurrently.
+        """
+
+        async def send(chunk: list[str]) -> dict[str, list[MediaEntry]]:
+            request = prepare_search_many_request(
+                chunk, country, language, count, best_only, providers
+            )
+            return parse_search_many_response(await self._post(request), chunk)
+
+        chunks = self._search_many_chunks(titles, count)
+        operation = _split_key("search_many", count=count)
+        return _merge_parts(await self._send_split(operation, chunks, send))
+
+    async def popular(
+        self,
+        country: str = "US",
+        language: str = "en",
+        count: int = 4,
+        best_only: bool = True,
+        offset: int = 0,
+        providers: list[str] | str | None = None,
+    ) -> list[MediaEntry]:
+        """
+        Look up all currently popular titles on JustWatch.
+
+        Check [`popular`][simplejustwatchapi.justwatch.popular] for details.
+        """
+
+        async def send(part: range) -> list[MediaEntry]:
+            request = prepare_popular_request(
+                country, language, len(part), best_only, part.start, providers
+            )
+            return parse_popular_response(await self._post(request))
+
+        parts = self._split_chunks("popular", range(offset, offset + count))
+        return list(chain.from_iterable(await self._send_split("popular", parts, send)))
+
+    def iter_popular(
+        self,
+        country: str = "US",
+        language: str = "en",
+        page_size: int = 50,
+        best_only: bool = True,
+        offset: int = 0,
+        providers: list[str] | str | None = None,
+    ) -> AsyncIterator[MediaEntry]:
+        """
+        Iterate over all currently popular titles on JustWatch, page by page.
+
+        Check [`iter_popular`][simplejustwatchapi.justwatch.iter_popular] for details.
+        Returns an async iterator, next page is requested in a background task.
+        """
+
+        async def fetch(page: range) -> list[MediaEntry]:
+            return await self.popular(
+                country, language, len(page), best_only, page.start, providers
+            )
+
+        return aiter_pages(fetch, page_ranges(offset, page_size))
+
+    async def popular_for_countries(
+        self,
+        countries: set[str],
+        language: str = "en",
+        count: int = 4,
+        best_only: bool = True,
+        providers: list[str] | str | None = None,
+    ) -> dict[str, list[MediaEntry]]:
+        """
+        Look up popular titles for multiple countries, with as few requests as possible.
+
+        Check [`popular_for_countries`]
+        [simplejustwatchapi.justwatch.popular_for_countries] for details.
+        Requests for all chunks of countries are sent concurrently.
+        """
+        if not countries:
+            return {}
+
+        async def send(part: list[str]) -> dict[str, list[MediaEntry]]:
+            request = prepare_popular_for_countries_request(
+                set(part), language, count, best_only, providers
+            )
+            response = await self._post(request)
+            return parse_popular_for_countries_response(response, set(part))
+
+        operation = _split_key("popular_for_countries", count=count)
+        chunks = self._country_chunks(
+            operation,
+            countries,
+            _popular_for_countries_query_for_size,
+            variables={"first": count},
+        )
+        parts = await self._send_split(operation, chunks, send)
+        return _by_given_countries(countries, _merge_parts(parts))
+
+    async def details(
+        self,
+        node_id: str,
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> MediaEntry:
+        """
+        Get details of entry for a given ID.
+
+        Check [`details`][simplejustwatchapi.justwatch.details] for details.
+        """
+        if self._batcher is not None:
+            return await self._load("details", node_id, country, language, best_only)
+        request = prepare_details_request(node_id, country, language, best_only)
+        response = await self._post(request)
+        return parse_details_response(response)
+
+    async def details_many(
+        self,
+        node_ids: list[str],
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> dict[str, MediaEntry]:
+        """
+        Get details of entries for multiple IDs, with as few requests as possible.
+
+        Check [`details_many`][simplejustwatchapi.justwatch.details_many] for details.
+        Requests for all chunks of node IDs are sent concurrently.
+        """
+
+        async def send(chunk: list[str]) -> dict[str, MediaEntry]:
+            request = prepare_details_many_request(chunk, country, language, best_only)
+            return parse_details_many_response(await self._post(request), chunk)
+
+        chunks = self._details_many_chunks(node_ids)
+        parts = await self._send_split("details_many", chunks, send)
+        return _merge_parts(parts)
+
+    async def details_for_locales(
+        self,
+        node_id: str,
+        locales: list[tuple[str, str]],
+        best_only: bool = True,
+    ) -> dict[tuple[str, str], MediaEntry]:
+        """
+        Get details of entry for a given ID in multiple locales.
+
+        Check [`details_for_locales`][simplejustwatchapi.justwatch.details_for_locales]
+        for details. Requests for all chunks of locales are sent concurrently.
+        """
+
+        async def send(
+            chunk: list[tuple[str, str]],
+        ) -> dict[tuple[str, str], MediaEntry]:
+            request = prepare_details_for_locales_request(node_id, chunk, best_only)
+            response = await self._post(request)
+            return parse_details_for_locales_response(response, chunk)
+
+        chunks = self._locale_chunks(locales)
+        parts = await self._send_split("details_for_locales", chunks, send)
+        return _by_given_locales(locales, _merge_parts(parts))
+
+    async def seasons(
+        self,
+        show_id: str,
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> list[MediaEntry]:
+        """
+        Get details of all seasons available for a given show ID.
+
+        Check [`seasons`][simplejustwatchapi.justwatch.seasons] for details.
+        """
+        if self._batcher is not None:
+            return await self._load("seasons", show_id, country, language, best_only)
+        request = prepare_seasons_request(show_id, country, language, best_only)
+        response = await self._post(request)
+        return parse_seasons_response(response)
+
+    async def seasons_many(
+        self,
+        show_ids: list[str],
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> dict[str, list[MediaEntry]]:
+        """
+        Get seasons for multiple show IDs, with as few requests as possible.
+
+        Check [`seasons_many`][simplejustwatchapi.justwatch.seasons_many] for details.
+        Requests for all chunks of show IDs are sent concurrently.
+        """
+
+        async def send(chunk: list[str]) -> dict[str, list[MediaEntry]]:
+            request = prepare_seasons_many_request(chunk, country, language, best_only)
+            response = await self._post(request)
+            return parse_seasons_many_response(response, chunk)
+
+        chunks = self._seasons_many_chunks(show_ids)
+        parts = await self._send_split("seasons_many", chunks, send)
+        return _merge_parts(parts)
+
+    async def episodes(
+        self,
+        season_id: str,
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> list[Episode]:
+        """
+        Get details of all episodes available for a given season ID.
+
+        Check [`episodes`][simplejustwatchapi.justwatch.episodes] for details.
+        """
+        if self._batcher is not None:
+            return await self._load("episodes", season_id, country, language, best_only)
+        request = prepare_episodes_request(season_id, country, language, best_only)
+        response = await self._post(request)
+        return parse_episodes_response(response)
+
+    async def episodes_many(
+        self,
+        season_ids: list[str],
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> dict[str, list[Episode]]:
+        """
+        Get episodes for multiple season IDs, with as few requests as possible.
+
+        Check [`episodes_many`][simplejustwatchapi.justwatch.episodes_many] for
+        details. Requests for all chunks of season IDs are sent concurrently.
+        """
+
+        async def send(chunk: list[str]) -> dict[str, list[Episode]]:
+            request = prepare_episodes_many_request(chunk, country, language, best_only)
+            response = await self._post(request)
+            return parse_episodes_many_response(response, chunk)
+
+        chunks = self._episodes_many_chunks(season_ids)
+        parts = await self._send_split("episodes_many", chunks, send)
+        return _merge_parts(parts)
+
+    async def show_tree(
+        self,
+        show_id: str,
+        country: str = "US",
+        language: str = "en",
+        best_only: bool = True,
+    ) -> ShowTree:
+        """
+        Get details of a show with all of its seasons and their episodes.
+
+        Check [`show_tree`][simplejustwatchapi.justwatch.show_tree] for details.
+        Requests for all groups of seasons are sent concurrently.
+        """
+        if _show_tree_complexity() <= self._complexity_budget:
+            request = prepare_show_tree_request(
+                show_id, country, language, best_only, with_episodes=True
+            )
+            try:
+                return parse_show_tree_response(await self._post(request))
+            except JustWatchApiError as error:
+                if not self._fall_back_on(error):
+                    raise
+        request = prepare_show_tree_request(
+            show_id, country, language, best_only, with_episodes=False
+        )
+        tree = parse_show_tree_response(await self._post(request))
+        season_ids = [season.entry_id for season in tree.seasons]
+        episodes = await self.episodes_many(season_ids, country, language, best_only)
+        return tree._replace(episodes=episodes)
+
+    async def offers_for_countries(
+        self,
+        node_id: str,
+        countries: set[str],
+        language: str = "en",
+        best_only: bool = True,
+    ) -> dict[str, list[Offer]]:
+        """
+        Get offers for entry of given node ID for all given countries.
+
+        Check [`offers_for_countries`]
+        [simplejustwatchapi.justwatch.offers_for_countries] for details.
+        """
+        if not countries:
+            return {}
+
+        async def send(part: list[str]) -> dict[str, list[Offer]]:
+            request = prepare_offers_for_countries_request(
+                node_id, set(part), language, best_only
+            )
+            response = await self._post(request)
+            return parse_offers_for_countries_response(response, set(part))
+
+        chunks = self._split_chunks("offers_for_countries", sorted(countries))
+        parts = await self._send_split("offers_for_countries", chunks, send)
+        return _merge_parts(parts)
+
+    async def offers_matrix(
+        self,
+        node_ids: list[str],
+        countries: set[str],
+        language: str = "en",
+        best_only: bool = True,
+    ) -> dict[tuple[str, str], list[Offer]]:
+        """
+        Get offers for multiple node IDs in all given countries, with few requests.
+
+        Check [`offers_matrix`][simplejustwatchapi.justwatch.offers_matrix] for details.
+        Requests for all chunks are sent concurrently.
+        """
+
+        async def send(
+            chunk: list[tuple[str, tuple[str, ...]]],
+        ) -> dict[Any, list[Offer]]:
+            ids, group = [node_id for node_id, _ in chunk], set(chunk[0][1])
+            request = prepare_offers_matrix_request(ids, group, language, best_only)
+            response = await self._post(request)
+            return parse_offers_matrix_response(response, ids, group)
+
+        country_count = len({country.upper() for country in countries})
+        operation = _split_key("offers_matrix", countries=country_count)
+        chunks = self._offers_matrix_chunks(operation, node_ids, countries)
+        parts = await self._send_split(operation, chunks, send)
+        return _matrix_by_given_countries(node_ids, countries, parts)
+
+    async def providers(self, country: str = "US") -> list[OfferPackage]:
+        """
+        Look up all providers for the given country.
+
+        Check [`providers`][simplejustwatchapi.justwatch.providers] for details.
+        """
+        request = prepare_providers_request(country)
+        response = await self._post(request)
+        return parse_providers_response(response)
+
+    async def providers_for_countries(
+        self, countries: set[str]
+    ) -> dict[str, list[OfferPackage]]:
+        """
+        Look up all providers for multiple countries, with as few requests as possible.
+
+        Check [`providers_for_countries`]
+        [simplejustwatchapi.justwatch.providers_for_countries] for details.
+        Requests for all chunks of countries are sent concurrently.
+        """
+        if not countries:
+            return {}
+
+        async def send(part: list[str]) -> dict[str, list[OfferPackage]]:
+            request = prepare_providers_for_countries_request(set(part))
+            response = await self._post(request)
+            return parse_providers_for_countries_response(response, set(part))
+
+        chunks = self._country_chunks(
+            "providers_for_countries",
+            countries,
+            _providers_for_countries_query_for_size,
+        )
+        parts = await self._send_split("providers_for_countries", chunks, send)
+        return _by_given_countries(countries, _merge_parts(parts))
+
+    async def _load(
+        self, kind: str, node_id: str, country: str, language: str, best_only: bool
+    ) -> Any:
+        """Get data for a single node ID from a request shared with concurrent calls."""
+        key = (country.upper(), language, best_only)
+        try:
+            return await self._batcher.load(key, (kind, node_id), remaining())
+        except TimeoutError as error:
+            raise JustWatchDeadlineError from error
+
+    async def _send_batch(
+        self, key: tuple[str, str, bool], items: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], Any]:
+        """Send all collected calls sharing the same locale and offers filter."""
+        country, language, best_only = key
+
+        async def send(chunk: list[tuple[str, str]]) -> dict[tuple[str, str], Any]:
+            request = prepare_nodes_batch_request(chunk, country, language, best_only)
+            return parse_nodes_batch_response(await self._post(request), chunk)
+
+        chunks = self._batch_chunks(items)
+        return _merge_parts(await self._send_split("batch", chunks, send))
+
+    async def _send_split(
+        self,
+        operation: str,
+        chunks: list[Sequence[Any]],
+        send: Callable[[Any], Awaitable[Any]],
+    ) -> list[Any]:
+        """
+        Send all chunks of a request concurrently, split chunks rejected for complexity.
+
+        If any chunk fails, all other chunks still being sent are cancelled.
+
+        Args:
+            operation (str): Name of the operation, used by splitting policy.
+            chunks (list[Sequence[Any]]): Chunks of elements of the request.
+            send (Callable[[Any], Awaitable[Any]]): Coroutine function sending a request
+                for a single chunk, returning its parsed results.
+
+        Returns:
+            (list[Any]): Results for all sent requests, in order of their elements.
+
+        """
+        results = await _gather_or_cancel(
+            *(self._bisect(operation, chunk, send) for chunk in chunks)
+        )
+        return list(chain.from_iterable(results))
+
+    async def _bisect(
+        self,
+        operation: str,
+        chunk: Sequence[Any],
+        send: Callable[[Any], Awaitable[Any]],
+    ) -> list[Any]:
+        """Send a single chunk, if it's rejected for complexity, send both halves."""
+        try:
+            result = await send(chunk)
+        except JustWatchApiError as error:
+            if self._splitting is None:
+                raise
+            half = self._splitting.split(operation, len(chunk), error)
+            first, second = await _gather_or_cancel(
+                self._bisect(operation, chunk[:half], send),
+                self._bisect(operation, chunk[half:], send),
+            )
+            return first + second
+        if self._splitting is not None:
+            self._splitting.succeeded(operation, len(chunk))
+        return [result]
+
+    async def _post(self, request_json: dict[str, Any]) -> dict[str, Any]:
+        """
+        Send a GraphQL query, verify HTTP response, return API response JSON as `dict`.
+
+        Identical requests sent concurrently are coalesced, if enabled. Each request
+        is retried according to the client's retry policy. While circuit breaker is
+        open, cached response is returned, if there's one.
+
+        Args:
+            request_json(dict[str, Any]): JSON with full request - GraphQL query and
+                variables.
+
+        Returns:
+            (dict[str, Any]): JSON response from the API.
+
+        Raises:
+            exceptions.JustWatchHttpError: HTTP-related error occurred.
+            exceptions.JustWatchCircuitOpenError: Circuit breaker is open, and there's
+                no cached response.
+            exceptions.JustWatchDeadlineError: Deadline passed before response arrived.
+
+        """
+        self._set_last_retries(0)
+        try:
+            if self._single_flight is None:
+                response = await self._post_query(request_json)
+            else:
+                response = await self._single_flight.do(
+                    request_key(request_json),
+                    partial(self._post_query, request_json),
+                    remaining(),
+                )
+        except JustWatchCircuitOpenError as error:
+            return self._cached_response(request_json, error)
+        except TimeoutError as error:
+            raise JustWatchDeadlineError from error
+        self._store_response(request_json, response)
+        return response
+
+    async def _post_query(self, request_json: dict[str, Any]) -> dict[str, Any]:
+        """Send a request, as persisted query if enabled, return API response JSON."""
+        persisted = self._persisted_request(request_json)
+        response = await self._post_with_retries(persisted)
+        if persisted is not request_json and (
+            full := self._full_request(request_json, response)
+        ):
+            retries = self.last_retries
+            response = await self._post_with_retries(full)
+            self._set_last_retries(retries + self.last_retries)
+        return response
+
+    async def _post_with_retries(self, request_json: dict[str, Any]) -> dict[str, Any]:
+        """Send a request, retrying it if needed, return API response JSON."""
+        retry = 0
+        with _translate_http_errors():
+            while True:
+                try:
+                    with self._guard():
+                        response = await self._send_hedged(request_json)
+                except HTTPError as error:
+                    if (delay := self._retry_delay(retry, error)) is None:
+                        self._set_last_retries(retry)
+                        raise
+                    await async_sleep(delay)
+                    retry += 1
+                else:
+                    break
+        self._set_last_retries(retry)
+        return response.json()
+
+    async def _send_hedged(self, request_json: dict[str, Any]) -> Response:
+        """Send a single request, hedged with a duplicate if hedging is used."""
+        if self._hedging is None:
+            return await self._send(request_json)
+        return await self._hedging.call_async(partial(self._send, request_json))
+
+    async def _send(self, request_json: dict[str, Any]) -> Response:
+        """
+        Send a single request, raise an error for non-`2xx` status codes.
+
+        Hash-only persisted queries are sent as `GET` requests, if configured. Request
+        waits for a rate limiter token and a free slot, if concurrency is limited.
+        Waiting, and timeout of the request itself, are limited to time left until the
+        deadline, if there's one.
+        """
+        with _deadline_timeouts():
+            if self._rate_limiter:
+                await self._rate_limiter.acquire_async(remaining())
+            concurrency = (
+                self._concurrency.slot_async(remaining())
+                if self._concurrency
+                else nullcontext(ConcurrencySlot(0.0))
+            )
+            async with concurrency as slot:
+                with _deadline_timeouts():
+                    timeout = request_timeout(self._http.timeout)
+                    if (params := self._get_params(request_json)) is not None:
+                        response = await self._http.get(
+                            self._url, params=params, timeout=timeout
+                        )
+                    else:
+                        response = await self._http.post(
+                            self._url, json=request_json, timeout=timeout
+                        )
+                slot.status_code = response.status_code
+        response.raise_for_status()
+        return response
+
+
+_BATCH_QUERIES: dict[str, Callable[[int], str]] = {
+    "details": graphql_details_many_query,
+    "seasons": graphql_seasons_many_query,
+    "episodes": graphql_episodes_many_query,
+}
+
+
+def _popular_for_countries_query_for_size(size: int) -> str:
+    """Prepare popular query for a given number of placeholder countries."""
+    return graphql_popular_for_countries_query([f"C{index}" for index in range(size)])
+
+
+def _providers_for_countries_query_for_size(size: int) -> str:
+    """Prepare providers query for a given number of placeholder countries."""
+    return graphql_providers_for_countries_query([f"C{index}" for index in range(size)])
+
+
+def _by_given_countries(
+    countries: set[str], results: dict[str, list[Any]]
+) -> dict[str, list[Any]]:
+    """Key results by country codes as given, instead of normalized ones."""
+    return {country: results[country.upper()] for country in countries}
+
+
+def _by_given_locales(
+    locales: list[tuple[str, str]], results: dict[tuple[str, str], MediaEntry]
+) -> dict[tuple[str, str], MediaEntry]:
+    """Key results by locales as given, instead of normalized ones."""
+    return {
+        (country, language): results[country.upper(), language]
+        for country, language in locales
+        if (country.upper(), language) in results
+    }
+
+
+@cache
+def _show_tree_complexity() -> int:
+    """Estimate complexity of a query for a show with all seasons and episodes."""
+    return estimate_complexity(GRAPHQL_SHOW_TREE_QUERY)
+
+
+def _offers_matrix_countries_query_for_size(size: int) -> str:
+    """Prepare offers matrix query for a single node and placeholder countries."""
+    return graphql_offers_matrix_query(1, [f"C{index}" for index in range(size)])
+
+
+@cache
+def _offers_matrix_query_for_size(country_count: int) -> Callable[[int], str]:
+    """Prepare function building offers matrix query for a given number of nodes."""
+    countries = [f"C{index}" for index in range(country_count)]
+    return partial(graphql_offers_matrix_query, countries=countries)
+
+
+def _matrix_by_given_countries(
+    node_ids: list[str], countries: set[str], parts: list[dict[Any, list[Offer]]]
+) -> dict[tuple[str, str], list[Offer]]:
+    """Merge offers matrix results, key them by country codes as given."""
+    results = _merge_parts(parts)
+    return {
+        (node_id, country): results[node_id, country.upper()]
+        for node_id in dict.fromkeys(node_ids)
+        for country in countries
+        if (node_id, country.upper()) in results
+    }
+
+
+def _split_key(operation: str, **list_sizes: int) -> str:
+    """
+    Return name of an operation for splitting policy, including its list sizes.
+
+    Complexity of a single element of a chunk depends on these sizes (e.g., `count` of
+    titles for each search), so sizes learned for one of them don't apply to others.
+    """
+    sizes = ", ".join(f"{name}={size}" for name, size in list_sizes.items())
+    return f"{operation}({sizes})"
+
+
+async def _gather_or_cancel(*coroutines: Awaitable[Any]) -> list[Any]:
+    """Run all coroutines concurrently, cancel the remaining ones when any fails."""
+    tasks = [ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _merge_parts(parts: list[dict[str, Any]]) -> dict[str, Any]:
+    """Merge results of a split request, a single result is returned as it is."""
+    if len(parts) == 1:
+        return parts[0]
+    return {key: value for part in parts for key, value in part.items()}
+
+
+@contextmanager
+def _deadline_timeouts() -> Iterator[None]:
+    """
+    Convert timeouts caused by a passed deadline into JustWatchDeadlineError.
+
+    It covers waiting for a rate limiter token or a concurrency slot, and `httpx`
+    timeouts of the request itself. Request is wrapped within its concurrency slot and
+    circuit breaker guard, so running out of caller's time budget isn't counted by them
+    as an API failure.
+    """
+    try:
+        yield
+    except TimeoutError as e:
+        raise JustWatchDeadlineError from e
+    except TimeoutException as e:
+        if deadline_passed():
+            raise JustWatchDeadlineError from e
+        raise
+
+
+@contextmanager
+def _translate_http_errors() -> Iterator[None]:
+    """
+    Convert all HTTP-related errors from `httpx` into JustWatchHttpError.
+
+    Timeouts caused by a passed deadline are converted into JustWatchDeadlineError.
+    """
+    try:
+        yield
+    except TimeoutException as e:
+        if deadline_passed():
+            raise JustWatchDeadlineError from e
+        raise JustWatchHttpError(str(e)) from e
+    except HTTPStatusError as e:
+        raise JustWatchHttpError(str(e), e.response.text) from e
+    except HTTPError as e:
+        raise JustWatchHttpError(str(e)) from e
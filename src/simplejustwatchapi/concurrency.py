@@ -0,0 +1,395 @@
+"""
+Adaptive limit of concurrent requests sent to JustWatch API.
+
+[`AdaptiveConcurrency`][simplejustwatchapi.concurrency.AdaptiveConcurrency] limits how
+many requests can be in flight at the same time, and adjusts the limit based on
+responses, using AIMD (additive increase, multiplicative decrease) - the same approach
+TCP uses for its congestion window. It's meant to be passed to [`JustWatchClient`]
+[simplejustwatchapi.client.JustWatchClient] or [`AsyncJustWatchClient`]
+[simplejustwatchapi.client.AsyncJustWatchClient]:
+
+```python
+from simplejustwatchapi import AdaptiveConcurrency, JustWatchClient
+
+concurrency = AdaptiveConcurrency(initial_limit=10, max_limit=50)
+client = JustWatchClient(concurrency=concurrency)
+```
+
+While responses are successful and their latency is stable, limit grows by roughly 1
+for each full "window" of requests. Limit is cut multiplicatively when API is
+overloaded - it responds with `429` or `5xx` status codes, requests fail with network
+errors or timeouts, or latency "blows up" compared to the usual latency. Timeouts
+caused by a [`deadline`][simplejustwatchapi.deadline] don't affect the limit.
+
+Current limit and all decisions made by the limiter are available through
+[`metrics`][simplejustwatchapi.concurrency.AdaptiveConcurrency.metrics].
+"""
+
+from asyncio import (
+    AbstractEventLoop,
+    CancelledError,
+    Future,
+    get_running_loop,
+    wait_for,
+)
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from threading import Event, Lock
+from time import monotonic
+from typing import NamedTuple
+
+from httpx import TransportError
+
+from simplejustwatchapi.exceptions import JustWatchError
+
+INCREASE = "increase"
+"""Decision reason - successful responses with stable latency."""
+
+THROTTLED = "throttled"
+"""Decision reason - response with `429` status code."""
+
+SERVER_ERROR = "server error"
+"""Decision reason - response with `5xx` status code."""
+
+NETWORK_ERROR = "network error"
+"""Decision reason - request failed without response, e.g., timeout."""
+
+LATENCY = "latency"
+"""Decision reason - response latency much higher than usual."""
+
+
+class ConcurrencyDecision(NamedTuple):
+    """
+    Single change of concurrency limit.
+
+    Attributes:
+        time (float): Time of the decision, from [`time.monotonic`][time.monotonic].
+        old_limit (int): Limit before the decision.
+        new_limit (int): Limit after the decision.
+        reason (str): Reason for the decision - [`INCREASE`]
+            [simplejustwatchapi.concurrency.INCREASE], [`THROTTLED`]
+            [simplejustwatchapi.concurrency.THROTTLED], [`SERVER_ERROR`]
+            [simplejustwatchapi.concurrency.SERVER_ERROR], [`NETWORK_ERROR`]
+            [simplejustwatchapi.concurrency.NETWORK_ERROR], or [`LATENCY`]
+            [simplejustwatchapi.concurrency.LATENCY].
+
+    """
+
+    time: float
+    old_limit: int
+    new_limit: int
+    reason: str
+
+
+class ConcurrencyMetrics(NamedTuple):
+    """
+    Snapshot of state of an adaptive concurrency limiter.
+
+    Attributes:
+        limit (int): Current limit of concurrent requests.
+        in_flight (int): Number of requests currently in flight.
+        waiting (int): Number of requests waiting for a free slot.
+        latency (float | None): Smoothed latency of responses in seconds, `None` if
+            there were no responses yet.
+        increases (int): Number of times limit was increased.
+        decreases (int): Number of times limit was decreased.
+        decisions (tuple[ConcurrencyDecision, ...]): Most recent changes of the limit,
+            from the oldest one.
+
+    """
+
+    limit: int
+    in_flight: int
+    waiting: int
+    latency: float | None
+    increases: int
+    decreases: int
+    decisions: tuple[ConcurrencyDecision, ...]
+
+
+class ConcurrencySlot:
+    """
+    Slot for a single in-flight request.
+
+    Status code of the response should be stored in `status_code`, so the limiter can
+    use it for adjusting the limit.
+    """
+
+    def __init__(self, started: float) -> None:
+        """Init ConcurrencySlot for a request started at given time."""
+        self.started = started
+        self.status_code: int | None = None
+
+
+class AdaptiveConcurrency:
+    """
+    Limit of concurrent requests, adjusted with AIMD based on responses.
+
+    Each successful response with stable latency increases the limit by `1 / limit`,
+    so it grows by roughly 1 per window of requests. Limit is increased only when it's
+    actually used, at least half of it needs to be in flight.
+
+    On overload signals the limit is multiplied by `backoff`. Requests which were sent
+    before the last decrease don't decrease it again - otherwise a single overload burst
+    would instantly cut the limit to its minimum.
+
+    Latency "blows up" when it's more than `latency_tolerance` times higher than the
+    smoothed latency of previous responses (exponential moving average with `smoothing`
+    weight for new responses).
+
+    Limiter is safe to use from multiple threads and from multiple `asyncio` tasks at
+    the same time (including sharing it between sync and async clients). Waiting
+    requests get free slots in order in which they arrived.
+
+    Args:
+        initial_limit (int): Limit of concurrent requests at start.
+        min_limit (int): Limit will never go below this value.
+        max_limit (int): Limit will never go above this value.
+        backoff (float): Multiplier applied to the limit on overload, between 0 and 1.
+        latency_tolerance (float): How many times latency can be higher than usual,
+            before it's considered an overload signal.
+        smoothing (float): Weight of each new response in smoothed latency, between 0
+            and 1.
+        history (int): Number of most recent decisions kept in metrics.
+
+    Raises:
+        exceptions.JustWatchError: Configuration is invalid.
+
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.1,
+        history: int = 100,
+    ) -> None:
+        """Init AdaptiveConcurrency with no requests in flight."""
+        if (
+            not 1 <= min_limit <= initial_limit <= max_limit
+            or not 0 < backoff < 1
+            or latency_tolerance <= 1
+            or not 0 < smoothing <= 1
+        ):
+            error_msg = (
+                f"Invalid concurrency config: {initial_limit=}, {min_limit=}, "
+                f"{max_limit=}, {backoff=}, {latency_tolerance=}, {smoothing=}"
+            )
+            raise JustWatchError(error_msg)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._backoff = backoff
+        self._latency_tolerance = latency_tolerance
+        self._smoothing = smoothing
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._latency: float | None = None
+        self._last_decrease = float("-inf")
+        self._increases = 0
+        self._decreases = 0
+        self._decisions: deque[ConcurrencyDecision] = deque(maxlen=history)
+        self._waiters: deque[Callable[[], object]] = deque()
+        self._lock = Lock()
+
+    @property
+    def limit(self) -> int:
+        """Current limit of concurrent requests."""
+        return int(self._limit)
+
+    @property
+    def metrics(self) -> ConcurrencyMetrics:
+        """Snapshot of current limit, usage, and decisions made so far."""
+        with self._lock:
+            return ConcurrencyMetrics(
+                self.limit,
+                self._in_flight,
+                len(self._waiters),
+                self._latency,
+                self._increases,
+                self._decreases,
+                tuple(self._decisions),
+            )
+
+    @contextmanager
+    def slot(self, max_wait: float | None = None) -> Iterator[ConcurrencySlot]:
+        """
+        Take a slot for a request, block current thread until one is available.
+
+        Slot is freed on exit, and its result is used for adjusting the limit.
+
+        Args:
+            max_wait (float | None): Maximal time in seconds to wait for a free slot, no
+                limit for `None`.
+
+        Raises:
+            TimeoutError: No slot was freed within `max_wait`.
+
+        """
+        with self._lock:
+            if acquired := self._try_acquire():
+                event = None
+            else:
+                event = Event()
+                self._waiters.append(event.set)
+        if not acquired and not event.wait(_non_negative(max_wait)):
+            self._cancel_waiter(event.set)
+            error_msg = "No free concurrency slot within max wait time"
+            raise TimeoutError(error_msg)
+        with self._release_on_exit(ConcurrencySlot(monotonic())) as slot:
+            yield slot
+
+    @asynccontextmanager
+    async def slot_async(
+        self, max_wait: float | None = None
+    ) -> AsyncIterator[ConcurrencySlot]:
+        """
+        Take a slot for a request, wait (without blocking event loop) until it's free.
+
+        Slot is freed on exit, and its result is used for adjusting the limit.
+
+        Args:
+            max_wait (float | None): Maximal time in seconds to wait for a free slot, no
+                limit for `None`.
+
+        Raises:
+            TimeoutError: No slot was freed within `max_wait`.
+
+        """
+        loop = get_running_loop()
+        with self._lock:
+            if acquired := self._try_acquire():
+                future = waiter = None
+            else:
+                future = loop.create_future()
+                waiter = _future_waiter(loop, future)
+                self._waiters.append(waiter)
+        if not acquired:
+            try:
+                await wait_for(future, _non_negative(max_wait))
+            except (CancelledError, TimeoutError):
+                self._cancel_waiter(waiter)
+                raise
+        with self._release_on_exit(ConcurrencySlot(monotonic())) as slot:
+            yield slot
+
+    def _try_acquire(self) -> bool:
+        """Take a free slot, if there is one and nobody is waiting for it."""
+        if self._waiters or self._in_flight >= self.limit:
+            return False
+        self._in_flight += 1
+        return True
+
+    def _cancel_waiter(self, waiter: Callable[[], object]) -> None:
+        """Remove cancelled waiter, or free the slot if it was already given to it."""
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                self._in_flight -= 1
+                self._wake_waiters()
+
+    @contextmanager
+    def _release_on_exit(self, slot: ConcurrencySlot) -> Iterator[ConcurrencySlot]:
+        """Free the slot on exit, adjust limit based on how request ended."""
+        try:
+            yield slot
+        except TransportError:
+            self._release(slot, NETWORK_ERROR)
+            raise
+        except BaseException:
+            self._release(slot, None)
+            raise
+        else:
+            self._release(slot, _status_code_reason(slot.status_code))
+
+    def _release(self, slot: ConcurrencySlot, reason: str | None) -> None:
+        """
+        Free a slot and adjust the limit.
+
+        Args:
+            slot (ConcurrencySlot): Slot of finished request.
+            reason (str | None): Overload reason, [`INCREASE`]
+                [simplejustwatchapi.concurrency.INCREASE] for successful responses, or
+                `None` if request shouldn't affect the limit at all.
+
+        """
+        now = monotonic()
+        with self._lock:
+            in_flight = self._in_flight
+            self._in_flight -= 1
+            if reason == INCREASE:
+                reason = self._observe_latency(now - slot.started)
+            if reason == INCREASE and in_flight * 2 >= self.limit:
+                self._set_limit(self._limit + 1 / self._limit, reason, now)
+            elif reason not in {INCREASE, None} and slot.started >= self._last_decrease:
+                self._last_decrease = now
+                self._set_limit(self._limit * self._backoff, reason, now)
+            self._wake_waiters()
+
+    def _observe_latency(self, latency: float) -> str:
+        """Update smoothed latency, return reason based on latency of a response."""
+        usual = self._latency
+        if usual is None:
+            self._latency = latency
+        else:
+            self._latency = usual + self._smoothing * (latency - usual)
+        if usual is not None and latency > usual * self._latency_tolerance:
+            return LATENCY
+        return INCREASE
+
+    def _set_limit(self, limit: float, reason: str, now: float) -> None:
+        """Set new limit within bounds, record decision if the limit changed."""
+        old_limit = self.limit
+        self._limit = min(self._max_limit, max(self._min_limit, limit))
+        if (new_limit := self.limit) == old_limit:
+            return
+        if new_limit > old_limit:
+            self._increases += 1
+        else:
+            self._decreases += 1
+        self._decisions.append(ConcurrencyDecision(now, old_limit, new_limit, reason))
+
+    def _wake_waiters(self) -> None:
+        """Give free slots to waiting requests, in order in which they arrived."""
+        while self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            self._waiters.popleft()()
+
+
+def _status_code_reason(status_code: int | None) -> str | None:
+    """
+    Return decision reason for a response with given status code.
+
+    Client errors (other than `429`) don't affect the limit, they are caused by the
+    request itself, not by load of the API.
+    """
+    if status_code is None:
+        return None
+    if status_code == 429:  # noqa: PLR2004
+        return THROTTLED
+    if status_code >= 500:  # noqa: PLR2004
+        return SERVER_ERROR
+    if status_code >= 400:  # noqa: PLR2004
+        return None
+    return INCREASE
+
+
+def _non_negative(max_wait: float | None) -> float | None:
+    """Return wait time which can't be negative, `None` means no limit."""
+    return None if max_wait is None else max(0.0, max_wait)
+
+
+def _future_waiter(
+    loop: AbstractEventLoop, future: Future[None]
+) -> Callable[[], object]:
+    """Return callback waking a waiting task from any thread."""
+
+    def wake() -> None:
+        if not future.done():
+            future.set_result(None)
+
+    return lambda: loop.call_soon_threadsafe(wake)
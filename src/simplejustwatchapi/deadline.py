@@ -0,0 +1,119 @@
+"""
+End-to-end deadlines for requests sent to JustWatch API.
+
+Client timeout applies separately to each request, so a call sending multiple requests
+(e.g., with retries, or a sequence of calls getting seasons and then their episodes)
+can take much longer. A deadline limits total time of all requests sent within it:
+
+```python
+from simplejustwatchapi import JustWatchClient, JustWatchDeadlineError
+
+client = JustWatchClient()
+try:
+    with client.deadline(0.3):
+        seasons = client.seasons(show_id)
+        episodes = [client.episodes(season.entry_id) for season in seasons]
+except JustWatchDeadlineError:
+    ...
+```
+
+Within a deadline, timeouts of each request are shrunk to the remaining time, retries
+which can't start before the deadline are skipped, and once the deadline passes,
+[`JustWatchDeadlineError`][simplejustwatchapi.exceptions.JustWatchDeadlineError] is
+raised. Waiting for a [`RateLimiter`][simplejustwatchapi.ratelimit.RateLimiter] token,
+or for a free slot of [`AdaptiveConcurrency`]
+[simplejustwatchapi.concurrency.AdaptiveConcurrency] is limited to the remaining time as
+well.
+
+Timeouts caused by a deadline are a result of caller's time budget, not of API health,
+so they aren't counted as failures by adaptive concurrency limit or by
+[`CircuitBreaker`][simplejustwatchapi.circuitbreaker.CircuitBreaker].
+
+Deadline is stored in a [context variable][contextvars], so it applies to all clients
+used in the current thread (or `asyncio` task, and tasks created within it), and nested
+deadlines can only shorten the outer one. Note that `httpx` read and write timeouts
+apply to each network operation separately, so a request slowly receiving data in
+multiple chunks can overrun the deadline slightly.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+
+from httpx import Timeout
+
+from simplejustwatchapi.exceptions import JustWatchDeadlineError
+
+_DEADLINE: ContextVar[float | None] = ContextVar("justwatch_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Limit total time of all requests sent within the context.
+
+    Args:
+        seconds (float): Time budget in seconds, counted from entering the context.
+
+    """
+    expires = monotonic() + seconds
+    if (outer := _DEADLINE.get()) is not None:
+        expires = min(expires, outer)
+    token = _DEADLINE.set(expires)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def remaining() -> float | None:
+    """
+    Get time left until the current deadline.
+
+    Returns:
+        (float | None): Number of seconds until the deadline, it's negative if deadline
+            has already passed. `None` if there's no deadline.
+
+    """
+    if (expires := _DEADLINE.get()) is None:
+        return None
+    return expires - monotonic()
+
+
+def deadline_passed() -> bool:
+    """Check whether there's a deadline, and it has already passed."""
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def request_timeout(timeout: Timeout) -> Timeout:
+    """
+    Shrink timeout of a single request, so it can't last past the current deadline.
+
+    Args:
+        timeout (Timeout): Timeout configured for a client.
+
+    Returns:
+        (Timeout): Timeout with each value limited to remaining time, or unchanged
+            timeout if there's no deadline.
+
+    Raises:
+        exceptions.JustWatchDeadlineError: Deadline has already passed.
+
+    """
+    if (left := remaining()) is None:
+        return timeout
+    if left <= 0:
+        raise JustWatchDeadlineError
+    return Timeout(
+        connect=_shrink(timeout.connect, left),
+        read=_shrink(timeout.read, left),
+        write=_shrink(timeout.write, left),
+        pool=_shrink(timeout.pool, left),
+    )
+
+
+def _shrink(timeout: float | None, left: float) -> float:
+    """Limit a single timeout value to remaining time, `None` means no timeout."""
+    return left if timeout is None else min(timeout, left)
@@ -4,7 +4,8 @@ Exceptions raised by this library.
 All exceptions inherit from [`JustWatchError`]
 [simplejustwatchapi.exceptions.JustWatchError] for easier catching.
 
-Specific exceptions are raised for HTTP-related errors and GraphQL API response errors.
+Specific exceptions are raised for HTTP-related errors, GraphQL API response errors,
+requests not sent due to an open circuit breaker, and passed deadlines.
 """
 
 
@@ -52,3 +53,41 @@ class JustWatchHttpError(JustWatchError):
         """Init JustWatchHttpError with error message and optional response text."""
         super().__init__(msg)
         self.response = response
+
+
+class JustWatchCircuitOpenError(JustWatchError):
+    """
+    Raised when request wasn't sent, because circuit breaker is open.
+
+    It's raised only by clients using a [`CircuitBreaker`]
+    [simplejustwatchapi.circuitbreaker.CircuitBreaker], after too many consecutive
+    failures, while JustWatch API is considered unhealthy.
+
+    Attributes:
+        msg (str): Error message describing the state of the circuit.
+        retry_after (float): Number of seconds until circuit breaker lets through probe
+            requests again. It's `0` if probe requests are already allowed, but all of
+            them are in flight.
+
+    """
+
+    def __init__(self, msg: str, retry_after: float) -> None:
+        """Init JustWatchCircuitOpenError with time until probe requests are allowed."""
+        super().__init__(msg)
+        self.retry_after = retry_after
+
+
+class JustWatchDeadlineError(JustWatchError):
+    """
+    Raised when deadline passed before the request finished.
+
+    It's raised only within a [`deadline`][simplejustwatchapi.deadline.deadline], either
+    when a request timed out because of the deadline, or when a request would be sent
+    after it has passed.
+    """
+
+    def __init__(
+        self, msg: str = "Deadline passed before the request finished"
+    ) -> None:
+        """Init JustWatchDeadlineError with an error message."""
+        super().__init__(msg)
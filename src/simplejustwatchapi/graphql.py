@@ -4,8 +4,51 @@ Module responsible for preparing full GraphQL queries.
 Queries are usually prepared as main query + needed fragments.
 Specific details are stored as separate GraphQL fragments / Python strings for easier
 reuse and maintainability.
+
+JustWatch API rejects queries with too high complexity, but doesn't document how it's
+calculated, or where the limit is. [`estimate_complexity`]
+[simplejustwatchapi.graphql.estimate_complexity] approximates it locally, so batched
+queries can be split into the largest chunks fitting into a complexity budget, with
+[`max_batch_size`][simplejustwatchapi.graphql.max_batch_size].
+"""
+
+import re
+from collections.abc import Callable
+from functools import cache
+from typing import Any
+
+from simplejustwatchapi.exceptions import JustWatchError
+
+DEFAULT_COMPLEXITY_BUDGET = 7_600
+"""
+Default complexity budget for a single request.
+
+Calibrated against [`popular`][simplejustwatchapi.justwatch.popular] requests - the
+largest ones accepted by the API have around 100 entries (estimated at about `7 500`),
+noticeably larger ones are rejected. Small margin over that allows for shared overhead
+of batched queries, e.g., two countries with 50 entries each in
+[`popular_for_countries`][simplejustwatchapi.justwatch.popular_for_countries].
 """
 
+_LIST_SIZES = {
+    "seasons": 8,
+    "episodes": 10,
+}
+"""
+Assumed number of elements in lists of titles without explicit `first` argument.
+
+Other lists (e.g., `offers`, `packages`, `genres`) are counted as a single element.
+Their length doesn't noticeably affect which requests are rejected - e.g.,
+`best_only=False` returning all offers barely lowers the largest accepted `count` -
+while nesting more titles does.
+"""
+
+_DEFAULT_FIRST = 10
+"""Assumed number of elements for `first` argument with unknown value."""
+
+_TOKENS = re.compile(r"\.\.\.|[{}()\[\]:=!@,]|\"(?:[^\"\\]|\\.)*\"|\$?[\w.+-]+")
+_COMMENTS = re.compile(r"#[^\n]*")
+
 _GRAPHQL_SEARCH_QUERY = """
 query GetSearchTitles(
     $searchTitlesFilter: TitleFilter!,
@@ -72,6 +115,22 @@ query GetPopularTitles(
 }
 """
 
+_GRAPHQL_POPULAR_FOR_COUNTRIES_QUERY = """
+query GetPopularTitlesForCountries(
+    $popularTitlesFilter: TitleFilter
+    $language: Language!
+    $first: Int!
+    $formatPoster: ImageFormat,
+    $formatOfferIcon: ImageFormat,
+    $profile: PosterProfile
+    $backdropProfile: BackdropProfile,
+    $filter: OfferFilter!,
+) {{
+    {country_entries}
+    __typename
+}}
+"""
+
 _GRAPHQL_DETAILS_QUERY = """
 query GetTitleNode(
     $nodeId: ID!,
@@ -91,6 +150,70 @@ query GetTitleNode(
 }
 """
 
+_GRAPHQL_DETAILS_MANY_QUERY = """
+query GetTitleNodes(
+    {node_id_variables}
+    $language: Language!,
+    $country: Country!,
+    $formatPoster: ImageFormat,
+    $formatOfferIcon: ImageFormat,
+    $profile: PosterProfile,
+    $backdropProfile: BackdropProfile,
+    $filter: OfferFilter!,
+) {{
+    {node_entries}
+    __typename
+}}
+"""
+
+_GRAPHQL_NODES_BATCH_QUERY = """
+query GetTitleNodesBatch(
+    {node_id_variables}
+    $language: Language!,
+    $country: Country!,
+    $formatPoster: ImageFormat,
+    $formatOfferIcon: ImageFormat,
+    $profile: PosterProfile,
+    $backdropProfile: BackdropProfile,
+    $filter: OfferFilter!,
+) {{
+    {node_entries}
+    __typename
+}}
+"""
+
+_GRAPHQL_DETAILS_FOR_LOCALES_QUERY = """
+query GetTitleNodeForLocales(
+    $nodeId: ID!,
+    {locale_variables}
+    $formatPoster: ImageFormat,
+    $formatOfferIcon: ImageFormat,
+    $profile: PosterProfile,
+    $backdropProfile: BackdropProfile,
+    $filter: OfferFilter!,
+) {{
+    {locale_entries}
+    __typename
+}}
+"""
+
+_GRAPHQL_SEARCH_MANY_QUERY = """
+query GetSearchTitles(
+    {search_filter_variables}
+    $country: Country!,
+    $language: Language!,
+    $first: Int!,
+    $formatPoster: ImageFormat,
+    $formatOfferIcon: ImageFormat,
+    $profile: PosterProfile,
+    $backdropProfile: BackdropProfile,
+    $filter: OfferFilter!,
+) {{
+    {search_entries}
+    __typename
+}}
+"""
+
 _GRAPHQL_SEASONS_QUERY = """
 query GetTitleNode(
     $nodeId: ID!,
@@ -137,6 +260,89 @@ query GetTitleNode(
 }
 """
 
+_GRAPHQL_SHOW_TREE_QUERY = """
+query GetShowTree(
+    $nodeId: ID!,
+    $language: Language!,
+    $country: Country!,
+    $formatPoster: ImageFormat,
+    $formatOfferIcon: ImageFormat,
+    $profile: PosterProfile,
+    $backdropProfile: BackdropProfile,
+    $filter: OfferFilter!,
+) {
+    node(id: $nodeId) {
+        ...TitleDetails
+        ... on Show {
+            seasons(sortDirection: ASC) {
+                ...TitleDetails
+                episodes(sortDirection: ASC) {
+                    ...TitleDetails
+                }
+            }
+        }
+        __typename
+    }
+    __typename
+}
+"""
+
+_GRAPHQL_SHOW_SEASONS_QUERY = """
+query GetShowSeasons(
+    $nodeId: ID!,
+    $language: Language!,
+    $country: Country!,
+    $formatPoster: ImageFormat,
+    $formatOfferIcon: ImageFormat,
+    $profile: PosterProfile,
+    $backdropProfile: BackdropProfile,
+    $filter: OfferFilter!,
+) {
+    node(id: $nodeId) {
+        ...TitleDetails
+        ... on Show {
+            seasons(sortDirection: ASC) {
+                ...TitleDetails
+            }
+        }
+        __typename
+    }
+    __typename
+}
+"""
+
+_GRAPHQL_EPISODES_MANY_QUERY = """
+query GetSeasonEpisodes(
+    {node_id_variables}
+    $language: Language!,
+    $country: Country!,
+    $formatPoster: ImageFormat,
+    $formatOfferIcon: ImageFormat,
+    $profile: PosterProfile,
+    $backdropProfile: BackdropProfile,
+    $filter: OfferFilter!,
+) {{
+    {node_entries}
+    __typename
+}}
+"""
+
+_GRAPHQL_SEASONS_MANY_QUERY = """
+query GetShowsSeasons(
+    {node_id_variables}
+    $language: Language!,
+    $country: Country!,
+    $formatPoster: ImageFormat,
+    $formatOfferIcon: ImageFormat,
+    $profile: PosterProfile,
+    $backdropProfile: BackdropProfile,
+    $filter: OfferFilter!,
+) {{
+    {node_entries}
+    __typename
+}}
+"""
+
 _GRAPHQL_PROVIDERS_QUERY = """
 query GetProviders(
     $country: Country!,
@@ -171,6 +377,18 @@ query GetTitleOffers(
 }}
 """
 
+_GRAPHQL_OFFERS_MATRIX_QUERY = """
+query GetTitleOffersMatrix(
+    {node_id_variables}
+    $language: Language!,
+    $formatOfferIcon: ImageFormat,
+    $filter: OfferFilter!,
+) {{
+    {node_entries}
+    __typename
+}}
+"""
+
 _GRAPHQL_DETAILS_FRAGMENT = """
 fragment TitleDetails on MovieOrShowOrSeasonOrEpisode {
     id
@@ -313,6 +531,126 @@ _GRAPHQL_COUNTRY_OFFERS_ENTRY = """
 }}
 """
 
+_GRAPHQL_POPULAR_COUNTRY_ENTRY = """
+{country_code}: popularTitles(
+    country: {country_code}
+    filter: $popularTitlesFilter
+    first: $first
+    sortBy: POPULAR
+    sortRandomSeed: 0
+) {{
+    edges {{
+        node {{
+            ...TitleDetails{country_code}
+            __typename
+        }}
+        __typename
+    }}
+    __typename
+}}
+"""
+
+_COUNTRY_DEPENDENT_FRAGMENTS = (
+    "TitleDetails",
+    "StreamingChartInfoFragment",
+    "ContentDetails",
+)
+"""
+Names of fragments from `TitleDetails`, which are copied for each country.
+
+`ContentDetails` also renames `FullContentDetails`, which is nested within it.
+"""
+
+_GRAPHQL_PROVIDERS_FOR_COUNTRIES_QUERY = """
+query GetProvidersForCountries(
+    $formatOfferIcon: ImageFormat
+) {{
+    {country_entries}
+    __typename
+}}
+"""
+
+_GRAPHQL_OFFERS_MATRIX_ENTRY = """
+node{index}: node(id: $nodeId{index}) {{
+    ... on MovieOrShowOrSeasonOrEpisode {{
+        {country_entries}
+        __typename
+    }}
+    __typename
+}}
+"""
+
+_GRAPHQL_COUNTRY_PROVIDERS_ENTRY = """
+{country_code}: packages(
+    country: {country_code}
+    platform: WEB
+    includeAddons: true
+) {{
+    ...PackageDetails
+}}
+"""
+
+_GRAPHQL_DETAILS_MANY_ENTRY = """
+node{index}: node(id: $nodeId{index}) {{
+    ...TitleDetails
+    __typename
+}}
+"""
+
+_GRAPHQL_EPISODES_MANY_ENTRY = """
+node{index}: node(id: $nodeId{index}) {{
+    ... on Season {{
+        episodes(sortDirection: ASC) {{
+            ...TitleDetails
+        }}
+    }}
+    __typename
+}}
+"""
+
+_GRAPHQL_SEASONS_MANY_ENTRY = """
+node{index}: node(id: $nodeId{index}) {{
+    ... on Show {{
+        seasons(sortDirection: ASC) {{
+            ...TitleDetails
+        }}
+    }}
+    __typename
+}}
+"""
+
+_GRAPHQL_BATCH_ENTRIES = {
+    "details": _GRAPHQL_DETAILS_MANY_ENTRY,
+    "seasons": _GRAPHQL_SEASONS_MANY_ENTRY,
+    "episodes": _GRAPHQL_EPISODES_MANY_ENTRY,
+}
+
+_GRAPHQL_LOCALE_DETAILS_ENTRY = """
+locale{index}: node(id: $nodeId) {{
+    ...TitleDetailsLocale{index}
+    __typename
+}}
+"""
+
+_GRAPHQL_SEARCH_MANY_ENTRY = """
+search{index}: popularTitles(
+    country: $country
+    filter: $searchTitlesFilter{index}
+    first: $first
+    sortBy: POPULAR
+    sortRandomSeed: 0
+) {{
+    edges {{
+        node {{
+            ...TitleDetails
+            __typename
+        }}
+        __typename
+    }}
+    __typename
+}}
+"""
+
 GRAPHQL_SEARCH_QUERY = (
     _GRAPHQL_SEARCH_QUERY
     + _GRAPHQL_DETAILS_FRAGMENT
@@ -350,6 +688,20 @@ GRAPHQL_EPISODES_QUERY = (
     + _GRAPHQL_PACKAGE_FRAGMENT
 )
 
+GRAPHQL_SHOW_TREE_QUERY = (
+    _GRAPHQL_SHOW_TREE_QUERY
+    + _GRAPHQL_DETAILS_FRAGMENT
+    + _GRAPHQL_OFFER_FRAGMENT
+    + _GRAPHQL_PACKAGE_FRAGMENT
+)
+
+GRAPHQL_SHOW_SEASONS_QUERY = (
+    _GRAPHQL_SHOW_SEASONS_QUERY
+    + _GRAPHQL_DETAILS_FRAGMENT
+    + _GRAPHQL_OFFER_FRAGMENT
+    + _GRAPHQL_PACKAGE_FRAGMENT
+)
+
 
 def graphql_offers_for_countries_query(countries: set[str]) -> str:
     """
@@ -377,3 +729,549 @@ def graphql_offers_for_countries_query(countries: set[str]) -> str:
         country_entries="\n".join(offer_requests)
     )
     return main_query + _GRAPHQL_OFFER_FRAGMENT + _GRAPHQL_PACKAGE_FRAGMENT
+
+
+def graphql_details_many_query(count: int) -> str:
+    """
+    Prepare GraphQL query with details for multiple node IDs.
+
+    The full query is `GetTitleNodes` query with aliased `node` field for each node ID,
+    all of them using the same `TitleDetails` fragment as `GetTitleNode` query.
+    Node IDs are passed through variables - `$nodeId0`, `$nodeId1`, etc. - and results
+    are returned under aliases `node0`, `node1`, etc., so the query itself depends only
+    on number of node IDs, not on the IDs themselves.
+
+    This function assumes that `count` is positive; it performs no verification on its
+    own.
+
+    Args:
+        count (int): Number of node IDs to look up.
+
+    Returns:
+        (str): GraphQL `GetTitleNodes` query with an aliased `node` for each node ID.
+
+    """
+    return _graphql_node_entries_query(
+        _GRAPHQL_DETAILS_MANY_QUERY, [_GRAPHQL_DETAILS_MANY_ENTRY] * count
+    )
+
+
+def graphql_episodes_many_query(count: int) -> str:
+    """
+    Prepare GraphQL query with episodes for multiple season IDs.
+
+    The full query is `GetSeasonEpisodes` query with aliased `node` field for each
+    season ID, each selecting all episodes of the season, the same as `GetTitleNode`
+    query for episodes. Season IDs are passed through variables - `$nodeId0`,
+    `$nodeId1`, etc. - and results are returned under aliases `node0`, `node1`, etc.
+
+    This function assumes that `count` is positive; it performs no verification on its
+    own.
+
+    Args:
+        count (int): Number of season IDs to look up.
+
+    Returns:
+        (str): GraphQL `GetSeasonEpisodes` query with an aliased `node` for each season
+            ID.
+
+    """
+    return _graphql_node_entries_query(
+        _GRAPHQL_EPISODES_MANY_QUERY, [_GRAPHQL_EPISODES_MANY_ENTRY] * count
+    )
+
+
+def graphql_seasons_many_query(count: int) -> str:
+    """
+    Prepare GraphQL query with seasons for multiple show IDs.
+
+    The full query is `GetShowsSeasons` query with aliased `node` field for each show
+    ID, each selecting all seasons of the show, the same as `GetTitleNode` query for
+    seasons. Show IDs are passed through variables - `$nodeId0`, `$nodeId1`, etc. - and
+    results are returned under aliases `node0`, `node1`, etc.
+
+    This function assumes that `count` is positive; it performs no verification on its
+    own.
+
+    Args:
+        count (int): Number of show IDs to look up.
+
+    Returns:
+        (str): GraphQL `GetShowsSeasons` query with an aliased `node` for each show ID.
+
+    """
+    return _graphql_node_entries_query(
+        _GRAPHQL_SEASONS_MANY_QUERY, [_GRAPHQL_SEASONS_MANY_ENTRY] * count
+    )
+
+
+def graphql_nodes_batch_query(kinds: list[str]) -> str:
+    """
+    Prepare GraphQL query with details, seasons, or episodes for multiple node IDs.
+
+    The full query is `GetTitleNodesBatch` query with aliased `node` field for each
+    element of `kinds`, selecting the same data as `GetTitleNode` queries:
+
+    - `"details"` - details of the node itself,
+    - `"seasons"` - all seasons of a show,
+    - `"episodes"` - all episodes of a season.
+
+    Node IDs are passed through variables - `$nodeId0`, `$nodeId1`, etc. - and results
+    are returned under aliases `node0`, `node1`, etc., in the same order as `kinds`.
+
+    This function assumes that `kinds` is not empty, and contains only the values
+    above; it performs no verification on its own.
+
+    Args:
+        kinds (list[str]): Kind of data to look up for each node ID.
+
+    Returns:
+        (str): GraphQL `GetTitleNodesBatch` query with an aliased `node` for each node
+            ID.
+
+    """
+    return _graphql_node_entries_query(
+        _GRAPHQL_NODES_BATCH_QUERY, [_GRAPHQL_BATCH_ENTRIES[kind] for kind in kinds]
+    )
+
+
+def graphql_offers_matrix_query(count: int, countries: list[str]) -> str:
+    """
+    Prepare GraphQL query with offers for multiple node IDs in multiple countries.
+
+    The full query is `GetTitleOffersMatrix` query with aliased `node` field for each
+    node ID, each of them with the same list of offers per country as `GetTitleOffers`
+    query. Node IDs are passed through variables - `$nodeId0`, `$nodeId1`, etc. - and
+    results are returned under aliases `node0`, `node1`, etc.
+
+    This function assumes that `count` is positive, and that country codes are valid,
+    uppercase, and the list is not empty; it performs no verification on its own.
+
+    Args:
+        count (int): Number of node IDs to look up.
+        countries (list[str]): 2-letter uppercase country codes.
+
+    Returns:
+        (str): GraphQL `GetTitleOffersMatrix` query with offers per country code for
+            each node ID.
+
+    """
+    node_id_variables = "\n    ".join(f"$nodeId{index}: ID!," for index in range(count))
+    country_entries = "\n".join(
+        _GRAPHQL_COUNTRY_OFFERS_ENTRY.format(country_code=country_code)
+        for country_code in countries
+    )
+    node_entries = "\n".join(
+        _GRAPHQL_OFFERS_MATRIX_ENTRY.format(
+            index=index, country_entries=country_entries
+        )
+        for index in range(count)
+    )
+    main_query = _GRAPHQL_OFFERS_MATRIX_QUERY.format(
+        node_id_variables=node_id_variables, node_entries=node_entries
+    )
+    return main_query + _GRAPHQL_OFFER_FRAGMENT + _GRAPHQL_PACKAGE_FRAGMENT
+
+
+def graphql_popular_for_countries_query(countries: list[str]) -> str:
+    """
+    Prepare GraphQL query with popular titles for multiple countries.
+
+    The full query is `GetPopularTitlesForCountries` query with aliased `popularTitles`
+    field for each country, named after the country code. `TitleDetails` fragment
+    selects content and offers for `$country` variable, so each country gets its own
+    copy of it (e.g., `TitleDetailsUS`), with the country code in place of the variable.
+    Number of titles for each country is shared `$first` variable.
+
+    The input is a list of 2-letter uppercase country codes, the same list results in
+    the same query. This function assumes that codes are valid and the list is not
+    empty; it performs no verification on its own.
+
+    Args:
+        countries (list[str]): 2-letter uppercase country codes.
+
+    Returns:
+        (str): GraphQL `GetPopularTitlesForCountries` query with popular titles per
+            country code.
+
+    """
+    country_entries = "\n".join(
+        _GRAPHQL_POPULAR_COUNTRY_ENTRY.format(country_code=country_code)
+        for country_code in countries
+    )
+    main_query = _GRAPHQL_POPULAR_FOR_COUNTRIES_QUERY.format(
+        country_entries=country_entries
+    )
+    country_fragments = "".join(map(_country_details_fragment, countries))
+    return (
+        main_query
+        + country_fragments
+        + _GRAPHQL_OFFER_FRAGMENT
+        + _GRAPHQL_PACKAGE_FRAGMENT
+    )
+
+
+def graphql_providers_for_countries_query(countries: list[str]) -> str:
+    """
+    Prepare GraphQL query with all providers for multiple countries.
+
+    The full query is `GetProvidersForCountries` query with aliased `packages` field
+    for each country, named after the country code. All of them share the same
+    `PackageDetails` fragment as `GetProviders` query.
+
+    The input is a list of 2-letter uppercase country codes, the same list results in
+    the same query. This function assumes that codes are valid and the list is not
+    empty; it performs no verification on its own.
+
+    Args:
+        countries (list[str]): 2-letter uppercase country codes.
+
+    Returns:
+        (str): GraphQL `GetProvidersForCountries` query with providers per country code.
+
+    """
+    country_entries = "\n".join(
+        _GRAPHQL_COUNTRY_PROVIDERS_ENTRY.format(country_code=country_code)
+        for country_code in countries
+    )
+    main_query = _GRAPHQL_PROVIDERS_FOR_COUNTRIES_QUERY.format(
+        country_entries=country_entries
+    )
+    return main_query + _GRAPHQL_PACKAGE_FRAGMENT
+
+
+def graphql_details_for_locales_query(count: int) -> str:
+    """
+    Prepare GraphQL query with details of a single node ID in multiple locales.
+
+    The full query is `GetTitleNodeForLocales` query with aliased `node` field for each
+    locale - `locale0`, `locale1`, etc. - all for the same `$nodeId`. `TitleDetails`
+    and `TitleOffer` fragments select data for `$country` and `$language` variables, so
+    each locale gets its own copy of them (e.g., `TitleDetailsLocale0`), using its own
+    variables - `$country0` and `$language0`, `$country1` and `$language1`, etc.
+
+    This function assumes that `count` is positive; it performs no verification on its
+    own.
+
+    Args:
+        count (int): Number of locales to look up.
+
+    Returns:
+        (str): GraphQL `GetTitleNodeForLocales` query with an aliased `node` for each
+            locale.
+
+    """
+    locale_variables = "\n    ".join(
+        f"$country{index}: Country!,\n    $language{index}: Language!,"
+        for index in range(count)
+    )
+    locale_entries = "\n".join(
+        _GRAPHQL_LOCALE_DETAILS_ENTRY.format(index=index) for index in range(count)
+    )
+    main_query = _GRAPHQL_DETAILS_FOR_LOCALES_QUERY.format(
+        locale_variables=locale_variables, locale_entries=locale_entries
+    )
+    locale_fragments = "".join(map(_locale_details_fragment, range(count)))
+    return main_query + locale_fragments + _GRAPHQL_PACKAGE_FRAGMENT
+
+
+def graphql_search_many_query(count: int) -> str:
+    """
+    Prepare GraphQL query searching for multiple titles.
+
+    The full query is `GetSearchTitles` query with aliased `popularTitles` field for
+    each title, all of them using the same `TitleDetails` fragment as single search.
+    Search filters are passed through variables - `$searchTitlesFilter0`,
+    `$searchTitlesFilter1`, etc. - and results are returned under aliases `search0`,
+    `search1`, etc. Number of results for each title is shared `$first` variable.
+
+    This function assumes that `count` is positive; it performs no verification on its
+    own.
+
+    Args:
+        count (int): Number of searched titles.
+
+    Returns:
+        (str): GraphQL `GetSearchTitles` query with aliased `popularTitles` for each
+            title.
+
+    """
+    search_filter_variables = "\n    ".join(
+        f"$searchTitlesFilter{index}: TitleFilter!," for index in range(count)
+    )
+    search_entries = "\n".join(
+        _GRAPHQL_SEARCH_MANY_ENTRY.format(index=index) for index in range(count)
+    )
+    main_query = _GRAPHQL_SEARCH_MANY_QUERY.format(
+        search_filter_variables=search_filter_variables, search_entries=search_entries
+    )
+    return (
+        main_query
+        + _GRAPHQL_DETAILS_FRAGMENT
+        + _GRAPHQL_OFFER_FRAGMENT
+        + _GRAPHQL_PACKAGE_FRAGMENT
+    )
+
+
+def estimate_complexity(query: str, variables: dict[str, Any] | None = None) -> int:
+    """
+    Estimate complexity of a GraphQL query.
+
+    Each selected field costs `1` (`__typename` is free), and cost of its subselection
+    is multiplied by expected number of returned elements - value of its `first`
+    argument (taken from `variables`, or default value of a variable), or an assumed
+    size for lists of titles, like `seasons`. Fragments, e.g., `TitleDetails`,
+    `TitleOffer` and `PackageDetails`, add their full cost for each spread, so each
+    aliased field adds its own cost.
+
+    Result is only an approximation - actual complexity calculated by JustWatch API
+    isn't known. It's meant for comparing queries, not for exact limits.
+
+    Args:
+        query (str): Full GraphQL document, with all used fragments.
+        variables (dict[str, Any] | None): Variables sent with the query.
+
+    Returns:
+        (int): Estimated complexity of all operations in the document.
+
+    Raises:
+        exceptions.JustWatchError: Query couldn't be parsed.
+
+    """
+    parser = _ComplexityParser(query, variables or {})
+    return parser.complexity()
+
+
+def max_batch_size(
+    query_for_size: Callable[[int], str],
+    budget: int = DEFAULT_COMPLEXITY_BUDGET,
+    limit: int = 1000,
+    variables: dict[str, int] | None = None,
+) -> int:
+    """
+    Find the largest batch size, for which query complexity stays under budget.
+
+    Complexity is estimated with [`estimate_complexity`]
+    [simplejustwatchapi.graphql.estimate_complexity], it's assumed to grow with batch
+    size. Results are cached, so it can be called for each batched request.
+
+    Args:
+        query_for_size (Callable[[int], str]): Function preparing a query for given
+            batch size, e.g., `graphql_details_many_query`.
+        budget (int): Maximal estimated complexity of a single query.
+        limit (int): Maximal batch size returned.
+        variables (dict[str, int] | None): Integer variables sent with each query,
+            e.g., `first`.
+
+    Returns:
+        (int): The largest batch size between `1` and `limit`, with complexity not
+            higher than `budget`. It's `1` if even a single element exceeds the budget.
+
+    """
+    return _max_batch_size(
+        query_for_size, budget, limit, tuple(sorted((variables or {}).items()))
+    )
+
+
+@cache
+def _max_batch_size(
+    query_for_size: Callable[[int], str],
+    budget: int,
+    limit: int,
+    variables: tuple[tuple[str, int], ...],
+) -> int:
+    """Binary search for the largest batch size under budget, cached."""
+    low, high = 1, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_complexity(query_for_size(middle), dict(variables)) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _country_details_fragment(country_code: str) -> str:
+    """Copy `TitleDetails` fragments for a country, replacing `$country` variable."""
+    fragment = _GRAPHQL_DETAILS_FRAGMENT.replace("$country", country_code)
+    for name in _COUNTRY_DEPENDENT_FRAGMENTS:
+        fragment = fragment.replace(name, name + country_code)
+    return fragment
+
+
+def _locale_details_fragment(index: int) -> str:
+    """Copy `TitleDetails` and `TitleOffer` fragments for variables of a locale."""
+    fragment = (_GRAPHQL_DETAILS_FRAGMENT + _GRAPHQL_OFFER_FRAGMENT).replace(
+        "$country", f"$country{index}"
+    )
+    fragment = fragment.replace("$language", f"$language{index}")
+    for name in (*_COUNTRY_DEPENDENT_FRAGMENTS, "TitleOffer"):
+        fragment = fragment.replace(name, f"{name}Locale{index}")
+    return fragment
+
+
+def _graphql_node_entries_query(query: str, entries: list[str]) -> str:
+    """Fill query with aliased node entries, each one using `TitleDetails` fragment."""
+    node_id_variables = "\n    ".join(
+        f"$nodeId{index}: ID!," for index in range(len(entries))
+    )
+    node_entries = "\n".join(
+        entry.format(index=index) for index, entry in enumerate(entries)
+    )
+    main_query = query.format(
+        node_id_variables=node_id_variables, node_entries=node_entries
+    )
+    return (
+        main_query
+        + _GRAPHQL_DETAILS_FRAGMENT
+        + _GRAPHQL_OFFER_FRAGMENT
+        + _GRAPHQL_PACKAGE_FRAGMENT
+    )
+
+
+class _ComplexityParser:
+    """
+    Minimal GraphQL parser, calculating complexity of a document.
+
+    It understands only parts of GraphQL syntax used by queries in this module -
+    operations, fragments, fields with aliases and arguments, fragment spreads, and
+    inline fragments. Values of arguments are skipped, except for `first`.
+    """
+
+    def __init__(self, query: str, variables: dict[str, Any]) -> None:
+        """Tokenize the query, without parsing it yet."""
+        self._tokens = _TOKENS.findall(_COMMENTS.sub("", query))
+        self._position = 0
+        self._variables = dict(variables)
+        self._fragments: dict[str, list[Any]] = {}
+        self._fragment_costs: dict[str, int] = {}
+
+    def complexity(self) -> int:
+        """Parse the whole document, return total complexity of its operations."""
+        operations = []
+        while self._position < len(self._tokens):
+            if self._peek() == "fragment":
+                self._next()
+                name = self._next()
+                self._expect("on")
+                self._next()
+                self._fragments[name] = self._selection_set()
+            else:
+                operations.append(self._operation())
+        return sum(self._cost(selections, set()) for selections in operations)
+
+    def _peek(self) -> str | None:
+        """Return the current symbol without consuming it, `None` at the end."""
+        if self._position < len(self._tokens):
+            return self._tokens[self._position]
+        return None
+
+    def _next(self) -> str:
+        """Consume and return the current symbol."""
+        symbol = self._peek()
+        if symbol is None:
+            error_msg = "Unexpected end of GraphQL query"
+            raise JustWatchError(error_msg)
+        self._position += 1
+        return symbol
+
+    def _expect(self, expected: str) -> None:
+        """Consume the current symbol, which must be equal to `expected`."""
+        if (symbol := self._next()) != expected:
+            error_msg = f"Expected {expected!r} in GraphQL query, got {symbol!r}"
+            raise JustWatchError(error_msg)
+
+    def _operation(self) -> list[Any]:
+        """Parse an operation, storing default values of its variables."""
+        if self._peek() != "{":
+            self._next()  # Operation type.
+            if self._peek() not in {"(", "{"}:
+                self._next()  # Operation name.
+            if self._peek() == "(":
+                self._variable_definitions()
+        return self._selection_set()
+
+    def _variable_definitions(self) -> None:
+        """Parse variable definitions, keep default values of integer variables."""
+        self._expect("(")
+        name = None
+        while (symbol := self._next()) != ")":
+            if symbol.startswith("$"):
+                name = symbol[1:]
+            elif symbol == "=" and name is not None:
+                default = self._next()
+                if default.isdigit():
+                    self._variables.setdefault(name, int(default))
+
+    def _selection_set(self) -> list[Any]:
+        """Parse selections within braces, return a list of parsed selections."""
+        self._expect("{")
+        selections: list[Any] = []
+        while self._peek() != "}":
+            if self._peek() == "...":
+                self._next()
+                if self._peek() == "on":
+                    self._next()
+                    self._next()
+                    selections.append(("inline", self._selection_set()))
+                else:
+                    selections.append(("spread", self._next()))
+                continue
+            name = self._next()
+            if self._peek() == ":":
+                self._next()
+                name = self._next()
+            first = self._arguments() if self._peek() == "(" else None
+            subselections = self._selection_set() if self._peek() == "{" else []
+            selections.append(("field", name, first, subselections))
+        self._next()
+        return selections
+
+    def _arguments(self) -> int | None:
+        """Parse field arguments, return value of `first` argument, if there is one."""
+        self._expect("(")
+        first = None
+        depth = 1
+        while depth:
+            symbol = self._next()
+            if symbol in {"(", "[", "{"}:
+                depth += 1
+            elif symbol in {")", "]", "}"}:
+                depth -= 1
+            elif symbol == "first" and depth == 1 and self._peek() == ":":
+                self._next()
+                first = self._argument_value(self._next())
+        return first
+
+    def _argument_value(self, symbol: str) -> int:
+        """Resolve integer value of an argument, directly or through variables."""
+        if symbol.startswith("$"):
+            value = self._variables.get(symbol[1:])
+            return value if isinstance(value, int) else _DEFAULT_FIRST
+        return int(symbol) if symbol.isdigit() else _DEFAULT_FIRST
+
+    def _cost(self, selections: list[Any], visiting: set[str]) -> int:
+        """Calculate cost of parsed selections, expanding fragment spreads."""
+        total = 0
+        for selection in selections:
+            match selection:
+                case ("inline", subselections):
+                    total += self._cost(subselections, visiting)
+                case ("spread", name):
+                    total += self._fragment_cost(name, visiting)
+                case ("field", "__typename", _, _):
+                    pass
+                case ("field", name, first, subselections):
+                    size = first if first is not None else _LIST_SIZES.get(name, 1)
+                    total += 1 + size * self._cost(subselections, visiting)
+        return total
+
+    def _fragment_cost(self, name: str, visiting: set[str]) -> int:
+        """Calculate (and cache) cost of a fragment, recursive fragments are free."""
+        if name in self._fragment_costs:
+            return self._fragment_costs[name]
+        if name in visiting or name not in self._fragments:
+            return 0
+        cost = self._cost(self._fragments[name], visiting | {name})
+        self._fragment_costs[name] = cost
+        return cost
@@ -0,0 +1,264 @@
+"""
+Hedged requests, cutting tail latency of requests sent to JustWatch API.
+
+If a request takes longer than usual, then a duplicate request is sent, and whichever
+response arrives first is used. A few slow responses are then much less likely to
+slow down the whole call. [`HedgePolicy`][simplejustwatchapi.hedging.HedgePolicy] is
+meant to be passed to [`JustWatchClient`][simplejustwatchapi.client.JustWatchClient] or
+[`AsyncJustWatchClient`][simplejustwatchapi.client.AsyncJustWatchClient]:
+
+```python
+from simplejustwatchapi import HedgePolicy, JustWatchClient
+
+client = JustWatchClient(hedging=HedgePolicy(percentile=95.0, max_extra_load=0.05))
+```
+
+Delay before sending a duplicate is based on latency of recent responses - by default
+it's their 95th percentile, so only about 5% of requests should be hedged. To protect
+API from additional load, number of duplicates is limited to a fraction of all requests.
+
+All requests sent by this library are read-only, so it's always safe to send them
+twice. Both requests go through all other client policies (rate limiting, concurrency
+limits, etc.), as any other request.
+
+Number of hedged requests, and how many of them were faster than the original ones, is
+available through [`metrics`][simplejustwatchapi.hedging.HedgePolicy.metrics].
+"""
+
+from asyncio import FIRST_COMPLETED, Task, ensure_future
+from asyncio import wait as async_wait
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED as FUTURE_FIRST_COMPLETED
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from threading import Event, Lock
+from time import monotonic
+from typing import Any, NamedTuple
+
+from simplejustwatchapi.exceptions import JustWatchError
+
+_MIN_SAMPLES = 20
+
+
+class HedgeMetrics(NamedTuple):
+    """
+    Snapshot of hedged requests statistics.
+
+    Attributes:
+        calls (int): Number of calls made through the policy.
+        hedges (int): Number of duplicate requests sent.
+        wins (int): Number of duplicate requests, which were faster than the original.
+        delay (float): Current delay in seconds, before a duplicate is sent.
+
+    """
+
+    calls: int
+    hedges: int
+    wins: int
+    delay: float
+
+
+class HedgePolicy:
+    """
+    Policy of sending duplicate requests, if the original one is too slow.
+
+    Duplicate request is sent, if there's no response after a delay equal to
+    `percentile` of latencies of `history` most recent responses. Until there are enough
+    responses to calculate it, `initial_delay` is used instead.
+
+    Number of duplicates is limited with a token bucket - each call adds
+    `max_extra_load` tokens (up to `burst` tokens), and each duplicate takes a whole
+    token. In the long run there's at most `max_extra_load` duplicates per call.
+
+    If the first response is an error, then the other request (if it was sent) is still
+    awaited. Error is raised only if both requests failed. Slower async request is
+    cancelled, slower sync request can't be cancelled, so its response is ignored.
+
+    Sync clients send requests from a thread pool owned by the client (and shut down
+    with it), so the calling thread can return as soon as the first response arrives.
+    Requests are sent with a copy of context of the calling thread, e.g., with its
+    [`deadline`][simplejustwatchapi.deadline.deadline]. Delay and latency are measured
+    from the moment the original request starts running, time spent waiting for a free
+    thread isn't counted.
+
+    Policy is safe to use from multiple threads and from multiple `asyncio` tasks at the
+    same time (including sharing it between sync and async clients).
+
+    Args:
+        percentile (float): Percentile of recent latencies used as delay, between 0
+            and 100.
+        initial_delay (float): Delay in seconds used until there are enough responses.
+        max_extra_load (float): Maximal number of duplicates per call, on average.
+        burst (int): Maximal number of duplicates which can be sent one after another,
+            after a period without any.
+        history (int): Number of most recent latencies used for calculating delay.
+        max_workers (int): Maximal number of threads sending requests for each sync
+            client.
+
+    Raises:
+        exceptions.JustWatchError: Configuration is invalid.
+
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        initial_delay: float = 1.0,
+        max_extra_load: float = 0.1,
+        burst: int = 10,
+        history: int = 1000,
+        max_workers: int = 100,
+    ) -> None:
+        """Init HedgePolicy with full bucket of duplicate requests."""
+        if (
+            not 0 <= percentile <= 100  # noqa: PLR2004
+            or initial_delay < 0
+            or not 0 <= max_extra_load <= 1
+            or burst < 1
+            or history < 1
+            or max_workers < 1
+        ):
+            error_msg = (
+                f"Invalid hedging config: {percentile=}, {initial_delay=}, "
+                f"{max_extra_load=}, {burst=}, {history=}, {max_workers=}"
+            )
+            raise JustWatchError(error_msg)
+        self._percentile = percentile
+        self._initial_delay = initial_delay
+        self._max_extra_load = max_extra_load
+        self._burst = burst
+        self._max_workers = max_workers
+        self._tokens = float(burst)
+        self._latencies: deque[float] = deque(maxlen=history)
+        self._delay = initial_delay
+        self._calls = 0
+        self._hedges = 0
+        self._wins = 0
+        self._lock = Lock()
+
+    @property
+    def delay(self) -> float:
+        """Current delay in seconds, before a duplicate request is sent."""
+        return self._delay
+
+    @property
+    def max_workers(self) -> int:
+        """Maximal number of threads sending requests for each sync client."""
+        return self._max_workers
+
+    @property
+    def metrics(self) -> HedgeMetrics:
+        """Snapshot of number of calls, duplicates sent, and current delay."""
+        with self._lock:
+            return HedgeMetrics(self._calls, self._hedges, self._wins, self._delay)
+
+    def call(self, function: Callable[[], Any], executor: ThreadPoolExecutor) -> Any:
+        """
+        Call a function sending a request, call it again if it's too slow.
+
+        Args:
+            function (Callable[[], Any]): Function sending a single request.
+            executor (ThreadPoolExecutor): Thread pool used for sending requests.
+
+        Returns:
+            (Any): Result of the first successful call.
+
+        """
+        delay = self._start_call()
+        started = Event()
+        start_times: list[float] = []
+
+        def original() -> Any:
+            start_times.append(monotonic())
+            started.set()
+            return function()
+
+        futures = [executor.submit(copy_context().run, original)]
+        futures[0].add_done_callback(lambda _: started.set())
+        started.wait()
+        if not start_times:  # Cancelled before it started running.
+            return futures[0].result()
+        done, _ = wait(futures, timeout=max(0.0, start_times[0] + delay - monotonic()))
+        if not done and self._try_hedge():
+            futures.append(executor.submit(copy_context().run, function))
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FUTURE_FIRST_COMPLETED)
+            if (winner := _first_successful(futures, done)) is not None:
+                self._record(monotonic() - start_times[0], hedge_won=winner > 0)
+                return futures[winner].result()
+        return futures[0].result()
+
+    async def call_async(self, coroutine_fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await a coroutine sending a request, await another one if it's too slow.
+
+        Args:
+            coroutine_fn (Callable[[], Awaitable[Any]]): Function returning coroutine
+                sending a single request.
+
+        Returns:
+            (Any): Result of the first successful coroutine.
+
+        """
+        started = monotonic()
+        tasks: list[Task[Any]] = [ensure_future(coroutine_fn())]
+        try:
+            done, _ = await async_wait(tasks, timeout=self._start_call())
+            if not done and self._try_hedge():
+                tasks.append(ensure_future(coroutine_fn()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await async_wait(pending, return_when=FIRST_COMPLETED)
+                if (winner := _first_successful(tasks, done)) is not None:
+                    self._record(monotonic() - started, hedge_won=winner > 0)
+                    return tasks[winner].result()
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _start_call(self) -> float:
+        """Count a new call, add its share of tokens, return delay for it."""
+        with self._lock:
+            self._calls += 1
+            self._tokens = min(self._burst, self._tokens + self._max_extra_load)
+            return self._delay
+
+    def _try_hedge(self) -> bool:
+        """Take a token for a duplicate request, return whether it can be sent."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self._hedges += 1
+            return True
+
+    def _record(self, latency: float, hedge_won: bool) -> None:
+        """
+        Store latency of the first successful response, update delay.
+
+        If duplicate won, then latency of the original request is unknown, time of the
+        whole call is stored instead.
+        """
+        with self._lock:
+            self._wins += hedge_won
+            self._latencies.append(latency)
+            if len(self._latencies) >= _MIN_SAMPLES:
+                latencies = sorted(self._latencies)
+                index = round(self._percentile / 100 * (len(latencies) - 1))
+                self._delay = latencies[index]
+
+
+def _first_successful(
+    futures: list[Future[Any]] | list[Task[Any]], done: Iterable[object]
+) -> int | None:
+    """Return index of the first finished and successful future, if there is one."""
+    done = set(done)
+    successful = [
+        index
+        for index, future in enumerate(futures)
+        if future in done and future.exception() is None
+    ]
+    return successful[0] if successful else None
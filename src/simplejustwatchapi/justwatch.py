@@ -1,10 +1,17 @@
 """
 Main functions used for obtaining data from JustWatch GraphQL API.
 
-Each function sends **one** GraphQL query to JustWatch API and returns API response
-parsed into a [`NamedTuple`][typing.NamedTuple] from [`tuples`]
-[simplejustwatchapi.tuples] module. Everything is handled on the API side through
-prepared GraphQL query.
+Each function sends **one** GraphQL query to JustWatch API (except for large inputs of
+functions like [`details_many`][simplejustwatchapi.justwatch.details_many], and
+iterators over pages, like [`iter_popular`][simplejustwatchapi.justwatch.iter_popular])
+and returns API response parsed into a [`NamedTuple`][typing.NamedTuple] from
+[`tuples`][simplejustwatchapi.tuples] module. Everything is handled on the API side
+through prepared GraphQL query.
+
+All functions share a single [`JustWatchClient`]
+[simplejustwatchapi.client.JustWatchClient], created on first use, so connections to
+the API are reused between calls. If you need different connection pool
+configuration, create your own client instead.
 
 Most functions have a number of common arguments (in addition to function-specific
 ones, like `title` to search for):
@@ -47,28 +54,20 @@ Each function can raise two exceptions:
     country code. |
 """
 
-from httpx import HTTPError, HTTPStatusError, post
-
-from simplejustwatchapi.exceptions import JustWatchHttpError
-from simplejustwatchapi.query import (
-    parse_details_response,
-    parse_episodes_response,
-    parse_offers_for_countries_response,
-    parse_popular_response,
-    parse_providers_response,
-    parse_search_response,
-    parse_seasons_response,
-    prepare_details_request,
-    prepare_episodes_request,
-    prepare_offers_for_countries_request,
-    prepare_popular_request,
-    prepare_providers_request,
-    prepare_search_request,
-    prepare_seasons_request,
+from collections.abc import Iterator
+from threading import Lock
+
+from simplejustwatchapi.client import JustWatchClient
+from simplejustwatchapi.tuples import (
+    Episode,
+    MediaEntry,
+    Offer,
+    OfferPackage,
+    ShowTree,
 )
-from simplejustwatchapi.tuples import Episode, MediaEntry, Offer, OfferPackage
 
-_GRAPHQL_API_URL = "https://apis.justwatch.com/graphql"
+_default_client_instance: JustWatchClient | None = None
+_default_client_lock = Lock()
 
 
 def search(
@@ -158,11 +157,119 @@ def search(
             responded with non-`2xx` status code.
 
     """
-    request = prepare_search_request(
+    return _default_client().search(
         title, country, language, count, best_only, offset, providers
     )
-    response = _post_to_jw_graphql_api(request)
-    return parse_search_response(response)
+
+
+def iter_search(
+    title: str = "",
+    country: str = "US",
+    language: str = "en",
+    page_size: int = 50,
+    best_only: bool = True,
+    offset: int = 0,
+    providers: list[str] | str | None = None,
+) -> Iterator[MediaEntry]:
+    """
+    Iterate over all search results for the given title, page by page.
+
+    Equivalent of calling [`search`][simplejustwatchapi.justwatch.search] in a loop
+    over `offset`, until there are no more results.
+
+    Pages are requested with `count` equal to `page_size` and increasing `offset`,
+    starting at `offset`. While entries from one page are consumed, the next page is
+    already requested in the background, so at most two pages are kept in memory.
+    Iteration stops when a page has fewer entries than requested, or at the API limit
+    of [`MAX_RESULTS`][simplejustwatchapi.paging.MAX_RESULTS] entries (`count + offset`
+    of the last page is lowered to fit within it). Errors are raised when iteration
+    reaches the page which caused them, check [`paging`][simplejustwatchapi.paging]
+    for details.
+
+    Arguments are the same as for [`search`][simplejustwatchapi.justwatch.search],
+    except for `page_size` replacing `count`.
+
+    Args:
+        title (str): Title to search, not stripped, passed to the API as-is.
+        country (str): 2-letter country code for which offers are selected.
+        language (str): Code for language in responses (e.g., description, title).
+        page_size (int): Number of entries requested in a single page.
+
+            Too high values can cause API errors due to too high operation complexity,
+            same as `count` in [`search`][simplejustwatchapi.justwatch.search].
+
+        best_only (bool): Return only best offers if `True`, return all offers if
+            `False`.
+        offset (int): Offset of the first returned result.
+        providers (list[str] | str | None): Selection of 3-letter service identifiers
+            (e.g, `nfx` for "Netflix") to filter for.
+
+    Yields:
+        (MediaEntry): Tuples with details of search results, in order.
+
+    Raises:
+        exceptions.JustWatchError: `page_size` is lower than 1, or `offset` is negative.
+        exceptions.JustWatchApiError: JSON response from API has internal errors, e.g.,
+            due to invalid language or country code.
+        exceptions.JustWatchHttpError: HTTP error occurred, e.g., JustWatch API
+            responded with non-`2xx` status code.
+
+    """
+    return _default_client().iter_search(
+        title, country, language, page_size, best_only, offset, providers
+    )
+
+
+def search_many(
+    titles: list[str],
+    country: str = "US",
+    language: str = "en",
+    count: int = 4,
+    best_only: bool = True,
+    providers: list[str] | str | None = None,
+) -> dict[str, list[MediaEntry]]:
+    """
+    Search JustWatch for multiple titles at once.
+
+    Equivalent of calling [`search`][simplejustwatchapi.justwatch.search] for each
+    title, but all titles are searched in a single GraphQL query (with an aliased
+    `popularTitles` field per title), instead of a separate request for each one.
+    Useful for resolving long lists of titles (e.g., imported watchlists) into entries.
+
+    Large inputs are automatically split into the largest chunks, which fit into
+    client's complexity budget (check [`graphql`][simplejustwatchapi.graphql] for
+    details), each chunk is sent as a separate request. Higher `count` means smaller
+    chunks. Duplicated titles are searched only once. If there are no titles, then no
+    request is sent.
+
+    All titles share the same `country`, `language`, `count`, `best_only`, and
+    `providers` arguments, check [`search`][simplejustwatchapi.justwatch.search] for
+    their description. There's no `offset`, only the first results are returned.
+
+    Args:
+        titles (list[str]): Titles to search, not stripped, passed to the API as-is.
+        country (str): 2-letter country code for which offers are selected.
+        language (str): Code for language in responses (e.g., description, title).
+        count (int): Return up to this many results for each title.
+        best_only (bool): Return only best offers if `True`, return all offers if
+            `False`.
+        providers (list[str] | str | None): Selection of 3-letter service identifiers
+            (e.g, `nfx` for "Netflix") to filter for.
+
+    Returns:
+        (dict[str, list[MediaEntry]]): A `dict` where keys are titles and values are
+            lists of search results for them, in the same order as `titles`.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, e.g.,
+            due to invalid language or country code.
+        exceptions.JustWatchHttpError: HTTP error occurred, e.g., JustWatch API
+            responded with non-`2xx` status code.
+
+    """
+    return _default_client().search_many(
+        titles, country, language, count, best_only, providers
+    )
 
 
 def popular(
@@ -243,11 +350,118 @@ def popular(
             responded with non-`2xx` status code.
 
     """
-    request = prepare_popular_request(
+    return _default_client().popular(
         country, language, count, best_only, offset, providers
     )
-    response = _post_to_jw_graphql_api(request)
-    return parse_popular_response(response)
+
+
+def iter_popular(
+    country: str = "US",
+    language: str = "en",
+    page_size: int = 50,
+    best_only: bool = True,
+    offset: int = 0,
+    providers: list[str] | str | None = None,
+) -> Iterator[MediaEntry]:
+    """
+    Iterate over all currently popular titles on JustWatch, page by page.
+
+    Equivalent of calling [`popular`][simplejustwatchapi.justwatch.popular] in a loop
+    over `offset`, until there are no more results.
+
+    Pages are requested with `count` equal to `page_size` and increasing `offset`,
+    starting at `offset`. While entries from one page are consumed, the next page is
+    already requested in the background, so at most two pages are kept in memory.
+    Iteration stops when a page has fewer entries than requested, or at the API limit
+    of [`MAX_RESULTS`][simplejustwatchapi.paging.MAX_RESULTS] entries (`count + offset`
+    of the last page is lowered to fit within it). Errors are raised when iteration
+    reaches the page which caused them, check [`paging`][simplejustwatchapi.paging]
+    for details.
+
+    Arguments are the same as for [`popular`][simplejustwatchapi.justwatch.popular],
+    except for `page_size` replacing `count`.
+
+    Args:
+        country (str): 2-letter country code for which offers are selected.
+        language (str): Code for language in responses (e.g., description, title).
+        page_size (int): Number of entries requested in a single page.
+
+            Too high values can cause API errors due to too high operation complexity,
+            same as `count` in [`popular`][simplejustwatchapi.justwatch.popular].
+
+        best_only (bool): Return only best offers if `True`, return all offers if
+            `False`.
+        offset (int): Offset of the first returned result.
+        providers (list[str] | str | None): Selection of 3-letter service identifiers
+            (e.g, `nfx` for "Netflix") to filter for.
+
+    Yields:
+        (MediaEntry): Tuples with details of popular titles, in order.
+
+    Raises:
+        exceptions.JustWatchError: `page_size` is lower than 1, or `offset` is negative.
+        exceptions.JustWatchApiError: JSON response from API has internal errors, e.g.,
+            due to invalid language or country code.
+        exceptions.JustWatchHttpError: HTTP error occurred, e.g., JustWatch API
+            responded with non-`2xx` status code.
+
+    """
+    return _default_client().iter_popular(
+        country, language, page_size, best_only, offset, providers
+    )
+
+
+def popular_for_countries(
+    countries: set[str],
+    language: str = "en",
+    count: int = 4,
+    best_only: bool = True,
+    providers: list[str] | str | None = None,
+) -> dict[str, list[MediaEntry]]:
+    """
+    Look up currently popular titles for all given countries.
+
+    Equivalent of calling [`popular`][simplejustwatchapi.justwatch.popular] for each
+    country, but all countries are looked up in a single GraphQL query (with an aliased
+    `popularTitles` field per country), instead of a separate request for each one.
+
+    Large inputs are automatically split into the largest chunks, which fit into
+    client's complexity budget (check [`graphql`][simplejustwatchapi.graphql] for
+    details), each chunk is sent as a separate request. Higher `count` means smaller
+    chunks. If no countries are passed (an empty set given as argument) empty dict is
+    returned, without sending any requests.
+
+    Country codes passed as argument are case-insensitive, however keys in returned dict
+    will match them exactly, the same as in [`offers_for_countries`]
+    [simplejustwatchapi.justwatch.offers_for_countries].
+
+    All countries share the same `language`, `count`, `best_only`, and `providers`
+    arguments, check [`popular`][simplejustwatchapi.justwatch.popular] for their
+    description. There's no `offset`, only the most popular titles are returned.
+
+    Args:
+        countries (set[str]): 2-letter country codes to look up popular titles for.
+        language (str): Code for language in responses (e.g., description, title).
+        count (int): Return up to this many results for each country.
+        best_only (bool): Return only best offers if `True`, return all offers if
+            `False`.
+        providers (list[str] | str | None): Selection of 3-letter service identifiers
+            (e.g, `nfx` for "Netflix") to filter for.
+
+    Returns:
+        (dict[str, list[MediaEntry]]): Keys match values in `countries` and values are
+            popular titles, with offers for their respective countries.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, e.g.,
+            due to invalid language or country code.
+        exceptions.JustWatchHttpError: HTTP error occurred, e.g., JustWatch API
+            responded with non-`2xx` status code.
+
+    """
+    return _default_client().popular_for_countries(
+        countries, language, count, best_only, providers
+    )
 
 
 def details(
@@ -313,9 +527,96 @@ def details(
             responded with non-`2xx` status code.
 
     """
-    request = prepare_details_request(node_id, country, language, best_only)
-    response = _post_to_jw_graphql_api(request)
-    return parse_details_response(response)
+    return _default_client().details(node_id, country, language, best_only)
+
+
+def details_many(
+    node_ids: list[str],
+    country: str = "US",
+    language: str = "en",
+    best_only: bool = True,
+) -> dict[str, MediaEntry]:
+    """
+    Get details of entries for multiple IDs at once.
+
+    Equivalent of calling [`details`][simplejustwatchapi.justwatch.details] for each
+    node ID, but all node IDs are looked up in a single GraphQL query (with an aliased
+    `node` field per ID), instead of a separate request for each one.
+
+    Large inputs are automatically split into the largest chunks, which fit into
+    client's complexity budget (check [`graphql`][simplejustwatchapi.graphql] for
+    details), each chunk is sent as a separate request. Duplicated node IDs are looked
+    up only once. If there are no node IDs, then no request is sent.
+
+    All node IDs share the same `country`, `language`, and `best_only` arguments, check
+    [`details`][simplejustwatchapi.justwatch.details] for their description.
+
+    Args:
+        node_ids (list[str]): IDs of entries to look up.
+        country (str): 2-letter country code for which offers are selected.
+        language (str): Code for language in responses (e.g., description, title).
+        best_only (bool): Return only best offers if `True`, return all offers if
+            `False`.
+
+    Returns:
+        (dict[str, MediaEntry]): A `dict` where keys are node IDs and values are data
+            about entries, in the same order as `node_ids`. Node IDs for which API
+            didn't return any entry are not present.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, e.g.,
+            due to invalid language or country code, or invalid node ID.
+        exceptions.JustWatchHttpError: HTTP error occurred, e.g., JustWatch API
+            responded with non-`2xx` status code.
+
+    """
+    return _default_client().details_many(node_ids, country, language, best_only)
+
+
+def details_for_locales(
+    node_id: str,
+    locales: list[tuple[str, str]],
+    best_only: bool = True,
+) -> dict[tuple[str, str], MediaEntry]:
+    """
+    Get details of entry for a given ID in multiple locales at once.
+
+    Equivalent of calling [`details`][simplejustwatchapi.justwatch.details] for each
+    pair of country and language codes, but all locales are looked up in a single
+    GraphQL query (with an aliased `node` field per locale), instead of a separate
+    request for each one. Content (e.g., title, description) is in the language of each
+    locale, offers are for its country.
+
+    Large inputs are automatically split into the largest chunks, which fit into
+    client's complexity budget (check [`graphql`][simplejustwatchapi.graphql] for
+    details), each chunk is sent as a separate request. Duplicated locales are looked
+    up only once. If there are no locales, then no request is sent.
+
+    Country and language codes have the same format as `country` and `language`
+    arguments of [`details`][simplejustwatchapi.justwatch.details], all locales share
+    the same `best_only` argument.
+
+    Args:
+        node_id (str): ID of an entry to look up.
+        locales (list[tuple[str, str]]): Pairs of 2-letter country code and language
+            code, e.g., `("US", "en")`, `("CH", "de-CH")`.
+        best_only (bool): Return only best offers if `True`, return all offers if
+            `False`.
+
+    Returns:
+        (dict[tuple[str, str], MediaEntry]): A `dict` where keys are pairs of country
+            and language codes (as given in `locales`), and values are data about the
+            entry in that locale. Locales for which API didn't return any entry are not
+            present.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, e.g.,
+            due to invalid language or country code, or invalid node ID.
+        exceptions.JustWatchHttpError: HTTP error occurred, e.g., JustWatch API
+            responded with non-`2xx` status code.
+
+    """
+    return _default_client().details_for_locales(node_id, locales, best_only)
 
 
 def seasons(
@@ -362,9 +663,50 @@ def seasons(
             responded with non-`2xx` status code.
 
     """
-    request = prepare_seasons_request(show_id, country, language, best_only)
-    response = _post_to_jw_graphql_api(request)
-    return parse_seasons_response(response)
+    return _default_client().seasons(show_id, country, language, best_only)
+
+
+def seasons_many(
+    show_ids: list[str],
+    country: str = "US",
+    language: str = "en",
+    best_only: bool = True,
+) -> dict[str, list[MediaEntry]]:
+    """
+    Get details of all seasons for multiple show IDs at once.
+
+    Equivalent of calling [`seasons`][simplejustwatchapi.justwatch.seasons] for each
+    show ID, but all show IDs are looked up in a single GraphQL query (with an aliased
+    `node` field per ID), instead of a separate request for each one.
+
+    Large inputs are automatically split into the largest chunks, which fit into
+    client's complexity budget (check [`graphql`][simplejustwatchapi.graphql] for
+    details), each chunk is sent as a separate request. Duplicated show IDs are looked
+    up only once. If there are no show IDs, then no request is sent.
+
+    All show IDs share the same `country`, `language`, and `best_only` arguments,
+    check [`seasons`][simplejustwatchapi.justwatch.seasons] for their description.
+
+    Args:
+        show_ids (list[str]): IDs of shows to look up seasons for.
+        country (str): 2-letter country code for which offers are selected.
+        language (str): Code for language in responses (e.g., description, title).
+        best_only (bool): Return only best offers if `True`, return all offers if
+            `False`.
+
+    Returns:
+        (dict[str, list[MediaEntry]]): A `dict` where keys are show IDs and values are
+            their seasons, in the same order as `show_ids`. Show IDs for which API
+            didn't return any entry are not present.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, e.g.,
+            due to invalid language or country code, or invalid show ID.
+        exceptions.JustWatchHttpError: HTTP error occurred, e.g., JustWatch API
+            responded with non-`2xx` status code.
+
+    """
+    return _default_client().seasons_many(show_ids, country, language, best_only)
 
 
 def episodes(
@@ -412,9 +754,88 @@ def episodes(
             responded with non-`2xx` status code.
 
     """
-    request = prepare_episodes_request(season_id, country, language, best_only)
-    response = _post_to_jw_graphql_api(request)
-    return parse_episodes_response(response)
+    return _default_client().episodes(season_id, country, language, best_only)
+
+
+def episodes_many(
+    season_ids: list[str],
+    country: str = "US",
+    language: str = "en",
+    best_only: bool = True,
+) -> dict[str, list[Episode]]:
+    """
+    Get details of all episodes for multiple season IDs at once.
+
+    Equivalent of calling [`episodes`][simplejustwatchapi.justwatch.episodes] for each
+    season ID, but all season IDs are looked up in a single GraphQL query (with an
+    aliased `node` field per ID), instead of a separate request for each one.
+
+    Large inputs are automatically split into the largest chunks, which fit into
+    client's complexity budget (check [`graphql`][simplejustwatchapi.graphql] for
+    details), each chunk is sent as a separate request. Duplicated season IDs are
+    looked up only once. If there are no season IDs, then no request is sent.
+
+    All season IDs share the same `country`, `language`, and `best_only` arguments,
+    check [`episodes`][simplejustwatchapi.justwatch.episodes] for their description.
+
+    Args:
+        season_ids (list[str]): IDs of seasons to look up episodes for.
+        country (str): 2-letter country code for which offers are selected.
+        language (str): Code for language in responses (e.g., description, title).
+        best_only (bool): Return only best offers if `True`, return all offers if
+            `False`.
+
+    Returns:
+        (dict[str, list[Episode]]): A `dict` where keys are season IDs and values are
+            their episodes, in the same order as `season_ids`. Season IDs for which API
+            didn't return any entry are not present.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, e.g.,
+            due to invalid language or country code, or invalid season ID.
+        exceptions.JustWatchHttpError: HTTP error occurred, e.g., JustWatch API
+            responded with non-`2xx` status code.
+
+    """
+    return _default_client().episodes_many(season_ids, country, language, best_only)
+
+
+def show_tree(
+    show_id: str, country: str = "US", language: str = "en", best_only: bool = True
+) -> ShowTree:
+    """
+    Get details of a show together with all of its seasons and their episodes.
+
+    Equivalent of calling [`details`][simplejustwatchapi.justwatch.details] and
+    [`seasons`][simplejustwatchapi.justwatch.seasons] for the show, and then
+    [`episodes`][simplejustwatchapi.justwatch.episodes] for each season, but everything
+    is looked up in a single GraphQL query, with episodes nested within seasons.
+
+    If such query doesn't fit into client's complexity budget (check [`graphql`]
+    [simplejustwatchapi.graphql] for details), or API rejects it for too high complexity
+    and the client has a [`SplitPolicy`][simplejustwatchapi.splitting.SplitPolicy], then
+    show and its seasons are looked up first, and episodes are looked up in groups of
+    seasons, the same as in [`episodes_many`]
+    [simplejustwatchapi.justwatch.episodes_many].
+
+    Args:
+        show_id (str): ID of a show to look up.
+        country (str): 2-letter country code for which offers are selected.
+        language (str): Code for language in responses (e.g., description, title).
+        best_only (bool): Return only best offers if `True`, return all offers if
+            `False`.
+
+    Returns:
+        (ShowTree): Details of the show, its seasons, and episodes of each season.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, e.g.,
+            due to invalid language or country code.
+        exceptions.JustWatchHttpError: HTTP error occurred, e.g., JustWatch API
+            responded with non-`2xx` status code.
+
+    """
+    return _default_client().show_tree(show_id, country, language, best_only)
 
 
 def offers_for_countries(
@@ -481,13 +902,57 @@ def offers_for_countries(
             responded with non-`2xx` status code.
 
     """
-    if not countries:
-        return {}
-    request = prepare_offers_for_countries_request(
+    return _default_client().offers_for_countries(
         node_id, countries, language, best_only
     )
-    response = _post_to_jw_graphql_api(request)
-    return parse_offers_for_countries_response(response, countries)
+
+
+def offers_matrix(
+    node_ids: list[str],
+    countries: set[str],
+    language: str = "en",
+    best_only: bool = True,
+) -> dict[tuple[str, str], list[Offer]]:
+    """
+    Get offers for entries of all given node IDs for all given countries.
+
+    Equivalent of calling [`offers_for_countries`]
+    [simplejustwatchapi.justwatch.offers_for_countries] for each node ID, but multiple
+    node IDs are looked up in a single GraphQL query (with an aliased `node` field per
+    node ID, each with an aliased `offers` field per country).
+
+    Large inputs are automatically split into the largest chunks, which fit into
+    client's complexity budget (check [`graphql`][simplejustwatchapi.graphql] for
+    details), each chunk is sent as a separate request. If countries don't fit into a
+    single request even for one node ID, they are split into groups of similar size
+    first. Duplicated node IDs are looked up only once. If either argument is empty,
+    then an empty dict is returned, without sending any requests.
+
+    Returned `dict` has a key for each pair of node ID and country code, country codes
+    are case-insensitive, however keys in returned dict will match them exactly, the
+    same as in [`offers_for_countries`]
+    [simplejustwatchapi.justwatch.offers_for_countries]. If API didn't return an entry
+    for a node ID, then all of its values are empty lists.
+
+    Args:
+        node_ids (list[str]): IDs of entries to look up offers for.
+        countries (set[str]): 2-letter country codes for which offers are selected.
+        language (str): Code for language in responses (e.g., description, title).
+        best_only (bool): Return only best offers if `True`, return all offers if
+            `False`.
+
+    Returns:
+        (dict[tuple[str, str], list[Offer]]): Keys are pairs of node ID and country
+            code, values are all found offers for them.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, e.g.,
+            due to invalid language or country code.
+        exceptions.JustWatchHttpError: HTTP error occurred, e.g., JustWatch API
+            responded with non-`2xx` status code.
+
+    """
+    return _default_client().offers_matrix(node_ids, countries, language, best_only)
 
 
 def providers(country: str = "US") -> list[OfferPackage]:
@@ -516,30 +981,53 @@ def providers(country: str = "US") -> list[OfferPackage]:
             responded with non-`2xx` status code.
 
     """
-    request = prepare_providers_request(country)
-    response = _post_to_jw_graphql_api(request)
-    return parse_providers_response(response)
+    return _default_client().providers(country)
 
 
-def _post_to_jw_graphql_api(request_json: dict) -> dict:
+def providers_for_countries(countries: set[str]) -> dict[str, list[OfferPackage]]:
     """
-    Send a GraphQL query, verify HTTP response, return API response JSON as `dict`.
+    Look up all providers for all given countries.
+
+    Equivalent of calling [`providers`][simplejustwatchapi.justwatch.providers] for each
+    country, but all countries are looked up in a single GraphQL query (with an aliased
+    `packages` field per country), instead of a separate request for each one.
+
+    Large inputs are automatically split into the largest chunks, which fit into
+    client's complexity budget (check [`graphql`][simplejustwatchapi.graphql] for
+    details), each chunk is sent as a separate request. If no countries are passed (an
+    empty set given as argument) empty dict is returned, without sending any requests.
+
+    Country codes passed as argument are case-insensitive, however keys in returned dict
+    will match them exactly, the same as in [`offers_for_countries`]
+    [simplejustwatchapi.justwatch.offers_for_countries].
 
     Args:
-        request_json(dict): JSON with full request - GraphQL query and variables.
+        countries (set[str]): 2-letter country codes to look up providers for.
 
     Returns:
-        (dict): JSON response from the API.
+        (dict[str, list[OfferPackage]]): Keys match values in `countries` and values
+            are all providers found for a given country.
 
     Raises:
-        exceptions.JustWatchHttpError: HTTP-related error occurred.
+        exceptions.JustWatchApiError: JSON response from API has internal errors, e.g.,
+            due to invalid country code.
+        exceptions.JustWatchHttpError: HTTP error occurred, e.g., JustWatch API
+            responded with non-`2xx` status code.
+
+    """
+    return _default_client().providers_for_countries(countries)
+
+
+def _default_client() -> JustWatchClient:
+    """
+    Return client shared by all module-level functions, create it on first use.
+
+    Returns:
+        (JustWatchClient): Shared client with default configuration.
 
     """
-    try:
-        response = post(_GRAPHQL_API_URL, json=request_json)
-        response.raise_for_status()
-        return response.json()
-    except HTTPStatusError as e:
-        raise JustWatchHttpError(str(e), e.response.text) from e
-    except HTTPError as e:
-        raise JustWatchHttpError(str(e)) from e
+    global _default_client_instance  # noqa: PLW0603
+    with _default_client_lock:
+        if _default_client_instance is None:
+            _default_client_instance = JustWatchClient()
+        return _default_client_instance
@@ -0,0 +1,126 @@
+"""
+Iterating over all results of paginated operations, with prefetching of next pages.
+
+Getting more results from [`search`][simplejustwatchapi.justwatch.search] or
+[`popular`][simplejustwatchapi.justwatch.popular] requires a loop over `offset`, where
+each page is requested only after the previous one is parsed. [`iter_search`]
+[simplejustwatchapi.justwatch.iter_search] and [`iter_popular`]
+[simplejustwatchapi.justwatch.iter_popular] do this loop themselves, while entries from
+one page are consumed, the next page is already requested in the background:
+
+```python
+from simplejustwatchapi import iter_popular
+
+for entry in iter_popular(page_size=100):
+    print(entry.title)
+```
+
+Iteration stops when the API returns fewer entries than requested, or when it reaches
+[`MAX_RESULTS`][simplejustwatchapi.paging.MAX_RESULTS] - the last page is shortened, so
+it doesn't go over the limit (which would result in an empty page). At most two pages
+are kept at once - the one being consumed, and the one being prefetched. If iteration
+is stopped early, the prefetched page is discarded.
+
+Errors from requesting a page are raised when iteration reaches that page.
+"""
+
+from asyncio import Task, ensure_future
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any
+
+from simplejustwatchapi.exceptions import JustWatchError
+
+MAX_RESULTS = 1999
+"""Limit for `count + offset`, API returns an empty list for larger values."""
+
+
+def page_ranges(offset: int, page_size: int) -> list[range]:
+    """
+    Split all results available from `offset` into pages.
+
+    Args:
+        offset (int): Offset of the first entry.
+        page_size (int): Number of entries in a single page.
+
+    Returns:
+        (list[range]): Range of entries for each page, last one is shortened to fit
+            within `MAX_RESULTS`.
+
+    Raises:
+        exceptions.JustWatchError: Page size or offset is invalid.
+
+    """
+    if page_size < 1 or offset < 0:
+        error_msg = f"Invalid pagination: {page_size=}, {offset=}"
+        raise JustWatchError(error_msg)
+    return [
+        range(start, min(start + page_size, MAX_RESULTS))
+        for start in range(offset, MAX_RESULTS, page_size)
+    ]
+
+
+def iter_pages(
+    fetch: Callable[[range], list[Any]], pages: list[range]
+) -> Iterator[Any]:
+    """
+    Yield entries from all pages, fetch the next page in a background thread.
+
+    The first page is fetched by the calling thread, following pages are fetched in a
+    separate thread, with a copy of the caller's context (including its deadline).
+
+    Args:
+        fetch (Callable[[range], list[Any]]): Function getting entries for a page.
+        pages (list[range]): Pages to get, in order.
+
+    Yields:
+        (Any): Entries from all pages, until a page with fewer entries than requested.
+
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="justwatch-page")
+    next_page: Future[list[Any]] | None = None
+    try:
+        for index, page in enumerate(pages):
+            entries = next_page.result() if next_page else fetch(page)
+            next_page = None
+            if len(entries) == len(page) and index + 1 < len(pages):
+                next_page = executor.submit(copy_context().run, fetch, pages[index + 1])
+            yield from entries
+            if next_page is None:
+                return
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+        executor.shutdown(wait=False)
+
+
+async def aiter_pages(
+    fetch: Callable[[range], Awaitable[list[Any]]], pages: list[range]
+) -> AsyncIterator[Any]:
+    """
+    Yield entries from all pages, fetch the next page in a background task.
+
+    Args:
+        fetch (Callable[[range], Awaitable[list[Any]]]): Coroutine function getting
+            entries for a page.
+        pages (list[range]): Pages to get, in order.
+
+    Yields:
+        (Any): Entries from all pages, until a page with fewer entries than requested.
+
+    """
+    next_page: Task[list[Any]] | None = None
+    try:
+        for index, page in enumerate(pages):
+            entries = await (next_page or fetch(page))
+            next_page = None
+            if len(entries) == len(page) and index + 1 < len(pages):
+                next_page = ensure_future(fetch(pages[index + 1]))
+            for entry in entries:
+                yield entry
+            if next_page is None:
+                return
+    finally:
+        if next_page is not None and not next_page.cancel():
+            next_page.exception()  # Mark exception of a discarded page as retrieved.
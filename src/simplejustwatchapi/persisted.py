@@ -0,0 +1,142 @@
+"""
+Automatic persisted queries - sending hashes of GraphQL queries instead of full queries.
+
+Full GraphQL queries used by this library are several kilobytes each, and the same
+query text is sent with every request. With persisted queries enabled, requests contain
+only variables and SHA-256 hash of the query. If the server doesn't know the hash yet,
+it responds with `PersistedQueryNotFound` error, then the request is sent again with
+both the hash and the full query, so the server can store it for future requests.
+
+It's meant to be enabled through [`JustWatchClient`]
+[simplejustwatchapi.client.JustWatchClient] or [`AsyncJustWatchClient`]
+[simplejustwatchapi.client.AsyncJustWatchClient]:
+
+```python
+from simplejustwatchapi import JustWatchClient, PersistedQueries
+
+client = JustWatchClient(persisted_queries=PersistedQueries(use_get=True))
+```
+
+With `use_get=True` hash-only requests are sent as `GET` requests, with all data in URL
+query parameters, so responses can be cached by intermediate HTTP caches. Requests with
+full query are always sent as `POST`.
+
+If server responds with `PersistedQueryNotSupported` error, then the client stops using
+persisted queries and sends full queries, as if persisted queries were disabled.
+"""
+
+from functools import cache
+from hashlib import sha256
+from json import dumps
+from typing import Any, NamedTuple
+
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+"""Error message returned by server if it doesn't know the query hash."""
+
+PERSISTED_QUERY_NOT_SUPPORTED = "PersistedQueryNotSupported"
+"""Error message returned by server if it doesn't support persisted queries."""
+
+_ERROR_CODES = {
+    "PERSISTED_QUERY_NOT_FOUND": PERSISTED_QUERY_NOT_FOUND,
+    "PERSISTED_QUERY_NOT_SUPPORTED": PERSISTED_QUERY_NOT_SUPPORTED,
+}
+
+
+class PersistedQueries(NamedTuple):
+    """
+    Configuration of automatic persisted queries.
+
+    Attributes:
+        use_get (bool): Send hash-only requests as `GET` requests, which can be cached
+            by intermediate HTTP caches.
+
+    """
+
+    use_get: bool = False
+
+
+@cache
+def query_hash(query: str) -> str:
+    """
+    Calculate hash identifying a GraphQL query.
+
+    Args:
+        query (str): Full GraphQL query.
+
+    Returns:
+        (str): Hex-encoded SHA-256 hash of the query.
+
+    """
+    return sha256(query.encode()).hexdigest()
+
+
+def persisted_request(
+    request_json: dict[str, Any], include_query: bool
+) -> dict[str, Any]:
+    """
+    Convert a request with full query into a persisted query request.
+
+    Args:
+        request_json (dict[str, Any]): JSON with full request - GraphQL query and
+            variables.
+        include_query (bool): Keep the full query in the request, so server can store
+            it under its hash.
+
+    Returns:
+        (dict[str, Any]): JSON with persisted query extension, with or without query.
+
+    """
+    persisted = {key: value for key, value in request_json.items() if key != "query"}
+    persisted_query = {"version": 1, "sha256Hash": query_hash(request_json["query"])}
+    persisted["extensions"] = {"persistedQuery": persisted_query}
+    if include_query:
+        persisted["query"] = request_json["query"]
+    return persisted
+
+
+def get_params(request_json: dict[str, Any]) -> dict[str, str]:
+    """
+    Convert a request JSON into URL query parameters for a `GET` request.
+
+    Nested values are serialized as JSON with sorted keys, so identical requests always
+    have identical URLs.
+
+    Args:
+        request_json (dict[str, Any]): JSON with request.
+
+    Returns:
+        (dict[str, str]): URL query parameters.
+
+    """
+    return {
+        key: value if isinstance(value, str) else _compact_json(value)
+        for key, value in request_json.items()
+    }
+
+
+def persisted_query_error(json: dict[str, Any]) -> str | None:
+    """
+    Get persisted query error from response, if there is any.
+
+    Args:
+        json (dict[str, Any]): JSON returned by the API.
+
+    Returns:
+        (str | None): [`PERSISTED_QUERY_NOT_FOUND`]
+            [simplejustwatchapi.persisted.PERSISTED_QUERY_NOT_FOUND],
+            [`PERSISTED_QUERY_NOT_SUPPORTED`]
+            [simplejustwatchapi.persisted.PERSISTED_QUERY_NOT_SUPPORTED], or `None` if
+            there's no error related to persisted queries.
+
+    """
+    for error in json.get("errors") or []:
+        if error.get("message") in _ERROR_CODES.values():
+            return error["message"]
+        if (code := (error.get("extensions") or {}).get("code")) in _ERROR_CODES:
+            return _ERROR_CODES[code]
+    return None
+
+
+def _compact_json(value: Any) -> str:
+    """Serialize value as JSON with sorted keys and no whitespace."""
+    return dumps(value, sort_keys=True, separators=(",", ":"))
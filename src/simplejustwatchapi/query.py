@@ -10,6 +10,7 @@ All "parse" functions convert JSON returned by API into request-specific Python
 [`NamedTuple`][typing.NamedTuple].
 """
 
+from collections.abc import Collection
 from typing import Any
 
 from simplejustwatchapi.exceptions import JustWatchApiError, JustWatchError
@@ -20,7 +21,18 @@ from simplejustwatchapi.graphql import (
     GRAPHQL_PROVIDERS_QUERY,
     GRAPHQL_SEARCH_QUERY,
     GRAPHQL_SEASONS_QUERY,
+    GRAPHQL_SHOW_SEASONS_QUERY,
+    GRAPHQL_SHOW_TREE_QUERY,
+    graphql_details_for_locales_query,
+    graphql_details_many_query,
+    graphql_episodes_many_query,
+    graphql_nodes_batch_query,
     graphql_offers_for_countries_query,
+    graphql_offers_matrix_query,
+    graphql_popular_for_countries_query,
+    graphql_providers_for_countries_query,
+    graphql_search_many_query,
+    graphql_seasons_many_query,
 )
 from simplejustwatchapi.tuples import (
     Episode,
@@ -29,6 +41,7 @@ from simplejustwatchapi.tuples import (
     Offer,
     OfferPackage,
     Scoring,
+    ShowTree,
     StreamingCharts,
 )
 
@@ -115,6 +128,101 @@ def parse_search_response(json: dict[str, Any]) -> list[MediaEntry]:
     ]
 
 
+def prepare_search_many_request(
+    titles: list[str],
+    country: str,
+    language: str,
+    count: int,
+    best_only: bool,
+    providers: list[str] | str | None,
+) -> dict[str, Any]:
+    """
+    Prepare search request for multiple titles to JustWatch GraphQL API.
+
+    Creates a `GetSearchTitles` GraphQL query, with a separate `popularTitles` for each
+    title. `titles` argument must not be empty, titles aren't deduplicated.
+
+    Country code should be two uppercase letters, however it will be auto-converted to
+    uppercase. Language code is not verified.
+
+    Meant to be used together with [`parse_search_many_response`]
+    [simplejustwatchapi.query.parse_search_many_response].
+
+    Args:
+        titles (list[str]): Titles to search.
+        country (str): Country to search for offers.
+        language (str): Language of responses.
+        count (int): How many responses should be returned for each title.
+        best_only (bool): Return only best offers if `True`,
+            return all offers if `False`.
+        providers (list[str] | str | None): 3-letter service identifier(s),
+            or `None` for all providers.
+
+    Returns:
+        (dict[str, Any]): JSON with GraphQL POST body.
+
+    """
+    if not titles:
+        # This should never happen, client.py should take care of this.
+        # If it will happen API will respond with an error due to empty selection.
+        error_msg = "No titles, should not happen!"
+        raise JustWatchError(error_msg)
+    return {
+        "operationName": "GetSearchTitles",
+        "variables": {
+            **{
+                f"searchTitlesFilter{index}": {
+                    "searchQuery": title,
+                    "packages": providers,
+                }
+                for index, title in enumerate(titles)
+            },
+            "first": count,
+            **_common_variables(best_only),
+            **_locale_variables(country, language),
+        },
+        "query": graphql_search_many_query(len(titles)),
+    }
+
+
+def parse_search_many_response(
+    json: dict[str, Any], titles: list[str]
+) -> dict[str, list[MediaEntry]]:
+    """
+    Parse response from search query for multiple titles from JustWatch GraphQL API.
+
+    Parses response for `GetSearchTitles` query with multiple titles.
+
+    `titles` must be the same list which was used for preparing the request, as
+    results in the response are matched to titles by their position. If API didn't
+    return any data for a title, then it has an empty list.
+
+    Meant to be used together with [`prepare_search_many_request`]
+    [simplejustwatchapi.query.prepare_search_many_request].
+
+    Args:
+        json (dict[str, Any]): JSON returned by JustWatch GraphQL API.
+        titles (list[str]): Titles used for preparing the request.
+
+    Returns:
+        (dict[str, list[MediaEntry]]): A `dict`, where keys are titles and values are
+            lists of parsed entries found for them.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors.
+
+    """
+    _raise_for_errors_in_response(json)
+    data = json["data"]
+    return {
+        title: [
+            _parse_entry(edge["node"])
+            for edge in (data.get(f"search{index}") or {}).get("edges", [])
+        ]
+        for index, title in enumerate(titles)
+    }
+
+
 def prepare_popular_request(
     country: str,
     language: str,
@@ -188,6 +296,93 @@ def parse_popular_response(json: dict[str, Any]) -> list[MediaEntry]:
     ]
 
 
+def prepare_popular_for_countries_request(
+    countries: set[str],
+    language: str,
+    count: int,
+    best_only: bool,
+    providers: list[str] | str | None,
+) -> dict[str, Any]:
+    """
+    Prepare "get popular" request for all given countries.
+
+    Creates a `GetPopularTitlesForCountries` GraphQL query.
+
+    Country codes should be two uppercase letters, however they will be auto-converted
+    to uppercase. `countries` argument must not be empty. Language code is not verified.
+
+    Meant to be used together with [`parse_popular_for_countries_response`]
+    [simplejustwatchapi.query.parse_popular_for_countries_response].
+
+    Args:
+        countries (set[str]): Set of country codes to get popular titles for.
+        language (str): Language of responses.
+        count (int): How many responses should be returned for each country.
+        best_only (bool): Return only best offers if `True`,
+            return all offers if `False`.
+        providers (list[str] | str | None): 3-letter service identifier(s),
+            or `None` for all providers.
+
+    Returns:
+        (dict[str, Any]): JSON with GraphQL POST body.
+
+    """
+    if not countries:
+        # This should never happen, client.py should take care of this.
+        # If it will happen API will respond with an error due to empty selection.
+        error_msg = "No country codes, should not happen!"
+        raise JustWatchError(error_msg)
+    countries = sorted({country.upper() for country in countries})
+    return {
+        "operationName": "GetPopularTitlesForCountries",
+        "variables": {
+            "first": count,
+            "popularTitlesFilter": {"packages": providers},
+            "language": language,
+            **_common_variables(best_only),
+        },
+        "query": graphql_popular_for_countries_query(countries),
+    }
+
+
+def parse_popular_for_countries_response(
+    json: dict[str, Any], countries: set[str]
+) -> dict[str, list[MediaEntry]]:
+    """
+    Parse response from popular query for multiple countries from JustWatch GraphQL API.
+
+    Parses response for `GetPopularTitlesForCountries` query.
+
+    Response is searched for country codes passed as `countries` argument. If response
+    doesn't have titles for a country, then that country still will be present in
+    returned `dict`, just with an empty list as value.
+
+    Meant to be used together with [`prepare_popular_for_countries_request`]
+    [simplejustwatchapi.query.prepare_popular_for_countries_request].
+
+    Args:
+        json (dict[str, Any]): JSON returned by JustWatch GraphQL API.
+        countries (set[str]): Set of country codes to look for in API response.
+
+    Returns:
+        (dict[str, list[MediaEntry]]): A `dict`, where keys are matching `countries`
+            argument and values are popular titles for a given country.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors.
+
+    """
+    _raise_for_errors_in_response(json)
+    data = json["data"]
+    return {
+        country: [
+            _parse_entry(edge["node"])
+            for edge in (data.get(country.upper()) or {}).get("edges", [])
+        ]
+        for country in countries
+    }
+
+
 def prepare_details_request(
     node_id: str, country: str, language: str, best_only: bool
 ) -> dict[str, Any]:
@@ -247,6 +442,164 @@ def parse_details_response(json: dict[str, Any]) -> MediaEntry:
     return _parse_entry(json["data"]["node"])
 
 
+def prepare_details_many_request(
+    node_ids: list[str], country: str, language: str, best_only: bool
+) -> dict[str, Any]:
+    """
+    Prepare a details request for multiple node IDs to JustWatch GraphQL API.
+
+    Creates a `GetTitleNodes` GraphQL query, with a separate `node` for each node ID.
+    `node_ids` argument must not be empty, node IDs aren't deduplicated.
+
+    Country code should be two uppercase letters, however it will be auto-converted to
+    uppercase. Language code is not verified.
+
+    Meant to be used together with [`parse_details_many_response`]
+    [simplejustwatchapi.query.parse_details_many_response].
+
+    Args:
+        node_ids (list[str]): Node IDs of entries to get details for.
+        country (str): Country to search for offers.
+        language (str): Language of responses.
+        best_only (bool): Return only best offers if `True`,
+            return all offers if `False`.
+
+    Returns:
+        (dict[str, Any]): JSON with GraphQL POST body.
+
+    """
+    if not node_ids:
+        # This should never happen, client.py should take care of this.
+        # If it will happen API will respond with an error due to empty selection.
+        error_msg = "No node IDs, should not happen!"
+        raise JustWatchError(error_msg)
+    return {
+        "operationName": "GetTitleNodes",
+        "variables": {
+            **{f"nodeId{index}": node_id for index, node_id in enumerate(node_ids)},
+            **_common_variables(best_only),
+            **_locale_variables(country, language),
+        },
+        "query": graphql_details_many_query(len(node_ids)),
+    }
+
+
+def parse_details_many_response(
+    json: dict[str, Any], node_ids: list[str]
+) -> dict[str, MediaEntry]:
+    """
+    Parse response from details query for multiple node IDs from JustWatch GraphQL API.
+
+    Parses response for `GetTitleNodes` query.
+
+    `node_ids` must be the same list which was used for preparing the request, as
+    entries in the response are matched to node IDs by their position. Node IDs without
+    an entry in the response, or with errors with `path` pointing to their node, are
+    not present in returned `dict`.
+
+    Meant to be used together with [`prepare_details_many_request`]
+    [simplejustwatchapi.query.prepare_details_many_request].
+
+    Args:
+        json (dict[str, Any]): JSON returned by JustWatch GraphQL API.
+        node_ids (list[str]): Node IDs used for preparing the request.
+
+    Returns:
+        (dict[str, MediaEntry]): A `dict`, where keys are node IDs and values are
+            parsed entries for them.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, which
+            aren't related to a single node.
+
+    """
+    nodes = _successful_nodes(json, len(node_ids))
+    return {node_ids[index]: _parse_entry(node) for index, node in nodes.items()}
+
+
+def prepare_details_for_locales_request(
+    node_id: str, locales: list[tuple[str, str]], best_only: bool
+) -> dict[str, Any]:
+    """
+    Prepare a details request for a single node ID in multiple locales.
+
+    Creates a `GetTitleNodeForLocales` GraphQL query, with a separate `node` for each
+    locale. Each locale is a pair of country and language codes, `locales` argument must
+    not be empty, locales aren't deduplicated.
+
+    Country codes should be two uppercase letters, however they will be auto-converted
+    to uppercase. Language codes are not verified.
+
+    Meant to be used together with [`parse_details_for_locales_response`]
+    [simplejustwatchapi.query.parse_details_for_locales_response].
+
+    Args:
+        node_id (str): Node ID of entry to get details for.
+        locales (list[tuple[str, str]]): Pairs of country and language codes.
+        best_only (bool): Return only best offers if `True`,
+            return all offers if `False`.
+
+    Returns:
+        (dict[str, Any]): JSON with GraphQL POST body.
+
+    """
+    if not locales:
+        # This should never happen, client.py should take care of this.
+        # If it will happen API will respond with an error due to empty selection.
+        error_msg = "No locales, should not happen!"
+        raise JustWatchError(error_msg)
+    locale_variables = {}
+    for index, (country, language) in enumerate(locales):
+        locale_variables[f"country{index}"] = country.upper()
+        locale_variables[f"language{index}"] = language
+    return {
+        "operationName": "GetTitleNodeForLocales",
+        "variables": {
+            "nodeId": node_id,
+            **locale_variables,
+            **_common_variables(best_only),
+        },
+        "query": graphql_details_for_locales_query(len(locales)),
+    }
+
+
+def parse_details_for_locales_response(
+    json: dict[str, Any], locales: list[tuple[str, str]]
+) -> dict[tuple[str, str], MediaEntry]:
+    """
+    Parse response from details query for multiple locales from JustWatch GraphQL API.
+
+    Parses response for `GetTitleNodeForLocales` query.
+
+    `locales` must be the same list which was used for preparing the request, as
+    entries in the response are matched to locales by their position. Locales without
+    an entry in the response are not present in returned `dict`.
+
+    Meant to be used together with [`prepare_details_for_locales_request`]
+    [simplejustwatchapi.query.prepare_details_for_locales_request].
+
+    Args:
+        json (dict[str, Any]): JSON returned by JustWatch GraphQL API.
+        locales (list[tuple[str, str]]): Pairs of country and language codes used for
+            preparing the request.
+
+    Returns:
+        (dict[tuple[str, str], MediaEntry]): A `dict`, where keys are pairs of country
+            and language codes, and values are parsed entries for them.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors.
+
+    """
+    _raise_for_errors_in_response(json)
+    data = json["data"]
+    return {
+        locale: _parse_entry(node)
+        for index, locale in enumerate(locales)
+        if (node := data.get(f"locale{index}")) is not None
+    }
+
+
 def prepare_seasons_request(
     show_id: str, country: str, language: str, best_only: bool
 ) -> dict[str, Any]:
@@ -306,6 +659,84 @@ def parse_seasons_response(json: dict[str, Any]) -> list[MediaEntry]:
     return [_parse_entry(season) for season in json["data"]["node"].get("seasons", [])]
 
 
+def prepare_seasons_many_request(
+    show_ids: list[str], country: str, language: str, best_only: bool
+) -> dict[str, Any]:
+    """
+    Prepare a seasons request for multiple show IDs to JustWatch GraphQL API.
+
+    Creates a `GetShowsSeasons` GraphQL query, with a separate `node` for each show ID.
+    `show_ids` argument must not be empty, show IDs aren't deduplicated.
+
+    Country code should be two uppercase letters, however it will be auto-converted to
+    uppercase. Language code is not verified.
+
+    Meant to be used together with [`parse_seasons_many_response`]
+    [simplejustwatchapi.query.parse_seasons_many_response].
+
+    Args:
+        show_ids (list[str]): Show IDs of entries to get seasons for.
+        country (str): Country to search for offers.
+        language (str): Language of responses.
+        best_only (bool): Return only best offers if `True`,
+            return all offers if `False`.
+
+    Returns:
+        (dict[str, Any]): JSON with GraphQL POST body.
+
+    """
+    if not show_ids:
+        # This should never happen, client.py should take care of this.
+        # If it will happen API will respond with an error due to empty selection.
+        error_msg = "No show IDs, should not happen!"
+        raise JustWatchError(error_msg)
+    return {
+        "operationName": "GetShowsSeasons",
+        "variables": {
+            **{f"nodeId{index}": node_id for index, node_id in enumerate(show_ids)},
+            **_common_variables(best_only),
+            **_locale_variables(country, language),
+        },
+        "query": graphql_seasons_many_query(len(show_ids)),
+    }
+
+
+def parse_seasons_many_response(
+    json: dict[str, Any], show_ids: list[str]
+) -> dict[str, list[MediaEntry]]:
+    """
+    Parse response from seasons query for multiple shows from JustWatch GraphQL API.
+
+    Parses response for `GetShowsSeasons` query.
+
+    `show_ids` must be the same list which was used for preparing the request, as
+    entries in the response are matched to show IDs by their position. Show IDs without
+    an entry in the response, or with errors with `path` pointing to their node, are
+    not present in returned `dict`.
+
+    Meant to be used together with [`prepare_seasons_many_request`]
+    [simplejustwatchapi.query.prepare_seasons_many_request].
+
+    Args:
+        json (dict[str, Any]): JSON returned by JustWatch GraphQL API.
+        show_ids (list[str]): Show IDs used for preparing the request.
+
+    Returns:
+        (dict[str, list[MediaEntry]]): A `dict`, where keys are show IDs and values are
+            parsed seasons for them.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, which
+            aren't related to a single node.
+
+    """
+    nodes = _successful_nodes(json, len(show_ids))
+    return {
+        show_ids[index]: list(map(_parse_entry, node.get("seasons", [])))
+        for index, node in nodes.items()
+    }
+
+
 def prepare_episodes_request(
     episode_id: str, country: str, language: str, best_only: bool
 ) -> dict[str, Any]:
@@ -364,6 +795,256 @@ def parse_episodes_response(json: dict[str, Any]) -> list[Episode]:
     ]
 
 
+def prepare_episodes_many_request(
+    season_ids: list[str], country: str, language: str, best_only: bool
+) -> dict[str, Any]:
+    """
+    Prepare an episodes request for multiple season IDs to JustWatch GraphQL API.
+
+    Creates a `GetSeasonEpisodes` GraphQL query, with a separate `node` for each season
+    ID. `season_ids` argument must not be empty, season IDs aren't deduplicated.
+
+    Country code should be two uppercase letters, however it will be auto-converted to
+    uppercase. Language code is not verified.
+
+    Meant to be used together with [`parse_episodes_many_response`]
+    [simplejustwatchapi.query.parse_episodes_many_response].
+
+    Args:
+        season_ids (list[str]): Season IDs of entries to get episodes for.
+        country (str): Country to search for offers.
+        language (str): Language of responses.
+        best_only (bool): Return only best offers if `True`,
+            return all offers if `False`.
+
+    Returns:
+        (dict[str, Any]): JSON with GraphQL POST body.
+
+    """
+    if not season_ids:
+        # This should never happen, client.py should take care of this.
+        # If it will happen API will respond with an error due to empty selection.
+        error_msg = "No season IDs, should not happen!"
+        raise JustWatchError(error_msg)
+    return {
+        "operationName": "GetSeasonEpisodes",
+        "variables": {
+            **{f"nodeId{index}": node_id for index, node_id in enumerate(season_ids)},
+            **_common_variables(best_only),
+            **_locale_variables(country, language),
+        },
+        "query": graphql_episodes_many_query(len(season_ids)),
+    }
+
+
+def parse_episodes_many_response(
+    json: dict[str, Any], season_ids: list[str]
+) -> dict[str, list[Episode]]:
+    """
+    Parse response from episodes query for multiple seasons from JustWatch GraphQL API.
+
+    Parses response for `GetSeasonEpisodes` query.
+
+    `season_ids` must be the same list which was used for preparing the request, as
+    entries in the response are matched to season IDs by their position. Season IDs
+    without an entry in the response, or with errors with `path` pointing to their
+    node, are not present in returned `dict`.
+
+    Meant to be used together with [`prepare_episodes_many_request`]
+    [simplejustwatchapi.query.prepare_episodes_many_request].
+
+    Args:
+        json (dict[str, Any]): JSON returned by JustWatch GraphQL API.
+        season_ids (list[str]): Season IDs used for preparing the request.
+
+    Returns:
+        (dict[str, list[Episode]]): A `dict`, where keys are season IDs and values are
+            parsed episodes for them.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, which
+            aren't related to a single node.
+
+    """
+    nodes = _successful_nodes(json, len(season_ids))
+    return {
+        season_ids[index]: list(map(_parse_episode, node.get("episodes", [])))
+        for index, node in nodes.items()
+    }
+
+
+def prepare_show_tree_request(
+    show_id: str, country: str, language: str, best_only: bool, with_episodes: bool
+) -> dict[str, Any]:
+    """
+    Prepare a request for a show with all of its seasons to JustWatch GraphQL API.
+
+    Creates a `GetShowTree` GraphQL query, which also includes episodes of each season,
+    or a `GetShowSeasons` query without episodes, if `with_episodes` is `False`.
+
+    Country code should be two uppercase letters, however it will be auto-converted to
+    uppercase. Language code is not verified.
+
+    Meant to be used together with [`parse_show_tree_response`]
+    [simplejustwatchapi.query.parse_show_tree_response].
+
+    Args:
+        show_id (str): Show ID of entry to get details for.
+        country (str): Country to search for offers.
+        language (str): Language of responses.
+        best_only (bool): Return only best offers if `True`,
+            return all offers if `False`.
+        with_episodes (bool): Include episodes of each season in the query.
+
+    Returns:
+        (dict[str, Any]): JSON with GraphQL POST body.
+
+    """
+    if with_episodes:
+        operation_name, query = "GetShowTree", GRAPHQL_SHOW_TREE_QUERY
+    else:
+        operation_name, query = "GetShowSeasons", GRAPHQL_SHOW_SEASONS_QUERY
+    return {
+        "operationName": operation_name,
+        "variables": {
+            "nodeId": show_id,
+            **_common_variables(best_only),
+            **_locale_variables(country, language),
+        },
+        "query": query,
+    }
+
+
+def parse_show_tree_response(json: dict[str, Any]) -> ShowTree:
+    """
+    Parse response from show tree query from JustWatch GraphQL API.
+
+    Parses response for `GetShowTree` and `GetShowSeasons` queries. Episodes are
+    present in returned `ShowTree` only for seasons which have them in the response,
+    so for `GetShowSeasons` query `episodes` is always empty.
+
+    Meant to be used together with [`prepare_show_tree_request`]
+    [simplejustwatchapi.query.prepare_show_tree_request].
+
+    Args:
+        json (dict[str, Any]): JSON returned by JustWatch GraphQL API.
+
+    Returns:
+        (ShowTree): Parsed show, its seasons, and their episodes.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors.
+
+    """
+    _raise_for_errors_in_response(json)
+    node = json["data"]["node"]
+    seasons = node.get("seasons", [])
+    return ShowTree(
+        show=_parse_entry(node),
+        seasons=list(map(_parse_entry, seasons)),
+        episodes={
+            season["id"]: list(map(_parse_episode, season["episodes"]))
+            for season in seasons
+            if "episodes" in season
+        },
+    )
+
+
+def prepare_nodes_batch_request(
+    items: list[tuple[str, str]], country: str, language: str, best_only: bool
+) -> dict[str, Any]:
+    """
+    Prepare a request for details, seasons, or episodes of multiple node IDs at once.
+
+    Creates a `GetTitleNodesBatch` GraphQL query, with a separate `node` for each
+    element of `items`. Each element is a pair of kind of data - `"details"`,
+    `"seasons"`, or `"episodes"` - and node ID. `items` argument must not be empty,
+    elements aren't deduplicated.
+
+    Country code should be two uppercase letters, however it will be auto-converted to
+    uppercase. Language code is not verified.
+
+    Meant to be used together with [`parse_nodes_batch_response`]
+    [simplejustwatchapi.query.parse_nodes_batch_response].
+
+    Args:
+        items (list[tuple[str, str]]): Pairs of kind of data and node ID to look up.
+        country (str): Country to search for offers.
+        language (str): Language of responses.
+        best_only (bool): Return only best offers if `True`,
+            return all offers if `False`.
+
+    Returns:
+        (dict[str, Any]): JSON with GraphQL POST body.
+
+    """
+    if not items:
+        # This should never happen, client.py should take care of this.
+        # If it will happen API will respond with an error due to empty selection.
+        error_msg = "No node IDs, should not happen!"
+        raise JustWatchError(error_msg)
+    return {
+        "operationName": "GetTitleNodesBatch",
+        "variables": {
+            **{f"nodeId{index}": node_id for index, (_, node_id) in enumerate(items)},
+            **_common_variables(best_only),
+            **_locale_variables(country, language),
+        },
+        "query": graphql_nodes_batch_query([kind for kind, _ in items]),
+    }
+
+
+def parse_nodes_batch_response(
+    json: dict[str, Any], items: list[tuple[str, str]]
+) -> dict[tuple[str, str], Any]:
+    """
+    Parse response from batch query for multiple nodes from JustWatch GraphQL API.
+
+    Parses response for `GetTitleNodesBatch` query.
+
+    `items` must be the same list which was used for preparing the request, as entries
+    in the response are matched to elements by their position. Each element gets the
+    same value as a separate `GetTitleNode` query would return - a `MediaEntry` for
+    `"details"`, a list of `MediaEntry` for `"seasons"`, and a list of `Episode` for
+    `"episodes"`.
+
+    Errors with `path` pointing to a specific node fail only that element - its value
+    is [`JustWatchApiError`][simplejustwatchapi.exceptions.JustWatchApiError] with
+    those errors, instead of parsed data. Elements without any data in the response get
+    [`JustWatchError`][simplejustwatchapi.exceptions.JustWatchError]. Other errors
+    (e.g., due to too high complexity) fail the whole response.
+
+    Meant to be used together with [`prepare_nodes_batch_request`]
+    [simplejustwatchapi.query.prepare_nodes_batch_request].
+
+    Args:
+        json (dict[str, Any]): JSON returned by JustWatch GraphQL API.
+        items (list[tuple[str, str]]): Pairs of kind of data and node ID used for
+            preparing the request.
+
+    Returns:
+        (dict[tuple[str, str], Any]): A `dict`, where keys are elements of `items` and
+            values are parsed data for them, or errors for elements which failed.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, which
+            aren't related to a single node.
+
+    """
+    aliases = {f"node{index}": item for index, item in enumerate(items)}
+    node_errors = _node_errors(json, aliases)
+    data = json.get("data") or {}
+    results: dict[tuple[str, str], Any] = {}
+    for alias, (kind, node_id) in aliases.items():
+        if alias in node_errors:
+            results[kind, node_id] = JustWatchApiError(node_errors[alias])
+        elif (node := data.get(alias)) is None:
+            results[kind, node_id] = JustWatchError(f"No data for node ID {node_id}")
+        else:
+            results[kind, node_id] = _parse_batch_node(kind, node)
+    return results
+
+
 def prepare_offers_for_countries_request(
     node_id: str,
     countries: set[str],
@@ -444,6 +1125,98 @@ def parse_offers_for_countries_response(
     }
 
 
+def prepare_offers_matrix_request(
+    node_ids: list[str],
+    countries: set[str],
+    language: str,
+    best_only: bool,
+) -> dict[str, Any]:
+    """
+    Prepare an offers request for multiple node IDs and for all given countries.
+
+    Creates a `GetTitleOffersMatrix` GraphQL query, with a separate `node` for each node
+    ID, each with offers for all countries. Neither `node_ids` nor `countries` can be
+    empty, node IDs aren't deduplicated.
+
+    Country codes should be two uppercase letters, however they will be auto-converted
+    to uppercase. Language code is not verified.
+
+    Meant to be used together with [`parse_offers_matrix_response`]
+    [simplejustwatchapi.query.parse_offers_matrix_response].
+
+    Args:
+        node_ids (list[str]): Node IDs of entries to get offers for.
+        countries (set[str]): Set of country codes to search for offers.
+        language (str): Language of responses.
+        best_only (bool): Return only best offers if `True`,
+            return all offers if `False`.
+
+    Returns:
+        (dict[str, Any]): JSON with GraphQL POST body.
+
+    """
+    if not node_ids or not countries:
+        # This should never happen, client.py should take care of this.
+        # If it will happen API will respond with an error due to empty selection.
+        error_msg = "No node IDs or country codes, should not happen!"
+        raise JustWatchError(error_msg)
+    countries = sorted({country.upper() for country in countries})
+    return {
+        "operationName": "GetTitleOffersMatrix",
+        "variables": {
+            **{f"nodeId{index}": node_id for index, node_id in enumerate(node_ids)},
+            "language": language,
+            **_common_variables(best_only),
+        },
+        "query": graphql_offers_matrix_query(len(node_ids), countries),
+    }
+
+
+def parse_offers_matrix_response(
+    json: dict[str, Any], node_ids: list[str], countries: set[str]
+) -> dict[tuple[str, str], list[Offer]]:
+    """
+    Parse response from offers query for multiple node IDs from JustWatch GraphQL API.
+
+    Parses response for `GetTitleOffersMatrix` query.
+
+    `node_ids` must be the same list which was used for preparing the request, as
+    entries in the response are matched to node IDs by their position. Every pair of
+    node ID and country is present in returned `dict`, if response doesn't have offers
+    for it (or doesn't have the node at all), then its value is an empty list. The only
+    exception are node IDs with errors with `path` pointing to their node - no pairs
+    with them are present, as their offers are unknown.
+
+    Meant to be used together with [`prepare_offers_matrix_request`]
+    [simplejustwatchapi.query.prepare_offers_matrix_request].
+
+    Args:
+        json (dict[str, Any]): JSON returned by JustWatch GraphQL API.
+        node_ids (list[str]): Node IDs used for preparing the request.
+        countries (set[str]): Set of country codes to look for in API response.
+
+    Returns:
+        (dict[tuple[str, str], list[Offer]]): A `dict`, where keys are pairs of node ID
+            and country code (matching `countries` argument), and values are offers
+            for them parsed from JSON response.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors, which
+            aren't related to a single node.
+
+    """
+    aliases = [f"node{index}" for index in range(len(node_ids))]
+    node_errors = _node_errors(json, aliases)
+    data = json.get("data") or {}
+    return {
+        (node_id, country): list(map(_parse_offer, node.get(country.upper()) or []))
+        for node_id, alias in zip(node_ids, aliases, strict=True)
+        if alias not in node_errors
+        for node in [data.get(alias) or {}]
+        for country in countries
+    }
+
+
 def prepare_providers_request(country: str) -> dict[str, Any]:
     """
     Prepare "get all providers" request for JustWatch GraphQL API.
@@ -495,6 +1268,73 @@ def parse_providers_response(json: dict[str, Any]) -> list[OfferPackage]:
     return [_parse_package(package) for package in json["data"]["packages"]]
 
 
+def prepare_providers_for_countries_request(countries: set[str]) -> dict[str, Any]:
+    """
+    Prepare "get all providers" request for all given countries.
+
+    Creates a `GetProvidersForCountries` GraphQL query.
+
+    Country codes should be two uppercase letters, however they will be auto-converted
+    to uppercase. `countries` argument must not be empty.
+
+    Meant to be used together with [`parse_providers_for_countries_response`]
+    [simplejustwatchapi.query.parse_providers_for_countries_response].
+
+    Args:
+        countries (set[str]): Set of country codes to look up providers for.
+
+    Returns:
+        (dict[str, Any]): JSON with GraphQL POST body.
+
+    """
+    if not countries:
+        # This should never happen, client.py should take care of this.
+        # If it will happen API will respond with an error due to empty selection.
+        error_msg = "No country codes, should not happen!"
+        raise JustWatchError(error_msg)
+    countries = sorted({country.upper() for country in countries})
+    return {
+        "operationName": "GetProvidersForCountries",
+        "variables": {"formatOfferIcon": "PNG"},
+        "query": graphql_providers_for_countries_query(countries),
+    }
+
+
+def parse_providers_for_countries_response(
+    json: dict[str, Any], countries: set[str]
+) -> dict[str, list[OfferPackage]]:
+    """
+    Parse response from "get all providers" query for multiple countries.
+
+    Parses response for `GetProvidersForCountries` query.
+
+    Response is searched for country codes passed as `countries` argument. If response
+    doesn't have providers for a country, then that country still will be present in
+    returned `dict`, just with an empty list as value.
+
+    Meant to be used together with [`prepare_providers_for_countries_request`]
+    [simplejustwatchapi.query.prepare_providers_for_countries_request].
+
+    Args:
+        json (dict[str, Any]): JSON returned by JustWatch GraphQL API.
+        countries (set[str]): Set of country codes to look for in API response.
+
+    Returns:
+        (dict[str, list[OfferPackage]]): A `dict`, where keys are matching `countries`
+            argument and values are providers for a given country.
+
+    Raises:
+        exceptions.JustWatchApiError: JSON response from API has internal errors.
+
+    """
+    _raise_for_errors_in_response(json)
+    data = json["data"]
+    return {
+        country: list(map(_parse_package, data.get(country.upper()) or []))
+        for country in countries
+    }
+
+
 def _common_variables(best_only: bool) -> dict[str, Any]:
     """Return dict with variables common for queries."""
     return {
@@ -517,6 +1357,47 @@ def _raise_for_errors_in_response(json: dict[str, Any]) -> None:
         raise JustWatchApiError(json["errors"])
 
 
+def _node_errors(json: dict[str, Any], aliases: Collection[str]) -> dict[str, list]:
+    """
+    Group errors from given JSON by aliases of nodes from their `path`.
+
+    Raise JustWatchApiError if any error isn't related to a single node from `aliases`,
+    or if `errors` are present, but empty.
+    """
+    node_errors: dict[str, list] = {}
+    for error in json.get("errors", []):
+        path = error.get("path") if isinstance(error, dict) else None
+        if not path or path[0] not in aliases:
+            raise JustWatchApiError(json["errors"])
+        node_errors.setdefault(path[0], []).append(error)
+    if "errors" in json and not node_errors:
+        raise JustWatchApiError(json["errors"])
+    return node_errors
+
+
+def _successful_nodes(json: dict[str, Any], count: int) -> dict[int, Any]:
+    """Return data of aliased nodes by their index, skip failed and empty nodes."""
+    aliases = [f"node{index}" for index in range(count)]
+    node_errors = _node_errors(json, aliases)
+    data = json.get("data") or {}
+    return {
+        index: node
+        for index, alias in enumerate(aliases)
+        if alias not in node_errors and (node := data.get(alias)) is not None
+    }
+
+
+def _parse_batch_node(kind: str, json: Any) -> Any:
+    """Parse a single node from batch response, based on kind of requested data."""
+    match kind:
+        case "seasons":
+            return [_parse_entry(season) for season in json.get("seasons", [])]
+        case "episodes":
+            return [_parse_episode(episode) for episode in json.get("episodes", [])]
+        case _:
+            return _parse_entry(json)
+
+
 def _parse_entry(json: Any) -> MediaEntry:
     entry_id = json.get("id")
     object_id = json.get("objectId")
@@ -0,0 +1,125 @@
+"""
+Client-side rate limiting of requests sent to JustWatch API.
+
+[`RateLimiter`][simplejustwatchapi.ratelimit.RateLimiter] is a token bucket - it allows
+for a short burst of requests, then steadily lets through requests at a configured rate.
+It's meant to be passed to [`JustWatchClient`]
+[simplejustwatchapi.client.JustWatchClient] or [`AsyncJustWatchClient`]
+[simplejustwatchapi.client.AsyncJustWatchClient]:
+
+```python
+from simplejustwatchapi import JustWatchClient, RateLimiter
+
+client = JustWatchClient(rate_limiter=RateLimiter(rate=10, burst=20))
+```
+
+The same limiter can be shared by multiple clients (including both sync and async
+ones), then the rate is shared between all of them.
+"""
+
+from asyncio import sleep as async_sleep
+from threading import Lock
+from time import monotonic, sleep
+
+from simplejustwatchapi.exceptions import JustWatchError
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how many requests per second can be sent.
+
+    Bucket holds up to `burst` tokens and is refilled with `rate` tokens per second.
+    Each request takes one token, if there are none, request waits until one is
+    available. Waiting requests are let through in order in which they arrived.
+
+    Limiter is safe to use from multiple threads and from multiple `asyncio` tasks at
+    the same time. Internal lock is held only to calculate how long a request has to
+    wait, waiting itself is done without it, so it never blocks an event loop.
+
+    Args:
+        rate (float): How many requests per second are allowed on average.
+        burst (int): Maximum number of requests which can be sent at once, after a
+            period of inactivity.
+
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """Init RateLimiter with a full bucket."""
+        if rate <= 0 or burst < 1:
+            error_msg = f"Invalid rate limiter config: {rate=}, {burst=}"
+            raise JustWatchError(error_msg)
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._lock = Lock()
+
+    @property
+    def rate(self) -> float:
+        """How many requests per second are allowed on average."""
+        return self._rate
+
+    @property
+    def burst(self) -> int:
+        """Maximum number of requests which can be sent at once."""
+        return self._burst
+
+    def acquire(self, max_wait: float | None = None) -> None:
+        """
+        Take a token, block current thread until it's available.
+
+        Args:
+            max_wait (float | None): Maximal time in seconds to wait for a token, no
+                limit for `None`.
+
+        Raises:
+            TimeoutError: Token won't be available within `max_wait`, nothing is taken.
+
+        """
+        if delay := self._reserve(max_wait):
+            sleep(delay)
+
+    async def acquire_async(self, max_wait: float | None = None) -> None:
+        """
+        Take a token, wait (without blocking event loop) until it's available.
+
+        Args:
+            max_wait (float | None): Maximal time in seconds to wait for a token, no
+                limit for `None`.
+
+        Raises:
+            TimeoutError: Token won't be available within `max_wait`, nothing is taken.
+
+        """
+        if delay := self._reserve(max_wait):
+            await async_sleep(delay)
+
+    def _reserve(self, max_wait: float | None) -> float:
+        """
+        Reserve a token, return how long the caller has to wait for it.
+
+        Number of tokens can go below zero - each waiting request holds a reservation
+        for a future token, so later requests will wait longer. Reservation isn't made
+        if the caller can't wait long enough for it.
+
+        Args:
+            max_wait (float | None): Maximal time in seconds the caller can wait.
+
+        Returns:
+            (float): Time in seconds after which reserved token is available.
+
+        Raises:
+            TimeoutError: Token won't be available within `max_wait`.
+
+        """
+        with self._lock:
+            now = monotonic()
+            elapsed = now - self._updated
+            self._tokens = min(self._burst, self._tokens + elapsed * self._rate)
+            self._updated = now
+            delay = max(0.0, (1 - self._tokens) / self._rate)
+            if max_wait is not None and delay > max(0.0, max_wait):
+                error_msg = f"Rate limiter token available in {delay:.3f}s"
+                raise TimeoutError(error_msg)
+            self._tokens -= 1
+            return delay
@@ -0,0 +1,124 @@
+"""
+Retrying requests which failed due to transient HTTP errors.
+
+[`RetryPolicy`][simplejustwatchapi.retry.RetryPolicy] describes which failed requests
+should be retried and how long to wait before each retry. It's meant to be passed to
+[`JustWatchClient`][simplejustwatchapi.client.JustWatchClient] or
+[`AsyncJustWatchClient`][simplejustwatchapi.client.AsyncJustWatchClient]:
+
+```python
+from simplejustwatchapi import JustWatchClient, RetryPolicy
+
+client = JustWatchClient(retry=RetryPolicy(max_attempts=5))
+```
+
+Only HTTP-related errors are retried - responses with one of selected status codes
+(by default `429` and `5xx` codes related to unavailable server), and network errors,
+like connection resets or timeouts. Errors returned by the API in JSON response are
+never retried, as repeating the same query won't fix them.
+
+Delay before each retry grows exponentially, with random "jitter" so multiple clients
+don't retry at exactly the same time. If response has a `Retry-After` header, then it's
+used instead.
+"""
+
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from random import uniform
+from typing import NamedTuple
+
+from httpx import HTTPError, HTTPStatusError, Response, TransportError
+
+DEFAULT_RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+"""Status codes retried by default - rate limiting and unavailable server."""
+
+
+class RetryPolicy(NamedTuple):
+    """
+    Configuration of retries for requests which failed due to transient errors.
+
+    Delay before `n`-th retry (starting from 0) is `backoff * 2 ** n` seconds, capped at
+    `max_backoff`. With `jitter` the delay is instead a random value between 0 and that
+    number ("full jitter"), spreading retries from multiple clients over time.
+
+    Attributes:
+        max_attempts (int): Maximum number of attempts for a single request, including
+            the first one. `1` means no retries.
+        backoff (float): Base delay in seconds before the first retry.
+        max_backoff (float): Maximum delay in seconds before any retry, including delay
+            requested through `Retry-After` header.
+        jitter (bool): Whether to randomize delays.
+        retry_status_codes (frozenset[int]): HTTP status codes which should be retried.
+        retry_network_errors (bool): Whether to retry network errors, e.g., connection
+            errors, or timeouts.
+        respect_retry_after (bool): Whether to use delay from `Retry-After` header, if
+            response has one.
+
+    """
+
+    max_attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    jitter: bool = True
+    retry_status_codes: frozenset[int] = DEFAULT_RETRY_STATUS_CODES
+    retry_network_errors: bool = True
+    respect_retry_after: bool = True
+
+    def is_retryable(self, error: HTTPError) -> bool:
+        """
+        Check if request which failed with given error can be retried.
+
+        Args:
+            error (HTTPError): Error from the failed request.
+
+        Returns:
+            (bool): `True` if error is transient, and request should be retried.
+
+        """
+        if isinstance(error, HTTPStatusError):
+            return error.response.status_code in self.retry_status_codes
+        return self.retry_network_errors and isinstance(error, TransportError)
+
+    def delay(self, retry: int, error: HTTPError) -> float:
+        """
+        Calculate how long to wait before a given retry.
+
+        Args:
+            retry (int): Number of the retry, starting from 0 for the first retry.
+            error (HTTPError): Error from the failed request.
+
+        Returns:
+            (float): Delay in seconds before retrying the request.
+
+        """
+        if (
+            self.respect_retry_after
+            and isinstance(error, HTTPStatusError)
+            and (retry_after := _parse_retry_after(error.response)) is not None
+        ):
+            return min(retry_after, self.max_backoff)
+        delay = min(self.backoff * 2**retry, self.max_backoff)
+        return uniform(0, delay) if self.jitter else delay  # noqa: S311
+
+
+def _parse_retry_after(response: Response) -> float | None:
+    """
+    Parse `Retry-After` header, either as number of seconds or an HTTP date.
+
+    Returns:
+        (float | None): Number of seconds to wait, `None` if there's no valid header.
+
+    """
+    if not (value := response.headers.get("Retry-After")):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=UTC)
+    return max(0.0, (retry_date - datetime.now(UTC)).total_seconds())
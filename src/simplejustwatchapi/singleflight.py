@@ -0,0 +1,150 @@
+"""
+Coalescing of identical requests sent at the same time ("single-flight").
+
+If a request is sent while an identical one is already in flight, then instead of
+sending it again, it waits for the in-flight request and gets the same response.
+Both clients do this by default for all requests, which helps with bursts of calls
+for the same data, e.g., many concurrent calls to `details` for the same trending title.
+
+Requests are identical if their JSON bodies (as created by `prepare_*_request`
+functions from [`query`][simplejustwatchapi.query] module) are equal, regardless of
+order of keys. Only requests which are in flight at the same time are coalesced,
+there's no caching of responses.
+"""
+
+from asyncio import CancelledError, Future, get_running_loop, shield, wait_for
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future as ThreadFuture
+from json import dumps
+from threading import Lock
+from typing import Any
+
+
+def request_key(request_json: dict[str, Any]) -> str:
+    """
+    Get canonical form of a request JSON, equal for all identical requests.
+
+    Args:
+        request_json (dict[str, Any]): JSON with full request - GraphQL query and
+            variables.
+
+    Returns:
+        (str): Request JSON serialized with sorted keys and no whitespace.
+
+    """
+    return dumps(request_json, sort_keys=True, separators=(",", ":"))
+
+
+class SingleFlight:
+    """
+    Coalescing of identical function calls made concurrently from multiple threads.
+
+    The first thread calling [`do`][simplejustwatchapi.singleflight.SingleFlight.do]
+    with a given key runs the function, other threads calling it with the same key in
+    the meantime wait for it and get the same result, or the same exception.
+    """
+
+    def __init__(self) -> None:
+        """Init SingleFlight without any calls in flight."""
+        self._lock = Lock()
+        self._calls: dict[str, ThreadFuture[Any]] = {}
+
+    def do(
+        self, key: str, function: Callable[[], Any], max_wait: float | None = None
+    ) -> Any:
+        """
+        Call function, or wait for result of an in-flight call with the same key.
+
+        Args:
+            key (str): Key identifying identical calls.
+            function (Callable[[], Any]): Function to call, if there's no in-flight call
+                with the same key.
+            max_wait (float | None): Maximal time in seconds to wait for an in-flight
+                call, no limit for `None`. It doesn't limit the call itself.
+
+        Returns:
+            (Any): Result of the function call.
+
+        Raises:
+            TimeoutError: In-flight call didn't finish within `max_wait`.
+
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if leader := future is None:
+                future = self._calls[key] = ThreadFuture()
+        if not leader:
+            return future.result(max_wait)
+        try:
+            result = function()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """
+    Coalescing of identical coroutine calls made concurrently from multiple tasks.
+
+    The first task calling [`do`][simplejustwatchapi.singleflight.AsyncSingleFlight.do]
+    with a given key awaits the coroutine, other tasks calling it with the same key in
+    the meantime wait for it and get the same result, or the same exception.
+
+    If the first task is cancelled, one of the waiting tasks takes over and sends the
+    request again, instead of all of them being cancelled as well.
+    """
+
+    def __init__(self) -> None:
+        """Init AsyncSingleFlight without any calls in flight."""
+        self._calls: dict[str, Future[Any]] = {}
+
+    async def do(
+        self,
+        key: str,
+        function: Callable[[], Awaitable[Any]],
+        max_wait: float | None = None,
+    ) -> Any:
+        """
+        Await coroutine, or wait for result of an in-flight call with the same key.
+
+        Args:
+            key (str): Key identifying identical calls.
+            function (Callable[[], Awaitable[Any]]): Coroutine function to await, if
+                there's no in-flight call with the same key.
+            max_wait (float | None): Maximal time in seconds to wait for an in-flight
+                call, no limit for `None`. It doesn't limit the call itself.
+
+        Returns:
+            (Any): Result of the coroutine.
+
+        Raises:
+            TimeoutError: In-flight call didn't finish within `max_wait`.
+
+        """
+        while (future := self._calls.get(key)) is not None:
+            try:
+                return await wait_for(shield(future), max_wait)
+            except CancelledError:
+                if not future.cancelled():
+                    raise
+        future = self._calls[key] = get_running_loop().create_future()
+        try:
+            result = await function()
+        except CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            future.exception()  # Mark as retrieved, there might be no other waiters.
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
@@ -0,0 +1,164 @@
+"""
+Splitting requests rejected by JustWatch API due to too high complexity.
+
+JustWatch API rejects requests returning too large graphs, e.g., [`popular`]
+[simplejustwatchapi.justwatch.popular] with high `count`, or [`offers_for_countries`]
+[simplejustwatchapi.justwatch.offers_for_countries] for a lot of countries. Normally
+[`JustWatchApiError`][simplejustwatchapi.exceptions.JustWatchApiError] is raised, and
+the whole call fails. [`SplitPolicy`][simplejustwatchapi.splitting.SplitPolicy] can be
+passed to [`JustWatchClient`][simplejustwatchapi.client.JustWatchClient] or
+[`AsyncJustWatchClient`][simplejustwatchapi.client.AsyncJustWatchClient] to split such
+requests instead:
+
+```python
+from simplejustwatchapi import JustWatchClient, SplitPolicy
+
+client = JustWatchClient(splitting=SplitPolicy())
+entries = client.popular(count=500)
+```
+
+Rejected request is split in half, and both halves are sent separately (and split
+further, if needed). Results of all parts are merged, so the call returns the same data
+as a single request would. How requests are split depends on the operation:
+
+- [`search`][simplejustwatchapi.justwatch.search] and [`popular`]
+[simplejustwatchapi.justwatch.popular] - `count` is halved, second half uses `offset`.
+- [`offers_for_countries`][simplejustwatchapi.justwatch.offers_for_countries],
+[`popular_for_countries`][simplejustwatchapi.justwatch.popular_for_countries], and
+[`providers_for_countries`][simplejustwatchapi.justwatch.providers_for_countries] - set
+of countries is split.
+- [`details_for_locales`][simplejustwatchapi.justwatch.details_for_locales] - set of
+locales is split.
+- [`details_many`][simplejustwatchapi.justwatch.details_many], [`episodes_many`]
+[simplejustwatchapi.justwatch.episodes_many], [`seasons_many`]
+[simplejustwatchapi.justwatch.seasons_many], and [`offers_matrix`]
+[simplejustwatchapi.justwatch.offers_matrix] - set of node IDs is split.
+- [`search_many`][simplejustwatchapi.justwatch.search_many] - set of titles is split.
+
+Policy remembers the largest size which worked after a split for each operation, so
+later calls are split into parts of that size right away, without sending requests which
+would be rejected anyway. For operations where size of each element depends on other
+arguments, they are a part of the operation name, e.g., `"search_many(count=50)"` for
+[`search_many`][simplejustwatchapi.justwatch.search_many] with `count=50`, and
+`"offers_matrix(countries=20)"` for [`offers_matrix`]
+[simplejustwatchapi.justwatch.offers_matrix] for 20 countries.
+
+Other operations always send a single request, so they can't be split.
+"""
+
+from threading import Lock
+
+from simplejustwatchapi.exceptions import JustWatchApiError, JustWatchError
+
+
+class SplitPolicy:
+    """
+    Policy of splitting requests rejected for too high complexity.
+
+    Error from API is considered a complexity error, if `message` or `code` of any of
+    its errors contains one of `markers` (case-insensitive). Parts are split until
+    they have `min_size` elements, if even such part is rejected, then the error is
+    raised.
+
+    Policy is safe to use from multiple threads and from multiple `asyncio` tasks at the
+    same time (including sharing it between sync and async clients).
+
+    Args:
+        min_size (int): The smallest number of elements in a single request.
+        markers (tuple[str, ...]): Fragments of error messages or codes, which mark
+            complexity errors.
+
+    Raises:
+        exceptions.JustWatchError: Configuration is invalid.
+
+    """
+
+    def __init__(
+        self, min_size: int = 1, markers: tuple[str, ...] = ("complexity",)
+    ) -> None:
+        """Init SplitPolicy without any remembered sizes."""
+        if min_size < 1 or not markers:
+            error_msg = f"Invalid split config: {min_size=}, {markers=}"
+            raise JustWatchError(error_msg)
+        self._min_size = min_size
+        self._markers = tuple(marker.lower() for marker in markers)
+        self._rejected: dict[str, int] = {}
+        self._sizes: dict[str, int] = {}
+        self._lock = Lock()
+
+    @property
+    def sizes(self) -> dict[str, int]:
+        """
+        Largest sizes which worked after a split, for each operation name.
+
+        Names of operations with elements of variable size include their list sizes,
+        e.g., `"popular_for_countries(count=100)"`.
+        """
+        with self._lock:
+            return dict(self._sizes)
+
+    def is_complexity_error(self, error: JustWatchApiError) -> bool:
+        """
+        Check if API error was caused by too high complexity of the request.
+
+        Args:
+            error (JustWatchApiError): Error raised for a response from API.
+
+        Returns:
+            (bool): Whether any of errors in the response matches one of `markers`.
+
+        """
+        return any(
+            marker in str(details.get(key, "")).lower()
+            for details in error.errors
+            if isinstance(details, dict)
+            for key in ("message", "code")
+            for marker in self._markers
+        )
+
+    def start_size(self, operation: str, size: int) -> int:
+        """
+        Return size of parts, which a request should be split into before sending it.
+
+        Args:
+            operation (str): Name of the operation, e.g., `"popular"`.
+            size (int): Number of elements in the whole request.
+
+        Returns:
+            (int): The largest remembered size for the operation, or `size` if it's
+                smaller, or nothing is remembered yet.
+
+        """
+        with self._lock:
+            return max(1, min(size, self._sizes.get(operation, size)))
+
+    def split(self, operation: str, size: int, error: JustWatchApiError) -> int:
+        """
+        Record a rejected request, return size of its first half.
+
+        Args:
+            operation (str): Name of the operation, e.g., `"popular"`.
+            size (int): Number of elements in the rejected request.
+            error (JustWatchApiError): Error raised for the response.
+
+        Returns:
+            (int): Number of elements in the first half of the request.
+
+        Raises:
+            exceptions.JustWatchApiError: Given error, if it's not a complexity error,
+                or request is already too small to split.
+
+        """
+        if size <= self._min_size or not self.is_complexity_error(error):
+            raise error
+        with self._lock:
+            self._rejected[operation] = min(self._rejected.get(operation, size), size)
+            if self._sizes.get(operation, 0) >= size:
+                del self._sizes[operation]
+        return max(self._min_size, (size + 1) // 2)
+
+    def succeeded(self, operation: str, size: int) -> None:
+        """Remember size of a successful request, if larger requests were rejected."""
+        with self._lock:
+            if size < self._rejected.get(operation, 0):
+                self._sizes[operation] = max(self._sizes.get(operation, 0), size)
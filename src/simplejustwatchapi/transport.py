@@ -0,0 +1,240 @@
+"""
+Transports recording and replaying requests sent to JustWatch GraphQL API.
+
+Clients send requests through an [`httpx` transport](https://www.python-httpx.org/advanced/transports/).
+By default it's a regular network transport (`httpx.HTTPTransport` for
+[`JustWatchClient`][simplejustwatchapi.client.JustWatchClient] and
+`httpx.AsyncHTTPTransport` for [`AsyncJustWatchClient`]
+[simplejustwatchapi.client.AsyncJustWatchClient]), but any other transport can be
+passed through `transport` argument.
+
+This module has two additional transports, both usable with sync and async clients:
+
+- [`RecordingTransport`][simplejustwatchapi.transport.RecordingTransport] sends
+requests through a regular network transport, and writes each request and response pair
+into a file.
+- [`ReplayTransport`][simplejustwatchapi.transport.ReplayTransport] doesn't send any
+requests, instead it serves responses from such file, with configurable synthetic
+latency.
+
+Together they allow for running the whole prepare → send → parse pipeline offline, e.g.,
+for deterministic tests or throughput benchmarks:
+
+```python
+from simplejustwatchapi import JustWatchClient, RecordingTransport, ReplayTransport
+
+with JustWatchClient(transport=RecordingTransport("recording.jsonl")) as client:
+    client.search("The Matrix")
+
+replay = ReplayTransport("recording.jsonl", latency=0.1)
+with JustWatchClient(transport=replay) as client:
+    client.search("The Matrix")  # No request is sent to JustWatch API.
+```
+
+Recording is a [JSON Lines](https://jsonlines.org/) file, each line holds a single
+request and response pair. Requests are matched by method, URL path with query
+parameters, and JSON body (regardless of order of keys), so recordings made with the
+real API can be replayed with any `url` configured in a client.
+"""
+
+from asyncio import sleep as async_sleep
+from json import JSONDecodeError, dumps, loads
+from pathlib import Path
+from random import uniform
+from threading import Lock
+from time import sleep
+from typing import Any
+
+from httpx import (
+    AsyncBaseTransport,
+    AsyncHTTPTransport,
+    BaseTransport,
+    HTTPTransport,
+    Request,
+    Response,
+)
+
+from simplejustwatchapi.exceptions import JustWatchError
+
+_RECORDED_HEADERS = {"content-type", "retry-after"}
+
+
+class RecordingTransport(BaseTransport, AsyncBaseTransport):
+    """
+    Transport sending requests over the network and recording them into a file.
+
+    Each request and response pair is appended to the file as soon as the response is
+    received, so it's safe to record from multiple threads or tasks at the same time.
+
+    Args:
+        path (str | Path): Path to file with recordings, new recordings are appended to
+            it, if it already exists.
+        transport (BaseTransport | AsyncBaseTransport | None): Transport sending the
+            requests. If `None`, then default `httpx` transport is used, matching the
+            type of the client (sync or async).
+
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        transport: BaseTransport | AsyncBaseTransport | None = None,
+    ) -> None:
+        """Init RecordingTransport for a given file."""
+        self._path = Path(path)
+        self._transport = transport
+        self._lock = Lock()
+
+    def handle_request(self, request: Request) -> Response:
+        """Send request through the wrapped transport, record it and its response."""
+        if self._transport is None:
+            self._transport = HTTPTransport()
+        response = self._transport.handle_request(request)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        return self._record(request, response, content)
+
+    async def handle_async_request(self, request: Request) -> Response:
+        """Send request through the wrapped transport, record it and its response."""
+        if self._transport is None:
+            self._transport = AsyncHTTPTransport()
+        response = await self._transport.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        return self._record(request, response, content)
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        if self._transport is not None:
+            self._transport.close()
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        if self._transport is not None:
+            await self._transport.aclose()
+
+    def _record(self, request: Request, response: Response, content: bytes) -> Response:
+        """Append request and response to the file, return a fully read response."""
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name in _RECORDED_HEADERS
+        }
+        recording = {
+            "request": {
+                "method": request.method,
+                "url": _request_target(request),
+                "body": request.content.decode(),
+            },
+            "response": {
+                "status_code": response.status_code,
+                "headers": headers,
+                "body": content.decode(),
+            },
+        }
+        with self._lock, self._path.open("a", encoding="utf-8") as file:
+            file.write(dumps(recording) + "\n")
+        return Response(response.status_code, headers=headers, content=content)
+
+
+class ReplayTransport(BaseTransport, AsyncBaseTransport):
+    """
+    Transport serving recorded responses, without sending any requests.
+
+    Each response is served after a synthetic latency, a random value between `latency`
+    and `latency + jitter` seconds. Sync clients block the current thread for that time,
+    async clients wait without blocking the event loop.
+
+    If the same request was recorded multiple times, then the last recorded response is
+    used. Recorded responses can be served any number of times.
+
+    Args:
+        path (str | Path): Path to file with recordings, created by
+            [`RecordingTransport`][simplejustwatchapi.transport.RecordingTransport].
+        latency (float): Minimal delay in seconds before each response.
+        jitter (float): Maximal additional random delay in seconds.
+
+    Raises:
+        exceptions.JustWatchError: Recording file can't be read.
+
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+    ) -> None:
+        """Init ReplayTransport, loading all recordings from a file."""
+        self._latency = latency
+        self._jitter = jitter
+        self._responses: dict[tuple[str, str, str], dict[str, Any]] = {}
+        try:
+            lines = Path(path).read_text(encoding="utf-8").splitlines()
+            for line in filter(None, lines):
+                recording = loads(line)
+                key = _recording_key(**recording["request"])
+                self._responses[key] = recording["response"]
+        except (OSError, JSONDecodeError, KeyError, TypeError) as error:
+            error_msg = f"Invalid recording file {path}: {error}"
+            raise JustWatchError(error_msg) from error
+
+    def handle_request(self, request: Request) -> Response:
+        """
+        Return recorded response for a request, after synthetic latency.
+
+        Raises:
+            exceptions.JustWatchError: There's no recorded response for the request.
+
+        """
+        response = self._response(request)
+        if delay := self._delay():
+            sleep(delay)
+        return response
+
+    async def handle_async_request(self, request: Request) -> Response:
+        """
+        Return recorded response for a request, after synthetic latency.
+
+        Raises:
+            exceptions.JustWatchError: There's no recorded response for the request.
+
+        """
+        response = self._response(request)
+        if delay := self._delay():
+            await async_sleep(delay)
+        return response
+
+    def _response(self, request: Request) -> Response:
+        """Find recorded response for a request."""
+        key = _recording_key(
+            request.method, _request_target(request), request.content.decode()
+        )
+        if (recorded := self._responses.get(key)) is None:
+            error_msg = f"No recorded response for {request.method} {key[1]}"
+            raise JustWatchError(error_msg)
+        return Response(
+            recorded["status_code"],
+            headers=recorded["headers"],
+            content=recorded["body"].encode(),
+        )
+
+    def _delay(self) -> float:
+        """Return synthetic latency for a single response."""
+        return self._latency + uniform(0, self._jitter)  # noqa: S311
+
+
+def _request_target(request: Request) -> str:
+    """Return URL path with query parameters, without scheme and host."""
+    return request.url.raw_path.decode()
+
+
+def _recording_key(method: str, url: str, body: str) -> tuple[str, str, str]:
+    """Return key matching identical requests, regardless of order of JSON keys."""
+    if body:
+        body = dumps(loads(body), sort_keys=True, separators=(",", ":"))
+    return method, url, body
@@ -274,3 +274,23 @@ class MediaEntry(NamedTuple):
     total_episode_count: int | None
     season_number: int | None
     episode_number: int | None
+
+
+class ShowTree(NamedTuple):
+    """
+    Parsed show together with all of its seasons and their episodes.
+
+    Returned by [`show_tree`][simplejustwatchapi.justwatch.show_tree] function.
+
+    Attributes:
+        show (MediaEntry): Full details of the show itself.
+        seasons (list[MediaEntry]): Full details of all seasons of the show, in
+            ascending order.
+        episodes (dict[str, list[Episode]]): Episodes of each season, in ascending
+            order. Keys are `entry_id` of seasons in `seasons` list.
+
+    """
+
+    show: MediaEntry
+    seasons: list[MediaEntry]
+    episodes: dict[str, list[Episode]]
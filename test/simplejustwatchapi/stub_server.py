@@ -0,0 +1,188 @@
+"""
+Local stand-in for JustWatch GraphQL API, for tests which need a real HTTP server.
+
+Server runs in a background thread on a random local port, responds with canned JSON
+responses selected by operation name, and records all received requests. It implements
+automatic persisted queries handshake - it stores queries sent together with their
+hashes, and responds with `PersistedQueryNotFound` for unknown hashes.
+
+Server can also simulate overload - responses are delayed by fixed latency, and
+requests over configured capacity (number of concurrent requests) are either rejected
+with a given status code, or delayed proportionally to how overloaded the server is.
+Capacity and latency can be changed at any point, to script different phases of load.
+"""
+
+from contextlib import suppress
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps, loads
+from threading import Lock, Thread
+from time import sleep
+from types import TracebackType
+from typing import Any, NamedTuple, Self
+from urllib.parse import parse_qsl, urlsplit
+
+
+class StubRequest(NamedTuple):
+    """Request received by the stub server."""
+
+    method: str
+    json: dict[str, Any]
+    size: int
+
+
+class StubServer:
+    """
+    Local stand-in for JustWatch GraphQL API, used as a context manager.
+
+    Args:
+        responses (dict[str, dict[str, Any]]): JSON responses for each operation name.
+        persisted_queries (bool): Whether server supports persisted queries, if not, it
+            responds with `PersistedQueryNotSupported` to all hash-only requests.
+        latency (float): Delay in seconds before each response.
+        capacity (int | None): Number of concurrent requests server can handle without
+            being overloaded, no limit for `None`.
+        overload_status (int | None): Status code returned immediately for requests
+            over capacity. If `None`, then such requests are instead delayed by
+            `latency` multiplied by how many times capacity is exceeded.
+
+    """
+
+    def __init__(
+        self,
+        responses: dict[str, dict[str, Any]],
+        persisted_queries: bool = True,
+        latency: float = 0.0,
+        capacity: int | None = None,
+        overload_status: int | None = 429,
+    ) -> None:
+        """Init StubServer listening on a random local port."""
+        self.responses = responses
+        self.persisted_queries = persisted_queries
+        self.latency = latency
+        self.capacity = capacity
+        self.overload_status = overload_status
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.rejected = 0
+        self.queries: dict[str, str] = {}
+        self.requests: list[StubRequest] = []
+        self._lock = Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self._server.stub = self
+        self._thread = Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.01},
+            daemon=True,
+        )
+
+    @property
+    def url(self) -> str:
+        """URL of GraphQL endpoint of this server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/graphql"
+
+    def __enter__(self) -> Self:
+        """Start the server in a background thread."""
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, request: StubRequest) -> tuple[int, dict[str, Any]]:
+        """
+        Record request and prepare a response for it.
+
+        Args:
+            request (StubRequest): Received request.
+
+        Returns:
+            (tuple[int, dict[str, Any]]): Response status code and JSON.
+
+        """
+        with self._lock:
+            self.requests.append(request)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            latency = self._latency()
+            if latency is None:
+                self.rejected += 1
+            query = self._query(request.json)
+        try:
+            if latency is None:
+                return self.overload_status, _errors("Server overloaded")
+            sleep(latency)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        if isinstance(query, dict):
+            return 200, query
+        if query is None:
+            return 400, _errors("Missing query")
+        return 200, self.responses[request.json["operationName"]]
+
+    def _latency(self) -> float | None:
+        """Get latency for current load, `None` if request should be rejected."""
+        if self.capacity is None or self.in_flight <= self.capacity:
+            return self.latency
+        if self.overload_status is not None:
+            return None
+        return self.latency * self.in_flight / self.capacity
+
+    def _query(self, json: dict[str, Any]) -> str | dict[str, Any] | None:
+        """Get query for request, or error response for persisted query handshake."""
+        persisted = json.get("extensions", {}).get("persistedQuery")
+        if persisted is None:
+            return json.get("query")
+        if not self.persisted_queries:
+            return _errors("PersistedQueryNotSupported")
+        query_hash = persisted["sha256Hash"]
+        if (query := json.get("query")) is not None:
+            if sha256(query.encode()).hexdigest() != query_hash:
+                return _errors("provided sha does not match query")
+            self.queries[query_hash] = query
+        return self.queries.get(query_hash) or _errors("PersistedQueryNotFound")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Handler passing requests to `StubServer`."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        params = dict(parse_qsl(urlsplit(self.path).query))
+        json = {
+            key: value if key in {"operationName", "query"} else loads(value)
+            for key, value in params.items()
+        }
+        self._respond(StubRequest("GET", json, len(self.path)))
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self._respond(StubRequest("POST", loads(body), len(body)))
+
+    def _respond(self, request: StubRequest) -> None:
+        status, json = self.server.stub.respond(request)
+        body = dumps(json).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        with suppress(ConnectionError):  # Client might've given up already.
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        """Don't log requests to stderr."""
+
+
+def _errors(message: str) -> dict[str, Any]:
+    """Return GraphQL error response with given message."""
+    return {"errors": [{"message": message}]}
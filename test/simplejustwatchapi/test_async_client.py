@@ -0,0 +1,462 @@
+from asyncio import CancelledError, gather, run
+from asyncio import Event as AsyncEvent
+from asyncio import sleep as async_sleep
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from httpx import ConnectError, Request, RequestError, Response
+from pytest import fixture, mark, raises
+
+from simplejustwatchapi.client import (
+    DEFAULT_LIMITS,
+    DEFAULT_TIMEOUT,
+    AsyncJustWatchClient,
+)
+from simplejustwatchapi.exceptions import JustWatchHttpError
+from simplejustwatchapi.retry import RetryPolicy
+from simplejustwatchapi.tuples import ShowTree
+
+JUSTWATCH_GRAPHQL_URL = "https://apis.justwatch.com/graphql"
+
+SEARCH_INPUT = ("TITLE", "COUNTRY", "LANGUAGE", 5, True, 10, ["prov1", "prov2"])
+POPULAR_INPUT = ("COUNTRY", "LANGUAGE", 5, True, 10, ["prov1", "prov2"])
+DETAILS_INPUT = ("NODE ID", "COUNTRY", "LANGUAGE", False)
+OFFERS_COUNTRIES_INPUT = {"COUNTRY1", "COUNTRY2", "COUNTRY3"}
+OFFERS_INPUT = ("NODE ID", OFFERS_COUNTRIES_INPUT, "LANGUAGE", True)
+PROVIDERS_INPUT = ("US",)
+
+REQUEST = {"dummy": "request"}
+DUMMY_RESPONSE = {"dummy": "response"}
+ENTRIES = [MagicMock(), MagicMock(), None]
+
+REQUEST_ERROR_MESSAGE = "HTTP request error"
+RESPONSE_ERROR_STATUS_CODE = 420
+RESPONSE_ERROR_MESSAGE = "HTTP response error"
+
+ALL_OPERATIONS = [
+    ("search", SEARCH_INPUT),
+    ("popular", POPULAR_INPUT),
+    ("details", DETAILS_INPUT),
+    ("seasons", DETAILS_INPUT),
+    ("episodes", DETAILS_INPUT),
+    ("offers_for_countries", OFFERS_INPUT),
+    ("providers", PROVIDERS_INPUT),
+]
+
+
+@fixture
+def http_client_mock(mocker):
+    http_client_mock = mocker.patch("simplejustwatchapi.client.AsyncClient")
+    http_client_mock.return_value.post = AsyncMock()
+    http_client_mock.return_value.aclose = AsyncMock()
+    return http_client_mock
+
+
+@fixture
+def post_mock_success(http_client_mock):
+    post_mock = http_client_mock.return_value.post
+    post_mock.return_value = MagicMock()
+    post_mock.return_value.json.return_value = DUMMY_RESPONSE
+    return post_mock
+
+
+@fixture
+def post_mock_request_error(http_client_mock):
+    post_mock = http_client_mock.return_value.post
+    post_mock.side_effect = RequestError(REQUEST_ERROR_MESSAGE)
+    return post_mock
+
+
+@fixture
+def post_mock_status_error(http_client_mock):
+    post_mock = http_client_mock.return_value.post
+    mock_request = Request(method="POST", url=JUSTWATCH_GRAPHQL_URL)
+    post_mock.return_value = Response(
+        status_code=RESPONSE_ERROR_STATUS_CODE,
+        request=mock_request,
+        text=RESPONSE_ERROR_MESSAGE,
+    )
+    return post_mock
+
+
+def test_client_creates_http_client_with_pool_configuration(http_client_mock):
+    AsyncJustWatchClient()
+    http_client_mock.assert_called_once_with(
+        limits=DEFAULT_LIMITS, timeout=DEFAULT_TIMEOUT, http2=False, transport=None
+    )
+
+
+def test_client_can_enable_http2(http_client_mock):
+    AsyncJustWatchClient(http2=True)
+    http_client_mock.assert_called_once_with(
+        limits=DEFAULT_LIMITS, timeout=DEFAULT_TIMEOUT, http2=True, transport=None
+    )
+
+
+def test_client_can_use_custom_transport(http_client_mock):
+    transport = MagicMock()
+    AsyncJustWatchClient(transport=transport)
+    http_client_mock.assert_called_once_with(
+        limits=DEFAULT_LIMITS, timeout=DEFAULT_TIMEOUT, http2=False, transport=transport
+    )
+
+
+def test_client_context_manager_closes_http_client(http_client_mock):
+    async def use_client():
+        async with AsyncJustWatchClient() as client:
+            http_client_mock.return_value.aclose.assert_not_awaited()
+        return client
+
+    client = run(use_client())
+    assert isinstance(client, AsyncJustWatchClient)
+    http_client_mock.return_value.aclose.assert_awaited_once_with()
+
+
+@mark.parametrize(argnames=("method_name", "inputs"), argvalues=ALL_OPERATIONS)
+def test_operation(method_name, inputs, http_client_mock, post_mock_success):
+    prepare_name = f"prepare_{method_name}_request"
+    parse_name = f"parse_{method_name}_response"
+    client = AsyncJustWatchClient()
+    with (
+        patch(f"simplejustwatchapi.client.{prepare_name}") as request_mock,
+        patch(f"simplejustwatchapi.client.{parse_name}") as parser_mock,
+    ):
+        request_mock.return_value = REQUEST
+        parser_mock.return_value = ENTRIES
+        results = run(getattr(client, method_name)(*inputs))
+    request_mock.assert_called_once_with(*inputs)
+    assert parser_mock.call_args.args[0] == DUMMY_RESPONSE
+    post_mock_success.assert_awaited_once_with(
+        JUSTWATCH_GRAPHQL_URL,
+        json=REQUEST,
+        timeout=http_client_mock.return_value.timeout,
+    )
+    assert results == ENTRIES
+
+
+@patch("simplejustwatchapi.client.parse_offers_for_countries_response")
+@patch("simplejustwatchapi.client.prepare_offers_for_countries_request")
+def test_offers_for_countries_returns_empty_dict_for_empty_countries_set(
+    requests_mock, parser_mock, http_client_mock
+):
+    results = run(AsyncJustWatchClient().offers_for_countries("", set(), "", False))
+    assert not results
+    requests_mock.assert_not_called()
+    parser_mock.assert_not_called()
+    http_client_mock.return_value.post.assert_not_awaited()
+
+
+@patch("simplejustwatchapi.client.parse_providers_response")
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_client_waits_for_rate_limiter_before_request(
+    requests_mock, parser_mock, post_mock_success
+):
+    post_mock = post_mock_success
+    limiter = MagicMock()
+    limiter.acquire_async = AsyncMock(
+        side_effect=lambda _: post_mock.assert_not_awaited()
+    )
+    run(AsyncJustWatchClient(rate_limiter=limiter).providers())
+    limiter.acquire_async.assert_awaited_once_with(None)
+    post_mock.assert_awaited_once()
+
+
+@patch("simplejustwatchapi.client.parse_details_response", return_value=ENTRIES)
+@patch("simplejustwatchapi.client.prepare_details_request", return_value=REQUEST)
+def test_concurrent_requests_share_client(
+    requests_mock, parser_mock, post_mock_success
+):
+    client = AsyncJustWatchClient()
+
+    async def fan_out():
+        return await gather(*(client.details(*DETAILS_INPUT) for _ in range(100)))
+
+    results = run(fan_out())
+    assert results == [ENTRIES] * 100
+    assert post_mock_success.await_count == 100  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_details_many_response")
+@patch("simplejustwatchapi.client.prepare_details_many_request")
+def test_details_many_sends_chunks_concurrently(
+    requests_mock, parser_mock, batch_mock, http_client_mock
+):
+    in_flight = []
+
+    async def post(*_, json, **__):
+        in_flight.append(json)
+        await async_sleep(0.01)
+        assert len(in_flight) == 3  # noqa: PLR2004
+        response = MagicMock()
+        response.json.return_value = json
+        return response
+
+    http_client_mock.return_value.post = AsyncMock(side_effect=post)
+    requests_mock.side_effect = lambda node_ids, *_: {"ids": node_ids}
+    parser_mock.side_effect = lambda json, node_ids: dict.fromkeys(json["ids"], 1)
+    node_ids = ["ID 1", "ID 2", "ID 3", "ID 3", "ID 4", "ID 5"]
+    results = run(AsyncJustWatchClient().details_many(node_ids))
+    assert list(results) == ["ID 1", "ID 2", "ID 3", "ID 4", "ID 5"]
+    assert http_client_mock.return_value.post.await_count == 3  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_details_many_response")
+@patch("simplejustwatchapi.client.prepare_details_many_request")
+def test_details_many_cancels_other_chunks_when_chunk_fails(
+    requests_mock, parser_mock, batch_mock, http_client_mock
+):
+    cancelled = []
+
+    async def post(*_, json, **__):
+        if "ID 1" in json["ids"]:
+            raise RequestError(REQUEST_ERROR_MESSAGE)
+        try:
+            await AsyncEvent().wait()
+        except CancelledError:
+            cancelled.append(json["ids"])
+            raise
+
+    http_client_mock.return_value.post = AsyncMock(side_effect=post)
+    requests_mock.side_effect = lambda node_ids, *_: {"ids": node_ids}
+    node_ids = ["ID 1", "ID 2", "ID 3", "ID 4", "ID 5"]
+
+    async def send():
+        with raises(JustWatchHttpError):
+            await AsyncJustWatchClient().details_many(node_ids)
+        await async_sleep(0)
+        return cancelled
+
+    assert run(send()) == [["ID 3", "ID 4"], ["ID 5"]]
+    parser_mock.assert_not_called()
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_search_many_response")
+@patch("simplejustwatchapi.client.prepare_search_many_request", return_value=REQUEST)
+def test_search_many_merges_chunks_in_order(
+    requests_mock, parser_mock, batch_mock, post_mock_success
+):
+    parsed = iter([{"A": [1], "B": [2]}, {"C": [3]}])
+    parser_mock.side_effect = lambda *_: next(parsed)
+    results = run(AsyncJustWatchClient().search_many(["A", "B", "C"], count=1))
+    assert results == {"A": [1], "B": [2], "C": [3]}
+    assert post_mock_success.await_count == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=1)
+@patch("simplejustwatchapi.client.parse_details_for_locales_response")
+@patch(
+    "simplejustwatchapi.client.prepare_details_for_locales_request",
+    return_value=REQUEST,
+)
+def test_details_for_locales_merges_chunks(
+    requests_mock, parser_mock, batch_mock, post_mock_success
+):
+    parser_mock.side_effect = lambda _, locales: dict.fromkeys(locales, "ENTRY")
+    locales = [("US", "en"), ("de", "de")]
+    results = run(AsyncJustWatchClient().details_for_locales("ID", locales))
+    assert results == {("US", "en"): "ENTRY", ("de", "de"): "ENTRY"}
+    assert post_mock_success.await_count == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_seasons_many_response")
+@patch("simplejustwatchapi.client.prepare_seasons_many_request", return_value=REQUEST)
+def test_seasons_many_merges_chunks_in_order(
+    requests_mock, parser_mock, batch_mock, post_mock_success
+):
+    parser_mock.side_effect = lambda _, show_ids: {i: [] for i in show_ids}
+    client = AsyncJustWatchClient()
+    results = run(client.seasons_many(["tss1", "tss2", "tss3"]))
+    assert list(results) == ["tss1", "tss2", "tss3"]
+    assert post_mock_success.await_count == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_episodes_many_response")
+@patch("simplejustwatchapi.client.prepare_episodes_many_request", return_value=REQUEST)
+def test_episodes_many_merges_chunks_in_order(
+    requests_mock, parser_mock, batch_mock, post_mock_success
+):
+    parser_mock.side_effect = lambda _, season_ids: {i: [] for i in season_ids}
+    client = AsyncJustWatchClient()
+    results = run(client.episodes_many(["tse1", "tse2", "tse3"]))
+    assert list(results) == ["tse1", "tse2", "tse3"]
+    assert post_mock_success.await_count == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.parse_show_tree_response")
+@patch("simplejustwatchapi.client.prepare_show_tree_request", return_value=REQUEST)
+def test_show_tree_with_default_budget_in_single_request(
+    requests_mock, parser_mock, post_mock_success
+):
+    run(AsyncJustWatchClient().show_tree("tss1"))
+    requests_mock.assert_called_once_with("tss1", "US", "en", True, with_episodes=True)
+    post_mock_success.assert_awaited_once()
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=1)
+@patch("simplejustwatchapi.client.parse_episodes_many_response")
+@patch("simplejustwatchapi.client.prepare_episodes_many_request", return_value=REQUEST)
+@patch("simplejustwatchapi.client.parse_show_tree_response")
+@patch("simplejustwatchapi.client.prepare_show_tree_request", return_value=REQUEST)
+def test_show_tree_over_budget_sends_season_groups_concurrently(
+    requests_mock,
+    parser_mock,
+    episodes_requests_mock,
+    episodes_parser_mock,
+    batch_mock,
+    post_mock_success,
+):
+    seasons = [MagicMock(entry_id="tse1"), MagicMock(entry_id="tse2")]
+    parser_mock.return_value = ShowTree(MagicMock(), seasons, {})
+    episodes_parser_mock.side_effect = lambda _, ids: {i: [] for i in ids}
+    tree = run(AsyncJustWatchClient(complexity_budget=1_000).show_tree("tss1"))
+    requests_mock.assert_called_once_with("tss1", "US", "en", True, with_episodes=False)
+    assert tree.episodes == {"tse1": [], "tse2": []}
+    assert post_mock_success.await_count == 3  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.max_batch_size", side_effect=[2, 1])
+@patch("simplejustwatchapi.client.parse_offers_matrix_response")
+@patch("simplejustwatchapi.client.prepare_offers_matrix_request", return_value=REQUEST)
+def test_offers_matrix_sends_chunks_concurrently(
+    requests_mock, parser_mock, batch_mock, post_mock_success
+):
+    parser_mock.side_effect = lambda _, node_ids, countries: {
+        (node_id, c): [] for node_id in node_ids for c in countries
+    }
+    client = AsyncJustWatchClient()
+    results = run(client.offers_matrix(["tm1", "tm2"], {"US", "gb"}))
+    assert results == {
+        ("tm1", "US"): [],
+        ("tm1", "gb"): [],
+        ("tm2", "US"): [],
+        ("tm2", "gb"): [],
+    }
+    assert post_mock_success.await_count == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=1)
+@patch("simplejustwatchapi.client.parse_providers_for_countries_response")
+@patch(
+    "simplejustwatchapi.client.prepare_providers_for_countries_request",
+    return_value=REQUEST,
+)
+def test_providers_for_countries_sends_chunks_concurrently(
+    requests_mock, parser_mock, batch_mock, post_mock_success
+):
+    parser_mock.side_effect = lambda _, countries: {c: [c] for c in countries}
+    client = AsyncJustWatchClient()
+    results = run(client.providers_for_countries({"US", "gb"}))
+    assert results == {"US": ["US"], "gb": ["GB"]}
+    assert post_mock_success.await_count == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=1)
+@patch("simplejustwatchapi.client.parse_popular_for_countries_response")
+@patch(
+    "simplejustwatchapi.client.prepare_popular_for_countries_request",
+    return_value=REQUEST,
+)
+def test_popular_for_countries_sends_chunks_concurrently(
+    requests_mock, parser_mock, batch_mock, post_mock_success
+):
+    parser_mock.side_effect = lambda _, countries: {c: [c] for c in countries}
+    client = AsyncJustWatchClient()
+    results = run(client.popular_for_countries({"US", "gb"}, count=50))
+    assert results == {"US": ["US"], "gb": ["GB"]}
+    assert post_mock_success.await_count == 2  # noqa: PLR2004
+
+
+@mark.parametrize(argnames=("method_name", "inputs"), argvalues=ALL_OPERATIONS)
+def test_http_request_error(method_name, inputs, post_mock_request_error):
+    prepare_name = f"simplejustwatchapi.client.prepare_{method_name}_request"
+    client = AsyncJustWatchClient()
+    with patch(prepare_name, return_value=REQUEST), raises(JustWatchHttpError) as e:
+        run(getattr(client, method_name)(*inputs))
+    assert str(e.value) == REQUEST_ERROR_MESSAGE
+    assert e.value.response is None
+
+
+@mark.parametrize(argnames=("method_name", "inputs"), argvalues=ALL_OPERATIONS)
+def test_http_status_error(method_name, inputs, post_mock_status_error):
+    prepare_name = f"simplejustwatchapi.client.prepare_{method_name}_request"
+    client = AsyncJustWatchClient()
+    with patch(prepare_name, return_value=REQUEST), raises(JustWatchHttpError) as e:
+        run(getattr(client, method_name)(*inputs))
+    assert str(RESPONSE_ERROR_STATUS_CODE) in str(e.value)
+    assert e.value.response == RESPONSE_ERROR_MESSAGE
+
+
+@patch("simplejustwatchapi.client.parse_providers_response", side_effect=lambda x: x)
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_transient_errors_are_retried(
+    requests_mock, parser_mock, http_client_mock, mocker
+):
+    sleep_mock = mocker.patch("simplejustwatchapi.client.async_sleep")
+    mock_request = Request(method="POST", url=JUSTWATCH_GRAPHQL_URL)
+    post_mock = http_client_mock.return_value.post
+    post_mock.side_effect = [
+        Response(status_code=503, request=mock_request),
+        ConnectError(REQUEST_ERROR_MESSAGE),
+        Response(status_code=200, request=mock_request, json=DUMMY_RESPONSE),
+    ]
+    client = AsyncJustWatchClient(retry=RetryPolicy(backoff=1.0, jitter=False))
+
+    async def providers_with_retries():
+        return await client.providers(), client.last_retries
+
+    results, retries = run(providers_with_retries())
+    assert results == DUMMY_RESPONSE
+    assert retries == 2  # noqa: PLR2004
+    assert post_mock.await_count == 3  # noqa: PLR2004
+    assert sleep_mock.await_args_list == [((1.0,),), ((2.0,),)]
+
+
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_retries_stop_after_max_attempts(requests_mock, http_client_mock, mocker):
+    sleep_mock = mocker.patch("simplejustwatchapi.client.async_sleep")
+    mock_request = Request(method="POST", url=JUSTWATCH_GRAPHQL_URL)
+    post_mock = http_client_mock.return_value.post
+    post_mock.return_value = Response(status_code=502, request=mock_request)
+    client = AsyncJustWatchClient(retry=RetryPolicy(max_attempts=2))
+    with raises(JustWatchHttpError):
+        run(client.providers())
+    assert post_mock.await_count == 2  # noqa: PLR2004
+    sleep_mock.assert_awaited_once()
+
+
+async def slow_post(*_, **__):
+    await async_sleep(0.01)
+    mock_request = Request(method="POST", url=JUSTWATCH_GRAPHQL_URL)
+    return Response(status_code=200, request=mock_request, json=DUMMY_RESPONSE)
+
+
+@patch("simplejustwatchapi.client.parse_details_response", side_effect=lambda x: x)
+def test_concurrent_identical_requests_are_coalesced(parser_mock, http_client_mock):
+    post_mock = http_client_mock.return_value.post
+    post_mock.side_effect = slow_post
+    client = AsyncJustWatchClient()
+
+    async def details_concurrently():
+        return await gather(*(client.details("tm123") for _ in range(5)))
+
+    results = run(details_concurrently())
+    assert results == [DUMMY_RESPONSE] * 5
+    post_mock.assert_awaited_once()
+    assert parser_mock.call_count == 5  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.parse_details_response")
+def test_coalescing_can_be_disabled(parser_mock, http_client_mock):
+    post_mock = http_client_mock.return_value.post
+    post_mock.side_effect = slow_post
+    client = AsyncJustWatchClient(coalesce=False)
+
+    async def details_concurrently():
+        return await gather(*(client.details("tm123") for _ in range(3)))
+
+    run(details_concurrently())
+    assert post_mock.await_count == 3  # noqa: PLR2004
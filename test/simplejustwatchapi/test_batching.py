@@ -0,0 +1,228 @@
+from asyncio import gather, run, wait_for
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from unittest.mock import AsyncMock, MagicMock
+
+from pytest import fixture, mark, raises
+
+from simplejustwatchapi.batching import AsyncBatcher, Batcher, BatchPolicy
+from simplejustwatchapi.client import AsyncJustWatchClient, JustWatchClient
+from simplejustwatchapi.exceptions import JustWatchApiError, JustWatchError
+from test.simplejustwatchapi.parser_data import (
+    PARSED_EPISODE_1,
+    PARSED_NODE_1,
+    PARSED_NODE_2,
+    RESPONSE_EPISODE_1,
+    RESPONSE_NODE_1,
+    RESPONSE_NODE_2,
+)
+from test.simplejustwatchapi.stub_server import StubServer
+
+KEY = ("US", "en", True)
+NODE_ERROR = {"message": "Node not found", "code": "NOT_FOUND", "path": ["node1"]}
+
+
+def send_results(_, items):
+    return {item: f"result-{item}" for item in items}
+
+
+@fixture
+def batch_server():
+    responses = {
+        "GetTitleNodesBatch": {
+            "data": {
+                "node0": RESPONSE_NODE_1,
+                "node1": RESPONSE_NODE_1,
+                "node2": RESPONSE_NODE_1,
+            }
+        }
+    }
+    with StubServer(responses) as server:
+        yield server
+
+
+@mark.parametrize(
+    argnames="config",
+    argvalues=[{"window": -1.0}, {"max_size": 0}],
+)
+def test_invalid_config(config):
+    with raises(JustWatchError):
+        BatchPolicy(**config)
+
+
+def test_concurrent_loads_are_sent_together():
+    send = MagicMock(side_effect=send_results)
+    batcher = Batcher(BatchPolicy(window=0.1), send)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        items = ["A", "B", "A", "C"]
+        results = list(executor.map(lambda item: batcher.load(KEY, item), items))
+    assert results == ["result-A", "result-B", "result-A", "result-C"]
+    send.assert_called_once()
+    assert sorted(send.call_args.args[1]) == ["A", "B", "C"]
+
+
+def test_loads_with_different_keys_are_sent_separately():
+    send = MagicMock(side_effect=send_results)
+    batcher = Batcher(BatchPolicy(window=0.05), send)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        keys = [("US", "en", True), ("GB", "en", True)]
+        results = list(executor.map(lambda key: batcher.load(key, "A"), keys))
+    assert results == ["result-A", "result-A"]
+    assert send.call_count == 2  # noqa: PLR2004
+
+
+def test_full_batch_is_sent_without_waiting_for_window():
+    batcher = Batcher(BatchPolicy(window=10.0, max_size=2), send_results)
+    started = monotonic()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lambda item: batcher.load(KEY, item), "AB"))
+    assert results == ["result-A", "result-B"]
+    assert monotonic() - started < 1.0
+
+
+def test_errors_are_raised_only_for_their_elements():
+    error = JustWatchApiError([NODE_ERROR])
+    batcher = Batcher(
+        BatchPolicy(window=0.05), lambda _, items: {"A": "result-A", "B": error}
+    )
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(batcher.load, KEY, item) for item in "AB"]
+        assert futures[0].result() == "result-A"
+        with raises(JustWatchApiError):
+            futures[1].result()
+
+
+def test_failed_batch_fails_all_loads():
+    send = MagicMock(side_effect=JustWatchError("Request failed"))
+    batcher = Batcher(BatchPolicy(window=0.05), send)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(batcher.load, KEY, item) for item in "AB"]
+        for future in futures:
+            with raises(JustWatchError):
+                future.result()
+    send.assert_called_once()
+
+
+def test_async_loads_in_one_loop_iteration_are_sent_together():
+    send = AsyncMock(side_effect=send_results)
+    batcher = AsyncBatcher(BatchPolicy(window=0), send)
+
+    async def load_all():
+        return await gather(*(batcher.load(KEY, item) for item in "ABA"))
+
+    assert run(load_all()) == ["result-A", "result-B", "result-A"]
+    send.assert_awaited_once_with(KEY, ["A", "B"])
+
+
+def test_async_cancelled_load_doesnt_cancel_batch():
+    send = AsyncMock(side_effect=send_results)
+    batcher = AsyncBatcher(BatchPolicy(window=0.05), send)
+
+    async def load_all():
+        cancelled = wait_for(batcher.load(KEY, "A"), 0.01)
+        return await gather(cancelled, batcher.load(KEY, "B"), return_exceptions=True)
+
+    cancelled_result, result = run(load_all())
+    assert isinstance(cancelled_result, TimeoutError)
+    assert result == "result-B"
+    send.assert_awaited_once()
+    assert sorted(send.await_args.args[1]) == ["A", "B"]
+
+
+def test_async_failed_batch_fails_all_loads():
+    send = AsyncMock(side_effect=JustWatchError("Request failed"))
+    batcher = AsyncBatcher(BatchPolicy(window=0), send)
+
+    async def load_all():
+        return await gather(
+            *(batcher.load(KEY, item) for item in "AB"), return_exceptions=True
+        )
+
+    results = run(load_all())
+    assert [type(result) for result in results] == [JustWatchError] * 2
+    send.assert_awaited_once()
+
+
+def test_client_batches_concurrent_calls(batch_server):
+    batching = BatchPolicy(window=0.1)
+    with (
+        JustWatchClient(url=batch_server.url, batching=batching) as client,
+        ThreadPoolExecutor(max_workers=3) as executor,
+    ):
+        results = list(executor.map(client.details, ["tm1", "tm2", "tm3"]))
+    assert results == [PARSED_NODE_1] * 3
+    assert len(batch_server.requests) == 1
+    variables = batch_server.requests[0].json["variables"]
+    assert sorted(variables[f"nodeId{i}"] for i in range(3)) == ["tm1", "tm2", "tm3"]
+
+
+def test_client_raises_node_errors_only_for_their_calls(batch_server):
+    batch_server.responses["GetTitleNodesBatch"] = {
+        "data": {"node0": RESPONSE_NODE_2, "node1": None},
+        "errors": [NODE_ERROR],
+    }
+
+    async def call():
+        async with AsyncJustWatchClient(
+            url=batch_server.url, batching=BatchPolicy(window=0)
+        ) as client:
+            return await gather(
+                client.details("tm2"),
+                client.seasons("invalid"),
+                return_exceptions=True,
+            )
+
+    entry, error = run(call())
+    assert entry == PARSED_NODE_2
+    assert isinstance(error, JustWatchApiError)
+    assert error.errors == [NODE_ERROR]
+    assert len(batch_server.requests) == 1
+
+
+def test_async_client_batches_mixed_calls(batch_server):
+    batch_server.responses["GetTitleNodesBatch"] = {
+        "data": {
+            "node0": RESPONSE_NODE_1,
+            "node1": {"seasons": [RESPONSE_NODE_2]},
+            "node2": {"episodes": [RESPONSE_EPISODE_1]},
+        }
+    }
+
+    async def call():
+        async with AsyncJustWatchClient(
+            url=batch_server.url, batching=BatchPolicy(window=0)
+        ) as client:
+            return await gather(
+                client.details("tm1"),
+                client.seasons("tss1"),
+                client.episodes("tse1"),
+            )
+
+    assert run(call()) == [PARSED_NODE_1, [PARSED_NODE_2], [PARSED_EPISODE_1]]
+    assert len(batch_server.requests) == 1
+
+
+def test_calls_with_different_locales_are_sent_separately(batch_server):
+    async def call():
+        async with AsyncJustWatchClient(
+            url=batch_server.url, batching=BatchPolicy(window=0)
+        ) as client:
+            return await gather(
+                client.details("tm1", "US"),
+                client.details("tm1", "us"),
+                client.details("tm1", "GB"),
+            )
+
+    assert run(call()) == [PARSED_NODE_1] * 3
+    assert len(batch_server.requests) == 2  # noqa: PLR2004
+
+
+def test_batch_is_split_by_complexity_budget(batch_server):
+    async def call():
+        async with AsyncJustWatchClient(
+            url=batch_server.url, batching=BatchPolicy(window=0), complexity_budget=1
+        ) as client:
+            return await gather(client.details("tm1"), client.seasons("tss1"))
+
+    assert run(call()) == [PARSED_NODE_1, []]
+    assert len(batch_server.requests) == 2  # noqa: PLR2004
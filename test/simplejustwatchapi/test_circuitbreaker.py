@@ -0,0 +1,247 @@
+from asyncio import run
+from unittest.mock import AsyncMock, patch
+
+from httpx import ConnectError, HTTPStatusError, ReadTimeout, Request, Response
+from pytest import fixture, mark, raises
+
+from simplejustwatchapi.circuitbreaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from simplejustwatchapi.client import AsyncJustWatchClient, JustWatchClient
+from simplejustwatchapi.exceptions import (
+    JustWatchCircuitOpenError,
+    JustWatchError,
+    JustWatchHttpError,
+)
+from simplejustwatchapi.retry import RetryPolicy
+
+URL = "https://apis.justwatch.com/graphql"
+REQUEST = {"dummy": "request"}
+OTHER_REQUEST = {"other": "request"}
+DUMMY_RESPONSE = {"dummy": "response"}
+CONNECTION_ERROR = ConnectError("Connection error")
+
+
+@fixture
+def clock(mocker):
+    clock = mocker.patch("simplejustwatchapi.circuitbreaker.monotonic")
+    clock.return_value = 100.0
+    return clock
+
+
+def status_error(status_code):
+    request = Request("POST", URL)
+    response = Response(status_code, request=request)
+    return HTTPStatusError("Status error", request=request, response=response)
+
+
+def succeed(breaker):
+    with breaker.guard():
+        pass
+
+
+def fail(breaker, error=CONNECTION_ERROR):
+    with raises(type(error)), breaker.guard():
+        raise error
+
+
+def open_circuit(breaker, failures=2):
+    for _ in range(failures):
+        fail(breaker)
+    assert breaker.state == OPEN
+
+
+@mark.parametrize(
+    argnames="config",
+    argvalues=[
+        {"failure_threshold": 0},
+        {"recovery_time": -1},
+        {"probes": 0},
+        {"cache_size": -1},
+    ],
+)
+def test_invalid_config(config):
+    with raises(JustWatchError):
+        CircuitBreaker(**config)
+
+
+def test_circuit_is_closed_initially(clock):
+    breaker = CircuitBreaker()
+    assert breaker.state == CLOSED
+    succeed(breaker)
+
+
+@mark.parametrize(
+    "error", [CONNECTION_ERROR, ReadTimeout("Timeout"), status_error(503)]
+)
+def test_circuit_opens_after_consecutive_failures(clock, error):
+    breaker = CircuitBreaker(failure_threshold=3)
+    fail(breaker, error)
+    fail(breaker, error)
+    assert breaker.state == CLOSED
+    fail(breaker, error)
+    assert breaker.state == OPEN
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+    fail(breaker)
+    succeed(breaker)
+    fail(breaker)
+    assert breaker.state == CLOSED
+
+
+@mark.parametrize("error", [status_error(400), status_error(429), JustWatchError()])
+def test_other_errors_dont_count_as_failures(clock, error):
+    breaker = CircuitBreaker(failure_threshold=1)
+    fail(breaker, error)
+    assert breaker.state == CLOSED
+
+
+def test_open_circuit_fails_immediately(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_time=30.0)
+    open_circuit(breaker)
+    clock.return_value += 10.0
+    with raises(JustWatchCircuitOpenError) as error, breaker.guard():
+        pass
+    assert error.value.retry_after == 20.0  # noqa: PLR2004
+
+
+def test_circuit_is_half_open_after_recovery_time(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_time=30.0)
+    open_circuit(breaker)
+    clock.return_value += 30.0
+    assert breaker.state == HALF_OPEN
+
+
+def test_successful_probes_close_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_time=30.0, probes=2)
+    open_circuit(breaker)
+    clock.return_value += 30.0
+    succeed(breaker)
+    assert breaker.state == HALF_OPEN
+    succeed(breaker)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_opens_circuit_again(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_time=30.0)
+    open_circuit(breaker)
+    clock.return_value += 30.0
+    fail(breaker)
+    assert breaker.state == OPEN
+    clock.return_value += 29.0
+    assert breaker.state == OPEN
+    clock.return_value += 1.0
+    assert breaker.state == HALF_OPEN
+
+
+def test_half_open_circuit_limits_probes_in_flight(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_time=30.0)
+    open_circuit(breaker)
+    clock.return_value += 30.0
+    with breaker.guard():
+        with raises(JustWatchCircuitOpenError) as error, breaker.guard():
+            pass
+        assert error.value.retry_after == 0
+    assert breaker.state == CLOSED
+
+
+def test_requests_finished_while_open_dont_affect_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=30.0)
+    with breaker.guard():
+        fail(breaker)
+    assert breaker.state == OPEN
+
+
+def test_cache_is_disabled_by_default(clock):
+    breaker = CircuitBreaker()
+    error = JustWatchCircuitOpenError("Open", 0.0)
+    breaker.store(REQUEST, DUMMY_RESPONSE)
+    with raises(JustWatchCircuitOpenError):
+        breaker.cached(REQUEST, error)
+
+
+def test_cache_keeps_most_recent_responses(clock):
+    breaker = CircuitBreaker(cache_size=1)
+    error = JustWatchCircuitOpenError("Open", 0.0)
+    breaker.store(OTHER_REQUEST, DUMMY_RESPONSE)
+    breaker.store(REQUEST, DUMMY_RESPONSE)
+    assert breaker.cached(REQUEST, error) == DUMMY_RESPONSE
+    with raises(JustWatchCircuitOpenError):
+        breaker.cached(OTHER_REQUEST, error)
+
+
+@fixture
+def http_client_mock(mocker):
+    return mocker.patch("simplejustwatchapi.client.Client")
+
+
+@fixture
+def async_http_client_mock(mocker):
+    http_client_mock = mocker.patch("simplejustwatchapi.client.AsyncClient")
+    http_client_mock.return_value.post = AsyncMock()
+    return http_client_mock
+
+
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_client_fails_fast_while_circuit_is_open(requests_mock, http_client_mock):
+    post_mock = http_client_mock.return_value.post
+    post_mock.side_effect = CONNECTION_ERROR
+    client = JustWatchClient(circuit_breaker=CircuitBreaker(failure_threshold=2))
+    for _ in range(2):
+        with raises(JustWatchHttpError):
+            client.providers()
+    with raises(JustWatchCircuitOpenError):
+        client.providers()
+    assert post_mock.call_count == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.sleep")
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_client_stops_retrying_when_circuit_opens(
+    requests_mock, sleep_mock, http_client_mock
+):
+    post_mock = http_client_mock.return_value.post
+    post_mock.side_effect = CONNECTION_ERROR
+    client = JustWatchClient(
+        retry=RetryPolicy(max_attempts=5),
+        circuit_breaker=CircuitBreaker(failure_threshold=2),
+    )
+    with raises(JustWatchCircuitOpenError):
+        client.providers()
+    assert post_mock.call_count == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.parse_providers_response", side_effect=lambda x: x)
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_client_serves_cached_response_while_circuit_is_open(
+    requests_mock, parser_mock, http_client_mock
+):
+    post_mock = http_client_mock.return_value.post
+    post_mock.return_value.json.return_value = DUMMY_RESPONSE
+    breaker = CircuitBreaker(failure_threshold=1, cache_size=10)
+    client = JustWatchClient(circuit_breaker=breaker)
+    assert client.providers() == DUMMY_RESPONSE
+    post_mock.side_effect = CONNECTION_ERROR
+    with raises(JustWatchHttpError):
+        client.providers()
+    assert client.providers() == DUMMY_RESPONSE
+    assert post_mock.call_count == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_async_client_fails_fast_while_circuit_is_open(
+    requests_mock, async_http_client_mock
+):
+    post_mock = async_http_client_mock.return_value.post
+    post_mock.side_effect = CONNECTION_ERROR
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    async def send_requests():
+        client = AsyncJustWatchClient(circuit_breaker=breaker)
+        with raises(JustWatchHttpError):
+            await client.providers()
+        with raises(JustWatchCircuitOpenError):
+            await client.providers()
+
+    run(send_requests())
+    post_mock.assert_awaited_once()
@@ -0,0 +1,796 @@
+from concurrent.futures import ThreadPoolExecutor
+from gc import collect
+from json import loads
+from threading import Barrier, Event
+from threading import enumerate as enumerate_threads
+from time import sleep
+from unittest.mock import MagicMock, patch
+from weakref import ref
+
+from httpx import ConnectError, MockTransport, Request, RequestError, Response
+from pytest import fixture, mark, raises
+
+from simplejustwatchapi.client import DEFAULT_LIMITS, DEFAULT_TIMEOUT, JustWatchClient
+from simplejustwatchapi.exceptions import JustWatchApiError, JustWatchHttpError
+from simplejustwatchapi.graphql import (
+    DEFAULT_COMPLEXITY_BUDGET,
+    graphql_details_for_locales_query,
+    graphql_details_many_query,
+    graphql_episodes_many_query,
+    graphql_search_many_query,
+    graphql_seasons_many_query,
+)
+from simplejustwatchapi.retry import RetryPolicy
+from simplejustwatchapi.splitting import SplitPolicy
+from simplejustwatchapi.tuples import ShowTree
+
+JUSTWATCH_GRAPHQL_URL = "https://apis.justwatch.com/graphql"
+
+SEARCH_INPUT = ("TITLE", "COUNTRY", "LANGUAGE", 5, True, 10, ["prov1", "prov2"])
+POPULAR_INPUT = ("COUNTRY", "LANGUAGE", 5, True, 10, ["prov1", "prov2"])
+DETAILS_INPUT = ("NODE ID", "COUNTRY", "LANGUAGE", False)
+OFFERS_COUNTRIES_INPUT = {"COUNTRY1", "COUNTRY2", "COUNTRY3"}
+OFFERS_INPUT = ("NODE ID", OFFERS_COUNTRIES_INPUT, "LANGUAGE", True)
+PROVIDERS_INPUT = "US"
+
+REQUEST = {"dummy": "request"}
+DUMMY_RESPONSE = {"dummy": "response"}
+ENTRIES = [MagicMock(), MagicMock(), None]
+SEASONS = [MagicMock(entry_id=f"tse{index}") for index in range(3)]
+SHOW_TREE = ShowTree(MagicMock(), SEASONS, {})
+COMPLEXITY_ERROR = JustWatchApiError([{"message": "Query complexity is too high"}])
+
+REQUEST_ERROR_MESSAGE = "HTTP request error"
+RESPONSE_ERROR_STATUS_CODE = 420
+RESPONSE_ERROR_MESSAGE = "HTTP response error"
+
+ALL_OPERATIONS = [
+    ("prepare_search_request", "search", SEARCH_INPUT),
+    ("prepare_popular_request", "popular", POPULAR_INPUT),
+    ("prepare_details_request", "details", DETAILS_INPUT),
+    ("prepare_seasons_request", "seasons", DETAILS_INPUT),
+    ("prepare_episodes_request", "episodes", DETAILS_INPUT),
+    ("prepare_offers_for_countries_request", "offers_for_countries", OFFERS_INPUT),
+    ("prepare_providers_request", "providers", (PROVIDERS_INPUT,)),
+]
+
+
+@fixture
+def http_client_mock(mocker):
+    return mocker.patch("simplejustwatchapi.client.Client")
+
+
+def response(status_code, json=None):
+    mock_request = Request(method="POST", url=JUSTWATCH_GRAPHQL_URL)
+    return Response(status_code=status_code, request=mock_request, json=json)
+
+
+@fixture
+def sleep_mock(mocker):
+    return mocker.patch("simplejustwatchapi.client.sleep")
+
+
+@fixture
+def api_mock():
+    """Stand-in for JustWatch API, called with JSON body of each request."""
+    return MagicMock(return_value=DUMMY_RESPONSE)
+
+
+@fixture
+def transport(api_mock):
+    def handle(request):
+        result = api_mock(loads(request.content))
+        return result if isinstance(result, Response) else response(200, result)
+
+    return MockTransport(handle)
+
+
+@fixture
+def api_mock_success(api_mock):
+    yield api_mock
+    api_mock.assert_called_with(REQUEST)
+
+
+@fixture
+def api_mock_request_error(api_mock):
+    api_mock.side_effect = RequestError(REQUEST_ERROR_MESSAGE)
+    return api_mock
+
+
+@fixture
+def api_mock_status_error(api_mock):
+    api_mock.side_effect = lambda _: Response(
+        status_code=RESPONSE_ERROR_STATUS_CODE, text=RESPONSE_ERROR_MESSAGE
+    )
+    return api_mock
+
+
+def test_client_creates_http_client_with_pool_configuration(http_client_mock):
+    JustWatchClient()
+    http_client_mock.assert_called_once_with(
+        limits=DEFAULT_LIMITS, timeout=DEFAULT_TIMEOUT, http2=False, transport=None
+    )
+
+
+def test_client_can_enable_http2(http_client_mock):
+    JustWatchClient(http2=True)
+    http_client_mock.assert_called_once_with(
+        limits=DEFAULT_LIMITS, timeout=DEFAULT_TIMEOUT, http2=True, transport=None
+    )
+
+
+def test_client_can_use_custom_transport(http_client_mock):
+    transport = MagicMock()
+    JustWatchClient(transport=transport)
+    http_client_mock.assert_called_once_with(
+        limits=DEFAULT_LIMITS, timeout=DEFAULT_TIMEOUT, http2=False, transport=transport
+    )
+
+
+def test_client_context_manager_closes_http_client(http_client_mock):
+    with JustWatchClient() as client:
+        http_client_mock.return_value.close.assert_not_called()
+    assert isinstance(client, JustWatchClient)
+    http_client_mock.return_value.close.assert_called_once_with()
+
+
+def test_client_reuses_http_client_between_requests(api_mock_success, transport):
+    client = JustWatchClient(transport=transport)
+    with patch("simplejustwatchapi.client.prepare_providers_request") as request_mock:
+        request_mock.return_value = REQUEST
+        with patch("simplejustwatchapi.client.parse_providers_response"):
+            client.providers()
+            client.providers()
+    assert api_mock_success.call_count == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.parse_providers_response")
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_client_sends_requests_to_configured_url(requests_mock, parser_mock):
+    requests = []
+
+    def handle(request):
+        requests.append(request)
+        return Response(200, json=DUMMY_RESPONSE)
+
+    transport = MockTransport(handle)
+    JustWatchClient(
+        url="http://localhost:8080/graphql", transport=transport
+    ).providers()
+    assert [(r.method, str(r.url)) for r in requests] == [
+        ("POST", "http://localhost:8080/graphql")
+    ]
+    assert loads(requests[0].content) == REQUEST
+
+
+@patch("simplejustwatchapi.client.parse_providers_response")
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_client_waits_for_rate_limiter_before_request(
+    requests_mock, parser_mock, api_mock, transport
+):
+    limiter = MagicMock()
+    limiter.acquire.side_effect = lambda _: api_mock.assert_not_called()
+    JustWatchClient(transport=transport, rate_limiter=limiter).providers()
+    limiter.acquire.assert_called_once_with(None)
+    api_mock.assert_called_once()
+
+
+@patch("simplejustwatchapi.client.parse_search_response", return_value=ENTRIES)
+@patch("simplejustwatchapi.client.prepare_search_request", return_value=REQUEST)
+def test_search(requests_mock, parser_mock, api_mock_success, transport):
+    results = JustWatchClient(transport=transport).search(*SEARCH_INPUT)
+    requests_mock.assert_called_with(*SEARCH_INPUT)
+    parser_mock.assert_called_with(DUMMY_RESPONSE)
+    assert results == ENTRIES
+
+
+@patch("simplejustwatchapi.client.parse_popular_response", return_value=ENTRIES)
+@patch("simplejustwatchapi.client.prepare_popular_request", return_value=REQUEST)
+def test_popular(requests_mock, parser_mock, api_mock_success, transport):
+    results = JustWatchClient(transport=transport).popular(*POPULAR_INPUT)
+    requests_mock.assert_called_with(*POPULAR_INPUT)
+    parser_mock.assert_called_with(DUMMY_RESPONSE)
+    assert results == ENTRIES
+
+
+@patch("simplejustwatchapi.client.parse_details_response")
+@patch("simplejustwatchapi.client.prepare_details_request", return_value=REQUEST)
+@mark.parametrize("parse_results", [ENTRIES, None])
+def test_details(
+    requests_mock, parser_mock, parse_results, api_mock_success, transport
+):
+    parser_mock.return_value = parse_results
+    results = JustWatchClient(transport=transport).details(*DETAILS_INPUT)
+    requests_mock.assert_called_with(*DETAILS_INPUT)
+    parser_mock.assert_called_with(DUMMY_RESPONSE)
+    assert results == parse_results
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_details_many_response")
+@patch("simplejustwatchapi.client.prepare_details_many_request", return_value=REQUEST)
+def test_details_many(
+    requests_mock, parser_mock, batch_mock, api_mock_success, transport
+):
+    parser_mock.side_effect = lambda _, node_ids: {i: i.lower() for i in node_ids}
+    node_ids = ["ID 1", "ID 2", "ID 1", "ID 3"]
+    client = JustWatchClient(transport=transport, complexity_budget=1234)
+    results = client.details_many(node_ids, "COUNTRY", "LANGUAGE", False)
+    batch_mock.assert_called_with(graphql_details_many_query, 1234)
+    assert [c.args for c in requests_mock.call_args_list] == [
+        (["ID 1", "ID 2"], "COUNTRY", "LANGUAGE", False),
+        (["ID 3"], "COUNTRY", "LANGUAGE", False),
+    ]
+    assert api_mock_success.call_count == 2  # noqa: PLR2004
+    assert results == {"ID 1": "id 1", "ID 2": "id 2", "ID 3": "id 3"}
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_search_many_response")
+@patch("simplejustwatchapi.client.prepare_search_many_request", return_value=REQUEST)
+def test_search_many(
+    requests_mock, parser_mock, batch_mock, api_mock_success, transport
+):
+    parser_mock.side_effect = lambda _, titles: {t: [t.lower()] for t in titles}
+    titles = ["B", "A", "B", "C"]
+    results = JustWatchClient(transport=transport).search_many(
+        titles, "COUNTRY", "LANGUAGE", 3, True
+    )
+    batch_mock.assert_called_with(
+        graphql_search_many_query, DEFAULT_COMPLEXITY_BUDGET, variables={"first": 3}
+    )
+    assert [c.args for c in requests_mock.call_args_list] == [
+        (["B", "A"], "COUNTRY", "LANGUAGE", 3, True, None),
+        (["C"], "COUNTRY", "LANGUAGE", 3, True, None),
+    ]
+    assert results == {"B": ["b"], "A": ["a"], "C": ["c"]}
+    assert list(results) == ["B", "A", "C"]
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_popular_for_countries_response")
+@patch(
+    "simplejustwatchapi.client.prepare_popular_for_countries_request",
+    return_value=REQUEST,
+)
+def test_popular_for_countries(
+    requests_mock, parser_mock, batch_mock, api_mock_success, transport
+):
+    parser_mock.side_effect = lambda _, countries: {c: [c] for c in countries}
+    countries = {"us", "GB", "fr"}
+    results = JustWatchClient(transport=transport).popular_for_countries(
+        countries, "LANGUAGE", 3
+    )
+    assert [c.args for c in requests_mock.call_args_list] == [
+        ({"FR", "GB"}, "LANGUAGE", 3, True, None),
+        ({"US"}, "LANGUAGE", 3, True, None),
+    ]
+    assert results == {"us": ["US"], "GB": ["GB"], "fr": ["FR"]}
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_providers_for_countries_response")
+@patch(
+    "simplejustwatchapi.client.prepare_providers_for_countries_request",
+    return_value=REQUEST,
+)
+def test_providers_for_countries(
+    requests_mock, parser_mock, batch_mock, api_mock_success, transport
+):
+    parser_mock.side_effect = lambda _, countries: {c: [c] for c in countries}
+    countries = {"us", "GB", "fr"}
+    results = JustWatchClient(transport=transport).providers_for_countries(countries)
+    assert [c.args for c in requests_mock.call_args_list] == [
+        ({"FR", "GB"},),
+        ({"US"},),
+    ]
+    assert results == {"us": ["US"], "GB": ["GB"], "fr": ["FR"]}
+
+
+def offers_matrix_cells(_, node_ids, countries):
+    return {(node_id, c): [node_id + c] for node_id in node_ids for c in countries}
+
+
+@patch("simplejustwatchapi.client.max_batch_size", side_effect=[2, 3])
+@patch(
+    "simplejustwatchapi.client.parse_offers_matrix_response",
+    side_effect=offers_matrix_cells,
+)
+@patch(
+    "simplejustwatchapi.client.prepare_offers_matrix_request",
+    return_value=REQUEST,
+)
+def test_offers_matrix(
+    requests_mock, parser_mock, batch_mock, api_mock_success, transport
+):
+    node_ids = ["tm1", "tm2", "tm1", "tm3", "tm4"]
+    results = JustWatchClient(transport=transport).offers_matrix(
+        node_ids, {"us", "GB", "fr"}, "LANG"
+    )
+    requests = [c.args for c in requests_mock.call_args_list]
+    assert len(requests) == 4  # noqa: PLR2004
+    for request in [
+        (["tm1", "tm2", "tm3"], {"FR", "GB"}, "LANG", True),
+        (["tm4"], {"FR", "GB"}, "LANG", True),
+        (["tm1", "tm2", "tm3"], {"US"}, "LANG", True),
+        (["tm4"], {"US"}, "LANG", True),
+    ]:
+        assert request in requests
+    assert results == {
+        (node_id, country): [node_id + country.upper()]
+        for node_id in ["tm1", "tm2", "tm3", "tm4"]
+        for country in ["us", "GB", "fr"]
+    }
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=1)
+@patch(
+    "simplejustwatchapi.client.parse_offers_matrix_response",
+    side_effect=offers_matrix_cells,
+)
+@patch(
+    "simplejustwatchapi.client.prepare_offers_matrix_request",
+    return_value=REQUEST,
+)
+def test_offers_matrix_sends_chunks_concurrently(
+    requests_mock, parser_mock, batch_mock, api_mock_success, transport
+):
+    all_sent = Barrier(3, timeout=1.0)
+
+    def respond(_):
+        all_sent.wait()
+        return api_mock_success.return_value
+
+    api_mock_success.side_effect = respond
+    with JustWatchClient(transport=transport, coalesce=False, max_workers=3) as client:
+        results = client.offers_matrix(["tm1", "tm2", "tm3"], {"US"})
+    assert list(results) == [("tm1", "US"), ("tm2", "US"), ("tm3", "US")]
+    assert not [t for t in enumerate_threads() if t.name.startswith("justwatch-chunk")]
+
+
+@patch(
+    "simplejustwatchapi.client.prepare_offers_matrix_request",
+    return_value=REQUEST,
+)
+def test_offers_matrix_leaves_out_failed_nodes(requests_mock, api_mock, transport):
+    api_mock.return_value = {
+        "data": {"node0": None, "node1": {"US": []}},
+        "errors": [{"message": "Not found", "path": ["node0"]}],
+    }
+    results = JustWatchClient(transport=transport).offers_matrix(["tm1", "tm2"], {"us"})
+    assert results == {("tm2", "us"): []}
+
+
+@mark.parametrize(
+    argnames=("node_ids", "countries"),
+    argvalues=[([], {"US"}), (["tm1"], set())],
+)
+def test_offers_matrix_with_empty_input_sends_no_requests(
+    api_mock, node_ids, countries, transport
+):
+    assert JustWatchClient(transport=transport).offers_matrix(node_ids, countries) == {}
+    api_mock.assert_not_called()
+
+
+def test_providers_for_countries_without_countries_sends_no_requests(
+    api_mock, transport
+):
+    assert JustWatchClient(transport=transport).providers_for_countries(set()) == {}
+    api_mock.assert_not_called()
+
+
+def test_popular_for_countries_without_countries_sends_no_requests(api_mock, transport):
+    assert JustWatchClient(transport=transport).popular_for_countries(set()) == {}
+    api_mock.assert_not_called()
+
+
+def test_search_many_without_titles_sends_no_requests(api_mock, transport):
+    assert JustWatchClient(transport=transport).search_many([]) == {}
+    api_mock.assert_not_called()
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_seasons_many_response")
+@patch("simplejustwatchapi.client.prepare_seasons_many_request", return_value=REQUEST)
+def test_seasons_many(
+    requests_mock, parser_mock, batch_mock, api_mock_success, transport
+):
+    parser_mock.side_effect = lambda _, show_ids: {i: [i] for i in show_ids}
+    show_ids = ["tss1", "tss2", "tss1", "tss3"]
+    client = JustWatchClient(transport=transport, complexity_budget=1234)
+    results = client.seasons_many(show_ids, "COUNTRY", "LANGUAGE", False)
+    batch_mock.assert_called_with(graphql_seasons_many_query, 1234)
+    requests = sorted(c.args for c in requests_mock.call_args_list)
+    assert requests == [
+        (["tss1", "tss2"], "COUNTRY", "LANGUAGE", False),
+        (["tss3"], "COUNTRY", "LANGUAGE", False),
+    ]
+    assert list(results) == ["tss1", "tss2", "tss3"]
+    assert results == {"tss1": ["tss1"], "tss2": ["tss2"], "tss3": ["tss3"]}
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=1)
+@patch("simplejustwatchapi.client.parse_seasons_many_response")
+@patch("simplejustwatchapi.client.prepare_seasons_many_request", return_value=REQUEST)
+def test_seasons_many_sends_chunks_concurrently(
+    requests_mock, parser_mock, batch_mock, api_mock_success, transport
+):
+    parser_mock.side_effect = lambda _, show_ids: {i: [] for i in show_ids}
+    all_sent = Barrier(2, timeout=1.0)
+
+    def respond(_):
+        all_sent.wait()
+        return api_mock_success.return_value
+
+    api_mock_success.side_effect = respond
+    with JustWatchClient(transport=transport, coalesce=False, max_workers=2) as client:
+        assert list(client.seasons_many(["tss1", "tss2"])) == ["tss1", "tss2"]
+
+
+def test_seasons_many_without_show_ids_sends_no_requests(api_mock, transport):
+    assert JustWatchClient(transport=transport).seasons_many([]) == {}
+    api_mock.assert_not_called()
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_episodes_many_response")
+@patch("simplejustwatchapi.client.prepare_episodes_many_request", return_value=REQUEST)
+def test_episodes_many(
+    requests_mock, parser_mock, batch_mock, api_mock_success, transport
+):
+    parser_mock.side_effect = lambda _, season_ids: {i: [i] for i in season_ids}
+    season_ids = ["tse1", "tse2", "tse1", "tse3"]
+    client = JustWatchClient(transport=transport, complexity_budget=1234)
+    results = client.episodes_many(season_ids, "COUNTRY", "LANGUAGE", False)
+    batch_mock.assert_called_with(graphql_episodes_many_query, 1234)
+    assert [c.args for c in requests_mock.call_args_list] == [
+        (["tse1", "tse2"], "COUNTRY", "LANGUAGE", False),
+        (["tse3"], "COUNTRY", "LANGUAGE", False),
+    ]
+    assert results == {"tse1": ["tse1"], "tse2": ["tse2"], "tse3": ["tse3"]}
+
+
+def test_episodes_many_without_season_ids_sends_no_requests(api_mock, transport):
+    assert JustWatchClient(transport=transport).episodes_many([]) == {}
+    api_mock.assert_not_called()
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_details_for_locales_response")
+@patch(
+    "simplejustwatchapi.client.prepare_details_for_locales_request",
+    return_value=REQUEST,
+)
+def test_details_for_locales(
+    requests_mock, parser_mock, batch_mock, api_mock_success, transport
+):
+    parser_mock.side_effect = lambda _, locales: {loc: "-".join(loc) for loc in locales}
+    locales = [("us", "en"), ("US", "en"), ("DE", "de"), ("FR", "fr")]
+    client = JustWatchClient(transport=transport, complexity_budget=1234)
+    results = client.details_for_locales("ID", locales, False)
+    batch_mock.assert_called_with(graphql_details_for_locales_query, 1234)
+    assert [c.args for c in requests_mock.call_args_list] == [
+        ("ID", [("US", "en"), ("DE", "de")], False),
+        ("ID", [("FR", "fr")], False),
+    ]
+    assert results == {
+        ("us", "en"): "US-en",
+        ("US", "en"): "US-en",
+        ("DE", "de"): "DE-de",
+        ("FR", "fr"): "FR-fr",
+    }
+
+
+def test_details_for_locales_without_locales_sends_no_requests(api_mock, transport):
+    assert JustWatchClient(transport=transport).details_for_locales("ID", []) == {}
+    api_mock.assert_not_called()
+
+
+def test_details_many_without_node_ids_sends_no_requests(api_mock, transport):
+    assert JustWatchClient(transport=transport).details_many([]) == {}
+    api_mock.assert_not_called()
+
+
+@patch("simplejustwatchapi.client.parse_seasons_response")
+@patch("simplejustwatchapi.client.prepare_seasons_request", return_value=REQUEST)
+@mark.parametrize("parse_results", [ENTRIES, None])
+def test_seasons(
+    requests_mock, parser_mock, parse_results, api_mock_success, transport
+):
+    parser_mock.return_value = parse_results
+    results = JustWatchClient(transport=transport).seasons(*DETAILS_INPUT)
+    requests_mock.assert_called_with(*DETAILS_INPUT)
+    parser_mock.assert_called_with(DUMMY_RESPONSE)
+    assert results == parse_results
+
+
+@patch("simplejustwatchapi.client.parse_show_tree_response", return_value=SHOW_TREE)
+@patch("simplejustwatchapi.client.prepare_show_tree_request", return_value=REQUEST)
+def test_show_tree_with_default_budget_in_single_request(
+    requests_mock, parser_mock, api_mock_success, transport
+):
+    results = JustWatchClient(transport=transport).show_tree(*DETAILS_INPUT)
+    requests_mock.assert_called_once_with(*DETAILS_INPUT, with_episodes=True)
+    parser_mock.assert_called_once_with(DUMMY_RESPONSE)
+    api_mock_success.assert_called_once()
+    assert results == SHOW_TREE
+
+
+@patch("simplejustwatchapi.client.max_batch_size", return_value=2)
+@patch("simplejustwatchapi.client.parse_episodes_many_response")
+@patch("simplejustwatchapi.client.prepare_episodes_many_request", return_value=REQUEST)
+@patch("simplejustwatchapi.client.parse_show_tree_response", return_value=SHOW_TREE)
+@patch("simplejustwatchapi.client.prepare_show_tree_request", return_value=REQUEST)
+def test_show_tree_over_budget_looks_up_episodes_for_groups_of_seasons(
+    requests_mock,
+    parser_mock,
+    episodes_requests_mock,
+    episodes_parser_mock,
+    batch_mock,
+    api_mock_success,
+    transport,
+):
+    episodes_parser_mock.side_effect = lambda _, ids: {i: [i] for i in ids}
+    results = JustWatchClient(transport=transport, complexity_budget=1_000).show_tree(
+        *DETAILS_INPUT
+    )
+    requests_mock.assert_called_once_with(*DETAILS_INPUT, with_episodes=False)
+    assert [c.args[0] for c in episodes_requests_mock.call_args_list] == [
+        ["tse0", "tse1"],
+        ["tse2"],
+    ]
+    assert results == SHOW_TREE._replace(
+        episodes={"tse0": ["tse0"], "tse1": ["tse1"], "tse2": ["tse2"]}
+    )
+    assert api_mock_success.call_count == 3  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.parse_episodes_many_response", return_value={})
+@patch("simplejustwatchapi.client.prepare_episodes_many_request", return_value=REQUEST)
+@patch(
+    "simplejustwatchapi.client.parse_show_tree_response",
+    side_effect=[COMPLEXITY_ERROR, SHOW_TREE],
+)
+@patch("simplejustwatchapi.client.prepare_show_tree_request", return_value=REQUEST)
+def test_show_tree_rejected_for_complexity_falls_back_with_splitting(
+    requests_mock,
+    parser_mock,
+    episodes_requests_mock,
+    episodes_parser_mock,
+    api_mock_success,
+    transport,
+):
+    client = JustWatchClient(transport=transport, splitting=SplitPolicy())
+    assert client.show_tree(*DETAILS_INPUT) == SHOW_TREE
+    assert [c.kwargs for c in requests_mock.call_args_list] == [
+        {"with_episodes": True},
+        {"with_episodes": False},
+    ]
+
+
+@patch(
+    "simplejustwatchapi.client.parse_show_tree_response", side_effect=COMPLEXITY_ERROR
+)
+@patch("simplejustwatchapi.client.prepare_show_tree_request", return_value=REQUEST)
+def test_show_tree_rejected_for_complexity_fails_without_splitting(
+    requests_mock, parser_mock, api_mock_success, transport
+):
+    with raises(JustWatchApiError):
+        JustWatchClient(transport=transport).show_tree(*DETAILS_INPUT)
+    api_mock_success.assert_called_once()
+
+
+@patch("simplejustwatchapi.client.parse_episodes_response")
+@patch("simplejustwatchapi.client.prepare_episodes_request", return_value=REQUEST)
+@mark.parametrize("parse_results", [ENTRIES, None])
+def test_episodes(
+    requests_mock, parser_mock, parse_results, api_mock_success, transport
+):
+    parser_mock.return_value = parse_results
+    results = JustWatchClient(transport=transport).episodes(*DETAILS_INPUT)
+    requests_mock.assert_called_with(*DETAILS_INPUT)
+    parser_mock.assert_called_with(DUMMY_RESPONSE)
+    assert results == parse_results
+
+
+@patch(
+    "simplejustwatchapi.client.parse_offers_for_countries_response",
+    return_value=ENTRIES,
+)
+@patch(
+    "simplejustwatchapi.client.prepare_offers_for_countries_request",
+    return_value=REQUEST,
+)
+def test_offers_for_countries(requests_mock, parser_mock, api_mock_success, transport):
+    results = JustWatchClient(transport=transport).offers_for_countries(*OFFERS_INPUT)
+    requests_mock.assert_called_with(*OFFERS_INPUT)
+    parser_mock.assert_called_with(DUMMY_RESPONSE, OFFERS_COUNTRIES_INPUT)
+    assert results == ENTRIES
+
+
+@patch("simplejustwatchapi.client.parse_offers_for_countries_response")
+@patch("simplejustwatchapi.client.prepare_offers_for_countries_request")
+def test_offers_for_countries_returns_empty_dict_for_empty_countries_set(
+    requests_mock, parser_mock, api_mock, transport
+):
+    results = JustWatchClient(transport=transport).offers_for_countries(
+        "", set(), "", False
+    )
+    assert not results
+    requests_mock.assert_not_called()
+    parser_mock.assert_not_called()
+    api_mock.assert_not_called()
+
+
+@patch("simplejustwatchapi.client.parse_providers_response", return_value=ENTRIES)
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_providers(requests_mock, parser_mock, api_mock_success, transport):
+    results = JustWatchClient(transport=transport).providers(PROVIDERS_INPUT)
+    requests_mock.assert_called_with(PROVIDERS_INPUT)
+    parser_mock.assert_called_with(DUMMY_RESPONSE)
+    assert results == ENTRIES
+
+
+@mark.parametrize(
+    argnames=("prepare_name", "method_name", "inputs"), argvalues=ALL_OPERATIONS
+)
+def test_http_request_error(
+    prepare_name, method_name, inputs, api_mock_request_error, transport
+):
+    full_mock_name = f"simplejustwatchapi.client.{prepare_name}"
+    client = JustWatchClient(transport=transport)
+    with patch(full_mock_name, return_value=REQUEST), raises(JustWatchHttpError) as e:
+        getattr(client, method_name)(*inputs)
+    assert str(e.value) == REQUEST_ERROR_MESSAGE
+    assert e.value.response is None
+
+
+@mark.parametrize(
+    argnames=("prepare_name", "method_name", "inputs"), argvalues=ALL_OPERATIONS
+)
+def test_http_status_error(
+    prepare_name, method_name, inputs, api_mock_status_error, transport
+):
+    full_mock_name = f"simplejustwatchapi.client.{prepare_name}"
+    client = JustWatchClient(transport=transport)
+    with patch(full_mock_name, return_value=REQUEST), raises(JustWatchHttpError) as e:
+        getattr(client, method_name)(*inputs)
+    assert str(RESPONSE_ERROR_STATUS_CODE) in str(e.value)
+    assert e.value.response == RESPONSE_ERROR_MESSAGE
+
+
+@patch("simplejustwatchapi.client.parse_providers_response", side_effect=lambda x: x)
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_transient_errors_are_retried(
+    requests_mock, parser_mock, api_mock, sleep_mock, transport
+):
+    api_mock.side_effect = [
+        response(503),
+        ConnectError(REQUEST_ERROR_MESSAGE),
+        response(200, DUMMY_RESPONSE),
+    ]
+    client = JustWatchClient(
+        transport=transport, retry=RetryPolicy(backoff=1.0, jitter=False)
+    )
+    results = client.providers()
+    assert results == DUMMY_RESPONSE
+    assert api_mock.call_count == 3  # noqa: PLR2004
+    assert sleep_mock.call_args_list == [((1.0,),), ((2.0,),)]
+    assert client.last_retries == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.parse_providers_response", side_effect=lambda x: x)
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_last_retries_are_tracked_separately_for_each_client(
+    requests_mock, parser_mock, api_mock, sleep_mock, transport
+):
+    api_mock.side_effect = [response(503), response(200, DUMMY_RESPONSE)]
+    retried = JustWatchClient(transport=transport, retry=RetryPolicy())
+    retried.providers()
+    other = JustWatchClient(transport=transport)
+    assert (retried.last_retries, other.last_retries) == (1, 0)
+    retried_ref = ref(retried)
+    del retried
+    collect()
+    assert retried_ref() is None
+
+
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_retries_stop_after_max_attempts(
+    requests_mock, api_mock, sleep_mock, transport
+):
+    api_mock.return_value = response(502)
+    client = JustWatchClient(transport=transport, retry=RetryPolicy(max_attempts=4))
+    with raises(JustWatchHttpError) as e:
+        client.providers()
+    assert "502" in str(e.value)
+    assert api_mock.call_count == 4  # noqa: PLR2004
+    assert sleep_mock.call_count == 3  # noqa: PLR2004
+    assert client.last_retries == 3  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_non_transient_errors_are_not_retried(
+    requests_mock, api_mock, sleep_mock, transport
+):
+    api_mock.return_value = response(400)
+    client = JustWatchClient(transport=transport, retry=RetryPolicy())
+    with raises(JustWatchHttpError):
+        client.providers()
+    api_mock.assert_called_once()
+    sleep_mock.assert_not_called()
+    assert client.last_retries == 0
+
+
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_errors_are_not_retried_without_retry_policy(
+    requests_mock, api_mock, sleep_mock, transport
+):
+    api_mock.return_value = response(503)
+    with raises(JustWatchHttpError):
+        JustWatchClient(transport=transport).providers()
+    api_mock.assert_called_once()
+    sleep_mock.assert_not_called()
+
+
+@patch("simplejustwatchapi.client.parse_providers_response")
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_retry_after_header_is_respected(
+    requests_mock, parser_mock, api_mock, sleep_mock, transport
+):
+    rate_limited = response(429)
+    rate_limited.headers["Retry-After"] = "3"
+    api_mock.side_effect = [rate_limited, response(200, DUMMY_RESPONSE)]
+    JustWatchClient(transport=transport, retry=RetryPolicy()).providers()
+    sleep_mock.assert_called_once_with(3.0)
+
+
+def slow_response_side_effect(release):
+    def respond(_):
+        release.wait()
+        return DUMMY_RESPONSE
+
+    return respond
+
+
+@patch("simplejustwatchapi.client.parse_details_response", side_effect=lambda x: x)
+def test_concurrent_identical_requests_are_coalesced(parser_mock, api_mock, transport):
+    release = Event()
+    api_mock.side_effect = slow_response_side_effect(release)
+    client = JustWatchClient(transport=transport)
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(client.details, "tm123") for _ in range(5)]
+        sleep(0.05)
+        release.set()
+        results = [future.result() for future in futures]
+    assert results == [DUMMY_RESPONSE] * 5
+    api_mock.assert_called_once()
+    assert parser_mock.call_count == 5  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.parse_details_response")
+def test_different_requests_are_not_coalesced(parser_mock, api_mock, transport):
+    release = Event()
+    api_mock.side_effect = slow_response_side_effect(release)
+    client = JustWatchClient(transport=transport)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(client.details, i) for i in ("tm1", "tm2")]
+        sleep(0.05)
+        release.set()
+        for future in futures:
+            future.result()
+    assert api_mock.call_count == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.parse_details_response")
+def test_coalescing_can_be_disabled(parser_mock, api_mock, transport):
+    release = Event()
+    api_mock.side_effect = slow_response_side_effect(release)
+    client = JustWatchClient(transport=transport, coalesce=False)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(client.details, "tm123") for _ in range(3)]
+        sleep(0.05)
+        release.set()
+        for future in futures:
+            future.result()
+    assert api_mock.call_count == 3  # noqa: PLR2004
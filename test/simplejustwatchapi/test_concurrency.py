@@ -0,0 +1,311 @@
+from asyncio import create_task, run, wait_for
+from asyncio import sleep as async_sleep
+from asyncio import timeout as async_timeout
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, suppress
+from threading import Event
+
+from httpx import ConnectError
+from pytest import fixture, mark, raises
+
+from simplejustwatchapi.client import AsyncJustWatchClient, JustWatchClient
+from simplejustwatchapi.concurrency import (
+    INCREASE,
+    LATENCY,
+    NETWORK_ERROR,
+    SERVER_ERROR,
+    THROTTLED,
+    AdaptiveConcurrency,
+)
+from simplejustwatchapi.exceptions import JustWatchError, JustWatchHttpError
+from test.simplejustwatchapi.stub_server import StubServer
+
+PROVIDERS_RESPONSE = {"data": {"packages": []}}
+CONNECTION_ERROR = ConnectError("Connection error")
+
+
+@fixture
+def clock(mocker):
+    clock = mocker.patch("simplejustwatchapi.concurrency.monotonic")
+    clock.return_value = 100.0
+    return clock
+
+
+def request(limiter, clock, status_code=200, latency=0.1):
+    with limiter.slot() as slot:
+        clock.return_value += latency
+        slot.status_code = status_code
+
+
+def concurrent_requests(limiter, clock, status_codes):
+    with ExitStack() as stack:
+        slots = [stack.enter_context(limiter.slot()) for _ in status_codes]
+        clock.return_value += 0.1
+        for slot, status_code in zip(slots, status_codes, strict=True):
+            slot.status_code = status_code
+
+
+@mark.parametrize(
+    argnames="config",
+    argvalues=[
+        {"initial_limit": 0},
+        {"initial_limit": 5, "min_limit": 6},
+        {"initial_limit": 5, "max_limit": 4},
+        {"backoff": 1},
+        {"backoff": 0},
+        {"latency_tolerance": 1},
+        {"smoothing": 0},
+    ],
+)
+def test_invalid_config(config):
+    with raises(JustWatchError):
+        AdaptiveConcurrency(**config)
+
+
+def test_slot_is_taken_while_request_is_in_flight(clock):
+    limiter = AdaptiveConcurrency(initial_limit=2)
+    with limiter.slot():
+        assert limiter.metrics.in_flight == 1
+    assert limiter.metrics.in_flight == 0
+
+
+def test_limit_grows_additively_for_successful_responses(clock):
+    limiter = AdaptiveConcurrency(initial_limit=2)
+    request(limiter, clock)
+    request(limiter, clock)
+    assert limiter.limit == 2  # noqa: PLR2004
+    request(limiter, clock)
+    assert limiter.limit == 3  # noqa: PLR2004
+    metrics = limiter.metrics
+    assert metrics.increases == 1
+    assert metrics.decisions[-1][1:] == (2, 3, INCREASE)
+
+
+def test_limit_doesnt_grow_if_it_isnt_used(clock):
+    limiter = AdaptiveConcurrency(initial_limit=4)
+    for _ in range(10):
+        request(limiter, clock)
+    assert limiter.limit == 4  # noqa: PLR2004
+
+
+def test_limit_doesnt_grow_over_maximum(clock):
+    limiter = AdaptiveConcurrency(initial_limit=1, max_limit=2)
+    for _ in range(10):
+        request(limiter, clock)
+    assert limiter.limit == 2  # noqa: PLR2004
+
+
+@mark.parametrize(
+    argnames=("status_code", "reason"),
+    argvalues=[(429, THROTTLED), (500, SERVER_ERROR), (503, SERVER_ERROR)],
+)
+def test_limit_is_cut_on_overload_status_codes(clock, status_code, reason):
+    limiter = AdaptiveConcurrency(initial_limit=10, backoff=0.5)
+    request(limiter, clock, status_code)
+    assert limiter.limit == 5  # noqa: PLR2004
+    assert limiter.metrics.decisions[-1][1:] == (10, 5, reason)
+
+
+def test_limit_is_cut_on_network_errors(clock):
+    limiter = AdaptiveConcurrency(initial_limit=10, backoff=0.5)
+    with raises(ConnectError), limiter.slot():
+        raise CONNECTION_ERROR
+    assert limiter.limit == 5  # noqa: PLR2004
+    assert limiter.metrics.decisions[-1].reason == NETWORK_ERROR
+
+
+def test_limit_is_cut_on_latency_blowup(clock):
+    limiter = AdaptiveConcurrency(initial_limit=10, latency_tolerance=2.0)
+    request(limiter, clock, latency=0.1)
+    request(limiter, clock, latency=0.19)
+    assert limiter.limit == 10  # noqa: PLR2004
+    request(limiter, clock, latency=0.5)
+    assert limiter.limit == 5  # noqa: PLR2004
+    assert limiter.metrics.decisions[-1].reason == LATENCY
+
+
+@mark.parametrize("status_code", [400, 404])
+def test_client_errors_dont_affect_limit(clock, status_code):
+    limiter = AdaptiveConcurrency(initial_limit=1)
+    request(limiter, clock, status_code)
+    assert limiter.limit == 1
+    assert limiter.metrics.decisions == ()
+
+
+def test_other_errors_dont_affect_limit(clock):
+    limiter = AdaptiveConcurrency(initial_limit=1)
+    with raises(JustWatchError), limiter.slot():
+        raise JustWatchError
+    assert limiter.limit == 1
+    assert limiter.metrics.in_flight == 0
+
+
+def test_limit_is_cut_once_per_overload_burst(clock):
+    limiter = AdaptiveConcurrency(initial_limit=8, backoff=0.5)
+    concurrent_requests(limiter, clock, [429, 429, 503, 429])
+    assert limiter.limit == 4  # noqa: PLR2004
+    request(limiter, clock, 429)
+    assert limiter.limit == 2  # noqa: PLR2004
+    assert limiter.metrics.decreases == 2  # noqa: PLR2004
+
+
+def test_limit_doesnt_go_below_minimum(clock):
+    limiter = AdaptiveConcurrency(initial_limit=4, min_limit=3)
+    request(limiter, clock, 429)
+    request(limiter, clock, 429)
+    assert limiter.limit == 3  # noqa: PLR2004
+
+
+def test_decisions_history_is_bounded(clock):
+    limiter = AdaptiveConcurrency(initial_limit=50, max_limit=50, history=3)
+    for _ in range(5):
+        request(limiter, clock, 429)
+    decisions = limiter.metrics.decisions
+    assert [decision.new_limit for decision in decisions] == [6, 3, 1]
+
+
+def test_requests_over_limit_wait_for_free_slot():
+    limiter = AdaptiveConcurrency(initial_limit=1)
+    release = Event()
+
+    def hold_slot():
+        with limiter.slot():
+            release.wait()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(hold_slot)
+        second = executor.submit(hold_slot)
+        while limiter.metrics.waiting == 0:
+            pass
+        assert limiter.metrics.in_flight == 1
+        release.set()
+        first.result()
+        second.result()
+    assert limiter.metrics.in_flight == 0
+
+
+def test_async_requests_over_limit_wait_for_free_slot():
+    limiter = AdaptiveConcurrency(initial_limit=1)
+
+    async def wait_for_slot():
+        async with limiter.slot_async():
+            waiting = create_task(use_slot())
+            await async_sleep(0.01)
+            assert limiter.metrics.waiting == 1
+        await wait_for(waiting, 1)
+
+    async def use_slot():
+        async with limiter.slot_async() as slot:
+            slot.status_code = 200
+
+    run(wait_for_slot())
+    assert limiter.metrics.in_flight == 0
+
+
+def test_waiting_for_slot_is_limited_by_max_wait():
+    limiter = AdaptiveConcurrency(initial_limit=1)
+    with limiter.slot():
+        with raises(TimeoutError), limiter.slot(max_wait=0.01):
+            pass
+        assert limiter.metrics.waiting == 0
+    with limiter.slot(max_wait=0):
+        assert limiter.metrics.in_flight == 1
+    assert limiter.metrics.in_flight == 0
+
+
+def test_async_waiting_for_slot_is_limited_by_max_wait():
+    limiter = AdaptiveConcurrency(initial_limit=1)
+
+    async def wait_too_long():
+        async with limiter.slot_async():
+            with raises(TimeoutError):
+                async with limiter.slot_async(max_wait=0.01):
+                    pass
+            assert limiter.metrics.waiting == 0
+
+    run(wait_too_long())
+    assert limiter.metrics.in_flight == 0
+
+
+def test_async_cancelled_waiter_doesnt_take_slot():
+    limiter = AdaptiveConcurrency(initial_limit=1)
+
+    async def cancel_waiting():
+        async with limiter.slot_async():
+            with raises(TimeoutError):
+                async with async_timeout(0.01), limiter.slot_async():
+                    pass
+            assert limiter.metrics.waiting == 0
+        async with limiter.slot_async():
+            assert limiter.metrics.in_flight == 1
+
+    run(cancel_waiting())
+    assert limiter.metrics.in_flight == 0
+
+
+def send_requests(client, requests, workers):
+    def send(_):
+        with suppress(JustWatchHttpError):
+            client.providers()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(send, range(requests)))
+
+
+def test_limit_adapts_to_server_capacity():
+    limiter = AdaptiveConcurrency(initial_limit=16, max_limit=32)
+    responses = {"GetProviders": PROVIDERS_RESPONSE}
+    with (
+        StubServer(responses, latency=0.005, capacity=4) as server,
+        JustWatchClient(url=server.url, concurrency=limiter, coalesce=False) as client,
+    ):
+        send_requests(client, requests=200, workers=16)
+        overloaded = limiter.metrics
+        assert overloaded.decreases > 0
+        assert THROTTLED in {decision.reason for decision in overloaded.decisions}
+        assert overloaded.limit < 16  # noqa: PLR2004
+        rejected = server.rejected
+        send_requests(client, requests=200, workers=16)
+        assert server.rejected - rejected < 50  # noqa: PLR2004
+
+        server.capacity = None
+        send_requests(client, requests=300, workers=16)
+        recovered = limiter.metrics
+        assert recovered.limit > overloaded.limit
+        assert recovered.increases > overloaded.increases
+
+
+def test_limit_adapts_to_latency_blowups():
+    limiter = AdaptiveConcurrency(initial_limit=2, max_limit=32)
+    responses = {"GetProviders": PROVIDERS_RESPONSE}
+    with (
+        StubServer(responses, latency=0.005, overload_status=None) as server,
+        JustWatchClient(url=server.url, concurrency=limiter, coalesce=False) as client,
+    ):
+        send_requests(client, requests=100, workers=16)
+        assert limiter.limit > 2  # noqa: PLR2004
+        server.capacity = 1
+        server.latency = 0.02
+        send_requests(client, requests=50, workers=16)
+    reasons = {decision.reason for decision in limiter.metrics.decisions}
+    assert LATENCY in reasons
+
+
+def test_async_client_uses_limiter():
+    limiter = AdaptiveConcurrency(initial_limit=8)
+    responses = {"GetProviders": PROVIDERS_RESPONSE}
+
+    async def send_concurrently(server):
+        async with AsyncJustWatchClient(
+            url=server.url, concurrency=limiter, coalesce=False
+        ) as client:
+            for _ in range(5):
+                tasks = [create_task(client.providers()) for _ in range(8)]
+                for task in tasks:
+                    with suppress(JustWatchHttpError):
+                        await task
+
+    with StubServer(responses, latency=0.005, capacity=2) as server:
+        run(send_concurrently(server))
+    assert limiter.metrics.decreases > 0
+    assert limiter.metrics.in_flight == 0
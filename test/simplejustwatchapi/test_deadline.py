@@ -0,0 +1,205 @@
+from asyncio import run
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+from unittest.mock import patch
+
+from httpx import Request, Response, Timeout
+from pytest import approx, fixture, raises
+
+from simplejustwatchapi.circuitbreaker import CLOSED, CircuitBreaker
+from simplejustwatchapi.client import AsyncJustWatchClient, JustWatchClient
+from simplejustwatchapi.concurrency import AdaptiveConcurrency
+from simplejustwatchapi.deadline import deadline, remaining, request_timeout
+from simplejustwatchapi.exceptions import JustWatchDeadlineError, JustWatchHttpError
+from simplejustwatchapi.hedging import HedgePolicy
+from simplejustwatchapi.ratelimit import RateLimiter
+from simplejustwatchapi.retry import RetryPolicy
+from test.simplejustwatchapi.stub_server import StubServer
+
+URL = "https://apis.justwatch.com/graphql"
+REQUEST = {"dummy": "request"}
+PROVIDERS_RESPONSE = {"data": {"packages": []}}
+
+
+@fixture
+def clock(mocker):
+    clock = mocker.patch("simplejustwatchapi.deadline.monotonic")
+    clock.return_value = 100.0
+    return clock
+
+
+@fixture
+def slow_server():
+    with StubServer({"GetProviders": PROVIDERS_RESPONSE}, latency=0.3) as server:
+        yield server
+
+
+def test_there_is_no_deadline_by_default():
+    timeout = Timeout(5.0)
+    assert remaining() is None
+    assert request_timeout(timeout) is timeout
+
+
+def test_deadline_shrinks_request_timeouts(clock):
+    with deadline(2.0):
+        clock.return_value += 0.5
+        assert remaining() == 1.5  # noqa: PLR2004
+        timeout = request_timeout(Timeout(5.0, connect=1.0, pool=None))
+    assert timeout == Timeout(connect=1.0, read=1.5, write=1.5, pool=1.5)
+    assert remaining() is None
+
+
+def test_nested_deadline_can_only_shorten_outer_one(clock):
+    with deadline(1.0):
+        with deadline(10.0):
+            assert remaining() == 1.0
+        with deadline(0.5):
+            assert remaining() == 0.5  # noqa: PLR2004
+        assert remaining() == 1.0
+
+
+def test_passed_deadline_raises_error(clock):
+    with deadline(1.0):
+        clock.return_value += 1.0
+        with raises(JustWatchDeadlineError):
+            request_timeout(Timeout(5.0))
+
+
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_request_isnt_sent_after_deadline(requests_mock, mocker):
+    http_client_mock = mocker.patch("simplejustwatchapi.client.Client")
+    client = JustWatchClient()
+    with client.deadline(0), raises(JustWatchDeadlineError):
+        client.providers()
+    http_client_mock.return_value.post.assert_not_called()
+
+
+@patch("simplejustwatchapi.client.sleep")
+@patch("simplejustwatchapi.client.prepare_providers_request", return_value=REQUEST)
+def test_retry_which_cant_finish_in_time_is_skipped(requests_mock, sleep_mock, mocker):
+    http_client_mock = mocker.patch("simplejustwatchapi.client.Client")
+    post_mock = http_client_mock.return_value.post
+    post_mock.return_value = Response(503, request=Request("POST", URL))
+    http_client_mock.return_value.timeout = Timeout(5.0)
+    client = JustWatchClient(retry=RetryPolicy(backoff=1.0, jitter=False))
+    with client.deadline(0.5), raises(JustWatchHttpError):
+        client.providers()
+    post_mock.assert_called_once()
+    sleep_mock.assert_not_called()
+
+
+def test_slow_request_is_stopped_at_deadline(slow_server):
+    with JustWatchClient(url=slow_server.url) as client:
+        started = monotonic()
+        with client.deadline(0.1), raises(JustWatchDeadlineError):
+            client.providers()
+        assert monotonic() - started == approx(0.1, abs=0.1)
+
+
+def test_deadline_covers_multiple_requests():
+    responses = {"GetProviders": PROVIDERS_RESPONSE}
+    with (
+        StubServer(responses, latency=0.1) as server,
+        JustWatchClient(url=server.url) as client,
+        client.deadline(0.15),
+    ):
+        client.providers()
+        with raises(JustWatchDeadlineError):
+            client.providers()
+
+
+def test_coalesced_call_waits_only_until_its_deadline(slow_server):
+    with JustWatchClient(url=slow_server.url) as client:
+
+        def call_with_deadline():
+            sleep(0.05)
+            with client.deadline(0.05):
+                client.providers()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(client.providers)
+            waiter = executor.submit(call_with_deadline)
+            with raises(JustWatchDeadlineError):
+                waiter.result(timeout=0.2)
+            assert leader.result() == []
+    assert len(slow_server.requests) == 1
+
+
+def test_hedged_requests_use_deadline(slow_server):
+    hedging = HedgePolicy(initial_delay=0.05)
+    with JustWatchClient(url=slow_server.url, hedging=hedging) as client:
+        started = monotonic()
+        with client.deadline(0.1), raises(JustWatchDeadlineError):
+            client.providers()
+        assert monotonic() - started == approx(0.1, abs=0.1)
+
+
+def test_async_slow_request_is_stopped_at_deadline(slow_server):
+    async def call():
+        async with AsyncJustWatchClient(url=slow_server.url) as client:
+            with client.deadline(0.1):
+                await client.providers()
+
+    with raises(JustWatchDeadlineError):
+        run(call())
+
+
+@fixture
+def server():
+    with StubServer({"GetProviders": PROVIDERS_RESPONSE}) as server:
+        yield server
+
+
+def test_waiting_for_saturated_rate_limiter_is_stopped_at_deadline(server):
+    limiter = RateLimiter(rate=0.5)
+    with JustWatchClient(url=server.url, rate_limiter=limiter) as client:
+        client.providers()
+        started = monotonic()
+        with client.deadline(0.2), raises(JustWatchDeadlineError):
+            client.providers()
+        assert monotonic() - started < 0.1  # noqa: PLR2004
+    assert len(server.requests) == 1
+
+
+def test_waiting_for_saturated_concurrency_is_stopped_at_deadline(server):
+    concurrency = AdaptiveConcurrency(initial_limit=1, max_limit=1)
+    with (
+        JustWatchClient(url=server.url, concurrency=concurrency) as client,
+        concurrency.slot(),
+    ):
+        started = monotonic()
+        with client.deadline(0.2), raises(JustWatchDeadlineError):
+            client.providers()
+        assert monotonic() - started == approx(0.2, abs=0.1)
+    assert concurrency.metrics.waiting == 0
+    assert concurrency.metrics.in_flight == 0
+    assert server.requests == []
+
+
+def test_async_waiting_for_saturated_concurrency_is_stopped_at_deadline(server):
+    concurrency = AdaptiveConcurrency(initial_limit=1, max_limit=1)
+
+    async def call():
+        async with (
+            AsyncJustWatchClient(url=server.url, concurrency=concurrency) as client,
+            concurrency.slot_async(),
+        ):
+            with client.deadline(0.1):
+                await client.providers()
+
+    with raises(JustWatchDeadlineError):
+        run(call())
+    assert concurrency.metrics.in_flight == 0
+
+
+def test_deadline_timeouts_arent_counted_as_api_failures(slow_server):
+    concurrency = AdaptiveConcurrency(initial_limit=10, min_limit=1)
+    circuit_breaker = CircuitBreaker(failure_threshold=1)
+    with JustWatchClient(
+        url=slow_server.url, concurrency=concurrency, circuit_breaker=circuit_breaker
+    ) as client:
+        for _ in range(3):
+            with client.deadline(0.05), raises(JustWatchDeadlineError):
+                client.providers()
+    assert concurrency.metrics.decreases == 0
+    assert circuit_breaker.state == CLOSED
@@ -1,13 +1,28 @@
-from pytest import mark
+from pytest import mark, raises
 
+from simplejustwatchapi.exceptions import JustWatchError
 from simplejustwatchapi.graphql import (
+    DEFAULT_COMPLEXITY_BUDGET,
     GRAPHQL_DETAILS_QUERY,
     GRAPHQL_EPISODES_QUERY,
     GRAPHQL_POPULAR_QUERY,
     GRAPHQL_PROVIDERS_QUERY,
     GRAPHQL_SEARCH_QUERY,
     GRAPHQL_SEASONS_QUERY,
+    GRAPHQL_SHOW_SEASONS_QUERY,
+    GRAPHQL_SHOW_TREE_QUERY,
+    estimate_complexity,
+    graphql_details_for_locales_query,
+    graphql_details_many_query,
+    graphql_episodes_many_query,
+    graphql_nodes_batch_query,
     graphql_offers_for_countries_query,
+    graphql_offers_matrix_query,
+    graphql_popular_for_countries_query,
+    graphql_providers_for_countries_query,
+    graphql_search_many_query,
+    graphql_seasons_many_query,
+    max_batch_size,
 )
 
 PACKAGE_ELEMENTS = [
@@ -90,6 +105,27 @@ def assert_query_contains_elements(query, elements):
                 *COMMON_ELEMENTS,
             ],
         ),
+        (
+            GRAPHQL_SHOW_TREE_QUERY,
+            [
+                "query GetShowTree",
+                "node(id: $nodeId)",
+                "... on Show",
+                "seasons(sortDirection: ASC)",
+                "episodes(sortDirection: ASC)",
+                *COMMON_ELEMENTS,
+            ],
+        ),
+        (
+            GRAPHQL_SHOW_SEASONS_QUERY,
+            [
+                "query GetShowSeasons",
+                "node(id: $nodeId)",
+                "... on Show",
+                "seasons(sortDirection: ASC)",
+                *COMMON_ELEMENTS,
+            ],
+        ),
     ],
 )
 def test_graphql_simple_query(query, expected_elements):
@@ -108,3 +144,255 @@ def test_graphql_offers_for_countries_query(country_codes):
     expected_elements.extend(country_code_offers)
     assert_query_contains_elements(query, expected_elements)
     assert query.count("...TitleOffer") == len(country_codes)
+
+
+@mark.parametrize(
+    argnames=("count", "countries"),
+    argvalues=[(1, ["US"]), (3, ["CA", "FR", "GB"]), (25, ["DE", "US"])],
+)
+def test_graphql_offers_matrix_query(count, countries):
+    query = graphql_offers_matrix_query(count, countries)
+    node_elements = [f"node{i}: node(id: $nodeId{i})" for i in range(count)]
+    variable_elements = [f"$nodeId{i}: ID!" for i in range(count)]
+    expected_elements = [
+        "query GetTitleOffersMatrix",
+        *node_elements,
+        *variable_elements,
+        *(
+            f"{country}: offers(country: {country}, platform: WEB, filter: $filter)"
+            for country in countries
+        ),
+        *PACKAGE_ELEMENTS,
+    ]
+    assert_query_contains_elements(query, expected_elements)
+    assert query.count("...TitleOffer") == count * len(countries)
+
+
+def test_graphql_show_seasons_query_has_no_episodes():
+    assert "episodes" not in GRAPHQL_SHOW_SEASONS_QUERY
+    assert GRAPHQL_SHOW_TREE_QUERY.count("...TitleDetails") == 3  # noqa: PLR2004
+
+
+@mark.parametrize("count", [1, 3, 25])
+def test_graphql_episodes_many_query(count):
+    query = graphql_episodes_many_query(count)
+    node_elements = [f"node{i}: node(id: $nodeId{i})" for i in range(count)]
+    variable_elements = [f"$nodeId{i}: ID!" for i in range(count)]
+    expected_elements = [
+        "query GetSeasonEpisodes",
+        "... on Season",
+        "episodes(sortDirection: ASC)",
+        *node_elements,
+        *variable_elements,
+        *COMMON_ELEMENTS,
+    ]
+    assert_query_contains_elements(query, expected_elements)
+    assert query.count("...TitleDetails") == count
+
+
+@mark.parametrize("count", [1, 3, 25])
+def test_graphql_seasons_many_query(count):
+    query = graphql_seasons_many_query(count)
+    node_elements = [f"node{i}: node(id: $nodeId{i})" for i in range(count)]
+    variable_elements = [f"$nodeId{i}: ID!" for i in range(count)]
+    expected_elements = [
+        "query GetShowsSeasons",
+        "... on Show",
+        "seasons(sortDirection: ASC)",
+        *node_elements,
+        *variable_elements,
+        *COMMON_ELEMENTS,
+    ]
+    assert_query_contains_elements(query, expected_elements)
+    assert query.count("...TitleDetails") == count
+
+
+def test_graphql_nodes_batch_query():
+    query = graphql_nodes_batch_query(["details", "seasons", "episodes", "details"])
+    expected_elements = [
+        "query GetTitleNodesBatch",
+        "... on Show",
+        "... on Season",
+        "seasons(sortDirection: ASC)",
+        "episodes(sortDirection: ASC)",
+        *[f"node{i}: node(id: $nodeId{i})" for i in range(4)],
+        *[f"$nodeId{i}: ID!" for i in range(4)],
+        *COMMON_ELEMENTS,
+    ]
+    assert_query_contains_elements(query, expected_elements)
+    assert query.count("...TitleDetails") == 4  # noqa: PLR2004
+    assert query.index("node1:") < query.index("... on Show") < query.index("node2:")
+
+
+@mark.parametrize("count", [1, 3, 25])
+def test_graphql_details_many_query(count):
+    query = graphql_details_many_query(count)
+    node_elements = [f"node{i}: node(id: $nodeId{i})" for i in range(count)]
+    variable_elements = [f"$nodeId{i}: ID!" for i in range(count)]
+    expected_elements = [
+        "query GetTitleNodes",
+        *node_elements,
+        *variable_elements,
+        *COMMON_ELEMENTS,
+    ]
+    assert_query_contains_elements(query, expected_elements)
+    assert query.count("...TitleDetails") == count
+
+
+@mark.parametrize("countries", [["US"], ["CA", "FR", "GB"]])
+def test_graphql_providers_for_countries_query(countries):
+    query = graphql_providers_for_countries_query(countries)
+    expected_elements = [
+        "query GetProvidersForCountries",
+        *PACKAGE_ELEMENTS,
+    ]
+    expected_elements += [
+        f"{country}: packages(\n    country: {country}\n" for country in countries
+    ]
+    assert_query_contains_elements(query, expected_elements)
+    assert "$country" not in query
+    assert query.count("fragment PackageDetails") == 1
+
+
+@mark.parametrize("countries", [["US"], ["CA", "FR", "GB"]])
+def test_graphql_popular_for_countries_query(countries):
+    query = graphql_popular_for_countries_query(countries)
+    expected_elements = [
+        "query GetPopularTitlesForCountries",
+        "$first: Int!",
+        "fragment TitleOffer on Offer",
+        *PACKAGE_ELEMENTS,
+    ]
+    for country in countries:
+        expected_elements += [
+            f"{country}: popularTitles(\n    country: {country}\n",
+            f"...TitleDetails{country}",
+            f"fragment TitleDetails{country} on MovieOrShowOrSeasonOrEpisode",
+            f"content(country: {country}, language: $language)",
+            f"offers(country: {country}, platform: WEB, filter: $filter)",
+            f"streamingCharts(country: {country})",
+            f"fragment FullContentDetails{country} on MovieOrShowOrSeasonContent",
+        ]
+    assert_query_contains_elements(query, expected_elements)
+    assert "$country" not in query
+    assert query.count("fragment TitleOffer") == 1
+
+
+@mark.parametrize("count", [1, 3, 12])
+def test_graphql_details_for_locales_query(count):
+    query = graphql_details_for_locales_query(count)
+    expected_elements = [
+        "query GetTitleNodeForLocales",
+        "$nodeId: ID!",
+        *PACKAGE_ELEMENTS,
+    ]
+    for index in range(count):
+        suffix = f"Locale{index}"
+        expected_elements += [
+            f"$country{index}: Country!",
+            f"$language{index}: Language!",
+            f"locale{index}: node(id: $nodeId)",
+            f"...TitleDetails{suffix}",
+            f"fragment TitleDetails{suffix} on MovieOrShowOrSeasonOrEpisode",
+            f"content(country: $country{index}, language: $language{index})",
+            f"offers(country: $country{index}, platform: WEB, filter: $filter)",
+            f"...TitleOffer{suffix}",
+            f"fragment TitleOffer{suffix} on Offer",
+            f"retailPrice(language: $language{index})",
+            f"fragment FullContentDetails{suffix} on MovieOrShowOrSeasonContent",
+        ]
+    assert_query_contains_elements(query, expected_elements)
+    assert "$country:" not in query
+    assert "$language:" not in query
+    assert "fragment TitleOffer on" not in query
+
+
+@mark.parametrize("count", [1, 3, 25])
+def test_graphql_search_many_query(count):
+    query = graphql_search_many_query(count)
+    search_elements = [
+        f"search{i}: popularTitles(\n    country: $country\n"
+        f"    filter: $searchTitlesFilter{i}\n    first: $first"
+        for i in range(count)
+    ]
+    variable_elements = [f"$searchTitlesFilter{i}: TitleFilter!" for i in range(count)]
+    expected_elements = [
+        "query GetSearchTitles",
+        "$first: Int!",
+        *search_elements,
+        *variable_elements,
+        *COMMON_ELEMENTS,
+    ]
+    assert_query_contains_elements(query, expected_elements)
+    assert query.count("...TitleDetails") == count
+
+
+def test_estimate_complexity_counts_fields_and_fragments():
+    query = """
+    query Test($first: Int = 5) {
+        a
+        b: c
+        list(first: $first) { ...Fragment __typename }
+        ... on Type { d }
+    }
+    fragment Fragment on Type { e f }
+    """
+    assert estimate_complexity(query) == 14  # noqa: PLR2004
+    assert estimate_complexity(query, {"first": 2}) == 8  # noqa: PLR2004
+
+
+def test_estimate_complexity_multiplies_lists_of_titles():
+    query = "{ seasons { id episodes { id } } offers { id package { id } } }"
+    assert estimate_complexity(query) == 1 + 8 * (2 + 10 * 1) + 1 + 3
+
+
+def test_default_complexity_budget_fits_largest_accepted_requests():
+    def popular_complexity(count):
+        return estimate_complexity(GRAPHQL_POPULAR_QUERY, {"first": count})
+
+    assert (
+        popular_complexity(100) <= DEFAULT_COMPLEXITY_BUDGET < popular_complexity(110)
+    )
+    popular_for_two_countries = graphql_popular_for_countries_query(["US", "GB"])
+    assert (
+        estimate_complexity(popular_for_two_countries, {"first": 50})
+        <= DEFAULT_COMPLEXITY_BUDGET
+    )
+
+
+def test_default_complexity_budget_fits_show_tree_query():
+    assert estimate_complexity(GRAPHQL_SHOW_TREE_QUERY) <= DEFAULT_COMPLEXITY_BUDGET
+
+
+def test_estimate_complexity_grows_with_first_argument():
+    complexities = [
+        estimate_complexity(GRAPHQL_POPULAR_QUERY, {"first": first})
+        for first in (1, 10, 100)
+    ]
+    assert complexities == sorted(complexities)
+    assert complexities[-1] > 10 * complexities[0]
+
+
+def test_estimate_complexity_grows_with_aliases():
+    single = estimate_complexity(GRAPHQL_DETAILS_QUERY)
+    assert estimate_complexity(graphql_details_many_query(10)) == 10 * single
+
+
+def test_estimate_complexity_raises_on_invalid_query():
+    with raises(JustWatchError):
+        estimate_complexity("query { node {")
+
+
+@mark.parametrize("budget", [1, 1000, 5000, 100_000])
+def test_max_batch_size_fits_into_budget(budget):
+    size = max_batch_size(graphql_details_many_query, budget, limit=500)
+    if size > 1:
+        assert estimate_complexity(graphql_details_many_query(size)) <= budget
+    if size < 500:  # noqa: PLR2004
+        assert estimate_complexity(graphql_details_many_query(size + 1)) > budget
+
+
+def test_max_batch_size_uses_variables():
+    single = max_batch_size(graphql_search_many_query, variables={"first": 1})
+    many = max_batch_size(graphql_search_many_query, variables={"first": 10})
+    assert single > many > 1
@@ -0,0 +1,248 @@
+from asyncio import CancelledError, Event, run
+from asyncio import sleep as async_sleep
+from concurrent.futures import CancelledError as FutureCancelledError
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from threading import Event as ThreadEvent
+from threading import Timer
+from threading import enumerate as enumerate_threads
+from time import sleep
+from unittest.mock import AsyncMock, patch
+
+from httpx import ConnectError, Request, Response
+from pytest import fixture, mark, raises
+
+from simplejustwatchapi.client import AsyncJustWatchClient, JustWatchClient
+from simplejustwatchapi.exceptions import JustWatchError
+from simplejustwatchapi.hedging import HedgePolicy
+
+URL = "https://apis.justwatch.com/graphql"
+REQUEST = {"dummy": "request"}
+PRIMARY_RESPONSE = {"response": "primary"}
+HEDGE_RESPONSE = {"response": "hedge"}
+CONNECTION_ERROR = ConnectError("Connection error")
+
+
+@fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+@fixture
+def release():
+    release = ThreadEvent()
+    yield release
+    release.set()
+
+
+def calls(*functions):
+    counter = count()
+
+    def call(*_, **__):
+        return functions[next(counter)]()
+
+    return call
+
+
+def blocked(release, result=PRIMARY_RESPONSE):
+    def function():
+        release.wait()
+        return result
+
+    return function
+
+
+def delayed(delay, result):
+    def function():
+        sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return function
+
+
+@mark.parametrize(
+    argnames="config",
+    argvalues=[
+        {"percentile": 101},
+        {"initial_delay": -1},
+        {"max_extra_load": 2},
+        {"burst": 0},
+        {"history": 0},
+        {"max_workers": 0},
+    ],
+)
+def test_invalid_config(config):
+    with raises(JustWatchError):
+        HedgePolicy(**config)
+
+
+def test_fast_request_is_not_hedged(executor):
+    hedging = HedgePolicy(initial_delay=1.0)
+    assert hedging.call(lambda: PRIMARY_RESPONSE, executor) == PRIMARY_RESPONSE
+    metrics = hedging.metrics
+    assert (metrics.calls, metrics.hedges, metrics.wins) == (1, 0, 0)
+
+
+def test_slow_request_is_hedged(executor, release):
+    hedging = HedgePolicy(initial_delay=0.01)
+    function = calls(blocked(release), lambda: HEDGE_RESPONSE)
+    assert hedging.call(function, executor) == HEDGE_RESPONSE
+    metrics = hedging.metrics
+    assert (metrics.calls, metrics.hedges, metrics.wins) == (1, 1, 1)
+
+
+def test_original_request_can_win_after_hedge_is_sent(executor, release):
+    hedging = HedgePolicy(initial_delay=0.01)
+    function = calls(delayed(0.05, PRIMARY_RESPONSE), blocked(release, HEDGE_RESPONSE))
+    assert hedging.call(function, executor) == PRIMARY_RESPONSE
+    metrics = hedging.metrics
+    assert (metrics.hedges, metrics.wins) == (1, 0)
+
+
+def test_failed_response_waits_for_the_other_request(executor):
+    hedging = HedgePolicy(initial_delay=0.01)
+    function = calls(delayed(0.03, CONNECTION_ERROR), delayed(0.05, HEDGE_RESPONSE))
+    assert hedging.call(function, executor) == HEDGE_RESPONSE
+
+
+def test_original_error_is_raised_if_both_requests_fail(executor):
+    hedging = HedgePolicy(initial_delay=0.01)
+    hedge_error = ConnectError("Hedge error")
+    function = calls(delayed(0.03, CONNECTION_ERROR), delayed(0.01, hedge_error))
+    with raises(ConnectError) as error:
+        hedging.call(function, executor)
+    assert error.value is CONNECTION_ERROR
+
+
+def test_request_failing_before_delay_is_not_hedged(executor):
+    hedging = HedgePolicy(initial_delay=1.0)
+    with raises(ConnectError):
+        hedging.call(delayed(0, CONNECTION_ERROR), executor)
+    assert hedging.metrics.hedges == 0
+
+
+def test_number_of_hedges_is_limited(executor):
+    hedging = HedgePolicy(initial_delay=0.01, max_extra_load=0, burst=1)
+    for _ in range(3):
+        hedging.call(delayed(0.03, PRIMARY_RESPONSE), executor)
+    metrics = hedging.metrics
+    assert (metrics.calls, metrics.hedges) == (3, 1)
+
+
+def test_time_waiting_for_thread_isnt_counted_into_delay(executor):
+    hedging = HedgePolicy(initial_delay=0.05)
+    busy = [executor.submit(sleep, 0.1) for _ in range(4)]
+    assert hedging.call(delayed(0.01, PRIMARY_RESPONSE), executor) == PRIMARY_RESPONSE
+    assert all(future.done() for future in busy)
+    assert hedging.metrics.hedges == 0
+
+
+def test_call_cancelled_before_it_starts_raises_error(release):
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.submit(release.wait)
+    shutdown = {"wait": False, "cancel_futures": True}
+    Timer(0.05, executor.shutdown, kwargs=shutdown).start()
+    with raises(FutureCancelledError):
+        HedgePolicy().call(lambda: PRIMARY_RESPONSE, executor)
+
+
+def test_delay_is_percentile_of_recent_latencies(mocker, executor):
+    clock = mocker.patch("simplejustwatchapi.hedging.monotonic")
+    clock.return_value = 100.0
+    hedging = HedgePolicy(percentile=90.0, initial_delay=5.0, history=20)
+
+    def request(latency):
+        def function():
+            clock.return_value += latency
+            return PRIMARY_RESPONSE
+
+        return function
+
+    for latency in range(1, 20):
+        hedging.call(request(latency), executor)
+    assert hedging.delay == 5.0  # noqa: PLR2004
+    hedging.call(request(20), executor)
+    assert hedging.delay == 18.0  # noqa: PLR2004
+    for _ in range(20):
+        hedging.call(request(1), executor)
+    assert hedging.delay == 1.0
+
+
+def test_async_slow_request_is_hedged_and_cancelled():
+    hedging = HedgePolicy(initial_delay=0.01)
+    cancelled = Event()
+
+    async def slow():
+        try:
+            await async_sleep(10)
+        except CancelledError:
+            cancelled.set()
+            raise
+
+    async def fast():
+        return HEDGE_RESPONSE
+
+    async def hedge():
+        result = await hedging.call_async(calls(slow, fast))
+        await async_sleep(0)
+        return result, cancelled.is_set()
+
+    assert run(hedge()) == (HEDGE_RESPONSE, True)
+    assert hedging.metrics.wins == 1
+
+
+def test_async_original_error_is_raised_if_both_requests_fail():
+    hedging = HedgePolicy(initial_delay=0.01)
+
+    async def fail(delay):
+        await async_sleep(delay)
+        raise CONNECTION_ERROR
+
+    with raises(ConnectError):
+        run(hedging.call_async(calls(lambda: fail(0.03), lambda: fail(0.01))))
+
+
+def response(json):
+    return Response(200, request=Request("POST", URL), json=json)
+
+
+@patch("simplejustwatchapi.client.parse_details_response", side_effect=lambda x: x)
+@patch("simplejustwatchapi.client.prepare_details_request", return_value=REQUEST)
+def test_client_uses_hedged_response(requests_mock, parser_mock, mocker, release):
+    http_client_mock = mocker.patch("simplejustwatchapi.client.Client")
+    post_mock = http_client_mock.return_value.post
+    post_mock.side_effect = calls(
+        blocked(release, response(PRIMARY_RESPONSE)), lambda: response(HEDGE_RESPONSE)
+    )
+    client = JustWatchClient(hedging=HedgePolicy(initial_delay=0.01))
+    assert client.details("tm123") == HEDGE_RESPONSE
+    assert post_mock.call_count == 2  # noqa: PLR2004
+
+
+@patch("simplejustwatchapi.client.parse_details_response", side_effect=lambda x: x)
+@patch("simplejustwatchapi.client.prepare_details_request", return_value=REQUEST)
+def test_client_shuts_down_its_threads_on_close(requests_mock, parser_mock, mocker):
+    http_client_mock = mocker.patch("simplejustwatchapi.client.Client")
+    http_client_mock.return_value.post.return_value = response(PRIMARY_RESPONSE)
+    with JustWatchClient(hedging=HedgePolicy()) as client:
+        assert client.details("tm123") == PRIMARY_RESPONSE
+    assert not [t for t in enumerate_threads() if t.name.startswith("justwatch-hedge")]
+
+
+@patch("simplejustwatchapi.client.parse_details_response", side_effect=lambda x: x)
+@patch("simplejustwatchapi.client.prepare_details_request", return_value=REQUEST)
+def test_async_client_uses_hedged_response(requests_mock, parser_mock, mocker):
+    http_client_mock = mocker.patch("simplejustwatchapi.client.AsyncClient")
+    responses = iter([(10, PRIMARY_RESPONSE), (0, HEDGE_RESPONSE)])
+
+    async def post(*_, **__):
+        delay, json = next(responses)
+        await async_sleep(delay)
+        return response(json)
+
+    http_client_mock.return_value.post = AsyncMock(side_effect=post)
+    client = AsyncJustWatchClient(hedging=HedgePolicy(initial_delay=0.01))
+    assert run(client.details("tm123")) == HEDGE_RESPONSE
@@ -1,192 +1,89 @@
 from unittest.mock import MagicMock, patch
 
-from httpx import Request, RequestError, Response
-from pytest import fixture, mark, raises
+from pytest import fixture, mark
 
-from simplejustwatchapi.exceptions import JustWatchHttpError
+from simplejustwatchapi.client import JustWatchClient
 from simplejustwatchapi.justwatch import (
+    _default_client,
     details,
+    details_for_locales,
+    details_many,
     episodes,
+    episodes_many,
+    iter_popular,
+    iter_search,
     offers_for_countries,
+    offers_matrix,
     popular,
+    popular_for_countries,
     providers,
+    providers_for_countries,
     search,
+    search_many,
     seasons,
+    seasons_many,
+    show_tree,
 )
 
-JUSTWATCH_GRAPHQL_URL = "https://apis.justwatch.com/graphql"
-
 SEARCH_INPUT = ("TITLE", "COUNTRY", "LANGUAGE", 5, True, 10, ["prov1", "prov2"])
+SEARCH_MANY_INPUT = (["TITLE 1", "TITLE 2"], "COUNTRY", "LANGUAGE", 5, True, "prov")
 POPULAR_INPUT = ("COUNTRY", "LANGUAGE", 5, True, 10, ["prov1", "prov2"])
+POPULAR_FOR_COUNTRIES_INPUT = ({"US", "GB"}, "LANGUAGE", 5, True, ["prov1"])
 DETAILS_INPUT = ("NODE ID", "COUNTRY", "LANGUAGE", False)
-OFFERS_COUNTRIES_INPUT = {"COUNTRY1", "COUNTRY2", "COUNTRY3"}
-OFFERS_INPUT = ("NODE ID", OFFERS_COUNTRIES_INPUT, "LANGUAGE", True)
-PROVIDERS_INPUT = "US"
-
-REQUEST = {"dummy": "request"}
-DUMMY_RESPONSE = {"dummy": "response"}
-ENTRIES = [MagicMock(), MagicMock(), None]
-
-REQUEST_ERROR_MESSAGE = "HTTP request error"
-RESPONSE_ERROR_STATUS_CODE = 420
-RESPONSE_ERROR_MESSAGE = "HTTP response error"
-
+DETAILS_MANY_INPUT = (["NODE ID 1", "NODE ID 2"], "COUNTRY", "LANGUAGE", False)
+DETAILS_FOR_LOCALES_INPUT = ("NODE ID", [("US", "en"), ("DE", "de")], False)
+OFFERS_INPUT = ("NODE ID", {"COUNTRY1", "COUNTRY2"}, "LANGUAGE", True)
+OFFERS_MATRIX_INPUT = (["ID1", "ID2"], {"COUNTRY1", "COUNTRY2"}, "LANGUAGE", True)
+PROVIDERS_INPUT = ("US",)
+PROVIDERS_FOR_COUNTRIES_INPUT = ({"US", "GB"},)
 
-@fixture
-def post_mock_success(mocker):
-    post_mock = mocker.patch("simplejustwatchapi.justwatch.post")
-    post_mock.return_value.json.return_value = DUMMY_RESPONSE
-    yield post_mock
-    post_mock.assert_called_with(JUSTWATCH_GRAPHQL_URL, json=REQUEST)
-
-
-@fixture
-def post_mock_request_error(mocker):
-    post_mock = mocker.patch("simplejustwatchapi.justwatch.post")
-    post_mock.side_effect = RequestError(REQUEST_ERROR_MESSAGE)
-    mock_request = Request(method="POST", url=JUSTWATCH_GRAPHQL_URL)
-    post_mock.return_value = Response(status_code=200, request=mock_request)
-    # Technically setting the return value is not necessary, since the side effect will
-    # be raised before the return value is used, but it can be useful for debugging if
-    # the test fails due to the side effect not being raised for some reason.
-    return post_mock
+RESULT = MagicMock()
 
 
 @fixture
-def post_mock_status_error(mocker):
-    post_mock = mocker.patch("simplejustwatchapi.justwatch.post")
-    mock_request = Request(method="POST", url=JUSTWATCH_GRAPHQL_URL)
-    post_mock.return_value = Response(
-        status_code=RESPONSE_ERROR_STATUS_CODE,
-        request=mock_request,
-        text=RESPONSE_ERROR_MESSAGE,
+def client_mock(mocker):
+    client_mock = MagicMock(spec=JustWatchClient)
+    mocker.patch(
+        "simplejustwatchapi.justwatch._default_client", return_value=client_mock
     )
-    return post_mock
-
-
-@patch("simplejustwatchapi.justwatch.parse_search_response", return_value=ENTRIES)
-@patch("simplejustwatchapi.justwatch.prepare_search_request", return_value=REQUEST)
-def test_search(requests_mock, parser_mock, post_mock_success):
-    results = search(*SEARCH_INPUT)
-    requests_mock.assert_called_with(*SEARCH_INPUT)
-    parser_mock.assert_called_with(DUMMY_RESPONSE)
-    assert results == ENTRIES
-
-
-@patch("simplejustwatchapi.justwatch.parse_popular_response", return_value=ENTRIES)
-@patch("simplejustwatchapi.justwatch.prepare_popular_request", return_value=REQUEST)
-def test_popular(requests_mock, parser_mock, post_mock_success):
-    results = popular(*POPULAR_INPUT)
-    requests_mock.assert_called_with(*POPULAR_INPUT)
-    parser_mock.assert_called_with(DUMMY_RESPONSE)
-    assert results == ENTRIES
-
-
-@patch("simplejustwatchapi.justwatch.parse_details_response")
-@patch("simplejustwatchapi.justwatch.prepare_details_request", return_value=REQUEST)
-@mark.parametrize("parse_results", [ENTRIES, None])
-def test_details(requests_mock, parser_mock, parse_results, post_mock_success):
-    parser_mock.return_value = parse_results
-    results = details(*DETAILS_INPUT)
-    requests_mock.assert_called_with(*DETAILS_INPUT)
-    parser_mock.assert_called_with(DUMMY_RESPONSE)
-    assert results == parse_results
-
-
-@patch("simplejustwatchapi.justwatch.parse_seasons_response")
-@patch("simplejustwatchapi.justwatch.prepare_seasons_request", return_value=REQUEST)
-@mark.parametrize("parse_results", [ENTRIES, None])
-def test_seasons(requests_mock, parser_mock, parse_results, post_mock_success):
-    parser_mock.return_value = parse_results
-    results = seasons(*DETAILS_INPUT)
-    requests_mock.assert_called_with(*DETAILS_INPUT)
-    parser_mock.assert_called_with(DUMMY_RESPONSE)
-    assert results == parse_results
-
-
-@patch("simplejustwatchapi.justwatch.parse_episodes_response")
-@patch("simplejustwatchapi.justwatch.prepare_episodes_request", return_value=REQUEST)
-@mark.parametrize("parse_results", [ENTRIES, None])
-def test_episodes(requests_mock, parser_mock, parse_results, post_mock_success):
-    parser_mock.return_value = parse_results
-    results = episodes(*DETAILS_INPUT)
-    requests_mock.assert_called_with(*DETAILS_INPUT)
-    parser_mock.assert_called_with(DUMMY_RESPONSE)
-    assert results == parse_results
-
-
-@patch(
-    "simplejustwatchapi.justwatch.parse_offers_for_countries_response",
-    return_value=ENTRIES,
-)
-@patch(
-    "simplejustwatchapi.justwatch.prepare_offers_for_countries_request",
-    return_value=REQUEST,
-)
-def test_offers_for_countries(requests_mock, parser_mock, post_mock_success):
-    results = offers_for_countries(*OFFERS_INPUT)
-    requests_mock.assert_called_with(*OFFERS_INPUT)
-    parser_mock.assert_called_with(DUMMY_RESPONSE, OFFERS_COUNTRIES_INPUT)
-    assert results == ENTRIES
-
-
-@patch("simplejustwatchapi.justwatch.parse_offers_for_countries_response")
-@patch("simplejustwatchapi.justwatch.prepare_offers_for_countries_request")
-@patch("simplejustwatchapi.justwatch.post")
-def test_offers_for_countries_returns_empty_dict_for_empty_countries_set(
-    requests_mock, parser_mock, post_mock_success
-):
-    results = offers_for_countries("", set(), "", False)
-    assert not results
-    requests_mock.assert_not_called()
-    parser_mock.assert_not_called()
-    post_mock_success.assert_not_called()
-
-
-@patch("simplejustwatchapi.justwatch.parse_providers_response", return_value=ENTRIES)
-@patch("simplejustwatchapi.justwatch.prepare_providers_request", return_value=REQUEST)
-def test_providers(requests_mock, parser_mock, post_mock_success):
-    results = providers(PROVIDERS_INPUT)
-    requests_mock.assert_called_with(PROVIDERS_INPUT)
-    parser_mock.assert_called_with(DUMMY_RESPONSE)
-    assert results == ENTRIES
-
-
-@mark.parametrize(
-    argnames=("prepare_name", "function", "inputs"),
-    argvalues=[
-        ("prepare_search_request", search, SEARCH_INPUT),
-        ("prepare_popular_request", popular, POPULAR_INPUT),
-        ("prepare_details_request", details, DETAILS_INPUT),
-        ("prepare_seasons_request", seasons, DETAILS_INPUT),
-        ("prepare_episodes_request", episodes, DETAILS_INPUT),
-        ("prepare_offers_for_countries_request", offers_for_countries, OFFERS_INPUT),
-        ("prepare_providers_request", providers, (PROVIDERS_INPUT,)),
-    ],
-)
-def test_http_request_error(prepare_name, function, inputs, post_mock_request_error):
-    full_mock_name = f"simplejustwatchapi.justwatch.{prepare_name}"
-    with patch(full_mock_name), raises(JustWatchHttpError) as e:
-        function(*inputs)
-    assert str(e.value) == REQUEST_ERROR_MESSAGE
-    assert e.value.response is None
+    return client_mock
 
 
 @mark.parametrize(
-    argnames=("prepare_name", "function", "inputs"),
+    argnames=("function", "inputs"),
     argvalues=[
-        ("prepare_search_request", search, SEARCH_INPUT),
-        ("prepare_popular_request", popular, POPULAR_INPUT),
-        ("prepare_details_request", details, DETAILS_INPUT),
-        ("prepare_seasons_request", seasons, DETAILS_INPUT),
-        ("prepare_episodes_request", episodes, DETAILS_INPUT),
-        ("prepare_offers_for_countries_request", offers_for_countries, OFFERS_INPUT),
-        ("prepare_providers_request", providers, (PROVIDERS_INPUT,)),
+        (search, SEARCH_INPUT),
+        (search_many, SEARCH_MANY_INPUT),
+        (iter_search, SEARCH_INPUT),
+        (popular, POPULAR_INPUT),
+        (popular_for_countries, POPULAR_FOR_COUNTRIES_INPUT),
+        (iter_popular, POPULAR_INPUT),
+        (details, DETAILS_INPUT),
+        (details_many, DETAILS_MANY_INPUT),
+        (details_for_locales, DETAILS_FOR_LOCALES_INPUT),
+        (seasons, DETAILS_INPUT),
+        (seasons_many, DETAILS_MANY_INPUT),
+        (episodes, DETAILS_INPUT),
+        (episodes_many, DETAILS_MANY_INPUT),
+        (show_tree, DETAILS_INPUT),
+        (offers_for_countries, OFFERS_INPUT),
+        (offers_matrix, OFFERS_MATRIX_INPUT),
+        (providers, PROVIDERS_INPUT),
+        (providers_for_countries, PROVIDERS_FOR_COUNTRIES_INPUT),
     ],
 )
-def test_http_status_error(prepare_name, function, inputs, post_mock_status_error):
-    full_mock_name = f"simplejustwatchapi.justwatch.{prepare_name}"
-    with patch(full_mock_name), raises(JustWatchHttpError) as e:
-        function(*inputs)
-    assert str(RESPONSE_ERROR_STATUS_CODE) in str(e.value)
-    assert e.value.response == RESPONSE_ERROR_MESSAGE
+def test_function_delegates_to_default_client(function, inputs, client_mock):
+    client_method = getattr(client_mock, function.__name__)
+    client_method.return_value = RESULT
+    results = function(*inputs)
+    client_method.assert_called_once_with(*inputs)
+    assert results == RESULT
+
+
+@patch("simplejustwatchapi.justwatch._default_client_instance", None)
+@patch("simplejustwatchapi.justwatch.JustWatchClient")
+def test_default_client_is_created_once(client_class_mock):
+    first_client = _default_client()
+    second_client = _default_client()
+    client_class_mock.assert_called_once_with()
+    assert first_client is second_client is client_class_mock.return_value
@@ -0,0 +1,165 @@
+from asyncio import Event as AsyncEvent
+from asyncio import run, wait_for
+from threading import Event
+from unittest.mock import AsyncMock, MagicMock
+
+from pytest import mark, raises
+
+from simplejustwatchapi.client import AsyncJustWatchClient, JustWatchClient
+from simplejustwatchapi.deadline import deadline, remaining
+from simplejustwatchapi.exceptions import JustWatchError
+from simplejustwatchapi.paging import MAX_RESULTS, aiter_pages, iter_pages, page_ranges
+
+PAGES = [range(3), range(3, 6), range(6, 9)]
+
+
+def fetch_page(page):
+    return list(page)
+
+
+def api_page(*args):
+    count, offset = args[-4], args[-2]
+    return list(range(offset, min(offset + count, MAX_RESULTS)))
+
+
+def test_page_ranges_stop_at_max_results():
+    pages = page_ranges(1900, 40)
+    assert pages == [range(1900, 1940), range(1940, 1980), range(1980, MAX_RESULTS)]
+    assert page_ranges(MAX_RESULTS, 40) == []
+
+
+@mark.parametrize(
+    argnames=("offset", "page_size"),
+    argvalues=[(0, 0), (-1, 10)],
+)
+def test_invalid_pagination(offset, page_size):
+    with raises(JustWatchError):
+        page_ranges(offset, page_size)
+
+
+def test_entries_from_all_pages_are_returned():
+    assert list(iter_pages(fetch_page, PAGES)) == list(range(9))
+
+
+def test_iteration_stops_at_page_shorter_than_requested():
+    fetch = MagicMock(side_effect=[[0, 1, 2], [3], [6, 7, 8]])
+    assert list(iter_pages(fetch, PAGES)) == [0, 1, 2, 3]
+    assert fetch.call_count == 2  # noqa: PLR2004
+
+
+def test_next_page_is_fetched_while_page_is_consumed():
+    fetched = Event()
+
+    def fetch(page):
+        if page.start > 0:
+            fetched.set()
+        return list(page)
+
+    entries = iter_pages(fetch, PAGES[:2])
+    assert next(entries) == 0
+    assert fetched.wait(1.0)
+    assert list(entries) == [1, 2, 3, 4, 5]
+
+
+def test_prefetched_page_is_discarded_when_iteration_stops():
+    fetch = MagicMock(side_effect=fetch_page)
+    entries = iter_pages(fetch, PAGES)
+    assert next(entries) == 0
+    entries.close()
+    assert fetch.call_count <= 2  # noqa: PLR2004
+
+
+def test_page_error_is_raised_when_page_is_reached():
+    fetch = MagicMock(side_effect=[[0, 1, 2], JustWatchError("Request failed")])
+    entries = iter_pages(fetch, PAGES)
+    assert [next(entries) for _ in range(3)] == [0, 1, 2]
+    with raises(JustWatchError):
+        next(entries)
+
+
+def test_prefetched_pages_use_caller_deadline():
+    remaining_times = []
+
+    def fetch(page):
+        remaining_times.append(remaining())
+        return list(page)
+
+    with deadline(10.0):
+        list(iter_pages(fetch, PAGES))
+    assert all(time is not None for time in remaining_times)
+    assert len(remaining_times) == len(PAGES)
+
+
+def test_async_entries_from_all_pages_are_returned():
+    fetch = AsyncMock(side_effect=[[0, 1, 2], [3, 4, 5], [6]])
+
+    async def iterate():
+        return [entry async for entry in aiter_pages(fetch, PAGES)]
+
+    assert run(iterate()) == list(range(7))
+    assert fetch.await_count == 3  # noqa: PLR2004
+
+
+def test_async_next_page_is_fetched_while_page_is_consumed():
+    async def iterate():
+        fetched = AsyncEvent()
+
+        async def fetch(page):
+            if page.start > 0:
+                fetched.set()
+            return list(page)
+
+        entries = aiter_pages(fetch, PAGES[:2])
+        first = await anext(entries)
+        await wait_for(fetched.wait(), 1.0)
+        return [first] + [entry async for entry in entries]
+
+    assert run(iterate()) == list(range(6))
+
+
+def test_async_prefetched_page_is_cancelled_when_iteration_stops():
+    async def iterate():
+        started = AsyncEvent()
+
+        async def fetch(page):
+            if page.start > 0:
+                started.set()
+                await AsyncEvent().wait()
+            return list(page)
+
+        entries = aiter_pages(fetch, PAGES)
+        await anext(entries)
+        await wait_for(started.wait(), 1.0)
+        await entries.aclose()
+
+    run(iterate())
+
+
+def test_client_iterates_popular_up_to_max_results(mocker):
+    popular_mock = mocker.patch.object(JustWatchClient, "popular", side_effect=api_page)
+    entries = list(JustWatchClient().iter_popular("US", page_size=500, offset=10))
+    assert entries == list(range(10, MAX_RESULTS))
+    counts = [call.args[2] for call in popular_mock.call_args_list]
+    assert counts == [500, 500, 500, 489]
+
+
+def test_client_raises_error_for_invalid_page_size(mocker):
+    popular_mock = mocker.patch.object(JustWatchClient, "popular")
+    with raises(JustWatchError):
+        JustWatchClient().iter_popular(page_size=0)
+    popular_mock.assert_not_called()
+
+
+def test_async_client_iterates_search_results(mocker):
+    search_mock = mocker.patch.object(
+        AsyncJustWatchClient,
+        "search",
+        new=AsyncMock(side_effect=lambda *args: api_page(*args)[:5]),
+    )
+
+    async def iterate():
+        client = AsyncJustWatchClient()
+        return [entry async for entry in client.iter_search("TITLE", page_size=10)]
+
+    assert run(iterate()) == list(range(5))
+    search_mock.assert_called_once_with("TITLE", "US", "en", 10, True, 0, None)
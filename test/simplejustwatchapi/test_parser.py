@@ -1,15 +1,26 @@
 from pytest import mark, raises
 
-from simplejustwatchapi.exceptions import JustWatchApiError
+from simplejustwatchapi.exceptions import JustWatchApiError, JustWatchError
 from simplejustwatchapi.query import (
+    parse_details_for_locales_response,
+    parse_details_many_response,
     parse_details_response,
+    parse_episodes_many_response,
     parse_episodes_response,
+    parse_nodes_batch_response,
     parse_offers_for_countries_response,
+    parse_offers_matrix_response,
+    parse_popular_for_countries_response,
     parse_popular_response,
+    parse_providers_for_countries_response,
     parse_providers_response,
+    parse_search_many_response,
     parse_search_response,
+    parse_seasons_many_response,
     parse_seasons_response,
+    parse_show_tree_response,
 )
+from simplejustwatchapi.tuples import ShowTree
 from test.simplejustwatchapi.parser_data import (
     API_EPISODES_RESPONSE_JSON,
     API_EPISODES_RESPONSE_NO_DATA,
@@ -27,6 +38,8 @@ from test.simplejustwatchapi.parser_data import (
     PARSED_PACKAGE_1,
     PARSED_PACKAGE_2,
     PARSED_PACKAGE_3,
+    RESPONSE_EPISODE_1,
+    RESPONSE_EPISODE_2,
     RESPONSE_NODE_1,
     RESPONSE_NODE_2,
     RESPONSE_NODE_3,
@@ -48,6 +61,22 @@ def test_parse_search_response(response_json, expected_output):
     assert parsed_entries == expected_output
 
 
+def test_parse_search_many_response():
+    response_json = {
+        "data": {
+            "search0": API_SEARCH_RESPONSE_JSON["data"]["popularTitles"],
+            "search1": API_SEARCH_RESPONSE_NO_DATA["data"]["popularTitles"],
+            "search2": None,
+        }
+    }
+    parsed_entries = parse_search_many_response(response_json, ["A", "B", "C"])
+    assert parsed_entries == {
+        "A": [PARSED_NODE_1, PARSED_NODE_2, PARSED_NODE_3],
+        "B": [],
+        "C": [],
+    }
+
+
 @mark.parametrize(
     argnames=("response_json", "expected_output"),
     argvalues=[
@@ -60,6 +89,24 @@ def test_parse_popular_response(response_json, expected_output):
     assert parsed_entries == expected_output
 
 
+def test_parse_popular_for_countries_response():
+    response_json = {
+        "data": {
+            "US": API_SEARCH_RESPONSE_JSON["data"]["popularTitles"],
+            "GB": API_SEARCH_RESPONSE_NO_DATA["data"]["popularTitles"],
+            "FR": API_SEARCH_RESPONSE_JSON["data"]["popularTitles"],
+        }
+    }
+    parsed_entries = parse_popular_for_countries_response(
+        response_json, {"us", "GB", "DE"}
+    )
+    assert parsed_entries == {
+        "us": [PARSED_NODE_1, PARSED_NODE_2, PARSED_NODE_3],
+        "GB": [],
+        "DE": [],
+    }
+
+
 @mark.parametrize(
     argnames=("response_json", "expected_output"),
     argvalues=[
@@ -73,6 +120,33 @@ def test_parse_details_response(response_json, expected_output):
     assert parsed_entries == expected_output
 
 
+@mark.parametrize(
+    argnames=("response_json", "node_ids", "expected_output"),
+    argvalues=[
+        (
+            {"data": {"node0": RESPONSE_NODE_1, "node1": RESPONSE_NODE_2}},
+            ["ID 1", "ID 2"],
+            {"ID 1": PARSED_NODE_1, "ID 2": PARSED_NODE_2},
+        ),
+        (
+            {
+                "data": {
+                    "node0": RESPONSE_NODE_3,
+                    "node1": None,
+                    "node2": RESPONSE_NODE_1,
+                }
+            },
+            ["ID 3", "MISSING", "ID 1"],
+            {"ID 3": PARSED_NODE_3, "ID 1": PARSED_NODE_1},
+        ),
+    ],
+)
+def test_parse_details_many_response(response_json, node_ids, expected_output):
+    parsed_entries = parse_details_many_response(response_json, node_ids)
+    assert parsed_entries == expected_output
+    assert list(parsed_entries) == list(expected_output)
+
+
 @mark.parametrize(
     argnames=("response_json", "expected_output"),
     argvalues=[
@@ -100,6 +174,159 @@ def test_parse_episodes_response(response_json, expected_output):
     assert parsed_entries == expected_output
 
 
+def test_parse_seasons_many_response():
+    response_json = {
+        "data": {
+            "node0": {"seasons": [RESPONSE_NODE_2, RESPONSE_NODE_3]},
+            "node1": None,
+            "node2": {"__typename": "Movie"},
+        }
+    }
+    parsed_seasons = parse_seasons_many_response(response_json, ["S1", "S2", "S3"])
+    assert parsed_seasons == {"S1": [PARSED_NODE_2, PARSED_NODE_3], "S3": []}
+
+
+def test_parse_details_for_locales_response():
+    locales = [("US", "en"), ("DE", "de"), ("FR", "fr")]
+    response_json = {
+        "data": {
+            "locale0": RESPONSE_NODE_1,
+            "locale1": None,
+            "locale2": RESPONSE_NODE_2,
+        }
+    }
+    parsed_entries = parse_details_for_locales_response(response_json, locales)
+    assert parsed_entries == {("US", "en"): PARSED_NODE_1, ("FR", "fr"): PARSED_NODE_2}
+
+
+def test_parse_details_for_locales_response_raises_on_internal_api_error():
+    with raises(JustWatchApiError):
+        parse_details_for_locales_response(API_ERROR_RESPONSE, [])
+
+
+def test_parse_nodes_batch_response():
+    items = [
+        ("details", "tm1"),
+        ("seasons", "tss1"),
+        ("episodes", "tse1"),
+        ("details", "tm2"),
+        ("details", "tm3"),
+    ]
+    node_error = {"message": "Not found", "code": "NOT_FOUND", "path": ["node3"]}
+    response_json = {
+        "data": {
+            "node0": RESPONSE_NODE_1,
+            "node1": {"seasons": [RESPONSE_NODE_2]},
+            "node2": {"episodes": [RESPONSE_EPISODE_1]},
+            "node3": None,
+            "node4": None,
+        },
+        "errors": [node_error],
+    }
+    parsed = parse_nodes_batch_response(response_json, items)
+    assert parsed["details", "tm1"] == PARSED_NODE_1
+    assert parsed["seasons", "tss1"] == [PARSED_NODE_2]
+    assert parsed["episodes", "tse1"] == [PARSED_EPISODE_1]
+    assert isinstance(parsed["details", "tm2"], JustWatchApiError)
+    assert parsed["details", "tm2"].errors == [node_error]
+    assert type(parsed["details", "tm3"]) is JustWatchError
+
+
+@mark.parametrize(
+    argnames="error",
+    argvalues=[
+        {"message": "Query complexity exceeds the limit", "code": "X"},
+        {"message": "Unknown", "code": "X", "path": ["node5"]},
+    ],
+)
+def test_parse_nodes_batch_response_raises_on_request_error(error):
+    response_json = {"data": None, "errors": [error]}
+    with raises(JustWatchApiError):
+        parse_nodes_batch_response(response_json, [("details", "tm1")])
+
+
+NODE_ERROR = {"message": "Not found", "code": "NOT_FOUND", "path": ["node1", "id"]}
+RESPONSE_WITH_NODE_ERROR = {
+    "data": {
+        "node0": {**RESPONSE_NODE_1, "seasons": [RESPONSE_NODE_2], "US": []},
+        "node1": None,
+        "node2": None,
+    },
+    "errors": [NODE_ERROR],
+}
+
+
+@mark.parametrize(
+    argnames=("parse_function", "expected_output"),
+    argvalues=[
+        (parse_details_many_response, {"ID 1": PARSED_NODE_1}),
+        (parse_seasons_many_response, {"ID 1": [PARSED_NODE_2]}),
+        (parse_episodes_many_response, {"ID 1": []}),
+    ],
+)
+def test_parse_many_response_skips_nodes_with_errors(parse_function, expected_output):
+    node_ids = ["ID 1", "ID 2", "ID 3"]
+    assert parse_function(RESPONSE_WITH_NODE_ERROR, node_ids) == expected_output
+
+
+def test_parse_offers_matrix_response_skips_nodes_with_errors():
+    parsed_offers = parse_offers_matrix_response(
+        RESPONSE_WITH_NODE_ERROR, ["tm1", "tm2", "tm3"], {"US"}
+    )
+    assert parsed_offers == {("tm1", "US"): [], ("tm3", "US"): []}
+
+
+@mark.parametrize(
+    argnames="parse_function",
+    argvalues=[
+        parse_details_many_response,
+        parse_seasons_many_response,
+        parse_episodes_many_response,
+        lambda json, node_ids: parse_offers_matrix_response(json, node_ids, {"US"}),
+    ],
+)
+def test_parse_many_response_raises_on_errors_not_related_to_node(parse_function):
+    error = {"message": "Query complexity exceeds the limit", "path": ["node5"]}
+    with raises(JustWatchApiError):
+        parse_function({"data": None, "errors": [error]}, ["ID 1"])
+
+
+def test_parse_episodes_many_response():
+    response_json = {
+        "data": {
+            "node0": {"episodes": [RESPONSE_EPISODE_1, RESPONSE_EPISODE_2]},
+            "node1": None,
+            "node2": {"episodes": []},
+        }
+    }
+    parsed_episodes = parse_episodes_many_response(response_json, ["S1", "S2", "S3"])
+    assert parsed_episodes == {
+        "S1": [PARSED_EPISODE_1, PARSED_EPISODE_2],
+        "S3": [],
+    }
+
+
+@mark.parametrize(
+    argnames=("seasons", "expected_seasons", "expected_episodes"),
+    argvalues=[
+        (
+            [
+                {**RESPONSE_NODE_2, "episodes": [RESPONSE_EPISODE_1]},
+                {**RESPONSE_NODE_3, "episodes": []},
+            ],
+            [PARSED_NODE_2, PARSED_NODE_3],
+            {"id2": [PARSED_EPISODE_1], "id3": []},
+        ),
+        ([RESPONSE_NODE_2, RESPONSE_NODE_3], [PARSED_NODE_2, PARSED_NODE_3], {}),
+        ([], [], {}),
+    ],
+)
+def test_parse_show_tree_response(seasons, expected_seasons, expected_episodes):
+    response_json = {"data": {"node": {**RESPONSE_NODE_1, "seasons": seasons}}}
+    tree = parse_show_tree_response(response_json)
+    assert tree == ShowTree(PARSED_NODE_1, expected_seasons, expected_episodes)
+
+
 @mark.parametrize(
     argnames=("response_json", "countries", "expected_output"),
     argvalues=[
@@ -157,6 +384,27 @@ def test_parse_offers_for_countries_response(response_json, countries, expected_
     assert parsed_entries == expected_output
 
 
+def test_parse_offers_matrix_response():
+    response_json = {
+        "data": {
+            "node0": {"US": RESPONSE_NODE_1["offers"], "GB": []},
+            "node1": None,
+            "node2": {"US": RESPONSE_NODE_2["offers"], "GB": RESPONSE_NODE_1["offers"]},
+        }
+    }
+    parsed_offers = parse_offers_matrix_response(
+        response_json, ["tm1", "tm2", "tm3"], {"us", "GB"}
+    )
+    assert parsed_offers == {
+        ("tm1", "us"): PARSED_NODE_1.offers,
+        ("tm1", "GB"): [],
+        ("tm2", "us"): [],
+        ("tm2", "GB"): [],
+        ("tm3", "us"): PARSED_NODE_2.offers,
+        ("tm3", "GB"): PARSED_NODE_1.offers,
+    }
+
+
 @mark.parametrize(
     argnames=("response_json", "expected_output"),
     argvalues=[
@@ -181,6 +429,24 @@ def test_parse_providers_response(response_json, expected_output):
     assert parsed_packages == expected_output
 
 
+def test_parse_providers_for_countries_response():
+    response_json = {
+        "data": {
+            "US": [RESPONSE_PACKAGE_1, RESPONSE_PACKAGE_2],
+            "GB": None,
+            "FR": [RESPONSE_PACKAGE_3],
+        }
+    }
+    parsed_packages = parse_providers_for_countries_response(
+        response_json, {"us", "GB", "DE"}
+    )
+    assert parsed_packages == {
+        "us": [PARSED_PACKAGE_1, PARSED_PACKAGE_2],
+        "GB": [],
+        "DE": [],
+    }
+
+
 @mark.parametrize(
     argnames="parse_function",
     argvalues=[
@@ -189,6 +455,7 @@ def test_parse_providers_response(response_json, expected_output):
         parse_details_response,
         parse_seasons_response,
         parse_episodes_response,
+        parse_show_tree_response,
         parse_providers_response,
     ],
 )
@@ -200,3 +467,38 @@ def test_raises_on_internal_api_errors(parse_function):
 def test_parse_offers_for_countries_response_raises_on_internal_api_error():
     with raises(JustWatchApiError):
         parse_offers_for_countries_response(API_ERROR_RESPONSE, set())
+
+
+def test_parse_details_many_response_raises_on_internal_api_error():
+    with raises(JustWatchApiError):
+        parse_details_many_response(API_ERROR_RESPONSE, [])
+
+
+def test_parse_search_many_response_raises_on_internal_api_error():
+    with raises(JustWatchApiError):
+        parse_search_many_response(API_ERROR_RESPONSE, [])
+
+
+def test_parse_popular_for_countries_response_raises_on_internal_api_error():
+    with raises(JustWatchApiError):
+        parse_popular_for_countries_response(API_ERROR_RESPONSE, set())
+
+
+def test_parse_providers_for_countries_response_raises_on_internal_api_error():
+    with raises(JustWatchApiError):
+        parse_providers_for_countries_response(API_ERROR_RESPONSE, set())
+
+
+def test_parse_offers_matrix_response_raises_on_internal_api_error():
+    with raises(JustWatchApiError):
+        parse_offers_matrix_response(API_ERROR_RESPONSE, [], set())
+
+
+def test_parse_seasons_many_response_raises_on_internal_api_error():
+    with raises(JustWatchApiError):
+        parse_seasons_many_response(API_ERROR_RESPONSE, [])
+
+
+def test_parse_episodes_many_response_raises_on_internal_api_error():
+    with raises(JustWatchApiError):
+        parse_episodes_many_response(API_ERROR_RESPONSE, [])
@@ -0,0 +1,148 @@
+from asyncio import run
+from hashlib import sha256
+
+from pytest import fixture, mark
+
+from simplejustwatchapi.client import AsyncJustWatchClient, JustWatchClient
+from simplejustwatchapi.persisted import (
+    PERSISTED_QUERY_NOT_FOUND,
+    PERSISTED_QUERY_NOT_SUPPORTED,
+    PersistedQueries,
+    get_params,
+    persisted_query_error,
+    persisted_request,
+    query_hash,
+)
+from simplejustwatchapi.query import prepare_providers_request
+from test.simplejustwatchapi.stub_server import StubServer
+
+QUERY = "query GetSomething { something }"
+QUERY_HASH = sha256(QUERY.encode()).hexdigest()
+REQUEST = {
+    "operationName": "GetSomething",
+    "variables": {"country": "US", "filter": {"bestOnly": True}},
+    "query": QUERY,
+}
+PROVIDERS_RESPONSE = {"data": {"packages": []}}
+
+
+@fixture
+def server():
+    with StubServer({"GetProviders": PROVIDERS_RESPONSE}) as server:
+        yield server
+
+
+def test_query_hash():
+    assert query_hash(QUERY) == QUERY_HASH
+
+
+def test_persisted_request_without_query():
+    assert persisted_request(REQUEST, include_query=False) == {
+        "operationName": "GetSomething",
+        "variables": {"country": "US", "filter": {"bestOnly": True}},
+        "extensions": {"persistedQuery": {"version": 1, "sha256Hash": QUERY_HASH}},
+    }
+
+
+def test_persisted_request_with_query():
+    persisted = persisted_request(REQUEST, include_query=True)
+    assert persisted["query"] == QUERY
+    assert persisted["extensions"]["persistedQuery"]["sha256Hash"] == QUERY_HASH
+
+
+def test_get_params():
+    request = persisted_request(REQUEST, include_query=False)
+    assert get_params(request) == {
+        "operationName": "GetSomething",
+        "variables": '{"country":"US","filter":{"bestOnly":true}}',
+        "extensions": (
+            f'{{"persistedQuery":{{"sha256Hash":"{QUERY_HASH}","version":1}}}}'
+        ),
+    }
+
+
+@mark.parametrize(
+    argnames=("response", "expected"),
+    argvalues=[
+        (
+            {"errors": [{"message": "PersistedQueryNotFound"}]},
+            PERSISTED_QUERY_NOT_FOUND,
+        ),
+        (
+            {
+                "errors": [
+                    {"message": "", "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"}}
+                ]
+            },
+            PERSISTED_QUERY_NOT_FOUND,
+        ),
+        (
+            {"errors": [{"message": "PersistedQueryNotSupported"}]},
+            PERSISTED_QUERY_NOT_SUPPORTED,
+        ),
+        ({"errors": [{"message": "Other error"}]}, None),
+        ({"data": {}}, None),
+    ],
+)
+def test_persisted_query_error(response, expected):
+    assert persisted_query_error(response) == expected
+
+
+def test_full_query_is_sent_only_for_unknown_hash(server):
+    persisted_queries = PersistedQueries()
+    with JustWatchClient(url=server.url, persisted_queries=persisted_queries) as client:
+        assert client.providers() == []
+        assert client.providers() == []
+    first, registration, second = server.requests
+    assert "query" not in first.json
+    assert registration.json["query"] == prepare_providers_request("US")["query"]
+    assert "query" not in second.json
+    assert second.size < registration.size
+    assert all(request.method == "POST" for request in server.requests)
+
+
+def test_hash_only_requests_can_be_sent_as_get(server):
+    persisted_queries = PersistedQueries(use_get=True)
+    with JustWatchClient(url=server.url, persisted_queries=persisted_queries) as client:
+        client.providers()
+        client.providers()
+    methods = [request.method for request in server.requests]
+    assert methods == ["GET", "POST", "GET"]
+
+
+def test_full_queries_are_sent_without_persisted_queries(server):
+    with JustWatchClient(url=server.url) as client:
+        client.providers()
+        client.providers()
+    assert all("query" in request.json for request in server.requests)
+    assert all("extensions" not in request.json for request in server.requests)
+
+
+def test_persisted_queries_are_disabled_if_not_supported():
+    responses = {"GetProviders": PROVIDERS_RESPONSE}
+    persisted_queries = PersistedQueries()
+    with (
+        StubServer(responses, persisted_queries=False) as server,
+        JustWatchClient(url=server.url, persisted_queries=persisted_queries) as client,
+    ):
+        assert client.providers() == []
+        assert client.providers() == []
+    first, fallback, second = server.requests
+    assert "query" not in first.json
+    assert "query" in fallback.json
+    assert "query" in second.json
+    assert "extensions" not in second.json
+
+
+def test_async_full_query_is_sent_only_for_unknown_hash(server):
+    async def providers_twice():
+        persisted_queries = PersistedQueries(use_get=True)
+        async with AsyncJustWatchClient(
+            url=server.url, persisted_queries=persisted_queries
+        ) as client:
+            return [await client.providers(), await client.providers()]
+
+    assert run(providers_twice()) == [[], []]
+    methods = [request.method for request in server.requests]
+    assert methods == ["GET", "POST", "GET"]
+    assert "query" in server.requests[1].json
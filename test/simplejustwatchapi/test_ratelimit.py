@@ -0,0 +1,95 @@
+from asyncio import gather, run
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+
+from pytest import approx, fixture, mark, raises
+
+from simplejustwatchapi.exceptions import JustWatchError
+from simplejustwatchapi.ratelimit import RateLimiter
+
+
+@fixture
+def clock(mocker):
+    clock = mocker.patch("simplejustwatchapi.ratelimit.monotonic")
+    clock.return_value = 100.0
+    return clock
+
+
+@fixture
+def sleep_mock(mocker):
+    return mocker.patch("simplejustwatchapi.ratelimit.sleep")
+
+
+def acquire_delays(limiter, count, sleep_mock):
+    delays = []
+    for _ in range(count):
+        sleep_mock.reset_mock()
+        limiter.acquire()
+        delays.append(sleep_mock.call_args.args[0] if sleep_mock.called else 0)
+    return delays
+
+
+@mark.parametrize(("rate", "burst"), [(0, 1), (-1, 1), (1, 0)])
+def test_invalid_config(rate, burst):
+    with raises(JustWatchError):
+        RateLimiter(rate, burst)
+
+
+def test_burst_is_let_through_without_waiting(clock, sleep_mock):
+    limiter = RateLimiter(rate=2, burst=3)
+    assert acquire_delays(limiter, 3, sleep_mock) == [0, 0, 0]
+
+
+def test_requests_over_burst_wait_in_order(clock, sleep_mock):
+    limiter = RateLimiter(rate=2, burst=1)
+    assert acquire_delays(limiter, 4, sleep_mock) == approx([0, 0.5, 1.0, 1.5])
+
+
+def test_bucket_is_refilled_over_time(clock, sleep_mock):
+    limiter = RateLimiter(rate=2, burst=2)
+    acquire_delays(limiter, 2, sleep_mock)
+    clock.return_value += 0.5
+    assert acquire_delays(limiter, 2, sleep_mock) == approx([0, 0.5])
+
+
+def test_bucket_is_not_refilled_over_burst(clock, sleep_mock):
+    limiter = RateLimiter(rate=10, burst=2)
+    clock.return_value += 100
+    assert acquire_delays(limiter, 3, sleep_mock) == approx([0, 0, 0.1])
+
+
+def test_token_isnt_taken_if_it_cant_be_waited_for(clock, sleep_mock):
+    limiter = RateLimiter(rate=2, burst=1)
+    limiter.acquire(max_wait=0)
+    with raises(TimeoutError):
+        limiter.acquire(max_wait=0.4)
+    sleep_mock.assert_not_called()
+    assert acquire_delays(limiter, 1, sleep_mock) == approx([0.5])
+
+
+def test_acquire_async_sleeps_for_reserved_delay(clock, mocker):
+    sleep_mock = mocker.patch("simplejustwatchapi.ratelimit.async_sleep")
+    limiter = RateLimiter(rate=4, burst=1)
+    run(limiter.acquire_async())
+    sleep_mock.assert_not_called()
+    run(limiter.acquire_async())
+    sleep_mock.assert_awaited_once_with(approx(0.25))
+
+
+def test_rate_is_shared_between_threads():
+    limiter = RateLimiter(rate=200, burst=1)
+    start = monotonic()
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        list(executor.map(lambda _: limiter.acquire(), range(21)))
+    assert monotonic() - start >= 0.1 * 0.9
+
+
+def test_rate_is_shared_between_tasks():
+    limiter = RateLimiter(rate=200, burst=1)
+
+    async def acquire_all():
+        await gather(*(limiter.acquire_async() for _ in range(21)))
+
+    start = monotonic()
+    run(acquire_all())
+    assert monotonic() - start >= 0.1 * 0.9
@@ -4,22 +4,43 @@ from pytest import mark, raises
 
 from simplejustwatchapi.exceptions import JustWatchError
 from simplejustwatchapi.query import (
+    prepare_details_for_locales_request,
+    prepare_details_many_request,
     prepare_details_request,
+    prepare_episodes_many_request,
     prepare_episodes_request,
+    prepare_nodes_batch_request,
     prepare_offers_for_countries_request,
+    prepare_offers_matrix_request,
+    prepare_popular_for_countries_request,
     prepare_popular_request,
+    prepare_providers_for_countries_request,
     prepare_providers_request,
+    prepare_search_many_request,
     prepare_search_request,
+    prepare_seasons_many_request,
     prepare_seasons_request,
+    prepare_show_tree_request,
 )
 
 DUMMY_SEARCH_QUERY = "A DUMMY SEARCH QUERY"
+DUMMY_SEARCH_MANY_QUERY = "A DUMMY SEARCH MANY QUERY"
 DUMMY_POPULAR_QUERY = "A DUMMY POPULAR QUERY"
+DUMMY_POPULAR_FOR_COUNTRIES_QUERY = "A DUMMY POPULAR FOR COUNTRIES QUERY"
 DUMMY_DETAILS_QUERY = "A DUMMY DETAILS QUERY"
+DUMMY_DETAILS_MANY_QUERY = "A DUMMY DETAILS MANY QUERY"
+DUMMY_DETAILS_FOR_LOCALES_QUERY = "A DUMMY DETAILS FOR LOCALES QUERY"
 DUMMY_SEASONS_QUERY = "A DUMMY SEASONS QUERY"
+DUMMY_SEASONS_MANY_QUERY = "A DUMMY SEASONS MANY QUERY"
 DUMMY_EPISODES_QUERY = "A DUMMY EPISODES QUERY"
 DUMMY_OFFERS_FOR_COUNTRIES_QUERY = "A DUMMY OFFERS FOR COUNTRIES QUERY"
+DUMMY_OFFERS_MATRIX_QUERY = "A DUMMY OFFERS MATRIX QUERY"
+DUMMY_EPISODES_MANY_QUERY = "A DUMMY EPISODES MANY QUERY"
+DUMMY_SHOW_TREE_QUERY = "A DUMMY SHOW TREE QUERY"
+DUMMY_NODES_BATCH_QUERY = "A DUMMY NODES BATCH QUERY"
+DUMMY_SHOW_SEASONS_QUERY = "A DUMMY SHOW SEASONS QUERY"
 DUMMY_PROVIDERS_QUERY = "A DUMMY PROVIDERS QUERY"
+DUMMY_PROVIDERS_FOR_COUNTRIES_QUERY = "A DUMMY PROVIDERS FOR COUNTRIES QUERY"
 
 
 def common_variables(best_only):
@@ -84,6 +105,40 @@ def test_prepare_search_request(
     assert expected_request == request
 
 
+@patch(
+    "simplejustwatchapi.query.graphql_search_many_query",
+    return_value=DUMMY_SEARCH_MANY_QUERY,
+)
+@mark.parametrize(
+    argnames=("titles", "country", "language", "count", "best_only", "providers"),
+    argvalues=[
+        (["TITLE 1"], "US", "en", 1, True, None),
+        (["TITLE 1", "TITLE 2"], "gb", "fr", 5, False, ["provider1", "provider2"]),
+    ],
+)
+def test_prepare_search_many_request(
+    query_mock, titles, country, language, count, best_only, providers
+):
+    expected_request = {
+        "operationName": "GetSearchTitles",
+        "variables": {
+            **{
+                f"searchTitlesFilter{i}": {"searchQuery": title, "packages": providers}
+                for i, title in enumerate(titles)
+            },
+            "first": count,
+            **common_variables(best_only),
+            **locale_variables(country, language),
+        },
+        "query": DUMMY_SEARCH_MANY_QUERY,
+    }
+    request = prepare_search_many_request(
+        titles, country, language, count, best_only, providers
+    )
+    assert expected_request == request
+    query_mock.assert_called_once_with(len(titles))
+
+
 @patch("simplejustwatchapi.query.GRAPHQL_POPULAR_QUERY", DUMMY_POPULAR_QUERY)
 @mark.parametrize(
     argnames=("country", "language", "count", "best_only", "offset", "providers"),
@@ -120,6 +175,37 @@ def test_prepare_popular_request(
     assert expected_request == request
 
 
+@patch(
+    "simplejustwatchapi.query.graphql_popular_for_countries_query",
+    return_value=DUMMY_POPULAR_FOR_COUNTRIES_QUERY,
+)
+@mark.parametrize(
+    argnames=("countries", "language", "count", "best_only", "providers"),
+    argvalues=[
+        ({"US"}, "en", 5, True, None),
+        ({"gb", "US", "Ca"}, "de-GER123", 50, False, ["provider1", "provider2"]),
+    ],
+)
+def test_prepare_popular_for_countries_request(
+    query_mock, countries, language, count, best_only, providers
+):
+    expected_request = {
+        "operationName": "GetPopularTitlesForCountries",
+        "variables": {
+            "first": count,
+            "popularTitlesFilter": {"packages": providers},
+            "language": language,
+            **common_variables(best_only),
+        },
+        "query": DUMMY_POPULAR_FOR_COUNTRIES_QUERY,
+    }
+    request = prepare_popular_for_countries_request(
+        countries, language, count, best_only, providers
+    )
+    assert expected_request == request
+    query_mock.assert_called_once_with(sorted(c.upper() for c in countries))
+
+
 @patch("simplejustwatchapi.query.GRAPHQL_DETAILS_QUERY", DUMMY_DETAILS_QUERY)
 @mark.parametrize(
     argnames=("node_id", "country", "language", "best_only"),
@@ -142,6 +228,34 @@ def test_prepare_details_request(node_id, country, language, best_only):
     assert expected_request == request
 
 
+@patch(
+    "simplejustwatchapi.query.graphql_details_many_query",
+    return_value=DUMMY_DETAILS_MANY_QUERY,
+)
+@mark.parametrize(
+    argnames=("node_ids", "country", "language", "best_only"),
+    argvalues=[
+        (["NODE ID 1"], "US", "en", True),
+        (["NODE ID 1", "NODE ID 2", "NODE ID 3"], "gb", "fr-213SD45", False),
+    ],
+)
+def test_prepare_details_many_request(
+    query_mock, node_ids, country, language, best_only
+):
+    expected_request = {
+        "operationName": "GetTitleNodes",
+        "variables": {
+            **{f"nodeId{i}": node_id for i, node_id in enumerate(node_ids)},
+            **common_variables(best_only),
+            **locale_variables(country, language),
+        },
+        "query": DUMMY_DETAILS_MANY_QUERY,
+    }
+    request = prepare_details_many_request(node_ids, country, language, best_only)
+    assert expected_request == request
+    query_mock.assert_called_once_with(len(node_ids))
+
+
 @patch("simplejustwatchapi.query.GRAPHQL_SEASONS_QUERY", DUMMY_SEASONS_QUERY)
 @mark.parametrize(
     argnames=("node_id", "country", "language", "best_only"),
@@ -164,6 +278,135 @@ def test_prepare_seasons_request(node_id, country, language, best_only):
     assert expected_request == request
 
 
+@patch(
+    "simplejustwatchapi.query.graphql_seasons_many_query",
+    return_value=DUMMY_SEASONS_MANY_QUERY,
+)
+@mark.parametrize(
+    argnames=("show_ids", "country", "language", "best_only"),
+    argvalues=[
+        (["tss1"], "US", "en", True),
+        (["tss1", "tss2", "tss3"], "gb", "fr", False),
+    ],
+)
+def test_prepare_seasons_many_request(
+    query_mock, show_ids, country, language, best_only
+):
+    expected_request = {
+        "operationName": "GetShowsSeasons",
+        "variables": {
+            **{f"nodeId{i}": show_id for i, show_id in enumerate(show_ids)},
+            **common_variables(best_only),
+            **locale_variables(country, language),
+        },
+        "query": DUMMY_SEASONS_MANY_QUERY,
+    }
+    request = prepare_seasons_many_request(show_ids, country, language, best_only)
+    assert expected_request == request
+    query_mock.assert_called_once_with(len(show_ids))
+
+
+@patch(
+    "simplejustwatchapi.query.graphql_nodes_batch_query",
+    return_value=DUMMY_NODES_BATCH_QUERY,
+)
+@mark.parametrize(
+    argnames=("country", "language", "best_only"),
+    argvalues=[("US", "en", True), ("gb", "fr", False)],
+)
+def test_prepare_nodes_batch_request(query_mock, country, language, best_only):
+    items = [("details", "tm1"), ("seasons", "tss1"), ("episodes", "tse1")]
+    expected_request = {
+        "operationName": "GetTitleNodesBatch",
+        "variables": {
+            "nodeId0": "tm1",
+            "nodeId1": "tss1",
+            "nodeId2": "tse1",
+            **common_variables(best_only),
+            **locale_variables(country, language),
+        },
+        "query": DUMMY_NODES_BATCH_QUERY,
+    }
+    request = prepare_nodes_batch_request(items, country, language, best_only)
+    assert expected_request == request
+    query_mock.assert_called_once_with(["details", "seasons", "episodes"])
+
+
+@patch(
+    "simplejustwatchapi.query.graphql_details_for_locales_query",
+    return_value=DUMMY_DETAILS_FOR_LOCALES_QUERY,
+)
+@mark.parametrize("best_only", [True, False])
+def test_prepare_details_for_locales_request(query_mock, best_only):
+    locales = [("US", "en"), ("de", "de-CH")]
+    expected_request = {
+        "operationName": "GetTitleNodeForLocales",
+        "variables": {
+            "nodeId": "tm1",
+            "country0": "US",
+            "language0": "en",
+            "country1": "DE",
+            "language1": "de-CH",
+            **common_variables(best_only),
+        },
+        "query": DUMMY_DETAILS_FOR_LOCALES_QUERY,
+    }
+    request = prepare_details_for_locales_request("tm1", locales, best_only)
+    assert expected_request == request
+    query_mock.assert_called_once_with(len(locales))
+
+
+@patch(
+    "simplejustwatchapi.query.graphql_episodes_many_query",
+    return_value=DUMMY_EPISODES_MANY_QUERY,
+)
+@mark.parametrize(
+    argnames=("season_ids", "country", "language", "best_only"),
+    argvalues=[
+        (["tse1"], "US", "en", True),
+        (["tse1", "tse2", "tse3"], "gb", "fr", False),
+    ],
+)
+def test_prepare_episodes_many_request(
+    query_mock, season_ids, country, language, best_only
+):
+    expected_request = {
+        "operationName": "GetSeasonEpisodes",
+        "variables": {
+            **{f"nodeId{i}": season_id for i, season_id in enumerate(season_ids)},
+            **common_variables(best_only),
+            **locale_variables(country, language),
+        },
+        "query": DUMMY_EPISODES_MANY_QUERY,
+    }
+    request = prepare_episodes_many_request(season_ids, country, language, best_only)
+    assert expected_request == request
+    query_mock.assert_called_once_with(len(season_ids))
+
+
+@patch("simplejustwatchapi.query.GRAPHQL_SHOW_TREE_QUERY", DUMMY_SHOW_TREE_QUERY)
+@patch("simplejustwatchapi.query.GRAPHQL_SHOW_SEASONS_QUERY", DUMMY_SHOW_SEASONS_QUERY)
+@mark.parametrize(
+    argnames=("with_episodes", "operation_name", "query"),
+    argvalues=[
+        (True, "GetShowTree", DUMMY_SHOW_TREE_QUERY),
+        (False, "GetShowSeasons", DUMMY_SHOW_SEASONS_QUERY),
+    ],
+)
+def test_prepare_show_tree_request(with_episodes, operation_name, query):
+    expected_request = {
+        "operationName": operation_name,
+        "variables": {
+            "nodeId": "tss1",
+            **common_variables(False),
+            **locale_variables("gb", "fr"),
+        },
+        "query": query,
+    }
+    request = prepare_show_tree_request("tss1", "gb", "fr", False, with_episodes)
+    assert expected_request == request
+
+
 @patch("simplejustwatchapi.query.GRAPHQL_EPISODES_QUERY", DUMMY_EPISODES_QUERY)
 @mark.parametrize(
     argnames=("node_id", "country", "language", "best_only"),
@@ -216,6 +459,36 @@ def test_prepare_offers_for_countries_request(
     assert expected_request == request
 
 
+@patch(
+    "simplejustwatchapi.query.graphql_offers_matrix_query",
+    return_value=DUMMY_OFFERS_MATRIX_QUERY,
+)
+@mark.parametrize(
+    argnames=("node_ids", "countries", "language", "best_only"),
+    argvalues=[
+        (["tm1"], {"US"}, "en", True),
+        (["tm1", "ts2", "tm3"], {"gb", "US", "Ca"}, "de-GER123", False),
+    ],
+)
+def test_prepare_offers_matrix_request(
+    query_mock, node_ids, countries, language, best_only
+):
+    expected_request = {
+        "operationName": "GetTitleOffersMatrix",
+        "variables": {
+            **{f"nodeId{i}": node_id for i, node_id in enumerate(node_ids)},
+            "language": language,
+            **common_variables(best_only),
+        },
+        "query": DUMMY_OFFERS_MATRIX_QUERY,
+    }
+    request = prepare_offers_matrix_request(node_ids, countries, language, best_only)
+    assert expected_request == request
+    query_mock.assert_called_once_with(
+        len(node_ids), sorted(c.upper() for c in countries)
+    )
+
+
 @patch(
     "simplejustwatchapi.query.GRAPHQL_PROVIDERS_QUERY",
     DUMMY_PROVIDERS_QUERY,
@@ -237,8 +510,94 @@ def test_prepare_providers_request(country):
     assert expected_request == request
 
 
+@patch(
+    "simplejustwatchapi.query.graphql_providers_for_countries_query",
+    return_value=DUMMY_PROVIDERS_FOR_COUNTRIES_QUERY,
+)
+@mark.parametrize(
+    argnames="countries",
+    argvalues=[{"US"}, {"gb", "US", "Ca"}],
+)
+def test_prepare_providers_for_countries_request(query_mock, countries):
+    expected_request = {
+        "operationName": "GetProvidersForCountries",
+        "variables": {"formatOfferIcon": "PNG"},
+        "query": DUMMY_PROVIDERS_FOR_COUNTRIES_QUERY,
+    }
+    request = prepare_providers_for_countries_request(countries)
+    assert expected_request == request
+    query_mock.assert_called_once_with(sorted(c.upper() for c in countries))
+
+
 def test_prepare_offers_for_countries_request_asserts_on_empty_countries_set():
     expected_error_message = "No country codes, should not happen!"
     with raises(JustWatchError) as error:
         prepare_offers_for_countries_request("", set(), "en", True)
     assert str(error.value) == expected_error_message
+
+
+def test_prepare_details_many_request_asserts_on_empty_node_ids():
+    expected_error_message = "No node IDs, should not happen!"
+    with raises(JustWatchError) as error:
+        prepare_details_many_request([], "US", "en", True)
+    assert str(error.value) == expected_error_message
+
+
+def test_prepare_search_many_request_asserts_on_empty_titles():
+    expected_error_message = "No titles, should not happen!"
+    with raises(JustWatchError) as error:
+        prepare_search_many_request([], "US", "en", 1, True, None)
+    assert str(error.value) == expected_error_message
+
+
+def test_prepare_popular_for_countries_request_asserts_on_empty_countries_set():
+    expected_error_message = "No country codes, should not happen!"
+    with raises(JustWatchError) as error:
+        prepare_popular_for_countries_request(set(), "en", 5, True, None)
+    assert str(error.value) == expected_error_message
+
+
+def test_prepare_providers_for_countries_request_asserts_on_empty_countries_set():
+    expected_error_message = "No country codes, should not happen!"
+    with raises(JustWatchError) as error:
+        prepare_providers_for_countries_request(set())
+    assert str(error.value) == expected_error_message
+
+
+@mark.parametrize(
+    argnames=("node_ids", "countries"),
+    argvalues=[([], {"US"}), (["tm1"], set())],
+)
+def test_prepare_offers_matrix_request_asserts_on_empty_input(node_ids, countries):
+    expected_error_message = "No node IDs or country codes, should not happen!"
+    with raises(JustWatchError) as error:
+        prepare_offers_matrix_request(node_ids, countries, "en", True)
+    assert str(error.value) == expected_error_message
+
+
+def test_prepare_seasons_many_request_asserts_on_empty_show_ids():
+    expected_error_message = "No show IDs, should not happen!"
+    with raises(JustWatchError) as error:
+        prepare_seasons_many_request([], "US", "en", True)
+    assert str(error.value) == expected_error_message
+
+
+def test_prepare_details_for_locales_request_asserts_on_empty_locales():
+    expected_error_message = "No locales, should not happen!"
+    with raises(JustWatchError) as error:
+        prepare_details_for_locales_request("tm1", [], True)
+    assert str(error.value) == expected_error_message
+
+
+def test_prepare_nodes_batch_request_asserts_on_empty_items():
+    expected_error_message = "No node IDs, should not happen!"
+    with raises(JustWatchError) as error:
+        prepare_nodes_batch_request([], "US", "en", True)
+    assert str(error.value) == expected_error_message
+
+
+def test_prepare_episodes_many_request_asserts_on_empty_season_ids():
+    expected_error_message = "No season IDs, should not happen!"
+    with raises(JustWatchError) as error:
+        prepare_episodes_many_request([], "US", "en", True)
+    assert str(error.value) == expected_error_message
@@ -0,0 +1,101 @@
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+
+from httpx import (
+    ConnectError,
+    DecodingError,
+    HTTPStatusError,
+    ReadTimeout,
+    Request,
+    Response,
+)
+from pytest import approx, mark
+
+from simplejustwatchapi.retry import RetryPolicy
+
+REQUEST = Request(method="POST", url="https://apis.justwatch.com/graphql")
+
+
+def status_error(status_code, headers=None):
+    response = Response(status_code=status_code, headers=headers, request=REQUEST)
+    return HTTPStatusError("Status error", request=REQUEST, response=response)
+
+
+@mark.parametrize(
+    argnames=("error", "expected"),
+    argvalues=[
+        (status_error(429), True),
+        (status_error(500), True),
+        (status_error(502), True),
+        (status_error(503), True),
+        (status_error(504), True),
+        (status_error(400), False),
+        (status_error(404), False),
+        (ConnectError("Connection error"), True),
+        (ReadTimeout("Timeout"), True),
+        (DecodingError("Decoding error"), False),
+    ],
+)
+def test_is_retryable(error, expected):
+    assert RetryPolicy().is_retryable(error) is expected
+
+
+def test_is_retryable_custom_status_codes():
+    policy = RetryPolicy(retry_status_codes=frozenset({418}))
+    assert policy.is_retryable(status_error(418))
+    assert not policy.is_retryable(status_error(503))
+
+
+def test_network_errors_are_not_retried_if_disabled():
+    policy = RetryPolicy(retry_network_errors=False)
+    assert not policy.is_retryable(ConnectError("Connection error"))
+
+
+@mark.parametrize(
+    argnames=("retry", "expected"),
+    argvalues=[(0, 0.5), (1, 1.0), (2, 2.0), (3, 4.0), (10, 30.0)],
+)
+def test_delay_grows_exponentially_without_jitter(retry, expected):
+    policy = RetryPolicy(backoff=0.5, max_backoff=30.0, jitter=False)
+    assert policy.delay(retry, status_error(503)) == expected
+
+
+def test_delay_with_jitter_is_random_up_to_exponential_delay(mocker):
+    uniform_mock = mocker.patch("simplejustwatchapi.retry.uniform", return_value=0.7)
+    policy = RetryPolicy(backoff=1.0, jitter=True)
+    assert policy.delay(2, status_error(503)) == 0.7  # noqa: PLR2004
+    uniform_mock.assert_called_once_with(0, 4.0)
+
+
+def test_delay_uses_retry_after_seconds():
+    policy = RetryPolicy(jitter=False)
+    assert policy.delay(0, status_error(429, {"Retry-After": "7"})) == 7  # noqa: PLR2004
+
+
+def test_delay_uses_retry_after_date():
+    retry_date = datetime.now(UTC) + timedelta(seconds=10)
+    headers = {"Retry-After": format_datetime(retry_date, usegmt=True)}
+    policy = RetryPolicy(jitter=False)
+    assert policy.delay(0, status_error(503, headers)) == approx(10, abs=1.5)
+
+
+def test_delay_from_retry_after_is_capped():
+    policy = RetryPolicy(max_backoff=5.0)
+    assert policy.delay(0, status_error(429, {"Retry-After": "120"})) == 5  # noqa: PLR2004
+
+
+@mark.parametrize("retry_after", ["not a date", ""])
+def test_delay_ignores_invalid_retry_after(retry_after):
+    policy = RetryPolicy(backoff=0.5, jitter=False)
+    error = status_error(429, {"Retry-After": retry_after})
+    assert policy.delay(0, error) == 0.5  # noqa: PLR2004
+
+
+def test_delay_ignores_retry_after_if_disabled():
+    policy = RetryPolicy(backoff=0.5, jitter=False, respect_retry_after=False)
+    assert policy.delay(0, status_error(429, {"Retry-After": "7"})) == 0.5  # noqa: PLR2004
+
+
+def test_delay_for_network_errors_ignores_retry_after():
+    policy = RetryPolicy(backoff=0.5, jitter=False)
+    assert policy.delay(1, ConnectError("Connection error")) == 1.0
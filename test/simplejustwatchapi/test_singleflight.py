@@ -0,0 +1,150 @@
+from asyncio import Event as AsyncEvent
+from asyncio import create_task, gather, run
+from asyncio import sleep as async_sleep
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from time import sleep
+from unittest.mock import MagicMock
+
+from pytest import raises
+
+from simplejustwatchapi.singleflight import AsyncSingleFlight, SingleFlight, request_key
+
+KEY = "key"
+RESULT = {"dummy": "response"}
+ERROR_MESSAGE = "Request failed"
+
+
+def test_request_key_ignores_order_of_keys():
+    first = {"query": "QUERY", "variables": {"a": 1, "b": [1, 2]}}
+    second = {"variables": {"b": [1, 2], "a": 1}, "query": "QUERY"}
+    assert request_key(first) == request_key(second)
+
+
+def test_request_key_differs_for_different_requests():
+    first = {"query": "QUERY", "variables": {"nodeId": "tm1"}}
+    second = {"query": "QUERY", "variables": {"nodeId": "tm2"}}
+    assert request_key(first) != request_key(second)
+
+
+def test_concurrent_calls_are_coalesced():
+    single_flight = SingleFlight()
+    release = Event()
+    function = MagicMock(side_effect=lambda: release.wait() and RESULT)
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(single_flight.do, KEY, function) for _ in range(5)]
+        sleep(0.05)
+        release.set()
+        results = [future.result() for future in futures]
+    assert results == [RESULT] * 5
+    function.assert_called_once()
+
+
+def test_sequential_calls_are_not_coalesced():
+    single_flight = SingleFlight()
+    function = MagicMock(return_value=RESULT)
+    assert single_flight.do(KEY, function) == RESULT
+    assert single_flight.do(KEY, function) == RESULT
+    assert function.call_count == 2  # noqa: PLR2004
+
+
+def test_calls_with_different_keys_are_not_coalesced():
+    single_flight = SingleFlight()
+    function = MagicMock(return_value=RESULT)
+    single_flight.do(KEY, lambda: single_flight.do("other key", function))
+    function.assert_called_once()
+
+
+def test_error_is_raised_for_all_coalesced_calls():
+    single_flight = SingleFlight()
+    started = Event()
+    release = Event()
+
+    def failing():
+        started.set()
+        release.wait()
+        raise ValueError(ERROR_MESSAGE)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, KEY, failing)
+        started.wait()
+        follower = executor.submit(single_flight.do, KEY, MagicMock())
+        sleep(0.05)
+        release.set()
+        with raises(ValueError, match=ERROR_MESSAGE):
+            leader.result()
+        with raises(ValueError, match=ERROR_MESSAGE):
+            follower.result()
+
+
+def test_async_concurrent_calls_are_coalesced():
+    single_flight = AsyncSingleFlight()
+    calls = []
+
+    async def function():
+        calls.append(None)
+        await async_sleep(0.01)
+        return RESULT
+
+    async def coalesced():
+        return await gather(*(single_flight.do(KEY, function) for _ in range(5)))
+
+    assert run(coalesced()) == [RESULT] * 5
+    assert len(calls) == 1
+
+
+def test_async_sequential_calls_are_not_coalesced():
+    single_flight = AsyncSingleFlight()
+    calls = []
+
+    async def function():
+        calls.append(None)
+        return RESULT
+
+    async def sequential():
+        return [await single_flight.do(KEY, function) for _ in range(2)]
+
+    assert run(sequential()) == [RESULT, RESULT]
+    assert len(calls) == 2  # noqa: PLR2004
+
+
+def test_async_error_is_raised_for_all_coalesced_calls():
+    single_flight = AsyncSingleFlight()
+
+    async def failing():
+        await async_sleep(0.01)
+        raise ValueError(ERROR_MESSAGE)
+
+    async def coalesced():
+        return await gather(
+            *(single_flight.do(KEY, failing) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = run(coalesced())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_async_waiting_call_takes_over_if_first_one_is_cancelled():
+    single_flight = AsyncSingleFlight()
+    calls = []
+    started = AsyncEvent()
+
+    async def function():
+        calls.append(None)
+        started.set()
+        await async_sleep(0.01)
+        return RESULT
+
+    async def cancel_first():
+        first = create_task(single_flight.do(KEY, function))
+        await started.wait()
+        second = create_task(single_flight.do(KEY, function))
+        await async_sleep(0)
+        first.cancel()
+        return await second, first.cancelled()
+
+    result, first_cancelled = run(cancel_first())
+    assert result == RESULT
+    assert first_cancelled
+    assert len(calls) == 2  # noqa: PLR2004
@@ -0,0 +1,167 @@
+from asyncio import run
+from unittest.mock import AsyncMock
+
+from httpx import Request, Response
+from pytest import fixture, mark, raises
+
+from simplejustwatchapi.client import AsyncJustWatchClient, JustWatchClient
+from simplejustwatchapi.exceptions import JustWatchApiError, JustWatchError
+from simplejustwatchapi.splitting import SplitPolicy
+
+URL = "https://apis.justwatch.com/graphql"
+MAX_SIZE = 10
+COMPLEXITY_ERROR = {"message": "Query complexity exceeds the limit", "code": "X"}
+OTHER_ERROR = {"message": "Invalid country", "code": "BAD_USER_INPUT"}
+
+
+def api_response(request_json, error=COMPLEXITY_ERROR):
+    items = request_json["items"]
+    json = {"errors": [error]} if len(items) > MAX_SIZE else {"data": items}
+    return Response(200, request=Request("POST", URL), json=json)
+
+
+def parse(json, *_):
+    if "errors" in json:
+        raise JustWatchApiError(json["errors"])
+    return json["data"]
+
+
+@fixture
+def popular_mocks(mocker):
+    mocker.patch(
+        "simplejustwatchapi.client.prepare_popular_request",
+        side_effect=lambda *args: {"items": list(range(args[4], args[4] + args[2]))},
+    )
+    mocker.patch("simplejustwatchapi.client.parse_popular_response", side_effect=parse)
+
+
+@fixture
+def offers_mocks(mocker):
+    mocker.patch(
+        "simplejustwatchapi.client.prepare_offers_for_countries_request",
+        side_effect=lambda _, countries, *__: {"items": sorted(countries)},
+    )
+    mocker.patch(
+        "simplejustwatchapi.client.parse_offers_for_countries_response",
+        side_effect=lambda json, _: {c: [] for c in parse(json)},
+    )
+
+
+@fixture
+def post_mock(mocker):
+    http_client_mock = mocker.patch("simplejustwatchapi.client.Client")
+    post_mock = http_client_mock.return_value.post
+    post_mock.side_effect = lambda _, json, **__: api_response(json)
+    return post_mock
+
+
+@mark.parametrize(
+    argnames="config",
+    argvalues=[{"min_size": 0}, {"markers": ()}],
+)
+def test_invalid_config(config):
+    with raises(JustWatchError):
+        SplitPolicy(**config)
+
+
+@mark.parametrize(
+    argnames=("errors", "expected"),
+    argvalues=[
+        ([COMPLEXITY_ERROR], True),
+        ([OTHER_ERROR, {"message": "", "code": "COMPLEXITY_LIMIT"}], True),
+        ([OTHER_ERROR], False),
+        ([], False),
+    ],
+)
+def test_is_complexity_error(errors, expected):
+    assert SplitPolicy().is_complexity_error(JustWatchApiError(errors)) == expected
+
+
+def test_split_raises_error_if_request_is_too_small():
+    splitting = SplitPolicy(min_size=5)
+    error = JustWatchApiError([COMPLEXITY_ERROR])
+    assert splitting.split("popular", 6, error) == 5  # noqa: PLR2004
+    with raises(JustWatchApiError):
+        splitting.split("popular", 5, error)
+
+
+def test_successful_sizes_are_remembered_only_after_rejection():
+    splitting = SplitPolicy()
+    splitting.succeeded("popular", 50)
+    assert splitting.start_size("popular", 100) == 100  # noqa: PLR2004
+    splitting.split("popular", 100, JustWatchApiError([COMPLEXITY_ERROR]))
+    splitting.succeeded("popular", 25)
+    splitting.succeeded("popular", 50)
+    assert splitting.sizes == {"popular": 50}
+    assert splitting.start_size("popular", 100) == 50  # noqa: PLR2004
+    assert splitting.start_size("popular", 20) == 20  # noqa: PLR2004
+    assert splitting.start_size("search", 100) == 100  # noqa: PLR2004
+
+
+def test_rejected_request_fails_without_splitting(popular_mocks, post_mock):
+    with raises(JustWatchApiError):
+        JustWatchClient().popular(count=20)
+
+
+def test_rejected_popular_request_is_split(popular_mocks, post_mock):
+    splitting = SplitPolicy()
+    client = JustWatchClient(splitting=splitting)
+    assert client.popular(count=30, offset=5) == list(range(5, 35))
+    sent = [call.kwargs["json"]["items"] for call in post_mock.call_args_list]
+    assert [len(items) for items in sent] == [30, 15, 8, 7, 15, 8, 7]
+    assert splitting.sizes == {"popular": 8}
+
+
+def test_later_calls_start_at_remembered_size(popular_mocks, post_mock):
+    client = JustWatchClient(splitting=SplitPolicy())
+    client.popular(count=30)
+    post_mock.reset_mock()
+    assert client.popular(count=20, offset=100) == list(range(100, 120))
+    sent = [call.kwargs["json"]["items"] for call in post_mock.call_args_list]
+    assert [len(items) for items in sent] == [8, 8, 4]
+
+
+def test_other_api_errors_are_not_split(popular_mocks, post_mock):
+    post_mock.side_effect = lambda _, json, **__: api_response(json, OTHER_ERROR)
+    client = JustWatchClient(splitting=SplitPolicy())
+    with raises(JustWatchApiError):
+        client.popular(count=20)
+    post_mock.assert_called_once()
+
+
+def test_rejected_offers_request_splits_countries(offers_mocks, post_mock):
+    countries = {f"C{index:02}" for index in range(12)}
+    client = JustWatchClient(splitting=SplitPolicy())
+    results = client.offers_for_countries("tm123", countries)
+    assert results == {country: [] for country in countries}
+    assert post_mock.call_count == 3  # noqa: PLR2004
+
+
+def test_sizes_are_remembered_separately_for_each_count(mocker, post_mock):
+    mocker.patch(
+        "simplejustwatchapi.client.prepare_search_many_request",
+        side_effect=lambda titles, _, __, count, *___: {"items": titles * count},
+    )
+    mocker.patch(
+        "simplejustwatchapi.client.parse_search_many_response",
+        side_effect=lambda json, titles: {t: [] for t in titles if parse(json)},
+    )
+    titles = [f"T{index:02}" for index in range(12)]
+    splitting = SplitPolicy()
+    client = JustWatchClient(complexity_budget=1_000_000, splitting=splitting)
+    client.search_many(titles[:4], count=5)
+    client.search_many(titles, count=1)
+    assert splitting.sizes == {"search_many(count=5)": 2, "search_many(count=1)": 6}
+    post_mock.reset_mock()
+    assert list(client.search_many(titles, count=1)) == titles
+    assert post_mock.call_count == 2  # noqa: PLR2004
+
+
+def test_async_rejected_popular_request_is_split(popular_mocks, mocker):
+    http_client_mock = mocker.patch("simplejustwatchapi.client.AsyncClient")
+    http_client_mock.return_value.post = AsyncMock(
+        side_effect=lambda _, json, **__: api_response(json)
+    )
+    client = AsyncJustWatchClient(splitting=SplitPolicy())
+    assert run(client.popular(count=25)) == list(range(25))
+    assert http_client_mock.return_value.post.await_count == 7  # noqa: PLR2004
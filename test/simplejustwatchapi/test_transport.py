@@ -0,0 +1,150 @@
+from asyncio import run
+from json import dumps, loads
+
+from httpx import Client, Request
+from pytest import approx, fixture, raises
+
+from simplejustwatchapi.client import AsyncJustWatchClient, JustWatchClient
+from simplejustwatchapi.exceptions import JustWatchError
+from simplejustwatchapi.persisted import PersistedQueries
+from simplejustwatchapi.transport import RecordingTransport, ReplayTransport
+from test.simplejustwatchapi.stub_server import StubServer
+
+PROVIDERS_RESPONSE = {"data": {"packages": []}}
+REPLAY_URL = "http://localhost:1/graphql"
+EMPTY_RECORDING = {
+    "request": {"method": "POST", "url": "/graphql", "body": "{}"},
+    "response": {"status_code": 200, "headers": {}, "body": "{}"},
+}
+
+
+@fixture
+def server():
+    with StubServer({"GetProviders": PROVIDERS_RESPONSE}) as server:
+        yield server
+
+
+@fixture
+def recording(tmp_path):
+    return tmp_path / "recording.jsonl"
+
+
+def test_recording_transport_writes_request_and_response(server, recording):
+    transport = RecordingTransport(recording)
+    with JustWatchClient(url=server.url, transport=transport) as client:
+        assert client.providers("US") == []
+    (line,) = recording.read_text().splitlines()
+    recorded = loads(line)
+    assert recorded["request"]["method"] == "POST"
+    assert recorded["request"]["url"] == "/graphql"
+    assert loads(recorded["request"]["body"])["operationName"] == "GetProviders"
+    assert recorded["response"]["status_code"] == 200  # noqa: PLR2004
+    assert loads(recorded["response"]["body"]) == PROVIDERS_RESPONSE
+
+
+def test_recording_transport_appends_to_existing_recording(server, recording):
+    for _ in range(2):
+        transport = RecordingTransport(recording)
+        with JustWatchClient(url=server.url, transport=transport) as client:
+            client.providers("US")
+    assert len(recording.read_text().splitlines()) == 2  # noqa: PLR2004
+
+
+def test_replay_transport_serves_recorded_responses_offline(server, recording):
+    transport = RecordingTransport(recording)
+    with JustWatchClient(url=server.url, transport=transport) as client:
+        client.providers("US")
+    server.requests.clear()
+    with JustWatchClient(
+        url=REPLAY_URL, transport=ReplayTransport(recording)
+    ) as client:
+        assert client.providers("US") == []
+        assert client.providers("US") == []
+    assert server.requests == []
+
+
+def test_replay_transport_matches_body_regardless_of_key_order(recording):
+    request = {"operationName": "GetProviders", "variables": {"country": "US"}}
+    response = {"status_code": 200, "headers": {}, "body": dumps(PROVIDERS_RESPONSE)}
+    recorded = {
+        "request": {"method": "POST", "url": "/graphql", "body": dumps(request)},
+        "response": response,
+    }
+    recording.write_text(dumps(recorded) + "\n")
+    reordered = {"variables": {"country": "US"}, "operationName": "GetProviders"}
+    with Client(transport=ReplayTransport(recording)) as client:
+        replayed = client.post(REPLAY_URL, json=reordered)
+    assert replayed.json() == PROVIDERS_RESPONSE
+
+
+def test_replay_transport_matches_get_requests(server, recording):
+    persisted_queries = PersistedQueries(use_get=True)
+    transport = RecordingTransport(recording)
+    with JustWatchClient(
+        url=server.url, transport=transport, persisted_queries=persisted_queries
+    ) as client:
+        client.providers("US")
+        client.providers("US")
+    replay = ReplayTransport(recording)
+    with JustWatchClient(
+        url=REPLAY_URL, transport=replay, persisted_queries=persisted_queries
+    ) as client:
+        assert client.providers("US") == []
+
+
+def test_replay_transport_raises_for_unknown_request(server, recording):
+    transport = RecordingTransport(recording)
+    with JustWatchClient(url=server.url, transport=transport) as client:
+        client.providers("US")
+    with (
+        JustWatchClient(url=REPLAY_URL, transport=ReplayTransport(recording)) as client,
+        raises(JustWatchError, match="No recorded response"),
+    ):
+        client.providers("PL")
+
+
+def test_replay_transport_raises_for_invalid_recording(recording):
+    recording.write_text("not a json\n")
+    with raises(JustWatchError, match="Invalid recording file"):
+        ReplayTransport(recording)
+
+
+def test_replay_transport_raises_for_missing_recording(recording):
+    with raises(JustWatchError, match="Invalid recording file"):
+        ReplayTransport(recording)
+
+
+def test_replay_transport_waits_for_synthetic_latency(recording, mocker):
+    sleep_mock = mocker.patch("simplejustwatchapi.transport.sleep")
+    uniform_mock = mocker.patch("simplejustwatchapi.transport.uniform")
+    uniform_mock.return_value = 0.02
+    recording.write_text(dumps(EMPTY_RECORDING))
+    transport = ReplayTransport(recording, latency=0.1, jitter=0.05)
+    transport.handle_request(Request("POST", REPLAY_URL, json={}))
+    uniform_mock.assert_called_once_with(0, 0.05)
+    sleep_mock.assert_called_once_with(approx(0.12))
+
+
+def test_replay_transport_fails_unknown_requests_without_waiting(recording, mocker):
+    sleep_mock = mocker.patch("simplejustwatchapi.transport.sleep")
+    recording.write_text(dumps(EMPTY_RECORDING))
+    transport = ReplayTransport(recording, latency=0.1)
+    with raises(JustWatchError):
+        transport.handle_request(Request("GET", REPLAY_URL))
+    sleep_mock.assert_not_called()
+
+
+def test_async_record_and_replay(server, recording, mocker):
+    sleep_mock = mocker.patch("simplejustwatchapi.transport.async_sleep")
+
+    async def record_and_replay():
+        transport = RecordingTransport(recording)
+        async with AsyncJustWatchClient(url=server.url, transport=transport) as client:
+            recorded = await client.providers("US")
+        replay = ReplayTransport(recording, latency=0.5)
+        async with AsyncJustWatchClient(url=REPLAY_URL, transport=replay) as client:
+            replayed = await client.providers("US")
+        return recorded, replayed
+
+    assert run(record_and_replay()) == ([], [])
+    sleep_mock.assert_awaited_once_with(0.5)